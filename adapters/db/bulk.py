@@ -0,0 +1,198 @@
+# adapters/db/bulk.py
+# Écriture en masse (UNWIND) : lots bornés (lignes / octets), transactions parallèles partitionnées, reprises.
+from __future__ import annotations
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterator, List, Mapping, Optional, Sequence, Union
+import logging, random, time, zlib
+
+from neo4j.exceptions import ServiceUnavailable, SessionExpired, TransientError
+
+log = logging.getLogger("neo4j")
+
+# Erreurs pour lesquelles rejouer la transaction a un sens (verrous, deadlocks, bascule du leader, coupure réseau)
+RETRYABLE = (TransientError, ServiceUnavailable, SessionExpired)
+
+# Clé de partition: champ, tuple de champs (toutes les extrémités touchées) ou callable -> id / tuple d'ids
+RowKey = Union[str, Sequence[str], Callable[[Mapping[str, Any]], Any]]
+
+
+def row_bytes(x: Any) -> int:
+    """Estimation (rapide, sans sérialisation) de la taille d'un paramètre Bolt."""
+    if x is None or isinstance(x, bool):
+        return 1
+    if isinstance(x, (int, float)):
+        return 9
+    if isinstance(x, str):
+        return len(x) + 5
+    if isinstance(x, Mapping):
+        return 5 + sum(len(str(k)) + row_bytes(v) for k, v in x.items())
+    if isinstance(x, (list, tuple)):
+        if x and isinstance(x[0], float):   # vecteur: pas de parcours élément par élément
+            return 5 + 9 * len(x)
+        return 5 + sum(row_bytes(v) for v in x)
+    return len(str(x)) + 5
+
+
+def _row_nodes(key: RowKey) -> Callable[[Mapping[str, Any]], List[Any]]:
+    """Ids des noeuds verrouillés par une ligne, selon `key`."""
+    if callable(key):
+        get = key
+    elif isinstance(key, str):
+        get = lambda r: r.get(key)
+    else:
+        fields = tuple(key)
+        get = lambda r: tuple(r.get(k) for k in fields)
+    def nodes(r: Mapping[str, Any]) -> List[Any]:
+        v = get(r)
+        return [x for x in v if x is not None] if isinstance(v, (list, tuple)) else [v]
+    return nodes
+
+
+def partition(rows: Sequence[Mapping[str, Any]], key: Optional[RowKey], parts: int) -> List[List[Mapping[str, Any]]]:
+    """
+    Répartit les lignes en `parts` groupes par hachage stable (crc32) de l'id de noeud:
+    deux lignes visant le même noeud tombent dans la même partition, donc jamais dans
+    deux transactions concurrentes (pas de contention de verrou sur ce noeud).
+    Ligne touchant plusieurs noeuds (relation src/dst, lien entité/chunk): les lignes qui partagent
+    un noeud quelconque sont regroupées (union-find) et le groupe entier va dans une seule partition;
+    un graphe très connexe dégénère donc en écriture sérialisée plutôt qu'en verrous croisés.
+    """
+    if parts <= 1 or key is None:
+        return [list(rows)]
+    nodes_of = _row_nodes(key)
+    row_nodes = [nodes_of(r) for r in rows]
+    parent: Dict[Any, Any] = {}
+
+    def find(x: Any) -> Any:
+        root = x
+        while parent.setdefault(root, root) != root:
+            root = parent[root]
+        while parent[x] != root:
+            parent[x], x = root, parent[x]
+        return root
+
+    for ns in row_nodes:
+        if len(ns) > 1:
+            a = find(ns[0])
+            for b in ns[1:]:
+                b = find(b)
+                if a != b:
+                    parent[b] = a
+    out: List[List[Mapping[str, Any]]] = [[] for _ in range(parts)]
+    for r, ns in zip(rows, row_nodes):
+        owner = find(ns[0]) if ns else None
+        out[zlib.crc32(str(owner).encode("utf-8")) % parts].append(r)
+    return [p for p in out if p]
+
+
+def split(rows: Sequence[Mapping[str, Any]], *, max_rows: int, max_bytes: int) -> Iterator[List[Mapping[str, Any]]]:
+    """Découpe en lots d'au plus `max_rows` lignes et ~`max_bytes` octets (une ligne seule peut dépasser)."""
+    batch: List[Mapping[str, Any]] = []
+    size = 0
+    for r in rows:
+        b = row_bytes(r)
+        if batch and (len(batch) >= max_rows or size + b > max_bytes):
+            yield batch
+            batch, size = [], 0
+        batch.append(r); size += b
+    if batch:
+        yield batch
+
+
+@dataclass
+class BulkReport:
+    """Bilan d'une écriture: lignes envoyées, `n` cumulé renvoyé par Cypher, lots, reprises, débit."""
+    label: str = ""
+    rows: int = 0
+    n: int = 0
+    batches: int = 0
+    retries: int = 0
+    seconds: float = 0.0
+
+    @property
+    def rows_per_s(self) -> float:
+        return self.rows / self.seconds if self.seconds > 0 else 0.0
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {"label": self.label, "rows": self.rows, "n": self.n, "batches": self.batches,
+                "retries": self.retries, "seconds": round(self.seconds, 3), "rows_per_s": round(self.rows_per_s, 1)}
+
+
+@dataclass
+class BulkWriter:
+    """
+    Exécute une requête `UNWIND $<param> AS ...` sur une grande liste de lignes:
+    - lots bornés par `max_rows` et `max_bytes` (une seule transaction géante évitée);
+    - `parallelism` transactions d'écriture simultanées, une par partition (hash de `key`, ou groupe de
+      lignes partageant un noeud si `key` désigne plusieurs extrémités);
+    - reprise des erreurs transitoires (`retries` tentatives, backoff exponentiel + jitter);
+    - `n` cumulé si la requête renvoie `n`, sinon le nombre de lignes écrites.
+    `session_factory` : callable sans argument qui ouvre une session (ex: Neo4jAdapter._session).
+    """
+    session_factory: Callable[[], Any]
+    max_rows: int = 2000
+    max_bytes: int = 8 * 1024 * 1024
+    parallelism: int = 4
+    retries: int = 5
+    backoff_s: float = 0.2
+    on_batch: Optional[Callable[..., None]] = field(default=None, repr=False)  # (query, params, t0=, rows=, label=) après écriture
+
+    def _tx(self, query: str, params: Mapping[str, Any], size: int) -> int:
+        # Transaction explicite: la seule couche de reprise est `_write_batch` (execute_write rejouerait lui aussi)
+        with self.session_factory() as s:
+            with s.begin_transaction() as tx:
+                recs = list(tx.run(query, **params))
+                tx.commit()
+        if recs and "n" in recs[0].keys():
+            return int(recs[0]["n"] or 0)
+        return size
+
+    def _write_batch(self, query: str, params: Mapping[str, Any], size: int, report: BulkReport) -> int:
+        delay = self.backoff_s
+        for attempt in range(self.retries + 1):
+            try:
+                return self._tx(query, params, size)
+            except RETRYABLE as ex:
+                if attempt >= self.retries:
+                    raise
+                report.retries += 1
+                log.warning("Neo4j|Bulk - %s: erreur transitoire (%s), reprise %d/%d dans %.2fs",
+                            report.label, type(ex).__name__, attempt + 1, self.retries, delay)
+                time.sleep(delay * (1.0 + random.random() * 0.5))
+                delay *= 2
+        return 0
+
+    def _run_partition(self, query: str, param: str, rows: Sequence[Mapping[str, Any]],
+                       extra: Mapping[str, Any], report: BulkReport) -> int:
+        n = 0
+        for batch in split(rows, max_rows=self.max_rows, max_bytes=self.max_bytes):
+            params = {**extra, param: list(batch)}
+            t0 = time.perf_counter()
+            n += self._write_batch(query, params, len(batch), report)
+            if self.on_batch:
+                self.on_batch(query, params, t0=t0, rows=len(batch), label=report.label)
+            report.batches += 1   # incréments d'entiers: sûrs sous le GIL
+        return n
+
+    def write(self, query: str, rows: Sequence[Mapping[str, Any]], *, param: str = "rows",
+              key: Optional[RowKey] = None, params: Optional[Mapping[str, Any]] = None,
+              label: str = "") -> BulkReport:
+        """Écrit `rows` (paramètre Cypher `param`) ; `params` : paramètres communs (ex: series)."""
+        report = BulkReport(label=label or param, rows=len(rows))
+        if not rows:
+            return report
+        t0 = time.perf_counter()
+        parts = partition(rows, key, self.parallelism)
+        extra = dict(params or {})
+        if len(parts) == 1:
+            report.n = self._run_partition(query, param, parts[0], extra, report)
+        else:
+            with ThreadPoolExecutor(max_workers=len(parts), thread_name_prefix="neo4j-bulk") as ex:
+                futs = [ex.submit(self._run_partition, query, param, p, extra, report) for p in parts]
+                report.n = sum(f.result() for f in futs)
+        report.seconds = time.perf_counter() - t0
+        log.info("Neo4j|Bulk - %s: %d lignes en %d lots (%d partitions, %d reprises) %.2fs = %.0f lignes/s",
+                 report.label, report.rows, report.batches, len(parts), report.retries,
+                 report.seconds, report.rows_per_s)
+        return report
@@ -5,12 +5,47 @@ from __future__ import annotations
 BASE_SCHEMA = [
     "CREATE CONSTRAINT chunk_id IF NOT EXISTS FOR (c:Chunk) REQUIRE c.id IS UNIQUE",
     "CREATE INDEX chunk_series IF NOT EXISTS FOR (c:Chunk) ON (c.series)",
+    "CREATE INDEX chunk_series_id IF NOT EXISTS FOR (c:Chunk) ON (c.series, c.id)",  # pagination iter_chunks
 
     "CREATE CONSTRAINT entity_id IF NOT EXISTS FOR (e:Entity) REQUIRE e.id IS UNIQUE",
     "CREATE INDEX entity_type IF NOT EXISTS FOR (e:Entity) ON (e.type)",
-    "CREATE FULLTEXT INDEX entity_name_ft IF NOT EXISTS FOR (e:Entity) ON EACH [e.name]"
+    "CREATE CONSTRAINT graph_version_series IF NOT EXISTS FOR (g:GraphVersion) REQUIRE g.series IS UNIQUE",
+    "CREATE CONSTRAINT schema_migration_name IF NOT EXISTS FOR (m:SchemaMigration) REQUIRE m.name IS UNIQUE",
+    "CREATE FULLTEXT INDEX entity_name_ft IF NOT EXISTS FOR (e:Entity) ON EACH [e.name]",
+    # recherche lexicale des seeds PathRAG (node_retrieval.topN), filtrée par série dans la requête Lucene
+    "CREATE FULLTEXT INDEX entity_lexical_ft IF NOT EXISTS FOR (e:Entity) ON EACH [e.name, e.aliases_text, e.desc, e.series]",
 ]
 
+# Migrations de données uniques : marqueur (:SchemaMigration {name}) posé après succès, vérifié avant de relancer
+SCHEMA_MIGRATION_DONE = "MATCH (m:SchemaMigration {name: $name}) RETURN count(m) AS n"
+SCHEMA_MIGRATION_MARK = "MERGE (m:SchemaMigration {name: $name}) SET m.applied_at = timestamp()"
+
+# Rattrapage unique (migration MIGRATION_ALIASES_TEXT): entités écrites avant que les upserts ne renseignent
+# aliases_text (parcours de toutes les entités: jamais relancé une fois le marqueur posé)
+MIGRATION_ALIASES_TEXT = "entity_aliases_text"
+BACKFILL_ALIASES_TEXT = """
+MATCH (e:Entity) WHERE e.aliases_text IS NULL
+CALL { WITH e
+  SET e.aliases_text = reduce(acc = "", a IN coalesce(e.aliases, []) | acc + " " + a)
+} IN TRANSACTIONS OF 10000 ROWS
+"""
+
+# ---------- Recherche lexicale d'entités ----------
+# Un seul aller-retour: Lucene (BM25) sur name/aliases/desc, série imposée dans $q et revérifiée
+ENTITY_LEXICAL_SEARCH = """
+CALL db.index.fulltext.queryNodes('entity_lexical_ft', $q, {limit: $limit}) YIELD node AS e, score
+WHERE e.series = $series
+RETURN e.id AS id, e.name AS name, e.desc AS desc, coalesce(e.conf, 0.5) AS conf, score
+ORDER BY score DESC
+"""
+
+# Repli (pas d'index full-text): entités de la série pour l'index inversé Python
+ENTITY_LEXICAL_DOCS = """
+MATCH (e:Entity {series: $series})
+RETURN e.id AS id, e.name AS name, coalesce(e.aliases, []) AS aliases, coalesce(e.desc, "") AS desc,
+       coalesce(e.conf, 0.5) AS conf
+"""
+
 def vector_index_create(name: str, label="Chunk", prop="embedding") -> str:
     return f"""
     CREATE VECTOR INDEX `{name}` IF NOT EXISTS
@@ -57,6 +92,7 @@ SET c.series = row.series,
     c.model = row.model,
     c.dims = row.dims,
     c.ts = row.ts,
+    c.text_hash = row.text_hash,
     c.build_id = row.build_id
 FOREACH (vec IN CASE WHEN row.vec IS NULL THEN [] ELSE [row.vec] END |
     SET c.embedding = vec
@@ -79,6 +115,45 @@ RETURN c.id AS cid,
 ORDER BY c.id
 """
 
+# Lecture paginée (keyset sur c.id) avec projection explicite : jamais `RETURN c` (embedding inclus)
+CHUNK_FIELDS = ("id", "series", "file", "page", "text", "order", "provider", "model",
+                "dims", "ts", "text_hash", "build_id", "meta_json", "embedding")
+DEFAULT_CHUNK_FIELDS = ("id", "text")
+
+def chunks_page_query(fields, *, after: bool = False) -> str:
+    """
+    Page de chunks d'une série, `$limit` lignes, colonnes = `fields` (liste blanche).
+    Deux variantes: première page (`after=False`) ou page suivant `$after` (exclu). Pas de
+    `($after IS NULL OR ...)`: le planner ne peut pas en tirer un range seek sur l'index (series, id).
+    """
+    cols = list(dict.fromkeys(["id", *fields]))
+    bad = [f for f in cols if f not in CHUNK_FIELDS]
+    if bad:
+        raise ValueError(f"unknown Chunk field(s): {bad}; allowed: {CHUNK_FIELDS}")
+    ret = ", ".join(f"c.`{f}` AS `{f}`" for f in cols)
+    cond = "c.series = $series AND c.id > $after" if after else "c.series = $series"
+    return f"""
+MATCH (c:Chunk)
+WHERE {cond}
+RETURN {ret}
+ORDER BY c.id
+LIMIT $limit
+"""
+
+# Empreintes (diff embed_corpus) : ce qui est déjà stocké pour la série
+GET_CHUNK_FINGERPRINTS = """
+MATCH (c:Chunk)
+WHERE c.series = $series
+RETURN c.id AS cid, c.text_hash AS text_hash, c.model AS model, c.dims AS dims
+"""
+
+DELETE_CHUNKS = """
+UNWIND $cids AS cid
+MATCH (c:Chunk {id: cid})
+DETACH DELETE c
+RETURN count(*) AS n
+"""
+
 # ---------- Similarité ----------
 QUERY_TOP_K = """
 CALL db.index.vector.queryNodes($index, $k, $vec)
@@ -98,7 +173,9 @@ SET  e.name       = row.name,
      e.attrs_json = row.attrs_json,
      e.meta_json  = row.meta_json,
      e.approach   = row.approach,
-     e.build_id   = row.build_id
+     e.build_id   = row.build_id,
+     e.aliases    = coalesce(row.aliases, e.aliases, [])
+SET  e.aliases_text = reduce(acc = "", a IN e.aliases | acc + " " + a)   // champ de entity_lexical_ft
 FOREACH (vec IN CASE WHEN row.embedding IS NULL THEN [] ELSE [row.embedding] END |
     SET e.embedding = vec)
 RETURN count(e) AS n
@@ -0,0 +1,255 @@
+# adapters/db/graph_snapshot.py
+# Instantané en mémoire du graphe d'entités d'une série : ids internés, adjacence CSR (NumPy), parcours locaux.
+from __future__ import annotations
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple, Union
+import logging, threading, time
+
+import numpy as np
+
+log = logging.getLogger("neo4j")
+
+SNAPSHOT_NODES = """
+MATCH (e:Entity {series: $series})
+RETURN e.id AS id, e.name AS name, coalesce(e.conf, 0.5) AS conf
+"""
+
+SNAPSHOT_EDGES = """
+MATCH (s:Entity {series: $series})-[r:REL]->(t:Entity {series: $series})
+RETURN s.id AS src, t.id AS dst, coalesce(r.pred, r.kind, "REL") AS pred, coalesce(r.conf, 0.5) AS conf
+"""
+
+# Version du graphe d'une série: un noeud (:GraphVersion) incrémenté par chaque écriture Entity/REL
+# (upserts, mises à jour conf/pred en place) => lecture O(1), aucune agrégation sur les arêtes
+GRAPH_VERSION_TOUCH = """
+UNWIND $series AS s
+MERGE (g:GraphVersion {series: s})
+SET g.v = coalesce(g.v, 0) + 1, g.updated_at = datetime()
+"""
+
+SNAPSHOT_VERSION = """
+OPTIONAL MATCH (g:GraphVersion {series: $series})
+RETURN g.v AS v, toString(g.updated_at) AS updated_at
+"""
+
+# Repli (graphes écrits avant GraphVersion): build_id max + compteurs
+SNAPSHOT_VERSION_LEGACY = """
+MATCH (e:Entity {series: $series})
+WITH count(e) AS n, max(e.build_id) AS b
+OPTIONAL MATCH (:Entity {series: $series})-[r:REL]->(:Entity {series: $series})
+RETURN b AS build_id, n AS nodes, count(r) AS rels, max(r.build_id) AS rel_build_id
+"""
+
+Node = Union[str, int]
+
+
+@dataclass
+class GraphSnapshot:
+    """
+    Graphe (non orienté, comme `-[r:REL*1..n]-` côté Cypher) d'une série:
+    - `ids[i]` <-> `index[id]` ; `names`, `node_conf` par noeud;
+    - CSR: voisins de i = indices[indptr[i]:indptr[i+1]], colonnes `edge_conf` / `edge_pred` (code -> `preds`).
+    """
+    series: str
+    ids: List[str]
+    names: List[str]
+    node_conf: np.ndarray
+    indptr: np.ndarray
+    indices: np.ndarray
+    edge_conf: np.ndarray
+    edge_pred: np.ndarray
+    preds: List[str]
+    version: Any = None
+    index: Dict[str, int] = field(default_factory=dict)
+
+    def __post_init__(self) -> None:
+        if not self.index:
+            self.index = {nid: i for i, nid in enumerate(self.ids)}
+
+    @classmethod
+    def from_rows(cls, series: str, nodes: Iterable[Mapping[str, Any]], edges: Iterable[Mapping[str, Any]],
+                  *, version: Any = None) -> "GraphSnapshot":
+        ids: List[str] = []
+        names: List[str] = []
+        conf: List[float] = []
+        index: Dict[str, int] = {}
+        for n in nodes:
+            if n["id"] in index:
+                continue
+            index[n["id"]] = len(ids)
+            ids.append(n["id"]); names.append(n.get("name") or ""); conf.append(float(n.get("conf", 0.5)))
+
+        preds: List[str] = []
+        pcode: Dict[str, int] = {}
+        src, dst, econf, epred = [], [], [], []
+        for e in edges:
+            s, t = index.get(e["src"]), index.get(e["dst"])
+            if s is None or t is None:
+                continue
+            p = e.get("pred") or "REL"
+            if p not in pcode:
+                pcode[p] = len(preds); preds.append(p)
+            src.append(s); dst.append(t); econf.append(float(e.get("conf", 0.5))); epred.append(pcode[p])
+
+        n = len(ids)
+        s_arr = np.asarray(src + dst, dtype=np.int64)        # deux sens par arête
+        d_arr = np.asarray(dst + src, dtype=np.int32)
+        order = np.argsort(s_arr, kind="stable")
+        indptr = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(s_arr, minlength=n), out=indptr[1:])
+        return cls(series=series, ids=ids, names=names, node_conf=np.asarray(conf, dtype=np.float32),
+                   indptr=indptr, indices=d_arr[order],
+                   edge_conf=np.asarray(econf + econf, dtype=np.float32)[order],
+                   edge_pred=np.asarray(epred + epred, dtype=np.int32)[order],
+                   preds=preds, version=version, index=index)
+
+    # ---------- primitives ----------
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @property
+    def n_edges(self) -> int:
+        return int(self.indices.shape[0] // 2)
+
+    def _i(self, node: Node) -> Optional[int]:
+        return node if isinstance(node, (int, np.integer)) else self.index.get(node)
+
+    def neighbors(self, node: Node, *, min_conf: float = 0.0) -> List[Tuple[str, str, float]]:
+        """(voisin, prédicat, conf) ; même forme que Neo4jAdapter.neighbors_neo4j."""
+        i = self._i(node)
+        if i is None:
+            return []
+        lo, hi = self.indptr[i], self.indptr[i + 1]
+        nb, cf, pr = self.indices[lo:hi], self.edge_conf[lo:hi], self.edge_pred[lo:hi]
+        keep = (cf >= min_conf) & (self.node_conf[nb] >= min_conf)
+        return [(self.ids[j], self.preds[p], float(c)) for j, p, c in zip(nb[keep], pr[keep], cf[keep])]
+
+    def k_hop(self, seeds: Sequence[Node], k: int, *, min_conf: float = 0.0) -> Dict[str, int]:
+        """id -> distance (en sauts, <= k) depuis l'ensemble `seeds` (BFS vectorisé par niveau)."""
+        dist = self._bfs([i for i in (self._i(s) for s in seeds) if i is not None], k, min_conf)
+        reached = np.nonzero(dist >= 0)[0]
+        return {self.ids[i]: int(dist[i]) for i in reached}
+
+    def _bfs(self, starts: Sequence[int], k: int, min_conf: float) -> np.ndarray:
+        dist = np.full(len(self.ids), -1, dtype=np.int32)
+        if not starts:
+            return dist
+        frontier = np.unique(np.asarray(starts, dtype=np.int64))
+        dist[frontier] = 0
+        for d in range(1, int(k) + 1):
+            if frontier.size == 0:
+                break
+            nxt = [self.indices[self.indptr[i]:self.indptr[i + 1]][self.edge_conf[self.indptr[i]:self.indptr[i + 1]] >= min_conf]
+                   for i in frontier]
+            cand = np.unique(np.concatenate(nxt)) if nxt else np.empty(0, dtype=np.int64)
+            cand = cand[(dist[cand] < 0) & (self.node_conf[cand] >= min_conf)]
+            dist[cand] = d
+            frontier = cand
+        return dist
+
+    def paths(self, src: Node, dst: Node, *, max_hops: int = 3, theta: float = 0.0,
+              limit: int = 6) -> List[Dict[str, Any]]:
+        """
+        Chemins simples src -> dst d'au plus `max_hops` arêtes, noeuds et arêtes de conf >= theta,
+        les plus courts d'abord, au plus `limit`. Forme = backend.neo4j._extract_path_record.
+        """
+        s, t = self._i(src), self._i(dst)
+        if s is None or t is None or s == t:
+            return []
+        if self.node_conf[s] < theta or self.node_conf[t] < theta:
+            return []
+        to_t = self._bfs([t], max_hops, theta)   # distance restante vers t: élague les branches sans issue
+        if to_t[s] < 0:
+            return []
+        out: List[Dict[str, Any]] = []
+        for L in range(int(to_t[s]), int(max_hops) + 1):
+            self._dfs(s, t, L, [s], [], to_t, theta, out, limit)
+            if len(out) >= limit:
+                break
+        return out
+
+    def _dfs(self, u: int, t: int, left: int, nodes: List[int], edges: List[int], to_t: np.ndarray,
+             theta: float, out: List[Dict[str, Any]], limit: int) -> None:
+        if len(out) >= limit:
+            return
+        if left == 0:
+            if u == t:
+                out.append(self._record(nodes, edges))
+            return
+        for e in range(self.indptr[u], self.indptr[u + 1]):
+            v = int(self.indices[e])
+            if self.edge_conf[e] < theta or to_t[v] < 0 or to_t[v] > left - 1 or v in nodes:
+                continue
+            nodes.append(v); edges.append(e)
+            self._dfs(v, t, left - 1, nodes, edges, to_t, theta, out, limit)
+            nodes.pop(); edges.pop()
+            if len(out) >= limit:
+                return
+
+    def _record(self, nodes: List[int], edges: List[int]) -> Dict[str, Any]:
+        return {"nodes": [{"id": self.ids[i], "name": self.names[i], "conf": float(self.node_conf[i])} for i in nodes],
+                "edges": [{"pred": self.preds[int(self.edge_pred[e])], "conf": float(self.edge_conf[e])} for e in edges],
+                "length": len(edges)}
+
+
+class SnapshotCache:
+    """
+    Un instantané par série, chargé une fois depuis Neo4j (`run` = Neo4jAdapter.run_cypher).
+    La version (noeud GraphVersion maintenu par les écrivains) est revérifiée au plus toutes les
+    `check_every_s` secondes; un changement provoque le rechargement.
+    Verrou par série: un seul chargement concurrent d'une même série, sans bloquer les autres séries;
+    pendant un rechargement, les lecteurs de la série reçoivent l'instantané précédent.
+    """
+
+    def __init__(self, run: Callable[..., List[Dict[str, Any]]], *, check_every_s: float = 30.0):
+        self._run = run
+        self.check_every_s = float(check_every_s)
+        self._snaps: Dict[str, GraphSnapshot] = {}
+        self._checked: Dict[str, float] = {}
+        self._loading: Dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()   # protège les dicts seulement (jamais tenu pendant une requête)
+
+    def _version(self, series: str) -> Tuple:
+        r = (self._run(SNAPSHOT_VERSION, {"series": series}, name="graph_snapshot.version") or [{}])[0]
+        if r.get("v") is not None:
+            return (r.get("v"), r.get("updated_at"))
+        r = (self._run(SNAPSHOT_VERSION_LEGACY, {"series": series}, name="graph_snapshot.version_legacy") or [{}])[0]
+        return (r.get("build_id"), r.get("rel_build_id"), r.get("nodes"), r.get("rels"))
+
+    def get(self, series: str) -> GraphSnapshot:
+        with self._lock:
+            snap = self._snaps.get(series)
+            if snap is not None and time.monotonic() - self._checked.get(series, 0.0) < self.check_every_s:
+                return snap
+            loading = self._loading.setdefault(series, threading.Lock())
+        if not loading.acquire(blocking=snap is None):
+            return snap     # rechargement en cours par un autre thread: instantané précédent
+        try:
+            with self._lock:   # un autre thread a pu rafraîchir pendant l'attente
+                snap = self._snaps.get(series)
+                if snap is not None and time.monotonic() - self._checked.get(series, 0.0) < self.check_every_s:
+                    return snap
+            version = self._version(series)
+            if snap is not None and snap.version == version:
+                with self._lock:
+                    self._checked[series] = time.monotonic()
+                return snap
+            t0 = time.perf_counter()
+            nodes = self._run(SNAPSHOT_NODES, {"series": series}, name="graph_snapshot.nodes") or []
+            edges = self._run(SNAPSHOT_EDGES, {"series": series}, name="graph_snapshot.edges") or []
+            snap = GraphSnapshot.from_rows(series, nodes, edges, version=version)
+            with self._lock:
+                self._snaps[series] = snap
+                self._checked[series] = time.monotonic()
+            log.info("Neo4j|Snapshot - %s: %d noeuds, %d arêtes chargés en %.2fs",
+                     series, len(snap), snap.n_edges, time.perf_counter() - t0)
+            return snap
+        finally:
+            loading.release()
+
+    def invalidate(self, series: Optional[str] = None) -> None:
+        with self._lock:
+            if series is None:
+                self._snaps.clear(); self._checked.clear()
+            else:
+                self._snaps.pop(series, None); self._checked.pop(series, None)
@@ -2,8 +2,8 @@
 from __future__ import annotations
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
-import contextlib, json, logging
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, Optional, Sequence, Tuple
+import contextlib, hashlib, json, logging, time
 import re
 
 from neo4j import GraphDatabase, Driver, AsyncDriver
@@ -11,6 +11,10 @@ from neo4j.exceptions import Neo4jError
 
 from app.core.config import get_settings
 from . import cypher as C
+from .bulk import BulkReport, BulkWriter
+from .graph_snapshot import GRAPH_VERSION_TOUCH, GraphSnapshot, SnapshotCache
+from .profiler import get_profiler
+from .querylog import QueryLog
 
 log = logging.getLogger("neo4j")
 
@@ -24,10 +28,93 @@ def _json_dump(x: Any) -> str:
     except Exception:
         return "{}"
 
+def text_hash(text: Optional[str]) -> str:
+    """Empreinte du texte d'un chunk (détection des chunks modifiés)."""
+    return hashlib.sha1((text or "").encode("utf-8")).hexdigest()
+
+def driver_options() -> Dict[str, Any]:
+    """Options du driver (pool, timeouts) issues de Neo4jCfg — communes aux drivers sync et async."""
+    cfg = get_settings().neo4j
+    return {
+        "max_connection_pool_size": cfg.max_connection_pool_size,
+        "connection_acquisition_timeout": cfg.connection_acquisition_timeout,
+        "connection_timeout": cfg.connection_timeout,
+        "max_connection_lifetime": cfg.max_connection_lifetime,
+        "max_transaction_retry_time": cfg.max_transaction_retry_time,
+    }
+
 def _now_ms() -> int:
-    import time
     return int(time.time() * 1000)
 
+def query_log(log_path: Path) -> QueryLog:
+    """QueryLog configuré par neo4j.query_log (commun aux adapters sync et async)."""
+    cfg = get_settings().neo4j.query_log
+    return QueryLog(log_path, sample=cfg.sample, max_list=cfg.max_list, max_str=cfg.max_str,
+                    max_bytes=int(cfg.max_mb * 1024 * 1024), backups=cfg.backups, flush_s=cfg.flush_s)
+
+# ------------------ Lignes Cypher (partagées sync / async) ------------------
+
+def chunk_rows(rows: Sequence[Mapping[str, Any]], *, series: Optional[str] = None,
+               approach: Optional[str] = None, build_id: Optional[str] = None) -> List[Dict[str, Any]]:
+    """Normalise des chunks pour UPSERT_CHUNKS."""
+    safe: List[Dict[str, Any]] = [] # liste de chunks sécurisés pour Cypher
+    for r in rows:
+        safe.append({
+            "cid":      r["cid"],                       # identifiant unique du chunk
+            "series":   r.get("series") or series,      # série du chunk
+            "file":     r.get("file"),                  # fichier source
+            "page":     r.get("page"),                  # page du document
+            "text":     r.get("text") or "",            # texte du chunk
+            "order":    r.get("order"),                 # ordre du chunk dans le doc
+            "provider": r.get("provider") or approach,  # méthode d’extraction
+            "model":    r.get("model"),                 # modèle utilisé
+            "dims":     r.get("dims"),                  # dimensions de l'embedding
+            "ts":       r.get("ts"),                    # timestamp
+            "vec":      r.get("vec"),                   # vecteur d'embedding
+            "text_hash": r.get("text_hash") or text_hash(r.get("text")),  # empreinte du texte
+            "build_id": r.get("build_id") or build_id,  # id de construction
+        })
+    return safe
+
+def entity_rows(rows: Sequence[Mapping[str, Any]], *, series: Optional[str] = None,
+                approach: Optional[str] = None, build_id: Optional[str] = None) -> List[Dict[str, Any]]:
+    """Normalise des entités pour UPSERT_ENTITIES."""
+    safe: List[Dict[str, Any]] = []
+    for r in rows:
+        safe.append({
+            "id": r["id"],
+            "name": r.get("name"),
+            "type": r.get("type") or "Unknown",
+            "series": r.get("series") or series,
+            "source": r.get("source"),
+            "aliases": list(r.get("aliases") or []) or None,
+            "attrs_json": _json_dump(r.get("attrs")),
+            "meta_json": _json_dump(r.get("meta")),
+            "embedding": r.get("embedding"),
+            "approach": r.get("approach") or approach,
+            "build_id": r.get("build_id") or build_id,
+        })
+    return safe
+
+def relation_rows(rows: Sequence[Mapping[str, Any]], *, series: Optional[str] = None,
+                  approach: Optional[str] = None, build_id: Optional[str] = None) -> List[Dict[str, Any]]:
+    """Normalise des relations pour UPSERT_RELATIONS."""
+    safe: List[Dict[str, Any]] = []
+    for r in rows:
+        rid = r.get("id") or f"{r['src']}::{r.get('type','REL')}::{r['dst']}"
+        safe.append({
+            "id": rid,
+            "src": r["src"],
+            "dst": r["dst"],
+            "kind": r.get("type") or "REL",
+            "series": r.get("series") or series,
+            "weight": float(r.get("weight", 1.0)),
+            "meta_json": _json_dump(r.get("meta")),
+            "approach": r.get("approach") or approach,
+            "build_id": r.get("build_id") or build_id,
+        })
+    return safe
+
 # ------------------ Adapter ------------------
 
 @dataclass
@@ -39,7 +126,12 @@ class Neo4jAdapter:
 
     # logging Cypher (optionnel)
     _log_file: Optional[Path] = None
+    _qlog: Optional[QueryLog] = None
     _driver: Driver = None  # type: ignore
+    _bulk: Optional[BulkWriter] = None
+    _snapshots: Optional[SnapshotCache] = None
+    last_bulk: Optional[BulkReport] = None  # bilan de la dernière écriture en masse (débit)
+    _migrated: bool = False                 # migrations de données vérifiées par cette instance
 
     def __post_init__(self) -> None:
         cfg = get_settings().neo4j
@@ -48,7 +140,7 @@ class Neo4jAdapter:
         self.password = self.password or cfg.password
         self.database = self.database or getattr(cfg, "database", None)
 
-        self._driver = GraphDatabase.driver(self.uri, auth=(self.user, self.password))
+        self._driver = GraphDatabase.driver(self.uri, auth=(self.user, self.password), **driver_options())
         self.ensure_base_schema()
 
     # ---------- Sessions managing ----------
@@ -57,7 +149,9 @@ class Neo4jAdapter:
         return self._driver.session(database=self.database) if self.database else self._driver.session()
 
     def _close(self) -> None:
-        """Ferme la connexion au driver."""
+        """Ferme la connexion au driver (et le journal des requêtes)."""
+        if self._qlog:
+            self._qlog.close()
         with contextlib.suppress(Exception): self._driver.close()
 
     def __enter__(self): return self
@@ -76,31 +170,61 @@ class Neo4jAdapter:
     # ---------- Cypher logging ----------
 
     def enable_query_logging(self, log_path: Path) -> None:
-        """Active l’écriture JSONL des requêtes (Cypher + params)."""
-        log_path.parent.mkdir(parents=True, exist_ok=True)
+        """Active l’écriture JSONL des requêtes (Cypher + params élidés, durée, lignes) en tâche de fond."""
+        if self._qlog and self._qlog.path == Path(log_path):
+            return
+        if self._qlog:
+            self._qlog.close()
         self._log_file = log_path
-        log.info("Neo4j query logging -> %s", log_path)
+        self._qlog = query_log(log_path)
+        log.info("Neo4j query logging -> %s (sample=%.2f)", log_path, self._qlog.sample)
+
+    def _log_cypher(self, q: str, params: Mapping[str, Any], *, t0: Optional[float] = None,
+                    rows: Optional[int] = None, name: Optional[str] = None, plan: Any = None) -> None:
+        """
+        Journalise après exécution: `t0` = perf_counter() au lancement (durée), `rows` = lignes lues/écrites.
+        `name` : requête nommée -> profiler (durée ignorée si exécutée en PROFILE, `plan` = arbre du profil).
+        """
+        ms = (time.perf_counter() - t0) * 1000.0 if t0 is not None else None
+        if self._qlog:
+            self._qlog.record(q, params, ms=ms, rows=rows)
+        if name:
+            get_profiler().record(name, q, ms if plan is None else None, rows, plan)
 
-    def _log_cypher(self, q: str, params: Mapping[str, Any]) -> None:
-        if not self._log_file:
-            return
-        rec = {"ts": _now_ms(), "query": q, "params": params}
-        with self._log_file.open("a", encoding="utf-8") as f:
-            f.write(json.dumps(rec, ensure_ascii=False) + "\n")
-        
     # ------------------------------
     
-    def run_cypher(self, query: str, params: Optional[Mapping[str, Any]] = None) -> Any:
-        """Exécute une requête Cypher arbitraire (ex: pour opérations personnalisées)."""
-        self._log_cypher(query, params or {})
+    def run_cypher(self, query: str, params: Optional[Mapping[str, Any]] = None, *,
+                   name: Optional[str] = None) -> Any:
+        """
+        Exécute une requête Cypher arbitraire (ex: pour opérations personnalisées).
+        `name` : identifiant du point d'appel pour le profiler (/api/dev/queries) ; passé le warmup,
+        une fraction échantillonnée des exécutions passe en `PROFILE` (db hits, opérateurs du plan).
+        """
+        profile = get_profiler().should_profile(name)
+        plan = None
+        t0 = time.perf_counter()
         with self._session() as s:
-            res = s.run(query, **(params or {}))
-            try:
-                return [r.data() for r in res]
-            except Exception:
-                return None
+            res = s.run(f"PROFILE {query}" if profile else query, **(params or {}))
+            # Les erreurs peuvent survenir pendant la lecture des lignes (index absent, ...): propagées
+            # à l'appelant comme celles de `run`, jamais converties en résultat vide.
+            out = [r.data() for r in res]
+            if profile:
+                plan = res.consume().profile
+        self._log_cypher(query, params or {}, t0=t0, rows=len(out), name=name, plan=plan)
+        return out
 
-    
+
+    def bulk_write(self, query: str, rows: Sequence[Mapping[str, Any]], *, param: str = "rows",
+                   key: Any = None, params: Optional[Mapping[str, Any]] = None, label: str = "") -> BulkReport:
+        """Écriture UNWIND en lots parallèles (voir adapters/db/bulk.py) ; `key` = id(s) de noeud de partition."""
+        if self._bulk is None:
+            cfg = get_settings().neo4j.bulk
+            self._bulk = BulkWriter(self._session, max_rows=cfg.batch_rows,
+                                    max_bytes=int(cfg.batch_mb * 1024 * 1024), parallelism=cfg.parallelism,
+                                    retries=cfg.retries, backoff_s=cfg.backoff_s,
+                                    on_batch=lambda q, p, *, label, **kw: self._log_cypher(q, p, name=f"neo4j.bulk.{label}", **kw))
+        self.last_bulk = self._bulk.write(query, rows, param=param, key=key, params=params, label=label)
+        return self.last_bulk
 
     # ---------- Schéma ----------
     def ensure_base_schema(self) -> None:
@@ -112,6 +236,20 @@ class Neo4jAdapter:
                 except Exception as ex:
                     log.info("Neo4j|ensure_base_schema - Schema notice: %s", ex)
                     print("test")
+            if not self._migrated:
+                self._migrate_once(s, C.MIGRATION_ALIASES_TEXT, C.BACKFILL_ALIASES_TEXT)
+                self._migrated = True
+
+    def _migrate_once(self, s, name: str, query: str) -> None:
+        """Exécute une migration de données une seule fois par base (marqueur SchemaMigration posé après succès)."""
+        try:
+            if s.run(C.SCHEMA_MIGRATION_DONE, name=name).single()["n"]:
+                return
+            s.run(query).consume()
+            s.run(C.SCHEMA_MIGRATION_MARK, name=name).consume()
+            log.info("Neo4j|ensure_base_schema - migration %s applied", name)
+        except Exception as ex:
+            log.warning("Neo4j|ensure_base_schema - migration %s: %s", name, ex)
 
     # ---------- Index vectoriel ----------
     def check_index_exists(self, name: str) -> bool:
@@ -129,9 +267,10 @@ class Neo4jAdapter:
         safe = self._safe_index_name(name)
         q = C.vector_index_create(safe, label, prop)
         params = {"dim": int(dimensions), "sim": similarity}
-        self._log_cypher(q, params)
+        t0 = time.perf_counter()
         with self._session() as s:
             s.run(q, **params).consume()
+        self._log_cypher(q, params, t0=t0)
 
     # ---------- Ingestion : Chunks ----------
     def upsert_chunks(
@@ -144,99 +283,105 @@ class Neo4jAdapter:
     ) -> int: 
         """Ingestion/upsert de chunks."""
 
-        safe: List[Dict[str, Any]] = [] # liste de chunks sécurisés pour Cypher
-        for r in rows:
-            log.info("Neo4j|Upsert - Upserting chunk: %s", r)
-            safe.append({
-                "cid":      r["cid"],                       # identifiant unique du chunk
-                "series":   r.get("series") or series,      # série du chunk
-                "file":     r.get("file"),                  # fichier source
-                "page":     r.get("page"),                  # page du document
-                "text":     r.get("text") or "",            # texte du chunk
-                "order":    r.get("order"),                 # ordre du chunk dans le doc
-                "provider": r.get("provider") or approach,  # méthode d’extraction
-                "model":    r.get("model"),                 # modèle utilisé
-                "dims":     r.get("dims"),                  # dimensions de l'embedding
-                "ts":       r.get("ts"),                    # timestamp
-                "vec":      r.get("vec"),                   # vecteur d'embedding
-                "build_id": r.get("build_id") or build_id,  # id de construction
-            })
-        q, params = C.UPSERT_CHUNKS, {"rows": safe}
-        self._log_cypher(q, params)
-        with self._session() as s:
-            return int(s.run(q, **params).single()["n"])
+        safe = chunk_rows(rows, series=series, approach=approach, build_id=build_id)
+        return self.bulk_write(C.UPSERT_CHUNKS, safe, key="cid", label="chunks").n
     
-    # stream_chunks(series) → respect this output (cid, text, meta)
-    def stream_chunks(self, series: str) -> List[Dict[str, Any]]:
+    def chunk_fingerprints(self, series: str) -> Dict[str, Dict[str, Any]]:
+        """cid -> {"text_hash","model","dims"} des chunks déjà stockés pour la série."""
+        q, params = C.GET_CHUNK_FINGERPRINTS, {"series": series}
+        t0 = time.perf_counter()
+        with self._session() as s:
+            out = {r["cid"]: {"text_hash": r["text_hash"], "model": r["model"], "dims": r["dims"]}
+                   for r in s.run(q, **params)}
+        self._log_cypher(q, params, t0=t0, rows=len(out), name="neo4j.chunk_fingerprints")
+        return out
+
+    def delete_chunks(self, cids: Sequence[str], *, batch: int = 1000) -> int:
+        """Supprime (DETACH) les chunks donnés ; retourne le nombre de noeuds supprimés."""
+        n = 0
+        with self._session() as s:
+            for i in range(0, len(cids), batch):
+                q, params = C.DELETE_CHUNKS, {"cids": list(cids[i:i + batch])}
+                t0 = time.perf_counter()
+                d = int(s.run(q, **params).single()["n"])
+                self._log_cypher(q, params, t0=t0, rows=d, name="neo4j.delete_chunks")
+                n += d
+        return n
+
+    def iter_chunks(self, series: str, fields: Sequence[str] = C.DEFAULT_CHUNK_FIELDS, *,
+                    fetch_size: int = 1000) -> Iterator[Dict[str, Any]]:
+        """
+        Chunks de la série, paresseusement, par pages de `fetch_size` (keyset sur c.id, ordre croissant).
+        - `fields` : projection explicite (liste blanche C.CHUNK_FIELDS) ; `id` toujours inclus.
+        - `embedding` n'est transféré que s'il est demandé.
+        """
+        first_q, next_q = C.chunks_page_query(fields), C.chunks_page_query(fields, after=True)
+        q, params = first_q, {"series": series, "limit": int(fetch_size)}
+        while True:
+            t0 = time.perf_counter()
+            with self._session() as s:
+                page = [r.data() for r in s.run(q, **params)]
+            self._log_cypher(q, params, t0=t0, rows=len(page), name="neo4j.iter_chunks")
+            yield from page
+            if len(page) < fetch_size:
+                return
+            q, params = next_q, {**params, "after": page[-1]["id"]}
+
+    def stream_chunks(self, series: str, fields: Optional[Sequence[str]] = None) -> List[Dict[str, Any]]:
+        """
+        Liste complète de la série: noeuds Chunk entiers (toutes propriétés, embedding compris) par défaut;
+        `fields` => projection explicite lue page par page (iter_chunks), à préférer pour les grosses séries.
+        """
+        if fields is not None:
+            return list(self.iter_chunks(series, fields))
         q, params = C.GET_CHUNKS_BY_SERIES_OLD, {"series": series}
-        self._log_cypher(q, params)
+        t0 = time.perf_counter()
         with self._session() as s:
-            res = s.run(q, **params)
-            return [r.data().get("c") for r in res]
+            out = [r.data().get("c") for r in s.run(q, **params)]
+        self._log_cypher(q, params, t0=t0, rows=len(out), name="neo4j.stream_chunks")
+        return out
 
     # ---------- Similarité ----------
-    def query_top_k(self, index_name: str, query_vec: Sequence[float], k: int = 5) -> List[Dict[str, Any]]:
+    def query_top_k(self, index_name: str, query_vec: Sequence[float], k: int = 5,
+                    series: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Top-k sur un index vectoriel (index par série: `series` informatif)."""
         q, params = C.QUERY_TOP_K, {"index": index_name, "k": int(k), "vec": list(query_vec)}
-        self._log_cypher(q, params)
+        t0 = time.perf_counter()
         with self._session() as s:
-            res = s.run(q, **params)
-            return [r.data() for r in res]
+            out = [r.data() for r in s.run(q, **params)]
+        self._log_cypher(q, params, t0=t0, rows=len(out), name="neo4j.query_top_k")
+        return out
 
     # ---------- KG : entités ----------
     def upsert_entities(self, rows: Sequence[Mapping[str, Any]],
                         *, series: Optional[str] = None,
                         approach: Optional[str] = None,
                         build_id: Optional[str] = None) -> int:
-        safe: List[Dict[str, Any]] = []
-        for r in rows:
-            safe.append({
-                "id": r["id"],
-                "name": r.get("name"),
-                "type": r.get("type") or "Unknown",
-                "series": r.get("series") or series,
-                "source": r.get("source"),
-                "attrs_json": _json_dump(r.get("attrs")),
-                "meta_json": _json_dump(r.get("meta")),
-                "embedding": r.get("embedding"),
-                "approach": r.get("approach") or approach,
-                "build_id": r.get("build_id") or build_id,
-            })
-        q, params = C.UPSERT_ENTITIES, {"rows": safe}
-        self._log_cypher(q, params)
-        with self._session() as s:
-            return int(s.run(q, **params).single()["n"])
+        safe = entity_rows(rows, series=series, approach=approach, build_id=build_id)
+        n = self.bulk_write(C.UPSERT_ENTITIES, safe, key="id", label="entities").n
+        self.touch_graph(r.get("series") for r in safe)
+        return n
 
     # ---------- KG : relations ----------
     def upsert_relations(self, rows: Sequence[Mapping[str, Any]],
                          *, series: Optional[str] = None,
                          approach: Optional[str] = None,
                          build_id: Optional[str] = None) -> int:
-        safe: List[Dict[str, Any]] = []
-        for r in rows:
-            rid = r.get("id") or f"{r['src']}::{r.get('type','REL')}::{r['dst']}"
-            safe.append({
-                "id": rid,
-                "src": r["src"],
-                "dst": r["dst"],
-                "kind": r.get("type") or "REL",
-                "series": r.get("series") or series,
-                "weight": float(r.get("weight", 1.0)),
-                "meta_json": _json_dump(r.get("meta")),
-                "approach": r.get("approach") or approach,
-                "build_id": r.get("build_id") or build_id,
-            })
-        q, params = C.UPSERT_RELATIONS, {"rows": safe}
-        self._log_cypher(q, params)
-        with self._session() as s:
-            return int(s.run(q, **params).single()["n"])
+        safe = relation_rows(rows, series=series, approach=approach, build_id=build_id)
+        n = self.bulk_write(C.UPSERT_RELATIONS, safe, key=("src", "dst"), label="relations").n
+        self.touch_graph(r.get("series") for r in safe)
+        return n
+
+    def touch_graph(self, series: Iterable[Optional[str]]) -> None:
+        """Incrémente la version du graphe des séries écrites (clé des instantanés CSR, cf. graph_snapshot)."""
+        names = sorted({s for s in series if s})
+        if names:
+            self.run_cypher(GRAPH_VERSION_TOUCH, {"series": names}, name="graph_snapshot.touch")
 
     # ---------- Traçabilité entité->chunk ----------
     def link_entities_to_chunks(self, links: Sequence[Mapping[str, Any]]) -> int:
-        q, params = C.LINK_ENTS_TO_CHUNKS, {"links": list(links)}
-        self._log_cypher(q, params)
-        with self._session() as s:
-            rec = s.run(q, **params).single()
-            return int(rec["n"]) if rec else 0
+        return self.bulk_write(C.LINK_ENTS_TO_CHUNKS, list(links), param="links", key=("eid", "cid"),
+                               label="links").n
 
     # ---------- Qualité ----------
     # def graph_quality(self, *, series: Optional[str] = None) -> Dict[str, int]:
@@ -260,6 +405,17 @@ class Neo4jAdapter:
             "offseries_relations": int(offseries),
         }
     
+    # ---------- Graphe en mémoire (PathRAG) ----------
+    def graph_snapshot(self, series: str) -> GraphSnapshot:
+        """Instantané CSR du graphe d'entités de la série (rechargé quand le graphe change)."""
+        if self._snapshots is None:
+            self._snapshots = SnapshotCache(self.run_cypher, check_every_s=get_settings().neo4j.snapshot.check_every_s)
+        return self._snapshots.get(series)
+
+    def neighbors(self, series: str, node_id: str) -> List[Tuple[str, str, float]]:
+        """(neighbor_id, relation, weight) via l'instantané en mémoire (sans aller-retour Bolt)."""
+        return self.graph_snapshot(series).neighbors(node_id)
+
     def neighbors_neo4j(self, node_id: str) -> List[Tuple[str, str, float]]:
         """
         Retourne (neighbor_id, relation_type, weight) pour PathRAG.
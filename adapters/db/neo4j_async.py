@@ -0,0 +1,167 @@
+# adapters/db/neo4j_async.py
+# Variante asynchrone de Neo4jAdapter (AsyncGraphDatabase) pour les routes FastAPI / outils MCP.
+from __future__ import annotations
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, Iterable, List, Mapping, Optional, Sequence
+import logging, time
+
+from neo4j import AsyncGraphDatabase, AsyncDriver
+from neo4j.exceptions import Neo4jError
+
+from app.core.config import get_settings
+from . import cypher as C
+from .graph_snapshot import GRAPH_VERSION_TOUCH
+from .neo4j import chunk_rows, driver_options, entity_rows, query_log, relation_rows
+from .profiler import get_profiler
+from .querylog import QueryLog
+
+log = logging.getLogger("neo4j")
+
+
+@dataclass
+class AsyncNeo4jAdapter:
+    """
+    Même surface que Neo4jAdapter (run_cypher, query_top_k, upsert_*, stream_chunks), en coroutines:
+    une requête lente n'occupe plus la boucle d'événements du worker.
+    - Pool dimensionné par Neo4jCfg (max_connection_pool_size, connection_acquisition_timeout).
+    - Le schéma de base reste créé par l'adapter sync (démarrage).
+    """
+    uri: Optional[str] = None
+    user: Optional[str] = None
+    password: Optional[str] = None
+    database: Optional[str] = None
+
+    _log_file: Optional[Path] = None
+    _qlog: Optional[QueryLog] = None
+    _driver: AsyncDriver = None  # type: ignore
+
+    def __post_init__(self) -> None:
+        cfg = get_settings().neo4j
+        self.uri = self.uri or cfg.uri
+        self.user = self.user or cfg.username
+        self.password = self.password or cfg.password
+        self.database = self.database or getattr(cfg, "database", None)
+        self._driver = AsyncGraphDatabase.driver(self.uri, auth=(self.user, self.password), **driver_options())
+
+    # ---------- Sessions ----------
+    def _session(self):
+        return self._driver.session(database=self.database) if self.database else self._driver.session()
+
+    async def close(self) -> None:
+        if self._qlog:
+            self._qlog.close()
+        await self._driver.close()
+
+    async def __aenter__(self): return self
+    async def __aexit__(self, exc_type, exc, tb): await self.close()
+
+    async def ping(self) -> bool:
+        try:
+            async with self._session() as s:
+                await (await s.run("RETURN 1")).consume()
+            return True
+        except Neo4jError as ex:
+            log.error("Neo4j|Ping - Neo4j async ping failed: %s", ex)
+            return False
+
+    # ---------- Cypher logging ----------
+    def enable_query_logging(self, log_path: Path) -> None:
+        if self._qlog and self._qlog.path == Path(log_path):
+            return
+        if self._qlog:
+            self._qlog.close()
+        self._log_file = log_path
+        self._qlog = query_log(log_path)
+
+    def _log_cypher(self, q: str, params: Mapping[str, Any], *, t0: Optional[float] = None,
+                    rows: Optional[int] = None, name: Optional[str] = None, plan: Any = None) -> None:
+        # record() ne fait qu'élider et déposer en file: pas d'I/O sur la boucle d'événements
+        ms = (time.perf_counter() - t0) * 1000.0 if t0 is not None else None
+        if self._qlog:
+            self._qlog.record(q, params, ms=ms, rows=rows)
+        if name:
+            get_profiler().record(name, q, ms if plan is None else None, rows, plan)
+
+    # ------------------------------
+    async def run_cypher(self, query: str, params: Optional[Mapping[str, Any]] = None, *,
+                         name: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Exécute une requête Cypher arbitraire ; renvoie les lignes (dicts). `name` : voir Neo4jAdapter.run_cypher."""
+        profile = get_profiler().should_profile(name)
+        plan = None
+        t0 = time.perf_counter()
+        async with self._session() as s:
+            res = await s.run(f"PROFILE {query}" if profile else query, **(params or {}))
+            out = await res.data()
+            if profile:
+                plan = (await res.consume()).profile
+        self._log_cypher(query, params or {}, t0=t0, rows=len(out), name=name, plan=plan)
+        return out
+
+    async def _single_n(self, q: str, params: Mapping[str, Any]) -> int:
+        t0 = time.perf_counter()
+        async with self._session() as s:
+            rec = await (await s.run(q, **params)).single()
+        n = int(rec["n"]) if rec else 0
+        self._log_cypher(q, params, t0=t0, rows=n)
+        return n
+
+    # ---------- Ingestion ----------
+    async def upsert_chunks(self, rows: Sequence[Mapping[str, Any]], *, series: Optional[str] = None,
+                            approach: Optional[str] = None, build_id: Optional[str] = None) -> int:
+        safe = chunk_rows(rows, series=series, approach=approach, build_id=build_id)
+        return await self._single_n(C.UPSERT_CHUNKS, {"rows": safe})
+
+    async def upsert_entities(self, rows: Sequence[Mapping[str, Any]], *, series: Optional[str] = None,
+                              approach: Optional[str] = None, build_id: Optional[str] = None) -> int:
+        safe = entity_rows(rows, series=series, approach=approach, build_id=build_id)
+        n = await self._single_n(C.UPSERT_ENTITIES, {"rows": safe})
+        await self.touch_graph(r.get("series") for r in safe)
+        return n
+
+    async def upsert_relations(self, rows: Sequence[Mapping[str, Any]], *, series: Optional[str] = None,
+                               approach: Optional[str] = None, build_id: Optional[str] = None) -> int:
+        safe = relation_rows(rows, series=series, approach=approach, build_id=build_id)
+        n = await self._single_n(C.UPSERT_RELATIONS, {"rows": safe})
+        await self.touch_graph(r.get("series") for r in safe)
+        return n
+
+    async def touch_graph(self, series: Iterable[Optional[str]]) -> None:
+        """Voir Neo4jAdapter.touch_graph."""
+        names = sorted({s for s in series if s})
+        if names:
+            await self.run_cypher(GRAPH_VERSION_TOUCH, {"series": names}, name="graph_snapshot.touch")
+
+    async def stream_chunks(self, series: str, fields: Optional[Sequence[str]] = None) -> List[Dict[str, Any]]:
+        """Voir Neo4jAdapter.stream_chunks: noeuds entiers par défaut, projection `fields` sur demande."""
+        if fields is not None:
+            return [c async for c in self.iter_chunks(series, fields)]
+        q, params = C.GET_CHUNKS_BY_SERIES_OLD, {"series": series}
+        t0 = time.perf_counter()
+        async with self._session() as s:
+            out = [r.get("c") for r in await (await s.run(q, **params)).data()]
+        self._log_cypher(q, params, t0=t0, rows=len(out), name="neo4j.stream_chunks")
+        return out
+
+    async def iter_chunks(self, series: str, fields: Sequence[str] = C.DEFAULT_CHUNK_FIELDS, *,
+                          fetch_size: int = 1000) -> AsyncIterator[Dict[str, Any]]:
+        """Chunks de la série consommés au fil de l'eau (pages keyset sur c.id, projection explicite)."""
+        first_q, next_q = C.chunks_page_query(fields), C.chunks_page_query(fields, after=True)
+        q, params = first_q, {"series": series, "limit": int(fetch_size)}
+        while True:
+            t0 = time.perf_counter()
+            async with self._session() as s:
+                page = await (await s.run(q, **params)).data()
+            self._log_cypher(q, params, t0=t0, rows=len(page), name="neo4j.iter_chunks")
+            for r in page:
+                yield r
+            if len(page) < fetch_size:
+                return
+            q, params = next_q, {**params, "after": page[-1]["id"]}
+
+    # ---------- Similarité ----------
+    async def query_top_k(self, index_name: str, query_vec: Sequence[float], k: int = 5,
+                          series: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Top-k sur un index vectoriel (index par série: `series` informatif)."""
+        q, params = C.QUERY_TOP_K, {"index": index_name, "k": int(k), "vec": list(query_vec)}
+        return await self.run_cypher(q, params, name="neo4j.query_top_k")
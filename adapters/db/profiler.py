@@ -0,0 +1,127 @@
+# adapters/db/profiler.py
+# Profilage des requêtes Cypher nommées : durée, lignes, PROFILE échantillonné (db hits, opérateurs du plan).
+from __future__ import annotations
+from collections import deque
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Any, Deque, Dict, Iterable, List, Mapping, Optional
+import random, threading
+
+import numpy as np
+
+
+def summarize_profile(plan: Optional[Mapping[str, Any]]) -> Dict[str, Any]:
+    """Arbre PROFILE (ResultSummary.profile) -> {"db_hits": total, "operators": [{op, db_hits, rows}, ...] triés}."""
+    ops: List[Dict[str, Any]] = []
+    total = 0
+    stack = [plan] if plan else []
+    while stack:
+        node = stack.pop()
+        hits = int(node.get("dbHits", 0) or 0)
+        total += hits
+        ops.append({"op": str(node.get("operatorType", "?")).split("@")[0], "db_hits": hits,
+                    "rows": int(node.get("rows", 0) or 0)})
+        stack.extend(node.get("children") or [])
+    ops.sort(key=lambda o: o["db_hits"], reverse=True)
+    return {"db_hits": total, "operators": ops}
+
+
+@dataclass
+class _Stats:
+    query: str
+    count: int = 0
+    timed: int = 0              # exécutions chronométrées (hors PROFILE): diviseur de mean_ms
+    total_ms: float = 0.0
+    rows: int = 0
+    window: Deque[float] = field(default_factory=lambda: deque(maxlen=1024))
+    profiles: int = 0
+    db_hits: int = 0            # cumul sur les exécutions profilées
+    last_profile: Optional[Dict[str, Any]] = None
+
+
+class QueryProfiler:
+    """
+    Registre des requêtes nommées (nom choisi au point d'appel: `run_cypher(q, p, name="pathrag.flow_pruning.topK")`).
+    - Chaque exécution: durée (fenêtre glissante de `window` mesures pour les percentiles) et lignes renvoyées.
+    - `profile_sample`: fraction des exécutions exécutées en `PROFILE` ; un nom n'est éligible qu'après `warmup`
+      exécutions (la première éligible l'est toujours), et jamais s'il commence par un préfixe de `exclude`
+      (dumps complets, lectures en masse: un PROFILE y coûte autant que la requête).
+    - `report()`: percentiles par requête + pires contrevenants (temps cumulé).
+    """
+
+    def __init__(self, *, profile_sample: float = 0.01, window: int = 1024, warmup: int = 20,
+                 exclude: Iterable[str] = ()):
+        self.profile_sample = float(profile_sample)
+        self.window = int(window)
+        self.warmup = max(0, int(warmup))
+        self.exclude = tuple(exclude)
+        self._stats: Dict[str, _Stats] = {}
+        self._lock = threading.Lock()
+
+    def _get(self, name: str, query: str) -> _Stats:
+        st = self._stats.get(name)
+        if st is None:
+            st = self._stats[name] = _Stats(query=" ".join(query.split())[:500], window=deque(maxlen=self.window))
+        return st
+
+    def should_profile(self, name: Optional[str]) -> bool:
+        if not name or self.profile_sample <= 0 or name.startswith(self.exclude):
+            return False
+        with self._lock:
+            st = self._stats.get(name)
+            if st is None or st.count < self.warmup:
+                return False
+            first = st.profiles == 0
+        return first or random.random() < self.profile_sample
+
+    def record(self, name: str, query: str, ms: Optional[float], rows: Optional[int] = None,
+               profile: Optional[Mapping[str, Any]] = None) -> None:
+        with self._lock:
+            st = self._get(name, query)
+            st.count += 1
+            if ms is not None:
+                st.timed += 1
+                st.total_ms += ms
+                st.window.append(ms)
+            st.rows += int(rows or 0)
+            if profile is not None:
+                summary = summarize_profile(profile)
+                st.profiles += 1
+                st.db_hits += summary["db_hits"]
+                st.last_profile = summary
+
+    def reset(self) -> None:
+        with self._lock:
+            self._stats.clear()
+
+    def report(self, top: int = 10) -> Dict[str, Any]:
+        with self._lock:
+            items = [(n, st, np.asarray(st.window, dtype=np.float64)) for n, st in self._stats.items()]
+        queries = []
+        for name, st, w in items:
+            p50, p95, p99 = (np.percentile(w, [50, 95, 99]).round(2).tolist() if w.size else [None] * 3)
+            lp = st.last_profile or {}
+            queries.append({
+                "name": name, "count": st.count, "total_ms": round(st.total_ms, 2),
+                "mean_ms": round(st.total_ms / st.timed, 2) if st.timed else None,
+                "p50_ms": p50, "p95_ms": p95, "p99_ms": p99, "max_ms": round(float(w.max()), 2) if w.size else None,
+                "rows_mean": round(st.rows / st.count, 1) if st.count else 0,
+                "profiled": st.profiles,
+                "db_hits_mean": round(st.db_hits / st.profiles, 1) if st.profiles else None,
+                "operators": lp.get("operators", [])[:5],
+                "query": st.query,
+            })
+        queries.sort(key=lambda q: q["total_ms"], reverse=True)
+        return {"profile_sample": self.profile_sample, "queries": queries,
+                "top_total": [q["name"] for q in queries[:top]],
+                "top_p95": [q["name"] for q in sorted(queries, key=lambda q: q["p95_ms"] or 0, reverse=True)[:top]],
+                "top_db_hits": [q["name"] for q in sorted(queries, key=lambda q: q["db_hits_mean"] or 0,
+                                                          reverse=True)[:top] if q["db_hits_mean"] is not None]}
+
+
+@lru_cache(maxsize=1)
+def get_profiler() -> QueryProfiler:
+    """Profiler partagé par les adapters sync et async (réglages neo4j.profile)."""
+    from app.core.config import get_settings
+    cfg = get_settings().neo4j.profile
+    return QueryProfiler(profile_sample=cfg.sample, window=cfg.window, warmup=cfg.warmup, exclude=cfg.exclude)
@@ -0,0 +1,123 @@
+# adapters/db/querylog.py
+# Journal JSONL des requêtes Cypher : écriture bufferisée en tâche de fond, échantillonnage, élision, rotation.
+from __future__ import annotations
+from pathlib import Path
+from typing import Any, Dict, Mapping, Optional
+import json, logging, queue, random, threading, time
+
+log = logging.getLogger("neo4j")
+
+_STOP = object()
+
+
+def elide(x: Any, *, max_list: int = 20, max_str: int = 2000) -> Any:
+    """
+    Copie allégée d'un paramètre pour le journal:
+    - vecteurs (listes de flottants) -> "<vector dims=N>";
+    - listes longues -> `max_list` premiers éléments + marqueur "...(+N)";
+    - chaînes longues tronquées à `max_str` caractères.
+    """
+    if isinstance(x, str):
+        return x if len(x) <= max_str else f"{x[:max_str]}...(+{len(x) - max_str} chars)"
+    if isinstance(x, Mapping):
+        return {k: elide(v, max_list=max_list, max_str=max_str) for k, v in x.items()}
+    if isinstance(x, (list, tuple)):
+        if len(x) > 8 and isinstance(x[0], float):
+            return f"<vector dims={len(x)}>"
+        head = [elide(v, max_list=max_list, max_str=max_str) for v in x[:max_list]]
+        if len(x) > max_list:
+            head.append(f"...(+{len(x) - max_list})")
+        return head
+    return x
+
+
+class QueryLog:
+    """
+    Writer JSONL asynchrone pour les requêtes Cypher:
+    - `record()` n'écrit rien: échantillonne (`sample`), élide les params puis dépose dans une file bornée
+      (file pleine => entrée abandonnée et comptée dans `dropped`, l'appelant n'attend jamais);
+    - un thread vide la file dans un fichier bufferisé, flush toutes les `flush_s` secondes;
+    - rotation par taille: path -> path.1 -> ... -> path.<backups> au-delà de `max_bytes`.
+    """
+
+    def __init__(self, path: Path, *, sample: float = 1.0, max_list: int = 20, max_str: int = 2000,
+                 max_bytes: int = 64 * 1024 * 1024, backups: int = 3, flush_s: float = 1.0,
+                 maxsize: int = 10000):
+        self.path = Path(path)
+        self.sample = float(sample)
+        self.max_list, self.max_str = int(max_list), int(max_str)
+        self.max_bytes, self.backups, self.flush_s = int(max_bytes), int(backups), float(flush_s)
+        self.written = self.dropped = self.sampled_out = 0
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._q: "queue.Queue[Any]" = queue.Queue(maxsize=maxsize)
+        self._fh = self.path.open("a", encoding="utf-8")
+        self._size = self.path.stat().st_size
+        self._thread = threading.Thread(target=self._loop, name="cypher-querylog", daemon=True)
+        self._thread.start()
+
+    def record(self, query: str, params: Optional[Mapping[str, Any]] = None, *,
+               ms: Optional[float] = None, rows: Optional[int] = None) -> None:
+        if self.sample < 1.0 and random.random() >= self.sample:
+            self.sampled_out += 1
+            return
+        rec: Dict[str, Any] = {"ts": int(time.time() * 1000), "query": query,
+                               "params": elide(dict(params or {}), max_list=self.max_list, max_str=self.max_str)}
+        if ms is not None:
+            rec["ms"] = round(ms, 2)
+        if rows is not None:
+            rec["rows"] = rows
+        try:
+            self._q.put_nowait(rec)
+        except queue.Full:
+            self.dropped += 1
+
+    # ---- thread d'écriture ----
+    def _loop(self) -> None:
+        last_flush = time.monotonic()
+        while True:
+            try:
+                item = self._q.get(timeout=self.flush_s)
+            except queue.Empty:
+                item = None
+            if item is _STOP:
+                break
+            if item is not None:
+                try:
+                    self._write(item)
+                except Exception as ex:  # le journal ne doit jamais casser les requêtes
+                    log.warning("Neo4j|QueryLog - écriture impossible: %s", ex)
+            if time.monotonic() - last_flush >= self.flush_s:
+                self._fh.flush(); last_flush = time.monotonic()
+        self._fh.flush()
+        self._fh.close()
+
+    def _write(self, rec: Dict[str, Any]) -> None:
+        line = json.dumps(rec, ensure_ascii=False, default=str) + "\n"
+        if self._size + len(line) > self.max_bytes and self._size > 0:
+            self._rotate()
+        self._fh.write(line)
+        self._size += len(line)
+        self.written += 1
+
+    def _rotate(self) -> None:
+        self._fh.close()
+        for i in range(self.backups - 1, 0, -1):
+            src = self.path.with_name(f"{self.path.name}.{i}")
+            if src.exists():
+                src.replace(self.path.with_name(f"{self.path.name}.{i + 1}"))
+        if self.backups > 0:
+            self.path.replace(self.path.with_name(f"{self.path.name}.1"))
+        else:
+            self.path.unlink(missing_ok=True)
+        self._fh = self.path.open("a", encoding="utf-8")
+        self._size = 0
+
+    def close(self) -> None:
+        """Vide la file, flush et ferme le fichier (idempotent)."""
+        if self._thread.is_alive():
+            self._q.put(_STOP)
+            self._thread.join()
+
+    def stats(self) -> Dict[str, Any]:
+        return {"path": str(self.path), "written": self.written, "dropped": self.dropped,
+                "sampled_out": self.sampled_out, "pending": self._q.qsize(), "sample": self.sample}
@@ -3,6 +3,7 @@ from abc import ABC, abstractmethod
 from typing import Protocol, Sequence, List, Optional, Iterable, Iterator, Any
 import logging
 import os
+import threading
 
 log = logging.getLogger(__name__)
 
@@ -48,3 +49,25 @@ def batch_iter(seq: Sequence[Any], size: int) -> Iterator[Sequence[Any]]:
         size = 1
     for i in range(0, len(seq), size):
         yield seq[i:i + size]
+
+
+def unwrap_provider(provider: Any) -> Any:
+    """Provider sous-jacent d'une pile de wrappers de cache (attribut `inner`)."""
+    while getattr(provider, "inner", None) is not None:
+        provider = provider.inner
+    return provider
+
+
+_SLOTS: dict = {}
+_SLOTS_LOCK = threading.Lock()
+
+def provider_slots(provider: Any, limit: int) -> threading.BoundedSemaphore:
+    """
+    Sémaphore partagé par classe de provider (sous-jacente si wrapper de cache):
+    borne les appels simultanés tous pipelines confondus.
+    """
+    key = type(unwrap_provider(provider)).__name__
+    with _SLOTS_LOCK:
+        if key not in _SLOTS:
+            _SLOTS[key] = threading.BoundedSemaphore(max(1, int(limit)))
+        return _SLOTS[key]
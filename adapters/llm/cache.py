@@ -0,0 +1,163 @@
+# adapters/llm/cache.py
+# Cache d'embeddings adressé par contenu (SQLite mono-fichier, éviction LRU bornée en taille) + wrapper Provider.
+from __future__ import annotations
+import hashlib, logging, sqlite3, threading, time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+import numpy as np
+
+log = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS emb (
+    key TEXT PRIMARY KEY,
+    vec BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    last_access REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS emb_last_access ON emb(last_access);
+"""
+
+
+class EmbeddingCache:
+    """
+    Store clé -> vecteur (float32) persistant.
+    - Un seul fichier SQLite (WAL), partagé entre process.
+    - Taille bornée (`max_bytes`): éviction des entrées les moins récemment lues.
+    """
+
+    def __init__(self, path: Path, *, max_bytes: int = 2 * 1024**3):
+        self.path = Path(path)
+        self.max_bytes = int(max_bytes)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self._bytes = int(self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM emb").fetchone()[0])
+
+    def get_many(self, keys: Sequence[str]) -> Dict[str, List[float]]:
+        out: Dict[str, List[float]] = {}
+        if not keys:
+            return out
+        with self._lock:
+            for s in range(0, len(keys), 500):  # limite de variables SQLite
+                part = list(keys[s:s + 500])
+                q = f"SELECT key, vec FROM emb WHERE key IN ({','.join('?' * len(part))})"
+                for k, blob in self._conn.execute(q, part):
+                    out[k] = np.frombuffer(blob, dtype=np.float32).tolist()
+            if out:
+                now = time.time()
+                self._conn.executemany("UPDATE emb SET last_access=? WHERE key=?", [(now, k) for k in out])
+                self._conn.commit()
+        return out
+
+    def put_many(self, items: Dict[str, Sequence[float]]) -> None:
+        if not items:
+            return
+        now = time.time()
+        rows = []
+        for k, v in items.items():
+            blob = np.asarray(v, dtype=np.float32).tobytes()
+            rows.append((k, blob, len(blob) + len(k), now))
+        with self._lock:
+            # tailles remplacées (clés déjà présentes) déduites => compteur tenu sans rescanner la table
+            replaced = 0
+            keys = [r[0] for r in rows]
+            for s in range(0, len(keys), 500):  # limite de variables SQLite
+                part = keys[s:s + 500]
+                q = f"SELECT COALESCE(SUM(size), 0) FROM emb WHERE key IN ({','.join('?' * len(part))})"
+                replaced += int(self._conn.execute(q, part).fetchone()[0])
+            self._conn.executemany("INSERT OR REPLACE INTO emb(key, vec, size, last_access) VALUES (?,?,?,?)", rows)
+            self._conn.commit()
+            self._bytes += sum(r[2] for r in rows) - replaced
+            if self._bytes > self.max_bytes:
+                self._evict()
+
+    def _evict(self) -> None:
+        """Supprime les entrées les plus anciennes jusqu'à 90% de max_bytes (lock tenu)."""
+        target = int(self.max_bytes * 0.9)
+        freed, doomed = 0, []
+        for k, size in self._conn.execute("SELECT key, size FROM emb ORDER BY last_access ASC"):
+            if self._bytes - freed <= target:
+                break
+            doomed.append((k,)); freed += int(size)
+        self._conn.executemany("DELETE FROM emb WHERE key=?", doomed)
+        self._conn.commit()
+        self._bytes -= freed
+        log.info("embedding cache: evicted %s entries (%s bytes)", len(doomed), freed)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return int(self._conn.execute("SELECT COUNT(*) FROM emb").fetchone()[0])
+
+    def stats(self) -> Dict[str, Any]:
+        return {"path": str(self.path), "entries": len(self), "bytes": self._bytes, "max_bytes": self.max_bytes}
+
+
+def _model_of(provider: Any) -> Optional[str]:
+    for attr in ("embed_model", "embed_dep", "embed_model_name"):
+        v = getattr(provider, attr, None)
+        if v:
+            return str(v)
+    return None
+
+
+class CachedProvider:
+    """
+    Wrapper Provider: embed / embed_batch / embed_texts passent par le cache,
+    seuls les textes manquants sont envoyés au provider (un appel batch).
+    - Clé: (classe provider, modèle/déploiement, dimensions, sha1(texte)).
+    - Tout le reste (ask_llm, capabilities, attributs) est délégué à `inner`.
+    """
+
+    def __init__(self, inner: Any, cache: EmbeddingCache):
+        self.inner = inner
+        self.cache = cache
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()     # compteurs partagés par les workers d'embed_corpus
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.inner, name)
+
+    def _key(self, text: str, dimensions: Optional[int]) -> str:
+        dims = dimensions or getattr(self.inner, "default_embed_dims", None)
+        digest = hashlib.sha1((text or "").encode("utf-8")).hexdigest()
+        return f"{type(self.inner).__name__}|{_model_of(self.inner)}|{dims or ''}|{digest}"
+
+    def _cached(self, texts: Sequence[str], dimensions: Optional[int], compute) -> List[List[float]]:
+        keys = [self._key(t, dimensions) for t in texts]
+        found = self.cache.get_many(list(dict.fromkeys(keys)))
+        missing = list(dict.fromkeys(k for k in keys if k not in found))
+        with self._lock:
+            self.hits += len(keys) - sum(1 for k in keys if k not in found)
+            self.misses += len(missing)
+        if missing:
+            first = {}
+            for k, t in zip(keys, texts):
+                first.setdefault(k, t)
+            vecs = list(compute([first[k] for k in missing]))
+            if len(vecs) != len(missing):
+                raise ValueError(f"{type(self.inner).__name__} returned {len(vecs)} embeddings "
+                                 f"for {len(missing)} texts")
+            fresh = {k: list(v) for k, v in zip(missing, vecs)}
+            self.cache.put_many(fresh)
+            found.update(fresh)
+        return [found[k] for k in keys]
+
+    # ---- Embeddings ----
+    def embed(self, text: str, *, dimensions: Optional[int] = None) -> List[float]:
+        return self._cached([text], dimensions, lambda ts: [self.inner.embed(ts[0], dimensions=dimensions)])[0]
+
+    def embed_batch(self, texts: Sequence[str], *, dimensions: Optional[int] = None) -> List[List[float]]:
+        return self._cached(list(texts), dimensions, lambda ts: self.inner.embed_batch(ts, dimensions=dimensions))
+
+    def embed_texts(self, texts: List[str], *, dimensions: Optional[int] = None) -> List[List[float]]:
+        return self._cached(list(texts), dimensions, lambda ts: self.inner.embed_texts(ts, dimensions=dimensions))
+
+    def cache_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            hits, misses = self.hits, self.misses
+        return {"hits": hits, "misses": misses, **self.cache.stats()}
@@ -0,0 +1,213 @@
+# adapters/llm/llm_cache.py
+# Cache persistant prompt -> réponse des appels chat (SQLite mono-fichier, TTL + éviction LRU bornée en taille).
+from __future__ import annotations
+import hashlib, json, logging, re, sqlite3, threading, time
+from collections import defaultdict
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Optional
+
+from adapters.llm.base import unwrap_provider
+
+log = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS llm (
+    key TEXT PRIMARY KEY,
+    response TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    created REAL NOT NULL,
+    last_access REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS llm_last_access ON llm(last_access);
+"""
+
+
+class LLMResponseCache:
+    """
+    Store clé -> réponse texte persistant.
+    - Un seul fichier SQLite (WAL), partagé entre process.
+    - Entrées expirées après `ttl_s` (0 = jamais); taille bornée (`max_bytes`): éviction des moins récemment lues.
+    """
+
+    def __init__(self, path: Path, *, max_bytes: int = 1024**3, ttl_s: float = 30 * 86400.0):
+        self.path = Path(path)
+        self.max_bytes = int(max_bytes)
+        self.ttl_s = float(ttl_s)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self._bytes = int(self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM llm").fetchone()[0])
+        self.evictions = self.expired = 0
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute("SELECT response, created, size FROM llm WHERE key=?", (key,)).fetchone()
+            if row is None:
+                return None
+            now = time.time()
+            if self.ttl_s and now - row[1] > self.ttl_s:
+                self._conn.execute("DELETE FROM llm WHERE key=?", (key,))
+                self._conn.commit()
+                self._bytes -= int(row[2])
+                self.expired += 1
+                return None
+            self._conn.execute("UPDATE llm SET last_access=? WHERE key=?", (now, key))
+            self._conn.commit()
+        return row[0]
+
+    def put(self, key: str, response: str) -> None:
+        now = time.time()
+        size = len(response.encode("utf-8")) + len(key)
+        with self._lock:
+            old = self._conn.execute("SELECT size FROM llm WHERE key=?", (key,)).fetchone()
+            self._conn.execute("INSERT OR REPLACE INTO llm(key, response, size, created, last_access) "
+                               "VALUES (?,?,?,?,?)", (key, response, size, now, now))
+            self._conn.commit()
+            self._bytes += size - (int(old[0]) if old else 0)     # compteur tenu à jour (SUM seulement à l'ouverture)
+            if self._bytes > self.max_bytes:
+                self._evict()
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            row = self._conn.execute("SELECT size FROM llm WHERE key=?", (key,)).fetchone()
+            if row is None:
+                return
+            self._conn.execute("DELETE FROM llm WHERE key=?", (key,))
+            self._conn.commit()
+            self._bytes -= int(row[0])
+
+    def _evict(self) -> None:
+        """Supprime les entrées les plus anciennes jusqu'à 90% de max_bytes (lock tenu)."""
+        target = int(self.max_bytes * 0.9)
+        freed, doomed = 0, []
+        for k, size in self._conn.execute("SELECT key, size FROM llm ORDER BY last_access ASC"):
+            if self._bytes - freed <= target:
+                break
+            doomed.append((k,)); freed += int(size)
+        self._conn.executemany("DELETE FROM llm WHERE key=?", doomed)
+        self._conn.commit()
+        self._bytes -= freed
+        self.evictions += len(doomed)
+        log.info("llm cache: evicted %d entries (%d bytes)", len(doomed), freed)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM llm")
+            self._conn.commit()
+            self._bytes = 0
+
+    def __len__(self) -> int:
+        with self._lock:
+            return int(self._conn.execute("SELECT COUNT(*) FROM llm").fetchone()[0])
+
+    def stats(self) -> Dict[str, Any]:
+        return {"path": str(self.path), "entries": len(self), "bytes": self._bytes, "max_bytes": self.max_bytes,
+                "ttl_s": self.ttl_s, "evictions": self.evictions, "expired": self.expired}
+
+
+def _chat_model_of(provider: Any) -> Optional[str]:
+    for attr in ("chat_model", "chat_dep", "chat_model_name", "model_id"):
+        v = getattr(provider, attr, None)
+        if v:
+            return str(v)
+    return None
+
+
+class CachedChatProvider:
+    """
+    Wrapper Provider: `ask_llm` passe par le cache, tout le reste est délégué à `inner`.
+    - Clé: (classe provider, modèle/déploiement chat, température, sha256(prompt)).
+    - `caller`: nom de l'appelant (ex. "kg.extract") pour les compteurs et le contournement;
+      `bypass`: appelants jamais servis depuis le cache (la réponse fraîche est tout de même enregistrée);
+      `cache=False` au point d'appel: contournement ponctuel.
+    - `validate(réponse) -> bool` au point d'appel: seules les réponses valides sont enregistrées (une réponse
+      illisible n'est pas resservie pendant tout le TTL) ; une entrée en cache invalide est supprimée puis
+      redemandée. Une exception du validateur vaut réponse invalide.
+    """
+
+    def __init__(self, inner: Any, cache: LLMResponseCache, *, bypass: Iterable[str] = ()):
+        self.inner = inner
+        self.llm_cache = cache
+        self.bypass = set(bypass)
+        self._counts: Dict[str, Dict[str, int]] = defaultdict(lambda: {"hits": 0, "misses": 0, "bypass": 0})
+        self._lock = threading.Lock()
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.inner, name)
+
+    def _key(self, prompt: str) -> str:
+        raw = unwrap_provider(self.inner)
+        temp = getattr(raw, "temperature", 0)
+        digest = hashlib.sha256((prompt or "").encode("utf-8")).hexdigest()
+        return f"{type(raw).__name__}|{_chat_model_of(raw)}|{temp}|{digest}"
+
+    def _count(self, caller: str, what: str) -> None:
+        with self._lock:
+            self._counts[caller][what] += 1
+
+    def ask_llm(self, query: str, *, caller: Optional[str] = None, cache: bool = True,
+                validate: Optional[Callable[[str], bool]] = None) -> str:
+        caller = caller or "default"
+        key = self._key(query)
+        if not cache or caller in self.bypass:
+            self._count(caller, "bypass")
+        else:
+            hit = self.llm_cache.get(key)
+            if hit is not None and _valid(validate, hit):
+                self._count(caller, "hits")
+                return hit
+            if hit is not None:
+                self.llm_cache.delete(key)
+                log.warning("llm cache: dropped invalid cached reply (caller=%s)", caller)
+            self._count(caller, "misses")
+        resp = self.inner.ask_llm(query)
+        if resp and _valid(validate, resp):
+            self.llm_cache.put(key, resp)
+        return resp
+
+    def llm_cache_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            callers = {c: {**n, "hit_rate": round(n["hits"] / max(1, n["hits"] + n["misses"]), 3)}
+                       for c, n in self._counts.items()}
+        hits = sum(n["hits"] for n in callers.values())
+        misses = sum(n["misses"] for n in callers.values())
+        return {"hits": hits, "misses": misses, "hit_rate": round(hits / max(1, hits + misses), 3),
+                "bypass": sorted(self.bypass), "callers": callers, **self.llm_cache.stats()}
+
+
+def _valid(validate: Optional[Callable[[str], bool]], resp: str) -> bool:
+    if validate is None:
+        return True
+    try:
+        return bool(validate(resp))
+    except Exception:
+        return False
+
+
+def json_object_reply(resp: str) -> bool:
+    """Validateur des appelants JSON: la réponse contient un objet JSON lisible (directement ou 1er bloc {...})."""
+    candidates = [resp or ""]
+    m = re.search(r"\{.*\}", resp or "", re.S)
+    if m:
+        candidates.append(m.group(0))
+    for s in candidates:
+        try:
+            if isinstance(json.loads(s), dict):
+                return True
+        except Exception:
+            continue
+    return False
+
+
+def ask_cached(provider: Any, prompt: str, *, caller: str, cache: bool = True,
+               validate: Optional[Callable[[str], bool]] = None) -> str:
+    """
+    `provider.ask_llm(prompt)` en passant l'appelant au cache s'il est actif (provider nu sinon).
+    `validate`: seules les réponses qu'il accepte sont mises en cache (voir CachedChatProvider).
+    """
+    if isinstance(provider, CachedChatProvider) or hasattr(provider, "llm_cache"):
+        return provider.ask_llm(prompt, caller=caller, cache=cache, validate=validate)
+    return provider.ask_llm(prompt)
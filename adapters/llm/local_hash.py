@@ -0,0 +1,105 @@
+# adapters/llm/local_hash.py
+# Provider local hors-ligne : hachage de n-grammes de caractères + projection aléatoire fixe (NumPy, par lot).
+from __future__ import annotations
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence
+import logging
+
+import numpy as np
+
+from adapters.llm.base import Provider
+
+log = logging.getLogger(__name__)
+
+_MIX = np.uint64(0x9E3779B97F4A7C15)   # constante de mélange (Fibonacci hashing)
+_PRIME = np.uint64(1099511628211)      # FNV prime 64 bits
+
+
+@dataclass
+class LocalHashProvider(Provider):
+    """
+    Embeddings déterministes sans modèle ni réseau (déploiements air-gapped, tests de charge):
+    - n-grammes de caractères (ngram_min..ngram_max, texte en minuscules) hachés en `buckets` seaux signés;
+    - TF sous-linéaire puis projection aléatoire gaussienne fixe (graine `seed`) vers `dimensions`;
+    - tout le lot est traité en une passe vectorisée (pas de boucle Python par n-gramme).
+    Pas de chat: ask_llm lève RuntimeError.
+    """
+    dims: int = 384
+    buckets: int = 4096
+    ngram_min: int = 3
+    ngram_max: int = 5
+    seed: int = 0
+    _proj: Dict[int, np.ndarray] = field(default_factory=dict, repr=False)
+
+    @property
+    def embed_model(self) -> str:
+        """Identifiant stable du 'modèle' (clé de cache, propriété Chunk.model)."""
+        return f"hash-ngram{self.ngram_min}-{self.ngram_max}-b{self.buckets}-s{self.seed}"
+
+    @property
+    def default_embed_dims(self) -> int:
+        return self.dims
+
+    # ---- internes ----
+    def _projection(self, dims: int) -> np.ndarray:
+        """Matrice (buckets, dims) N(0, 1/dims), fixée par (seed, dims)."""
+        if dims not in self._proj:
+            rng = np.random.default_rng([self.seed, dims])
+            self._proj[dims] = (rng.standard_normal((self.buckets, dims)) / np.sqrt(dims)).astype(np.float32)
+        return self._proj[dims]
+
+    def _features(self, texts: Sequence[str]) -> np.ndarray:
+        """Histogrammes signés (n, buckets) des n-grammes hachés, pour tout le lot à la fois."""
+        n = len(texts)
+        enc = [f" {t.lower()} ".encode("utf-8") for t in texts]
+        lens = np.fromiter((len(b) for b in enc), dtype=np.int64, count=n)
+        data = np.frombuffer(b"".join(enc), dtype=np.uint8).astype(np.uint64)
+        doc = np.repeat(np.arange(n, dtype=np.int64), lens)
+        total = data.shape[0]
+
+        feats = np.zeros(n * self.buckets, dtype=np.float32)
+        h = np.zeros(total, dtype=np.uint64)
+        for g in range(1, self.ngram_max + 1):
+            m = total - g + 1
+            if m <= 0:
+                break
+            # hachage polynomial glissant: h[i] couvre data[i : i+g]
+            h = h[:m] * _PRIME + data[g - 1:g - 1 + m]
+            if g < self.ngram_min:
+                continue
+            same = doc[:m] == doc[g - 1:g - 1 + m]   # n-gramme interne à un seul texte
+            hx = (h[same] ^ np.uint64(g)) * _MIX
+            bucket = (hx >> np.uint64(40)) % np.uint64(self.buckets)
+            sign = np.where((hx >> np.uint64(20)) & np.uint64(1), 1.0, -1.0).astype(np.float32)
+            feats += np.bincount(doc[:m][same] * self.buckets + bucket.astype(np.int64),
+                                 weights=sign, minlength=n * self.buckets).astype(np.float32)
+        feats = feats.reshape(n, self.buckets)
+        return np.sign(feats) * np.log1p(np.abs(feats))
+
+    # ---- Embeddings ----
+    def embed_batch(self, texts: Sequence[str], *, dimensions: Optional[int] = None) -> List[List[float]]:
+        if not texts:
+            return []
+        vecs = self._features([t or "" for t in texts]) @ self._projection(int(dimensions or self.dims))
+        norms = np.linalg.norm(vecs, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return (vecs / norms).tolist()
+
+    def embed(self, text: str, *, dimensions: Optional[int] = None) -> List[float]:
+        return self.embed_batch([text], dimensions=dimensions)[0]
+
+    def embed_texts(self, texts: List[str], *, dimensions: Optional[int] = None) -> List[List[float]]:
+        return self.embed_batch(texts, dimensions=dimensions)
+
+    # ---- Chat ----
+    def ask_llm(self, query: str) -> str:
+        raise RuntimeError("LocalHashProvider: embeddings seulement (pas de chat); choisir un autre provider pour ask_llm")
+
+    def capabilities(self) -> dict:
+        return {
+            "provider": "local",
+            "supports_chat": False,
+            "supports_embeddings": True,
+            "embed_model": self.embed_model,
+            "dims": self.dims,
+        }
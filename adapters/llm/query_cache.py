@@ -0,0 +1,81 @@
+# adapters/llm/query_cache.py
+# Cache mémoire LRU + TTL des embeddings de requêtes (chemin chaud de la recherche), partagé entre les retrievers.
+from __future__ import annotations
+import re, threading, time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from adapters.llm.base import unwrap_provider
+
+_WS = re.compile(r"\s+")
+
+
+def normalize_query(text: str) -> str:
+    """Normalisation de la clé: minuscules, espaces compactés, bords retirés."""
+    return _WS.sub(" ", (text or "").strip().lower())
+
+
+class QueryEmbeddingCache:
+    """
+    LRU borné (`maxsize` entrées) avec expiration (`ttl_s`), thread-safe.
+    - Clé: (classe provider, modèle/déploiement, dimensions, requête normalisée).
+    - Compteurs hits / misses / evictions / expired exposés par `stats()`.
+    """
+
+    def __init__(self, maxsize: int = 4096, ttl_s: float = 3600.0):
+        self.maxsize = int(maxsize)
+        self.ttl_s = float(ttl_s)
+        self._data: "OrderedDict[Tuple, Tuple[float, List[float]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = self.misses = self.evictions = self.expired = 0
+
+    @staticmethod
+    def _key(provider: Any, text: str, dimensions: Optional[int]) -> Tuple:
+        inner = unwrap_provider(provider)
+        model = next((getattr(inner, a) for a in ("embed_model", "embed_dep", "embed_model_name")
+                      if getattr(inner, a, None)), None)
+        dims = dimensions or getattr(inner, "default_embed_dims", None)
+        return (type(inner).__name__, model, dims, normalize_query(text))
+
+    def get(self, key: Tuple) -> Optional[List[float]]:
+        with self._lock:
+            hit = self._data.get(key)
+            if hit is None:
+                self.misses += 1
+                return None
+            ts, vec = hit
+            if self.ttl_s and time.monotonic() - ts > self.ttl_s:
+                del self._data[key]
+                self.expired += 1; self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return vec
+
+    def put(self, key: Tuple, vec: List[float]) -> None:
+        with self._lock:
+            self._data[key] = (time.monotonic(), vec)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def embed(self, provider: Any, text: str, *, dimensions: Optional[int] = None) -> List[float]:
+        """Embedding de la requête via le cache (appel provider.embed seulement en cas de miss)."""
+        key = self._key(provider, text, dimensions)
+        vec = self.get(key)
+        if vec is None:
+            vec = list(provider.embed(text, dimensions=dimensions) if dimensions else provider.embed(text))
+            self.put(key, vec)
+        return vec
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            total = self.hits + self.misses
+            return {"size": len(self._data), "maxsize": self.maxsize, "ttl_s": self.ttl_s,
+                    "hits": self.hits, "misses": self.misses, "evictions": self.evictions,
+                    "expired": self.expired, "hit_rate": (self.hits / total) if total else 0.0}
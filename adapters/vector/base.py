@@ -3,7 +3,7 @@
 from __future__ import annotations
 from dataclasses import dataclass
 from typing import List, Dict, Sequence, Tuple
-import math
+import numpy as np
 
 @dataclass
 class VectorHit:
@@ -20,25 +20,137 @@ class VectorIndex:
     def add(self, ids: Sequence[str], vectors: Sequence[Sequence[float]], metadata: Sequence[Dict] | None = None): ...
     def search(self, query: Sequence[float], k: int = 8) -> List[VectorHit]: ...
 
+    def remove(self, ids: Sequence[str]) -> int:
+        """Supprime des ids (absents ignorés); retourne le nombre supprimé."""
+        raise NotImplementedError(f"{type(self).__name__}.remove")
+
+    def __contains__(self, id: str) -> bool:
+        """True si `id` a un vecteur (non supprimé) dans l'index."""
+        raise NotImplementedError(f"{type(self).__name__}.__contains__")
+
+    def search_many(self, queries: Sequence[Sequence[float]], k: int = 8) -> List[List[VectorHit]]:
+        """Recherche par lot (défaut: une recherche par requête)."""
+        return [self.search(q, k=k) for q in queries]
+
+# ------------------ Helpers numpy ------------------
+
+def _as_matrix(vectors, dim: int) -> np.ndarray:
+    """Convertit une séquence de vecteurs en matrice float32 (n, dim) contiguë."""
+    mat = np.asarray(vectors, dtype=np.float32)
+    if mat.ndim == 1:
+        mat = mat.reshape(1, -1)
+    if mat.ndim != 2 or (mat.size and mat.shape[1] != dim):
+        got = mat.shape[-1] if mat.ndim else 0
+        raise ValueError(f"dim mismatch: expected {dim}, got {got}")
+    return np.ascontiguousarray(mat)
+
+def _normalize_rows(mat: np.ndarray) -> np.ndarray:
+    """Normalise chaque ligne (L2). Les vecteurs nuls restent nuls (score 0)."""
+    norms = np.linalg.norm(mat, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return mat / norms
+
+def _topk(scores: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Top-k par ligne via argpartition (O(n)) puis tri des k retenus.
+    - scores: (q, n) -> (indices (q, k), valeurs (q, k)) triés par score décroissant.
+    """
+    n = scores.shape[1]
+    k = min(int(k), n)
+    if k <= 0:
+        empty = np.empty((scores.shape[0], 0), dtype=np.int64)
+        return empty, scores[:, :0]
+    if k < n:
+        part = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    else:
+        part = np.broadcast_to(np.arange(n), (scores.shape[0], n))
+    vals = np.take_along_axis(scores, part, axis=1)
+    order = np.argsort(-vals, axis=1, kind="stable")
+    return np.take_along_axis(part, order, axis=1), np.take_along_axis(vals, order, axis=1)
+
+def _hits(ids: List[str], meta: List[Dict], rows, scores, k: int) -> List[VectorHit]:
+    """Hits d'une ligne de top-k, en ignorant les lignes supprimées (id vide), au plus k."""
+    out: List[VectorHit] = []
+    for j, s in zip(rows, scores):
+        if ids[j]:
+            out.append(VectorHit(id=ids[j], score=float(s), metadata=meta[j]))
+            if len(out) >= k:
+                break
+    return out
+
+# ------------------ Index mémoire ------------------
+
 class InMemoryIndex(VectorIndex):
-    """Brute-force cosine — suffisant pour tests et petits volumes."""
+    """Brute-force cosine (matrice float32 pré-normalisée) — suffisant pour tests et petits volumes."""
     def __init__(self, dim: int):
         self.dim = dim
-        self._vecs: Dict[str, List[float]] = {}
-        self._meta: Dict[str, Dict] = {}
+        self._ids: List[str] = []
+        self._pos: Dict[str, int] = {}
+        self._meta: List[Dict] = []
+        self._mat = np.zeros((0, dim), dtype=np.float32)  # capacité (>= len(self._ids))
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def __contains__(self, id: str) -> bool:
+        return id in self._pos
+
+    @property
+    def dead(self) -> int:
+        """Nombre de lignes supprimées (tombstones) encore présentes dans la matrice."""
+        return len(self._ids) - len(self._pos)
+
+    def _reserve(self, n: int) -> None:
+        """Agrandit la matrice par doublement (amortit les ajouts incrémentaux)."""
+        cap = self._mat.shape[0]
+        if n <= cap:
+            return
+        new = np.zeros((max(n, 2 * cap, 64), self.dim), dtype=np.float32)
+        new[:len(self._ids)] = self._mat[:len(self._ids)]
+        self._mat = new
+
+    @property
+    def matrix(self) -> np.ndarray:
+        """Vue (n, dim) des vecteurs normalisés (sans la capacité libre)."""
+        return self._mat[:len(self._ids)]
 
     def add(self, ids, vectors, metadata=None):
+        ids = list(ids)
         if metadata is None: metadata = [{}] * len(ids)
-        for i, v, m in zip(ids, vectors, metadata):
-            if len(v) != self.dim:
-                raise ValueError(f"dim mismatch: expected {self.dim}, got {len(v)}")
-            self._vecs[i] = list(v); self._meta[i] = dict(m)
+        if not ids:
+            return
+        mat = _normalize_rows(_as_matrix(vectors, self.dim))
+        if mat.shape[0] != len(ids):
+            raise ValueError(f"ids/vectors length mismatch: {len(ids)} != {mat.shape[0]}")
+        self._reserve(len(self._ids) + len(ids))
+        for i, v, m in zip(ids, mat, metadata):
+            pos = self._pos.get(i)
+            if pos is None:  # nouvel id → nouvelle ligne ; sinon écrasement (upsert)
+                pos = len(self._ids)
+                self._pos[i] = pos
+                self._ids.append(i)
+                self._meta.append({})
+            self._mat[pos] = v
+            self._meta[pos] = dict(m)
+
+    def remove(self, ids: Sequence[str]) -> int:
+        """Supprime des ids: ligne remise à zéro + tombstone (id vide, ignoré à la recherche)."""
+        rows = sorted({self._pos.pop(i) for i in set(ids) if i in self._pos})
+        for r in rows:
+            self._mat[r] = 0.0
+            self._ids[r] = ""
+            self._meta[r] = {}
+        return len(rows)
 
     def search(self, query, k=8) -> List[VectorHit]:
-        def cos(a,b):
-            dp = sum(x*y for x,y in zip(a,b))
-            na = math.sqrt(sum(x*x for x in a)); nb = math.sqrt(sum(y*y for y in b))
-            return 0.0 if na==0 or nb==0 else dp/(na*nb)
-        scores = [(i, cos(query, v)) for i, v in self._vecs.items()]
-        scores.sort(key=lambda t: t[1], reverse=True)
-        return [VectorHit(id=i, score=s, metadata=self._meta[i]) for i, s in scores[:k]]
+        return self.search_many([query], k=k)[0]
+
+    def search_many(self, queries, k=8) -> List[List[VectorHit]]:
+        """Score toutes les requêtes en un seul produit matriciel (q, dim) x (dim, n)."""
+        if len(queries) == 0:
+            return []
+        qs = _normalize_rows(_as_matrix(queries, self.dim))
+        if not self._ids:
+            return [[] for _ in range(qs.shape[0])]
+        idx, vals = _topk(qs @ self.matrix.T, int(k) + self.dead)
+        return [_hits(self._ids, self._meta, row_i, row_s, k) for row_i, row_s in zip(idx, vals)]
@@ -0,0 +1,210 @@
+# adapters/vector/ivf.py
+# vector : index approché IVF (quantificateur grossier k-means sphérique) au-dessus d'un index brute-force (mémoire ou mmap).
+from __future__ import annotations
+import math, os, tempfile
+from pathlib import Path
+from typing import List, Optional
+import numpy as np
+
+from .base import VectorIndex, VectorHit, _as_matrix, _hits, _normalize_rows, _topk
+
+
+def _kmeans(x: np.ndarray, k: int, *, iters: int = 10, seed: int = 0) -> np.ndarray:
+    """k-means sphérique (lignes de `x` normalisées) -> centroïdes normalisés (k, dim)."""
+    rng = np.random.default_rng(seed)
+    c = x[rng.choice(x.shape[0], size=k, replace=False)].copy()
+    for _ in range(iters):
+        assign = np.argmax(x @ c.T, axis=1)
+        onehot = np.zeros((x.shape[0], k), dtype=np.float32)
+        onehot[np.arange(x.shape[0]), assign] = 1.0
+        sums = onehot.T @ x
+        empty = onehot.sum(axis=0) == 0
+        if empty.any():  # ré-amorce les listes vides sur des points aléatoires
+            sums[empty] = x[rng.choice(x.shape[0], size=int(empty.sum()), replace=False)]
+        c = _normalize_rows(sums)
+    return c.astype(np.float32)
+
+
+class IVFIndex(VectorIndex):
+    """
+    Inverted File Index: les vecteurs de `base` sont répartis en `nlist` listes (centroïdes k-means);
+    une requête ne score que les `nprobe` listes les plus proches.
+    - `base`: InMemoryIndex ou MmapIndex (stockage + ids + métadonnées, upsert inclus).
+    - Knobs rappel/latence: `nprobe` (défaut, ou par appel), `nlist` (défaut ~sqrt(n)).
+    - Entraînement à la construction et dans `add` (jamais sur le chemin de recherche): les nouvelles lignes
+      sont affectées à leur centroïde; ré-entraînement quand le volume dépasse `retrain_factor` x le volume
+      d'entraînement. Les lignes ajoutées par un autre process sont affectées à la recherche suivante.
+    - Tant que n < `train_min`: recherche exacte (brute-force) sur `base`.
+    - `path` (optionnel): centroïdes + affectations persistés en .npz (rechargés au démarrage).
+    """
+
+    def __init__(self, base: VectorIndex, *, nlist: Optional[int] = None, nprobe: int = 8,
+                 train_min: int = 2048, retrain_factor: float = 4.0, sample: int = 32,
+                 path: Optional[Path] = None, seed: int = 0):
+        self.base = base
+        self.nlist = nlist
+        self.nprobe = int(nprobe)
+        self.train_min = int(train_min)
+        self.retrain_factor = float(retrain_factor)
+        self.sample = int(sample)  # points d'entraînement par centroïde
+        self.path = Path(path) if path else None
+        self.seed = seed
+
+        self._centroids: Optional[np.ndarray] = None
+        self._assign = np.zeros(0, dtype=np.int32)  # liste de chaque ligne de base
+        self._trained_n = 0
+        self._lists: Optional[tuple] = None          # (ptr, rows) CSR, reconstruit à la demande
+        self._load()
+        self._maybe_train()
+
+    # ---------- délégation ----------
+    def __len__(self) -> int:
+        return len(self.base)  # type: ignore[arg-type]
+
+    def __contains__(self, id: str) -> bool:
+        return id in self.base
+
+    @property
+    def dim(self) -> int:  # type: ignore[override]
+        return self.base.dim
+
+    @property
+    def root(self) -> Optional[Path]:
+        return getattr(self.base, "root", None)
+
+    @property
+    def trained(self) -> bool:
+        return self._centroids is not None
+
+    def refresh(self) -> None:
+        if hasattr(self.base, "refresh"):
+            self.base.refresh()  # type: ignore[attr-defined]
+
+    def remove(self, ids) -> int:
+        """Suppression déléguée à `base` (tombstones, ignorées à la recherche)."""
+        return self.base.remove(ids)  # type: ignore[attr-defined]
+
+    # ---------- persistance ----------
+    def _load(self) -> None:
+        if not self.path or not self.path.exists():
+            return
+        with np.load(self.path) as z:
+            n = int(z["assign"].shape[0])
+            if n > len(self) or int(z["centroids"].shape[1]) != int(self.dim or 0):
+                return  # artefact incohérent avec la base: ré-entraînement
+            self._centroids = z["centroids"]
+            self._assign = z["assign"].astype(np.int32)
+            self._trained_n = int(z["trained_n"])
+            self.nlist = int(self._centroids.shape[0])
+
+    def save(self) -> None:
+        if not self.path or self._centroids is None:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # fichier temporaire unique: deux workers peuvent sauvegarder la même série
+        with tempfile.NamedTemporaryFile(dir=self.path.parent, prefix=f".{self.path.stem}.", suffix=".tmp.npz",
+                                         delete=False) as f:
+            np.savez(f, centroids=self._centroids, assign=self._assign, trained_n=np.int64(self._trained_n))
+        try:
+            os.replace(f.name, self.path)
+        except BaseException:
+            os.unlink(f.name)
+            raise
+
+    # ---------- entraînement / affectation ----------
+    def train(self) -> None:
+        """(Ré)entraîne le quantificateur sur un échantillon puis affecte toutes les lignes."""
+        mat = self.base.matrix  # type: ignore[attr-defined]
+        n = mat.shape[0]
+        nlist = max(1, min(int(self.nlist or round(math.sqrt(n))), n))
+        rng = np.random.default_rng(self.seed)
+        take = min(n, nlist * self.sample)
+        rows = np.sort(rng.choice(n, size=take, replace=False)) if take < n else np.arange(n)
+        self._centroids = _kmeans(np.asarray(mat[rows], dtype=np.float32), nlist, seed=self.seed)
+        self.nlist = nlist
+        self._assign = np.zeros(0, dtype=np.int32)
+        self._trained_n = n
+        self._sync()
+        self.save()
+
+    def _assign_rows(self, rows: np.ndarray) -> np.ndarray:
+        out = np.empty(rows.shape[0], dtype=np.int32)
+        mat = self.base.matrix  # type: ignore[attr-defined]
+        for s in range(0, rows.shape[0], 8192):  # borne la mémoire (blocs)
+            blk = np.asarray(mat[rows[s:s + 8192]], dtype=np.float32)
+            out[s:s + 8192] = np.argmax(blk @ self._centroids.T, axis=1)
+        return out
+
+    def _sync(self) -> None:
+        """Affecte les lignes ajoutées à la base depuis la dernière synchro (autre process inclus)."""
+        n = len(self)
+        if self._centroids is None or self._assign.shape[0] >= n:
+            return
+        start = self._assign.shape[0]
+        tail = self._assign_rows(np.arange(start, n))
+        self._assign = np.concatenate([self._assign, tail])
+        self._lists = None
+
+    def _maybe_train(self) -> bool:
+        """Entraîne si le volume le justifie (premier passage du seuil ou croissance x retrain_factor)."""
+        n = len(self)
+        if n < self.train_min:
+            return False
+        if self._centroids is None or n > self._trained_n * self.retrain_factor:
+            self.train()
+            return True
+        return False
+
+    def _inverted_lists(self) -> tuple:
+        if self._lists is None:
+            order = np.argsort(self._assign, kind="stable").astype(np.int64)
+            counts = np.bincount(self._assign, minlength=int(self.nlist))
+            ptr = np.concatenate([[0], np.cumsum(counts)])
+            self._lists = (ptr, order)
+        return self._lists
+
+    def add(self, ids, vectors, metadata=None):
+        ids = list(ids)
+        n0 = self._assign.shape[0]
+        self.base.add(ids, vectors, metadata)
+        if not ids or self._maybe_train():
+            return  # train() affecte toutes les lignes et persiste
+        if self._centroids is None:
+            return
+        self._sync()
+        # lignes réécrites (upsert) : ré-affectation
+        pos = getattr(self.base, "_pos", {})
+        rows = np.array([pos[i] for i in ids if i in pos and pos[i] < n0], dtype=np.int64)
+        if rows.size:
+            self._assign[rows] = self._assign_rows(rows)
+            self._lists = None
+        self.save()
+
+    # ---------- recherche ----------
+    def search(self, query, k=8, *, nprobe: Optional[int] = None) -> List[VectorHit]:
+        return self.search_many([query], k=k, nprobe=nprobe)[0]
+
+    def search_many(self, queries, k=8, *, nprobe: Optional[int] = None) -> List[List[VectorHit]]:
+        if len(queries) == 0:
+            return []
+        self.refresh()
+        if self._centroids is None:
+            return self.base.search_many(queries, k=k)  # pas encore entraîné: recherche exacte
+        self._sync()
+        qs = _normalize_rows(_as_matrix(queries, int(self.dim)))
+        probe = max(1, min(int(nprobe or self.nprobe), int(self.nlist)))
+        lists, _ = _topk(qs @ self._centroids.T, probe)
+        ptr, order = self._inverted_lists()
+        mat = self.base.matrix  # type: ignore[attr-defined]
+        ids, meta = self.base._ids, self.base._meta  # type: ignore[attr-defined]
+
+        out: List[List[VectorHit]] = []
+        for q, probes in zip(qs, lists):
+            cand = np.concatenate([order[ptr[l]:ptr[l + 1]] for l in probes])
+            if cand.size == 0:
+                out.append([]); continue
+            cand.sort()  # accès séquentiel (pages mmap)
+            scores = (np.asarray(mat[cand], dtype=np.float32) @ q)[None, :]
+            top, vals = _topk(scores, int(k) + getattr(self.base, "dead", 0))
+            out.append(_hits(ids, meta, cand[top[0]], vals[0], k))
+        return out
@@ -0,0 +1,203 @@
+# adapters/vector/mmap.py
+# vector : index persistant par série (matrice float32 sur disque ouverte via np.memmap + sidecar ids/métadonnées).
+from __future__ import annotations
+import json, os
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+import numpy as np
+
+from app.core.config import get_settings
+from .base import VectorIndex, VectorHit, _as_matrix, _hits, _normalize_rows, _topk
+
+VECTORS_FILE = "vectors.f32"   # matrice brute (n, dim) float32, lignes normalisées
+IDS_FILE = "ids.jsonl"         # sidecar: {"row", "id", "meta"} (dernière ligne gagnante par row; id null = supprimé)
+HEADER_FILE = "header.json"    # {"dim", "count"} : point de commit des écritures
+
+
+def series_vectors_dir(series: str, name: Optional[str] = None) -> Path:
+    """data/series/<series>/vectors[/<name>] (racine issue de settings.storage; name=None => chunks)."""
+    st = get_settings().storage
+    root = Path(st.root) / st.series_dirname / series / get_settings().vector.dirname
+    return root / name if name else root
+
+
+class MmapIndex(VectorIndex):
+    """
+    Index cosine brute-force persistant, ouvert en np.memmap (lecture seule).
+    - Démarrage instantané: seule la sidecar des ids est chargée, la matrice reste sur disque.
+    - Plusieurs workers partagent les mêmes pages via le cache OS.
+    - Écritures append-only; `header.json` (remplacé atomiquement) fait foi pour le nombre de lignes.
+    - Un id déjà présent est réécrit en place (upsert); `remove` pose une tombstone (ligne mise à zéro).
+    """
+
+    def __init__(self, root: Path, dim: Optional[int] = None):
+        self.root = Path(root)
+        self.dim = dim  # type: ignore[assignment]
+        self._ids: List[str] = []
+        self._pos: Dict[str, int] = {}
+        self._meta: List[Dict[str, Any]] = []
+        self._mat: Optional[np.ndarray] = None
+        self._stamp: Optional[tuple] = None
+        self._load()
+
+    @classmethod
+    def for_series(cls, series: str, dim: Optional[int] = None, name: Optional[str] = None) -> "MmapIndex":
+        return cls(series_vectors_dir(series, name), dim=dim)
+
+    # ---------- chargement ----------
+    def _header(self) -> Dict[str, Any]:
+        p = self.root / HEADER_FILE
+        if not p.exists():
+            return {}
+        return json.loads(p.read_text(encoding="utf-8"))
+
+    def _load(self) -> None:
+        """(Re)charge header + sidecar et remappe la matrice si le header a changé."""
+        hp, sp = self.root / HEADER_FILE, self.root / IDS_FILE
+        stamp = (hp.stat().st_mtime_ns, sp.stat().st_size if sp.exists() else 0) if hp.exists() else None
+        if stamp is not None and stamp == self._stamp:
+            return
+        self._stamp = stamp
+        head = self._header()
+        count = int(head.get("count", 0))
+        if head.get("dim"):
+            if self.dim and int(head["dim"]) != int(self.dim):
+                raise ValueError(f"dim mismatch: index {self.root} has {head['dim']}, expected {self.dim}")
+            self.dim = int(head["dim"])
+
+        ids: List[Optional[str]] = [None] * count
+        meta: List[Dict[str, Any]] = [{} for _ in range(count)]
+        if count and sp.exists():
+            with sp.open(encoding="utf-8") as f:
+                for line in f:
+                    if not line.strip():
+                        continue
+                    rec = json.loads(line)
+                    row = int(rec["row"])
+                    if row < count:  # ignore les lignes non commitées
+                        ids[row] = rec["id"]
+                        meta[row] = rec.get("meta") or {}
+        self._ids = [i if i is not None else "" for i in ids]
+        self._pos = {i: r for r, i in enumerate(self._ids) if i}
+        self._meta = meta
+        self._mat = None
+        if count and self.dim:
+            self._mat = np.memmap(self.root / VECTORS_FILE, dtype=np.float32, mode="r", shape=(count, int(self.dim)))
+
+    def refresh(self) -> None:
+        """À appeler côté lecteur: prend en compte les écritures d'un autre process."""
+        self._load()
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def __contains__(self, id: str) -> bool:
+        return id in self._pos
+
+    @property
+    def dead(self) -> int:
+        """Nombre de lignes supprimées (tombstones) encore présentes dans la matrice."""
+        return len(self._ids) - len(self._pos)
+
+    @property
+    def matrix(self) -> np.ndarray:
+        if self._mat is None:
+            return np.zeros((0, int(self.dim or 0)), dtype=np.float32)
+        return self._mat
+
+    def get(self, id: str) -> Optional[np.ndarray]:
+        """Vecteur (normalisé) stocké pour `id`, None si absent ou supprimé."""
+        row = self._pos.get(id)
+        return None if row is None else np.asarray(self.matrix[row])
+
+    # ---------- écriture ----------
+    def _commit(self, count: int) -> None:
+        tmp = self.root / f".{HEADER_FILE}.tmp"
+        tmp.write_text(json.dumps({"dim": int(self.dim), "count": int(count)}), encoding="utf-8")
+        os.replace(tmp, self.root / HEADER_FILE)
+
+    def add(self, ids, vectors, metadata=None):
+        ids = list(ids)
+        if metadata is None: metadata = [{}] * len(ids)
+        if not ids:
+            return
+        if not self.dim:
+            self.dim = len(vectors[0])
+        mat = _normalize_rows(_as_matrix(vectors, int(self.dim)))
+        if mat.shape[0] != len(ids):
+            raise ValueError(f"ids/vectors length mismatch: {len(ids)} != {mat.shape[0]}")
+        self.root.mkdir(parents=True, exist_ok=True)
+        self._load()
+
+        count = len(self._ids)
+        updates: Dict[int, np.ndarray] = {}
+        appends: List[np.ndarray] = []
+        lines: List[str] = []
+        for i, v, m in zip(ids, mat, metadata):
+            row = self._pos.get(i)
+            if row is None:
+                row = count + len(appends)
+                self._pos[i] = row
+                appends.append(v)
+            elif row >= count:  # doublon dans le même lot
+                appends[row - count] = v
+            else:
+                updates[row] = v
+            lines.append(json.dumps({"row": row, "id": i, "meta": dict(m)}, ensure_ascii=False))
+
+        self._mat = None  # libère la vue avant réécriture
+        vp = self.root / VECTORS_FILE
+        if updates:
+            mm = np.memmap(vp, dtype=np.float32, mode="r+", shape=(count, int(self.dim)))
+            for row, v in updates.items():
+                mm[row] = v
+            mm.flush(); del mm
+        if appends:
+            with vp.open("ab") as f:
+                # tronque une éventuelle écriture partielle non commitée
+                f.truncate(count * int(self.dim) * 4)
+                f.write(np.asarray(appends, dtype=np.float32).tobytes())
+        with (self.root / IDS_FILE).open("a", encoding="utf-8") as f:
+            f.write("\n".join(lines) + "\n")
+        self._commit(count + len(appends))
+        self._stamp = None
+        self._load()
+
+    def remove(self, ids: Sequence[str]) -> int:
+        """Supprime des ids: ligne remise à zéro + tombstone dans la sidecar. Retourne le nb supprimé."""
+        self._load()
+        rows = sorted({self._pos[i] for i in ids if i in self._pos})
+        if not rows:
+            return 0
+        count = len(self._ids)
+        self._mat = None
+        mm = np.memmap(self.root / VECTORS_FILE, dtype=np.float32, mode="r+", shape=(count, int(self.dim)))
+        mm[rows] = 0.0
+        mm.flush(); del mm
+        with (self.root / IDS_FILE).open("a", encoding="utf-8") as f:
+            f.write("\n".join(json.dumps({"row": r, "id": None}) for r in rows) + "\n")
+        self._commit(count)
+        self._stamp = None
+        self._load()
+        return len(rows)
+
+    def reset(self) -> None:
+        """Supprime le contenu de l'index (ré-ingestion complète)."""
+        self._mat = None
+        for name in (VECTORS_FILE, IDS_FILE, HEADER_FILE):
+            (self.root / name).unlink(missing_ok=True)
+        self._ids, self._pos, self._meta, self._stamp = [], {}, [], None
+
+    # ---------- recherche ----------
+    def search(self, query, k=8) -> List[VectorHit]:
+        return self.search_many([query], k=k)[0]
+
+    def search_many(self, queries, k=8) -> List[List[VectorHit]]:
+        if len(queries) == 0:
+            return []
+        self._load()
+        qs = _normalize_rows(_as_matrix(queries, int(self.dim or len(queries[0]))))
+        if not self._ids:
+            return [[] for _ in range(qs.shape[0])]
+        idx, vals = _topk(qs @ self.matrix.T, int(k) + self.dead)
+        return [_hits(self._ids, self._meta, row_i, row_s, k) for row_i, row_s in zip(idx, vals)]
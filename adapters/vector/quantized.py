@@ -0,0 +1,155 @@
+# adapters/vector/quantized.py
+# vector : codes scalaires (int8 / float16) en mémoire pour le premier passage + re-scoring exact depuis les vecteurs float32 sur disque.
+from __future__ import annotations
+from typing import List, Optional
+import numpy as np
+
+from .base import VectorIndex, VectorHit, _as_matrix, _hits, _normalize_rows, _topk
+
+BLOCK = 1024  # lignes décodées par bloc lors du scan (tient dans le cache CPU)
+
+
+class QuantizedIndex(VectorIndex):
+    """
+    Index compressé au-dessus d'un index pleine précision (`base`, typiquement MmapIndex):
+    - `codes="int8"`: quantification scalaire par dimension (min/max) -> 4x moins de mémoire;
+      `codes="float16"` -> 2x.
+    - Premier passage sur les codes (pas de décodage complet: score = q·lo + (q*scale)·code).
+    - Les `rerank * k` meilleurs candidats sont re-scorés exactement depuis `base.matrix`
+      (np.memmap: seules les pages des candidats sont lues).
+    - `add` incrémental: les nouvelles lignes / lignes réécrites sont encodées avec les bornes
+      courantes (valeurs hors bornes écrêtées, corrigées par le re-scoring); `fit()` recalcule.
+    """
+
+    def __init__(self, base: VectorIndex, *, codes: str = "int8", rerank: int = 4):
+        if codes not in ("int8", "float16"):
+            raise ValueError(f"unsupported codes: {codes} (int8 | float16)")
+        self.base = base
+        self.codes = codes
+        self.rerank = max(1, int(rerank))
+        self._codes: Optional[np.ndarray] = None
+        self._lo: Optional[np.ndarray] = None      # (dim,) borne basse par dimension (int8)
+        self._scale: Optional[np.ndarray] = None   # (dim,) pas de quantification (int8)
+        if len(self):
+            self.fit()
+
+    # ---------- délégation ----------
+    def __len__(self) -> int:
+        return len(self.base)  # type: ignore[arg-type]
+
+    def __contains__(self, id: str) -> bool:
+        return id in self.base
+
+    @property
+    def dim(self) -> int:  # type: ignore[override]
+        return self.base.dim
+
+    @property
+    def root(self):
+        return getattr(self.base, "root", None)
+
+    def refresh(self) -> None:
+        if hasattr(self.base, "refresh"):
+            self.base.refresh()  # type: ignore[attr-defined]
+
+    def remove(self, ids) -> int:
+        """Suppression déléguée à `base` (tombstones, ignorées à la recherche)."""
+        return self.base.remove(ids)  # type: ignore[attr-defined]
+
+    @property
+    def nbytes(self) -> int:
+        """Mémoire résidente des codes (hors vecteurs pleine précision sur disque)."""
+        return 0 if self._codes is None else int(self._codes.nbytes)
+
+    # ---------- encodage ----------
+    def _encode(self, mat: np.ndarray) -> np.ndarray:
+        if self.codes == "float16":
+            return mat.astype(np.float16)
+        q = np.rint((mat - self._lo) / self._scale) - 128.0
+        return np.clip(q, -128, 127).astype(np.int8)
+
+    def _encode_rows(self, start: int, stop: int) -> np.ndarray:
+        mat = self.base.matrix  # type: ignore[attr-defined]
+        return np.concatenate([self._encode(np.asarray(mat[s:min(s + BLOCK, stop)], dtype=np.float32))
+                               for s in range(start, stop, BLOCK)] or [np.zeros((0, self.dim), dtype=np.int8)])
+
+    def fit(self) -> None:
+        """Calcule les bornes par dimension puis (ré)encode toutes les lignes de `base`."""
+        mat = self.base.matrix  # type: ignore[attr-defined]
+        n = mat.shape[0]
+        if self.codes == "int8":
+            lo = np.full(self.dim, np.inf, dtype=np.float32)
+            hi = np.full(self.dim, -np.inf, dtype=np.float32)
+            for s in range(0, n, BLOCK):
+                blk = np.asarray(mat[s:s + BLOCK], dtype=np.float32)
+                lo = np.minimum(lo, blk.min(axis=0)); hi = np.maximum(hi, blk.max(axis=0))
+            if not n:
+                lo, hi = np.full(self.dim, -1.0, np.float32), np.full(self.dim, 1.0, np.float32)
+            self._lo = lo
+            self._scale = np.maximum(hi - lo, 1e-12).astype(np.float32) / 255.0
+        self._codes = self._encode_rows(0, n)
+
+    def _sync(self) -> None:
+        """Encode les lignes ajoutées à la base depuis la dernière synchro (autre process inclus)."""
+        n = len(self)
+        if self._codes is None:
+            if n:
+                self.fit()
+            return
+        if self._codes.shape[0] < n:
+            self._codes = np.concatenate([self._codes, self._encode_rows(self._codes.shape[0], n)])
+
+    def add(self, ids, vectors, metadata=None):
+        ids = list(ids)
+        had = self._codes is not None and self._codes.shape[0] > 0
+        self.base.add(ids, vectors, metadata)
+        if not had:
+            self.fit()  # bornes calculées sur le premier lot
+            return
+        n_old = self._codes.shape[0]
+        self._sync()
+        pos = getattr(self.base, "_pos", {})
+        rows = np.array(sorted({pos[i] for i in ids if i in pos and pos[i] < n_old}), dtype=np.int64)
+        if rows.size:  # lignes réécrites (upsert)
+            mat = self.base.matrix  # type: ignore[attr-defined]
+            self._codes[rows] = self._encode(np.asarray(mat[rows], dtype=np.float32))
+
+    # ---------- recherche ----------
+    def _approx_scores(self, qs: np.ndarray) -> np.ndarray:
+        """Scores approchés (q, n) calculés par blocs sur les codes."""
+        n = self._codes.shape[0]
+        out = np.empty((qs.shape[0], n), dtype=np.float32)
+        if self.codes == "float16":
+            for s in range(0, n, BLOCK):
+                out[:, s:s + BLOCK] = qs @ self._codes[s:s + BLOCK].astype(np.float32).T
+            return out
+        # x ≈ lo + (code + 128) * scale  =>  q·x ≈ q·lo + 128 q·scale + (q*scale)·code
+        qsc = qs * self._scale
+        bias = qs @ self._lo + 128.0 * qsc.sum(axis=1)
+        for s in range(0, n, BLOCK):
+            out[:, s:s + BLOCK] = qsc @ self._codes[s:s + BLOCK].astype(np.float32).T
+        out += bias[:, None]
+        return out
+
+    def search(self, query, k=8) -> List[VectorHit]:
+        return self.search_many([query], k=k)[0]
+
+    def search_many(self, queries, k=8) -> List[List[VectorHit]]:
+        if len(queries) == 0:
+            return []
+        self.refresh()
+        self._sync()
+        qs = _normalize_rows(_as_matrix(queries, int(self.dim or len(queries[0]))))
+        if self._codes is None or not self._codes.shape[0]:
+            return [[] for _ in range(qs.shape[0])]
+        cand, _ = _topk(self._approx_scores(qs), int(k) * self.rerank + getattr(self.base, "dead", 0))
+        mat = self.base.matrix  # type: ignore[attr-defined]
+        ids, meta = self.base._ids, self.base._meta  # type: ignore[attr-defined]
+
+        out: List[List[VectorHit]] = []
+        for q, rows in zip(qs, cand):
+            rows = np.sort(rows)  # accès séquentiel (pages mmap)
+            exact = (np.asarray(mat[rows], dtype=np.float32) @ q)[None, :]
+            top, vals = _topk(exact, int(k) + getattr(self.base, "dead", 0))
+            out.append(_hits(ids, meta, rows[top[0]], vals[0], k))
+        return out
@@ -40,6 +40,36 @@ class StorageCfg(BaseModel):
     ])
     max_file_size_mb: int = 64
 
+class Neo4jBulkCfg(BaseModel):
+    """Écritures en masse (UNWIND) : lots, parallélisme, reprises"""
+    batch_rows: int = 2000     # lignes max par transaction
+    batch_mb: float = 8.0      # taille estimée max d'un lot (vecteurs inclus)
+    parallelism: int = 4       # transactions d'écriture simultanées (partitions par id de noeud)
+    retries: int = 5           # reprises sur erreur transitoire (deadlock, leader, réseau)
+    backoff_s: float = 0.2     # délai initial, doublé à chaque reprise
+
+class QueryLogCfg(BaseModel):
+    """Journal JSONL des requêtes Cypher (enable_query_logging)"""
+    sample: float = 1.0     # fraction des requêtes journalisées
+    max_list: int = 20      # éléments gardés par liste (UNWIND rows), vecteurs remplacés par leur dimension
+    max_str: int = 2000     # caractères max par chaîne (textes de chunks)
+    max_mb: float = 64.0    # rotation au-delà
+    backups: int = 3        # fichiers .1 .. .N conservés
+    flush_s: float = 1.0
+
+class QueryProfileCfg(BaseModel):
+    """Profiler des requêtes nommées (run_cypher(name=...), /api/dev/queries)"""
+    sample: float = 0.01    # fraction des exécutions relancées en PROFILE (0 = jamais)
+    window: int = 1024      # durées gardées par requête pour les percentiles
+    warmup: int = 20        # exécutions d'un nom avant son premier PROFILE
+    exclude: List[str] = ["graph_snapshot.nodes", "graph_snapshot.edges"]   # préfixes jamais profilés (dumps)
+    endpoints: bool = False # expose /api/dev/queries (désactivé hors debug)
+
+class GraphSnapshotCfg(BaseModel):
+    """Instantané CSR en mémoire du graphe d'une série (PathRAG)"""
+    enabled: bool = True
+    check_every_s: float = 30.0   # intervalle min entre deux vérifications de version (noeud GraphVersion)
+
 class Neo4jCfg(BaseModel):
     """Configuration de la base de données Neo4j"""
     uri: str = "bolt://localhost:7687"
@@ -49,16 +79,37 @@ class Neo4jCfg(BaseModel):
     connection_timeout: float = 15.0
     max_connection_lifetime: int = 3600
     max_transaction_retry_time: float = 10.0
+    max_connection_pool_size: int = 50          # connexions max par driver (sync et async)
+    connection_acquisition_timeout: float = 30.0  # attente max d'une connexion libre du pool
+    bulk: Neo4jBulkCfg = Neo4jBulkCfg()
+    query_log: QueryLogCfg = QueryLogCfg()
+    profile: QueryProfileCfg = QueryProfileCfg()
+    snapshot: GraphSnapshotCfg = GraphSnapshotCfg()
+
+class GraphCfg(BaseModel):
+    """Backend du graphe de connaissances (pipelines graph_based)"""
+    backend: str = "neo4j"   # neo4j | memory (embarqué, process courant) | sqlite (embarqué persisté dans `path`)
+    path: Path = Path("./data/_graph/graph.sqlite")
 
 class VectorChromaCfg(BaseModel):
     """Configuration du stockage vectoriel ChromaDB"""
     persist_dir: Path = Path("./chroma")
 
+class VectorIvfCfg(BaseModel):
+    """Index approché IVF (vector.type=ivf) : compromis rappel / latence"""
+    nlist: Optional[int] = None   # nb de listes (défaut ~sqrt(n))
+    nprobe: int = 8               # listes scorées par requête (+ => rappel, - => latence)
+    train_min: int = 2048         # en dessous: recherche exacte
+
 class VectorCfg(BaseModel):
     """Configuration du stockage vectoriel"""
     provider: str = "chroma"
     chroma: VectorChromaCfg = VectorChromaCfg()
-    type: str = "memory"
+    type: str = "memory"  # memory (index vectoriel Neo4j seul) | mmap (index local data/series/<series>/vectors) | ivf (mmap + IVF)
+    dirname: str = "vectors"
+    ivf: VectorIvfCfg = VectorIvfCfg()
+    quantization: str = "none"  # none | int8 | float16 (type=mmap : codes en mémoire, vecteurs float32 sur disque)
+    rerank: int = 4             # candidats re-scorés en pleine précision = rerank * k
 
 class OpenAICfg(BaseModel):
     """Configuration de l'API OpenAI"""
@@ -80,12 +131,47 @@ class GeminiCfg(BaseModel):
     chat_model: str = "gemini-1.5-pro"
     embed_model: str = "text-embedding-004"
 
+class LocalHashCfg(BaseModel):
+    """Provider local hors-ligne (n-grammes hachés + projection aléatoire)"""
+    dims: int = 384
+    buckets: int = 4096
+    ngram_min: int = 3
+    ngram_max: int = 5
+    seed: int = 0
+
 class ProviderCfg(BaseModel):
     """Configuration du LLM provider"""
     openai : OpenAICfg = OpenAICfg()
     azure: AzureOpenAICfg = AzureOpenAICfg()
     gemini: GeminiCfg = GeminiCfg()
-    default: str = "azure" # openai | azure | gemini
+    local: LocalHashCfg = LocalHashCfg()
+    default: str = "azure" # openai | azure | gemini | phi-local | local
+    embed_concurrency: int = 4  # appels d'embedding simultanés max par provider
+
+class EmbedCacheCfg(BaseModel):
+    """Cache d'embeddings (clé: provider, modèle, dimensions, sha1(texte))"""
+    enabled: bool = True
+    path: Path = Path("./data/_cache/embeddings.sqlite")
+    max_mb: int = 2048  # éviction LRU au-delà
+
+class QueryCacheCfg(BaseModel):
+    """Cache mémoire des embeddings de requêtes (LRU + TTL)"""
+    maxsize: int = 4096
+    ttl_s: float = 3600.0
+
+class LLMCacheCfg(BaseModel):
+    """Cache des réponses chat (clé: provider, modèle, température, sha256(prompt))"""
+    enabled: bool = True
+    path: Path = Path("./data/_cache/llm.sqlite")
+    max_mb: int = 1024               # éviction LRU au-delà
+    ttl_s: float = 30 * 86400.0      # 0 = pas d'expiration
+    bypass: List[str] = Field(default_factory=list)   # appelants jamais servis depuis le cache (ex. "kg.extract")
+
+class CacheCfg(BaseModel):
+    """Configuration des caches"""
+    embeddings: EmbedCacheCfg = EmbedCacheCfg()
+    queries: QueryCacheCfg = QueryCacheCfg()
+    llm: LLMCacheCfg = LLMCacheCfg()
 
 class OcrCfg(BaseModel):
     """Configuration de l'OCR"""
@@ -102,6 +188,16 @@ class ChunkCfg(BaseModel):
     overlap: int = 150
 
 
+class RuntimeCfg(BaseModel):
+    """Exécution LLM des pipelines (config/graph_based.yaml: runtime)"""
+    model: str = "gpt-4o-mini"
+    max_tokens: int = 700
+    temperature: float = 0.1
+    parallelism: int = 8       # appels LLM simultanés (extraction KG)
+    pack_tokens: int = 0       # budget (tokens approx.) des textes regroupés par appel d'extraction; 0 = un chunk par appel
+    pack_max_chunks: int = 8   # chunks max par appel groupé
+    pack_chunk_tokens: int = 300   # seuil (tokens approx.) au-delà duquel un chunk est extrait seul
+
 class PipelinesCfg(BaseModel):
     """Configuration des pipelines"""
     end_to_end: Dict[str, List[str]] | Dict[str, Any] | None = None
@@ -111,10 +207,13 @@ class Settings(BaseModel):
     app: AppCfg = AppCfg()
     storage: StorageCfg = StorageCfg()
     neo4j: Neo4jCfg = Neo4jCfg()
+    graph: GraphCfg = GraphCfg()
     vector: VectorCfg = VectorCfg()
     provider: ProviderCfg = ProviderCfg()
+    cache: CacheCfg = CacheCfg()
     ocr: OcrCfg = OcrCfg()
     chunk: ChunkCfg = ChunkCfg()
+    runtime: RuntimeCfg = RuntimeCfg()
     pipelines: PipelinesCfg = PipelinesCfg()
 
 
@@ -9,11 +9,20 @@ from app.mcp import MCPServer
 from app.core.config import get_settings
 from typing import List, Optional
 
-from adapters.vector.base import InMemoryIndex
+from adapters.vector.base import InMemoryIndex, VectorIndex
+from adapters.vector.mmap import MmapIndex
+from adapters.vector.ivf import IVFIndex
+from adapters.vector.quantized import QuantizedIndex
 from adapters.db.neo4j import Neo4jAdapter, client_from_settings
+from adapters.db.neo4j_async import AsyncNeo4jAdapter
 from adapters.storage.local import LocalStorage
 from adapters.llm.openai_azure import AzureOpenAIProvider
 from adapters.llm.gemini import GeminiProvider
+from adapters.llm.base import unwrap_provider
+from adapters.llm.cache import CachedProvider, EmbeddingCache
+from adapters.llm.llm_cache import CachedChatProvider, LLMResponseCache
+from adapters.llm.local_hash import LocalHashProvider
+from adapters.llm.query_cache import QueryEmbeddingCache
 
 
 # ---------- Core-Settings-Server ----------------------------
@@ -32,6 +41,23 @@ def get_mcp(): return MCPServer().mcp
 @lru_cache
 def get_db(): return Neo4jAdapter()
 
+@lru_cache
+def get_async_db() -> AsyncNeo4jAdapter:
+    """ Adapter Neo4j asynchrone (routes / outils MCP) — pool distinct du driver sync. """
+    return AsyncNeo4jAdapter()
+
+@lru_cache
+def get_graph_backend():
+    """ Backend du graphe (graph.backend): Neo4j (défaut) ou embarqué (memory | sqlite). """
+    from graph_based.backend import EmbeddedGraphBackend, Neo4jGraphBackend
+    cfg = get_settings().graph
+    match cfg.backend:
+        case "memory":
+            return EmbeddedGraphBackend()
+        case "sqlite":
+            return EmbeddedGraphBackend(cfg.path)
+    return Neo4jGraphBackend(get_db())
+
 @lru_cache
 def test_cnx():
     db = get_db()
@@ -51,13 +77,43 @@ def get_provider():
             provider = OpenAIProvider()
         case "phi-local":
             provider = PhiLocalProvider()
+        case "local":
+            provider = LocalHashProvider(**get_settings().provider.local.model_dump())
+    cache = get_settings().cache.embeddings
+    if cache.enabled:
+        provider = CachedProvider(provider, get_embedding_cache())
+    llm = get_settings().cache.llm
+    if llm.enabled:
+        provider = CachedChatProvider(provider, get_llm_cache(), bypass=llm.bypass)
     return provider
 
+@lru_cache
+def get_query_cache() -> QueryEmbeddingCache:
+    """ Cache mémoire des embeddings de requêtes, partagé par les retrievers (cache.queries). """
+    cfg = get_settings().cache.queries
+    return QueryEmbeddingCache(maxsize=cfg.maxsize, ttl_s=cfg.ttl_s)
+
+def embed_query(text: str, provider=None, *, dimensions: Optional[int] = None) -> List[float]:
+    """ Embedding d'une requête de recherche (via get_query_cache). """
+    return get_query_cache().embed(provider or get_provider(), text, dimensions=dimensions)
+
+@lru_cache
+def get_embedding_cache() -> EmbeddingCache:
+    """ Cache d'embeddings persistant partagé (cache.embeddings). """
+    cfg = get_settings().cache.embeddings
+    return EmbeddingCache(cfg.path, max_bytes=cfg.max_mb * 1024 * 1024)
+
+@lru_cache
+def get_llm_cache() -> LLMResponseCache:
+    """ Cache persistant prompt -> réponse des appels chat (cache.llm). """
+    cfg = get_settings().cache.llm
+    return LLMResponseCache(cfg.path, max_bytes=cfg.max_mb * 1024 * 1024, ttl_s=cfg.ttl_s)
+
 @lru_cache
 def ask_llm(query: str):
     provider = get_provider()
     resp =  provider.ask_llm(query)
-    return {"response": resp, "provider": provider.__class__.__name__}
+    return {"response": resp, "provider": type(unwrap_provider(provider)).__name__}
 
 @lru_cache
 def sanity_check_gemini_ask() -> str:
@@ -93,6 +149,27 @@ def sanity_check_phi_embd() -> int:
     return len(p.embed("hello"))
 
 
+# ---------- Adapters : Vector ------------------------
+
+@lru_cache
+def get_vector_index(series: str, name: Optional[str] = None) -> Optional[VectorIndex]:
+    """
+    Index vectoriel local de la série selon vector.type (None => index vectoriel Neo4j seul).
+    - name: sous-index (ex: "entities"); None => chunks.
+    """
+    cfg = get_settings().vector
+    match cfg.type:
+        case "mmap":
+            base = MmapIndex.for_series(series, name=name)
+            if cfg.quantization in ("int8", "float16"):
+                return QuantizedIndex(base, codes=cfg.quantization, rerank=cfg.rerank)
+            return base
+        case "ivf":
+            base = MmapIndex.for_series(series, name=name)
+            return IVFIndex(base, nlist=cfg.ivf.nlist, nprobe=cfg.ivf.nprobe, train_min=cfg.ivf.train_min,
+                            path=base.root / "ivf.npz")
+    return None
+
 # ---------- Adapters : Storage -----------------------
 
 @lru_cache
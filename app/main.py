@@ -8,6 +8,7 @@ from fastapi.middleware.cors import CORSMiddleware
 from app.observability.sse import router as dev_router, attach_sse_log_handler, push_status,SSELogHandler
 from app.observability.state import Phase, STATUS, health_loop
 from app.observability.readiness import ReadinessMiddleware
+from app.observability.pipeline import bind_event_loop
 
 from dataclasses import asdict
 
@@ -30,6 +31,9 @@ async def lifespan(app: FastAPI):
     handler = attach_sse_log_handler()
     # app.state.sse_log_handler = handler
 
+    # Événements de pipeline émis depuis les threads de travail -> cette boucle
+    bind_event_loop()
+
     # Lancer la boucle santé
     app.state.health_task = asyncio.create_task(health_loop())
 
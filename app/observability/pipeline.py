@@ -1,6 +1,61 @@
-import time, asyncio, functools, logging
+import time, asyncio, functools, logging, sys, threading
+from typing import Any, Optional
 from app.observability.sse import push_step
 
+# Boucle principale (FastAPI) : permet d'émettre des événements depuis des threads de travail
+_LOOP: Optional[asyncio.AbstractEventLoop] = None
+
+def bind_event_loop(loop: Optional[asyncio.AbstractEventLoop] = None) -> None:
+    """À appeler au démarrage (lifespan) : boucle cible des événements émis hors boucle."""
+    global _LOOP
+    _LOOP = loop or asyncio.get_running_loop()
+
+def _emit(event: dict) -> None:
+    """Pousse un événement de pipeline depuis n'importe quel thread (non-bloquant, jamais d'erreur)."""
+    global _LOOP
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        loop = None
+    if loop is not None:
+        _LOOP = _LOOP or loop
+        loop.create_task(push_step(event))
+    elif _LOOP is not None and _LOOP.is_running():
+        asyncio.run_coroutine_threadsafe(push_step(event), _LOOP)
+
+def peak_rss_mb() -> Optional[float]:
+    """High-water mark mémoire du process (Mo) ; None si indisponible (ex: Windows sans `resource`)."""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux: Ko ; macOS: octets
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+class Progress:
+    """
+    Compteur d'avancement thread-safe pour une étape (phase "progress").
+    - `advance(n, **extra)` depuis n'importe quel worker; émission au plus toutes les `every_s` secondes.
+    """
+    def __init__(self, step: str, series: str | None = None, *, total: int | None = None, every_s: float = 1.0):
+        self.step, self.series, self.total, self.every_s = step, series, total, every_s
+        self.done = 0
+        self._t0 = time.perf_counter()
+        self._last = 0.0
+        self._lock = threading.Lock()
+
+    def advance(self, n: int = 1, **extra: Any) -> None:
+        with self._lock:
+            self.done += n
+            now = time.perf_counter()
+            if now - self._last < self.every_s and (self.total is None or self.done < self.total):
+                return
+            self._last = now
+            ev = {"series": self.series, "step": self.step, "phase": "progress", "done": self.done,
+                  "total": self.total, "ms": (now - self._t0) * 1000.0, **extra}
+        _emit(ev)
+
 def pipeline_step(name: str, series: str|None=None):
     def deco(fn):
         is_async = asyncio.iscoroutinefunction(fn)
@@ -19,14 +74,14 @@ def pipeline_step(name: str, series: str|None=None):
         @functools.wraps(fn)
         def _s(*a, **k):
             t0 = time.perf_counter()
-            asyncio.create_task(push_step({"series": series, "step": name, "phase": "start"}))
+            _emit({"series": series, "step": name, "phase": "start"})
             try:
                 res = fn(*a, **k)
                 dt = (time.perf_counter()-t0)*1000.0
-                asyncio.create_task(push_step({"series": series, "step": name, "phase": "end", "ms": dt}))
+                _emit({"series": series, "step": name, "phase": "end", "ms": dt})
                 return res
             except Exception as e:
-                asyncio.create_task(push_step({"series": series, "step": name, "phase": "error", "msg": str(e)}))
+                _emit({"series": series, "step": name, "phase": "error", "msg": str(e)})
                 raise
         return _a if is_async else _s
     return deco
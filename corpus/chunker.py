@@ -3,7 +3,7 @@ from __future__ import annotations
 import json, re
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Any, Callable, Iterable, List, Optional, Sequence, Tuple, Dict
+from typing import Any, Callable, Iterable, Iterator, List, Optional, Sequence, Tuple, Dict
 
 from app.core.config import get_settings
 from app.core.logging import get_logger
@@ -196,12 +196,15 @@ class Chunker:
 
     def split_blocks(self, blocks: Iterable[TextBlock]) -> List[Chunk]:
         """Divise une série de TextBlock en une série de Chunk."""
+        return list(self.iter_chunks(blocks))
+
+    def iter_chunks(self, blocks: Iterable[TextBlock]) -> Iterator[Chunk]:
+        """Version flux de split_blocks (consomme les blocs au fil de l'eau)."""
         idx = 0
-        results: List[Chunk] = []
         for b in blocks:
             if self._keep_whole_block(b):
                 # on conserve le bloc tel quel (ex: panneau prix/tableau)
-                results.append(
+                yield (
                     Chunk(
                         doc=b.doc,
                         idx=idx,
@@ -219,7 +222,7 @@ class Chunker:
 
             # sinon on découpe suivant la stratégie choisie
             for txt in self.split_text(b.text):
-                results.append(
+                yield (
                     Chunk(
                         doc=b.doc,
                         idx=idx,
@@ -233,7 +236,6 @@ class Chunker:
                     )
                 )
                 idx += 1
-        return results
 
 
 # -----------------------------
@@ -250,16 +252,21 @@ class ChunkRunner:
         """
         Charge les blocs de texte à partir d'un fichier JSONL.
         """
-        items: List[TextBlock] = []
-        for line in path.read_text(encoding="utf-8").splitlines():
-            line = line.strip()
-            if not line:
-                continue
-            try:
-                data = json.loads(line)
-                doc = Document(**data["doc"])
-                items.append(
-                    TextBlock(
+        return list(self._iter_blocks(path))
+
+    def _iter_blocks(self, path: Path) -> Iterator[TextBlock]:
+        """
+        Lit les blocs d'un fichier JSONL ligne à ligne (mémoire bornée, gros tableurs inclus).
+        """
+        with path.open(encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    data = json.loads(line)
+                    doc = Document(**data["doc"])
+                    yield TextBlock(
                         doc=doc,
                         page=data.get("page"),
                         order=data.get("order"),
@@ -268,19 +275,20 @@ class ChunkRunner:
                         lang=data.get("lang"),
                         meta=data.get("meta") or {},
                     )
-                )
-            except Exception:
-                # fallback minimal
-                d = Document(series=path.parents[1].name, filename=path.stem, path=str(path))
-                items.append(TextBlock(doc=d, page=1, order=0, text=line, meta={}))
-        return items
-
-    def _write_chunks(self, out_path: Path, chunks: List[Chunk]) -> None:
-        """Écrit les chunks dans un fichier JSONL."""
+                except Exception:
+                    # fallback minimal
+                    d = Document(series=path.parents[1].name, filename=path.stem, path=str(path))
+                    yield TextBlock(doc=d, page=1, order=0, text=line, meta={})
+
+    def _write_chunks(self, out_path: Path, chunks: Iterable[Chunk]) -> int:
+        """Écrit les chunks dans un fichier JSONL (au fil de l'eau) ; retourne leur nombre."""
         out_path.parent.mkdir(parents=True, exist_ok=True)
+        n = 0
         with out_path.open("w", encoding="utf-8") as f:
             for c in chunks:
                 f.write(json.dumps(c.model_dump(), ensure_ascii=False) + "\n")
+                n += 1
+        return n
 
     def run_series(self, series: str) -> dict:
         """
@@ -303,21 +311,25 @@ class ChunkRunner:
             if (it.get("status") != "ok") or not it.get("output"):
                 continue
             blocks_path = series_dir / it["output"]
-            blocks = self._load_blocks(blocks_path)
-            chunks = chunker.split_blocks(blocks)
+            n_blocks = 0
+            def counted(blocks):
+                nonlocal n_blocks
+                for b in blocks:
+                    n_blocks += 1
+                    yield b
             out_path = chunk_dir / f"{Path(it['filename']).stem}.chunks.jsonl"
-            self._write_chunks(out_path, chunks)
+            n_chunks = self._write_chunks(out_path, chunker.iter_chunks(counted(self._iter_blocks(blocks_path))))
 
             results.append({
                 "filename": it["filename"],
-                "blocks": len(blocks),
-                "chunks": len(chunks),
+                "blocks": n_blocks,
+                "chunks": n_chunks,
                 "output": str(out_path.relative_to(series_dir)),
                 "strategy": self.opts.strategy,
                 "size": self.opts.size,
                 "overlap": self.opts.overlap,
             })
-            total_chunks += len(chunks)
+            total_chunks += n_chunks
 
         report = {
             "series": series,
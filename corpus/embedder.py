@@ -1,17 +1,44 @@
 # corpus/importer.py
 # embedder.py
 from __future__ import annotations
-import json, time, re
+import asyncio, json, time, re
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Any, Dict, Iterable, List, Optional, Sequence
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
 
-from app.core.resources import get_storage, get_db, get_provider
-from adapters.db.neo4j import Neo4jAdapter
-from adapters.llm.base import Provider  # votre Protocol
+from app.core.config import get_settings
+from app.core.resources import embed_query, get_storage, get_graph_backend, get_provider, get_vector_index
+from app.observability.pipeline import Progress, peak_rss_mb, pipeline_step
+from adapters.db.neo4j import Neo4jAdapter, text_hash
+from adapters.db.neo4j_async import AsyncNeo4jAdapter
+from adapters.llm.base import Provider, provider_slots, unwrap_provider  # votre Protocol
+from adapters.llm.local_hash import LocalHashProvider
+from graph_based.utils.parallel import QueueWriter, imap_bounded
 
 DEFAULT_BATCH = 128
 
+
+def iter_jsonl(path: Path) -> Iterator[Tuple[int, Dict[str, Any]]]:
+    """(n° de ligne, objet) d'un fichier JSONL, lu en flux (lignes vides ignorées)."""
+    with path.open(encoding="utf-8") as f:
+        for line_idx, line in enumerate(f):
+            line = line.strip()
+            if line:
+                yield line_idx, json.loads(line)
+
+def safe_index_name(base: str) -> str:
+    """Nom d'index Neo4j valide: [A-Za-z0-9_] uniquement, commence par une lettre."""
+    # 1) remplacer tout sauf [A-Za-z0-9_] par _
+    name = re.sub(r'[^A-Za-z0-9_]', '_', base)
+    # 2) si le 1er char n'est pas une lettre, préfixer
+    if not re.match(r'^[A-Za-z]', name):
+        name = f'idx_{name}'
+    return name
+
+def chunk_index_name(series: str) -> str:
+    """Index vectoriel des chunks d'une série, tel que créé par Embedder.embed_corpus."""
+    return safe_index_name(f"chunkIndex__{series}")
+
 # Batching configurable (batch_size).
 # Index par série (évite le bruit inter-corpus et simplifie l’isolation).
 # Dimension auto-déduite sur le premier batch et appliquée à l’index.
@@ -27,10 +54,12 @@ class Embedder:
     index_base: str = "chunkIndex"
     index_per_series: bool = True
 
-    def __init__(self) -> None:
+    def __init__(self, provider: Optional[Provider] = None, db: Optional[Neo4jAdapter] = None,
+                 batch_size: int = DEFAULT_BATCH) -> None:
         self.storage = get_storage()
-        self.provider = get_provider()
-        self.db = get_db()
+        self.provider = provider or get_provider()
+        self.db = db or get_graph_backend()  # Neo4j (défaut) ou backend embarqué (graph.backend)
+        self.batch_size = batch_size
 
     # def __post_init__(self) -> None:
     #     self.db = self.db or Neo4jAdapter()
@@ -40,22 +69,23 @@ class Embedder:
         # return f"{self.index_base}__{series}" if self.index_per_series else self.index_base
 
     def _safe_index_name(self, base: str) -> str:
-        # 1) remplacer tout sauf [A-Za-z0-9_] par _
-        name = re.sub(r'[^A-Za-z0-9_]', '_', base)
-        # 2) si le 1er char n'est pas une lettre, préfixer
-        if not re.match(r'^[A-Za-z]', name):
-            name = f'idx_{name}'
-        return name
+        return safe_index_name(base)
 
     # ----------- ingestion corpus -----------
-    def embed_corpus(self, series: str, *, dimensions: Optional[int] = None) -> Dict[str, Any]:
+    @pipeline_step("Embedding")
+    def embed_corpus(self, series: str, *, dimensions: Optional[int] = None, mode: str = "full") -> Dict[str, Any]:
         """
         Ingestion des fichiers chunks d'une série:
         - lit data/series/<series>/chunks/_report.json
         - vectorise en batch
         - crée l'index vectoriel si besoin
-        - upsert dans Neo4j
+        - upsert dans Neo4j (+ index local si vector.type=mmap)
+        - mode="diff": compare (cid, text_hash, model, dims) aux Chunk déjà stockés,
+          n'embed que les nouveaux / modifiés et supprime les chunks disparus ; un chunk inchangé absent de
+          l'index local (index vide ou en retard, ex. vector.type passé à mmap) est re-vectorisé ("reindexed").
         """
+        if mode not in ("full", "diff"):
+            raise ValueError(f"unknown embed mode: {mode} (full | diff)")
         # storage = get_storage()
         series_dir = self.storage.ensure_series(series)
         chunks_dir = series_dir / "chunks"
@@ -67,37 +97,35 @@ class Embedder:
         items = report.get("items", [])
 
         index = None
+        local = get_vector_index(series)  # None => Neo4j seul
         vec_dim: Optional[int] = None
         total_vectors = 0
         total_nodes = 0
         rows_batch: List[Dict[str, Any]] = []
 
-        def flush():
-            """Écrit les blocs de texte dans un fichier JSONL."""
-            nonlocal total_nodes
-            if not rows_batch:
-                return
-            total_nodes += self.db.upsert_chunks(rows=rows_batch, series=series, approach="embedder")
-            # total_nodes += self.db.upsert_chunks(rows=rows_batch, label=self.label, prop=self.prop)     #(rows=rows_batch, label=self.label, prop=self.prop)
-            rows_batch.clear()
+        model = getattr(self.provider, "embed_model", getattr(self.provider, "embed_dep", None))
+        provider_name = type(unwrap_provider(self.provider)).__name__
+        stored = self.db.chunk_fingerprints(series) if mode == "diff" else {}
+        seen: set[str] = set()
+        skipped = updated = reindexed = 0
 
-        # Parcours des outputs *.chunks.jsonl
-        for item in items:
-            out_rel = item.get("output")
-            if not out_rel:
-                continue
-            fpath = series_dir / out_rel
-            if not fpath.exists():
-                continue
-
-            texts: List[str] = []
+        def batches():
+            """
+            Producteur: lots (metas) de batch_size chunks à vectoriser (hors chunks inchangés),
+            lus ligne à ligne => mémoire bornée par la taille de lot, pas par celle des fichiers.
+            """
+            nonlocal skipped, updated, reindexed
             metas: List[Dict[str, Any]] = []
-            with fpath.open(encoding="utf-8") as f:
-                for line_idx, line in enumerate(f):
-                    line = line.strip()
-                    if not line:
-                        continue
-                    data = json.loads(line)
+            # Parcours des outputs *.chunks.jsonl
+            for item in items:
+                out_rel = item.get("output")
+                if not out_rel:
+                    continue
+                fpath = series_dir / out_rel
+                if not fpath.exists():
+                    continue
+
+                for line_idx, data in iter_jsonl(fpath):
                     text = data.get("text", "")
                     doc = data.get("doc", {}) or {}
                     meta = data.get("meta", {}) or {}
@@ -105,79 +133,136 @@ class Embedder:
                     idx = data.get("idx", data.get("order", line_idx))
                     page = meta.get("page", data.get("page"))
                     cid = f"{series}:{filename}:{idx}"
-                    texts.append(text)
+                    h = text_hash(text)
+                    seen.add(cid)
+                    prev = stored.get(cid)
+                    if prev is not None:
+                        if (prev["text_hash"] == h and prev["model"] == model
+                                and (dimensions is None or prev["dims"] == dimensions)):
+                            if local is None or cid in local:
+                                skipped += 1
+                                continue
+                            reindexed += 1      # à jour dans Neo4j, manquant localement
+                        else:
+                            updated += 1
                     metas.append({
                         "cid": cid,
                         "text": text,
+                        "text_hash": h,
                         "series": series,
                         "file": filename,
                         "page": page,
                         "order": idx,
                     })
+                    if len(metas) >= self.batch_size:
+                        yield metas
+                        metas = []
+            if metas:
+                yield metas
+
+        slots = provider_slots(self.provider, get_settings().provider.embed_concurrency)
 
-            # Embedding en batch
-            for i in range(0, len(texts), self.batch_size):
-                batch_texts = texts[i:i + self.batch_size]
-                # vecs = self.provider.embed_batch(batch_texts, dimensions=dimensions)
-                vecs = self.embed_texts(batch_texts, dim=dimensions)
-                if vecs:
-                    if vec_dim is None:
-                        vec_dim = len(vecs[0])
-                        index = self._index_name(series)
-                        index = self._safe_index_name(index)
-                        if not self.db.check_index_exists(index):
-                            self.db.create_vector_index(index, label=self.label, prop=self.prop,
-                                                        dimensions=vec_dim, similarity="cosine")
-                    total_vectors += len(vecs)
-                    now = time.time()
-                    for j, v in enumerate(vecs):
-                        m = metas[i + j]
-                        rows_batch.append({
-                            "cid": m["cid"],
-                            "text": m["text"],
-                            "vec": v,
-                            "series": m["series"],
-                            "file": m["file"],
-                            "page": m["page"],
-                            "order": m["order"],
-                            "provider": type(self.provider).__name__,
-                            "model": getattr(self.provider, "embed_model", getattr(self.provider, "embed_dep", None)),
-                            "dims": vec_dim,
-                            "ts": now,
-                        })
-                    if len(rows_batch) >= 2000:
-                        flush()
-
-        flush()
+        def embed(metas: List[Dict[str, Any]]) -> List[List[float]]:
+            """Étape embedding (pool de threads), bornée par provider."""
+            with slots:
+                return self.embed_texts([m["text"] for m in metas], dim=dimensions)
+
+        def flush():
+            """Upsert Neo4j des lignes accumulées (thread writer)."""
+            nonlocal total_nodes
+            if not rows_batch:
+                return
+            total_nodes += self.db.upsert_chunks(rows=rows_batch, series=series, approach="embedder")
+            rows_batch.clear()
+
+        def write(batch) -> None:
+            """Consommateur: index local + Neo4j, pendant que les lots suivants sont vectorisés."""
+            if batch is None:
+                flush(); return
+            metas, vecs = batch
+            if local is not None:
+                local.add([m["cid"] for m in metas], vecs, metas)
+            now = time.time()
+            for m, v in zip(metas, vecs):
+                rows_batch.append({**m, "vec": v, "provider": provider_name, "model": model,
+                                   "dims": vec_dim, "ts": now})
+            if len(rows_batch) >= 2000:
+                flush()
+            progress.advance(len(vecs), stage="written")
+
+        # Pipeline: N lots en vol (embedding) -> file bornée -> writer unique (ordre d'entrée conservé)
+        workers = max(1, int(get_settings().provider.embed_concurrency))
+        progress = Progress("Embedding", series)
+        with QueueWriter(write, maxsize=2 * workers, name=f"embed-writer:{series}") as writer:
+            for metas, vecs in imap_bounded(embed, batches(), max_workers=workers):
+                if not vecs:
+                    continue
+                if vec_dim is None:
+                    vec_dim = len(vecs[0])
+                    index = self._index_name(series)
+                    index = self._safe_index_name(index)
+                    if not self.db.check_index_exists(index):
+                        self.db.create_vector_index(index, label=self.label, prop=self.prop,
+                                                    dimensions=vec_dim, similarity="cosine")
+                total_vectors += len(vecs)
+                writer.put((metas, vecs))
+            writer.put(None)  # dernier flush côté writer
+
+        # Chunks disparus (fichiers supprimés / re-chunkés)
+        removed = 0
+        if mode == "diff":
+            gone = sorted(set(stored) - seen)
+            if gone:
+                removed = self.db.delete_chunks(gone)
+                if local is not None:
+                    local.remove(gone)
         return {
             "series": series,
-            "index": index,
+            "mode": mode,
+            "index": index or self._safe_index_name(self._index_name(series)),
             "dimensions": vec_dim,
             "vectors": total_vectors,
             "upserted_nodes": total_nodes,
+            "skipped": skipped,
+            "updated": updated,
+            "reindexed": reindexed,
+            "added": total_vectors - updated - reindexed,
+            "removed": removed,
+            "local_index": str(getattr(local, "root", None) or type(local).__name__) if local is not None else None,
+            "peak_rss_mb": peak_rss_mb(),
         }
     
     
-    def _hash_vec(self, text: str, dim: Optional[int] = 384) -> List[float]:
-        import hashlib, math
-        h = hashlib.sha256(text.encode("utf-8")).digest()
-        vals = []
-        while len(vals) < (dim or 384):
-            for b in h:
-                vals.append((b - 128) / 128.0)
-                if len(vals) >= (dim or 384):
-                    break
-        n = math.sqrt(sum(x*x for x in vals))
-        return [x/(n or 1.0) for x in vals]
-
     def embed_texts(self, texts: Iterable[str], dim: Optional[int] = 384) -> List[List[float]]:
-        if self.provider.embed_texts is not None:
+        if getattr(self.provider, "embed_texts", None) is not None:
             return self.provider.embed_texts(list(texts), dimensions=dim)
-        return [self._hash_vec(t or "", dim=dim) for t in texts]
+        # fallback hors-ligne (provider.default=local pour l'utiliser explicitement)
+        return LocalHashProvider().embed_batch(list(texts), dimensions=dim)
 
     # ----------- recherche top-k -----------
     def search(self, series: str, query: str, k: int = 5) -> List[Dict[str, Any]]:
         """Recherche les chunks les plus similaires à une requête donnée."""
         index = self._index_name(series)
-        vec = self.provider.embed(query)
-        return self.db.query_top_k(index, vec, k=k, series=series)
\ No newline at end of file
+        vec = embed_query(query, self.provider)
+        local = get_vector_index(series)
+        if local is not None:
+            local.refresh()  # écritures éventuelles d'un autre worker
+        if local is not None and len(local):
+            # index local (mmap / ivf) : pas d'aller-retour Neo4j
+            return [{"id": h.id, "cid": h.id, "text": h.metadata.get("text"), "score": h.score,
+                     "series": h.metadata.get("series"), "file": h.metadata.get("file"),
+                     "page": h.metadata.get("page"), "order": h.metadata.get("order")}
+                    for h in local.search(vec, k=k)]
+        return self.db.query_top_k(index, vec, k=k, series=series)
+
+    async def asearch(self, series: str, query: str, k: int = 5, *, adb: Optional[AsyncNeo4jAdapter] = None) -> List[Dict[str, Any]]:
+        """Version non bloquante de `search` (index local dans un thread, Neo4j via l'adapter async)."""
+        if adb is None:
+            return await asyncio.to_thread(self.search, series, query, k)
+        local = get_vector_index(series)
+        if local is not None:
+            await asyncio.to_thread(local.refresh)
+            if len(local):
+                return await asyncio.to_thread(self.search, series, query, k)
+        vec = await asyncio.to_thread(embed_query, query, self.provider)
+        return await adb.query_top_k(self._index_name(series), vec, k=k, series=series)
\ No newline at end of file
@@ -0,0 +1,168 @@
+# corpus/kg/dedup.py
+# Déduplication à mémoire bornée pour les gros builds KG : filtre de Bloom (numpy) devant un ensemble exact SQLite.
+from __future__ import annotations
+import hashlib, math, re, sqlite3, threading
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set
+
+import numpy as np
+
+
+class BloomFilter:
+    """
+    Filtre de Bloom sur un tableau de bits numpy (m bits, k hachages par double hachage blake2b).
+    Aucun faux négatif ; taux de faux positifs ~`error_rate` jusqu'à `capacity` éléments, croissant au-delà.
+    Opérations par lot (`add_many`, `contains_many`): un seul calcul vectorisé des positions pour tout le lot.
+    """
+
+    def __init__(self, capacity: int = 1_000_000, error_rate: float = 0.01):
+        n, p = max(1, int(capacity)), min(max(float(error_rate), 1e-9), 0.5)
+        self.m = max(64, int(math.ceil(-n * math.log(p) / math.log(2) ** 2)))
+        self.k = max(1, int(round(self.m / n * math.log(2))))
+        self.bits = np.zeros((self.m + 7) // 8, dtype=np.uint8)
+        self._steps = np.arange(self.k, dtype=np.int64)
+
+    def _positions(self, keys: Sequence[str]) -> np.ndarray:
+        """Positions (len(keys), k) des bits de chaque clé."""
+        d = np.frombuffer(b"".join(hashlib.blake2b(key.encode("utf-8"), digest_size=16).digest() for key in keys),
+                          dtype="<u8").reshape(len(keys), 2)
+        h1 = (d[:, 0] % np.uint64(self.m)).astype(np.int64)
+        h2 = ((d[:, 1] | np.uint64(1)) % np.uint64(self.m)).astype(np.int64)
+        return (h1[:, None] + self._steps[None, :] * h2[:, None]) % self.m
+
+    def add_many(self, keys: Sequence[str]) -> None:
+        if not len(keys):
+            return
+        pos = np.unique(self._positions(keys))                       # triées: octets groupés
+        byte = pos >> 3
+        mask = np.left_shift(1, pos & 7).astype(np.uint8)
+        starts = np.flatnonzero(np.r_[True, byte[1:] != byte[:-1]])
+        self.bits[byte[starts]] |= np.bitwise_or.reduceat(mask, starts)
+
+    def contains_many(self, keys: Sequence[str]) -> np.ndarray:
+        if not len(keys):
+            return np.zeros(0, dtype=bool)
+        pos = self._positions(keys)
+        return np.all(self.bits[pos >> 3] & np.left_shift(1, pos & 7).astype(np.uint8), axis=1)
+
+    def add(self, key: str) -> None:
+        self.add_many([key])
+
+    def __contains__(self, key: str) -> bool:
+        return bool(self.contains_many([key])[0])
+
+    @property
+    def nbytes(self) -> int:
+        return int(self.bits.nbytes)
+
+
+class DedupStore:
+    """
+    Ensemble « déjà vu » d'un build (ids d'entités, clés de relations), en mémoire bornée.
+    - Bloom devant: une clé absente du filtre est nouvelle sans accès disque (cas courant);
+    - ensemble exact SQLite pour trancher les positifs du filtre; une table par (`name`, `namespace`):
+      le build_id en namespace isole les builds concurrents ou successifs partageant le fichier, et un build
+      repris retrouve son ensemble (`reset=False` par défaut; `close(drop=True)` en fin de build);
+    - insertions tamponnées (`buffer` clés) puis écrites par lot => seule la mémoire du filtre et du tampon est tenue;
+      `autoflush=False`: le tampon n'est écrit que par `flush()` (l'appelant persiste les clés une fois les données
+      correspondantes écrites ailleurs) et `close()` abandonne les clés non confirmées.
+    """
+
+    def __init__(self, path: Path, name: str, *, namespace: Optional[str] = None, capacity: int = 1_000_000,
+                 error_rate: float = 0.01, buffer: int = 10_000, reset: bool = False, autoflush: bool = True):
+        if not name.isidentifier():
+            raise ValueError(f"invalid dedup set name: {name!r}")
+        self.path, self.name = Path(path), name
+        self.table = f"{name}__{re.sub(r'[^A-Za-z0-9_]', '_', namespace)}" if namespace else name
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.bloom = BloomFilter(capacity, error_rate)
+        self.buffer = max(1, int(buffer))
+        self.autoflush = autoflush
+        self._pending: Set[str] = set()
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=OFF")     # ensemble de travail d'un build, reconstructible
+        if reset:
+            self._conn.execute(f'DROP TABLE IF EXISTS "{self.table}"')
+        self._conn.execute(f'CREATE TABLE IF NOT EXISTS "{self.table}" (key TEXT PRIMARY KEY) WITHOUT ROWID')
+        self._conn.commit()
+        cur = self._conn.execute(f'SELECT key FROM "{self.table}"')
+        while True:
+            rows = cur.fetchmany(self.buffer)
+            if not rows:
+                break
+            self.bloom.add_many([k for (k,) in rows])
+        self.size = int(self._conn.execute(f'SELECT COUNT(*) FROM "{self.table}"').fetchone()[0])
+        self.disk_checks = 0
+
+    def _on_disk(self, keys: Iterable[str]) -> Set[str]:
+        keys = list(keys)
+        self.disk_checks += len(keys)
+        found: Set[str] = set()
+        for i in range(0, len(keys), 500):
+            part = keys[i:i + 500]
+            q = f'SELECT key FROM "{self.table}" WHERE key IN ({",".join("?" * len(part))})'
+            found.update(k for (k,) in self._conn.execute(q, part))
+        return found
+
+    def add_many(self, keys: Sequence[str]) -> List[bool]:
+        """Ajoute un lot de clés; pour chacune, True si elle n'avait jamais été vue (doublons du lot compris)."""
+        keys = list(keys)
+        if not keys:
+            return []
+        with self._lock:
+            maybe = self.bloom.contains_many(keys)
+            known = self._on_disk({k for k, m in zip(keys, maybe) if m and k not in self._pending})
+            out: List[bool] = []
+            fresh: List[str] = []
+            for k, m in zip(keys, maybe):
+                if k in self._pending or (m and k in known):    # `_pending` couvre aussi les doublons du lot
+                    out.append(False)
+                    continue
+                out.append(True)
+                fresh.append(k)
+                self._pending.add(k)
+            self.bloom.add_many(fresh)
+            self.size += len(fresh)
+            if self.autoflush and len(self._pending) >= self.buffer:
+                self._flush()
+        return out
+
+    def add(self, key: str) -> bool:
+        """Ajoute `key`; True si elle n'avait jamais été vue."""
+        return self.add_many([key])[0]
+
+    def __contains__(self, key: str) -> bool:
+        with self._lock:
+            return key in self.bloom and (key in self._pending or bool(self._on_disk([key])))
+
+    def _flush(self) -> None:
+        self._conn.executemany(f'INSERT OR IGNORE INTO "{self.table}"(key) VALUES (?)', ((k,) for k in self._pending))
+        self._conn.commit()
+        self._pending.clear()
+
+    def flush(self) -> None:
+        with self._lock:
+            if self._pending:
+                self._flush()
+
+    def __len__(self) -> int:
+        return self.size
+
+    def stats(self) -> Dict[str, Any]:
+        return {"name": self.name, "table": self.table, "keys": self.size, "bloom_bytes": self.bloom.nbytes,
+                "bloom_k": self.bloom.k, "pending": len(self._pending), "disk_checks": self.disk_checks}
+
+    def close(self, *, drop: bool = False) -> None:
+        """
+        Ferme le store ; `drop=True` supprime l'ensemble du build (build terminé, rien à reprendre).
+        Sans autoflush, les clés en attente (non confirmées par `flush()`) ne sont pas écrites.
+        """
+        with self._lock:
+            if drop:
+                self._conn.execute(f'DROP TABLE IF EXISTS "{self.table}"')
+                self._conn.commit()
+            elif self._pending and self.autoflush:
+                self._flush()
+            self._conn.close()
@@ -1,9 +1,13 @@
 # corpus/kg/extract.py
 from __future__ import annotations
-import json, re, time, hashlib
+import json, logging, re, time, hashlib
 from dataclasses import dataclass
-from typing import Any, Dict, List, Tuple, Optional
-from corpus.kg.prompts import build_extraction_prompt
+from typing import Any, Dict, Iterable, Iterator, List, Tuple, Optional
+from corpus.kg.prompts import build_extraction_prompt, build_packed_extraction_prompt
+from graph_based.utils.tokenize import approx_token_count
+from adapters.llm.llm_cache import ask_cached
+
+log = logging.getLogger(__name__)
 
 def _strip_code_fences(s: str) -> str:
     """Supprime les fences de code (```...```) d'une chaîne."""
@@ -27,6 +31,10 @@ def _coerce_json(s: str) -> Dict[str, Any]:
         s = re.sub(r",\s*([}\]])", r"\1", s)
         return json.loads(s)
 
+def _parses(raw: str) -> bool:
+    """Validateur du cache LLM: seules les réponses lisibles par `_coerce_json` sont mises en cache."""
+    return isinstance(_coerce_json(raw), dict)
+
 def _slug(s: str) -> str:
     """Crée un slug simple (a-z0-9-) à partir d'une chaîne."""
     s = s.strip().lower()
@@ -54,10 +62,11 @@ def extract_from_text(text: str, *, provider, series: str, file: str, page: Opti
     normalise en ajoutant ids et méta minimales (series, source...).
     """
     prompt = build_extraction_prompt(text, domain_hint=domain_hint)
-    raw = provider.ask_llm(prompt)
-    data = _coerce_json(raw)
+    raw = ask_cached(provider, prompt, caller="kg.extract", validate=_parses)
+    return _normalize(_coerce_json(raw), series=series, chunk_id=chunk_id, ts=time.time())
 
-    ts = time.time()
+def _normalize(data: Dict[str, Any], *, series: str, chunk_id: str, ts: float) -> KGExtraction:
+    """JSON du modèle -> KGExtraction (ids canoniques, provenance `chunk_id`)."""
     ents_in = data.get("entities") or []
     rels_in = data.get("relations") or []
 
@@ -99,3 +108,82 @@ def extract_from_text(text: str, *, provider, series: str, file: str, page: Opti
         })
 
     return KGExtraction(entities=entities, relations=relations, ts=ts)
+
+
+def pack_chunks(items: Iterable[Dict[str, Any]], *, max_tokens: int, max_chunks: int = 8,
+                max_chunk_tokens: Optional[int] = None) -> Iterator[List[Dict[str, Any]]]:
+    """
+    Regroupe des chunks *courts* consécutifs ({"text", ...}) tant que leurs textes tiennent dans `max_tokens`
+    (approx.) et `max_chunks`. Un chunk de plus de `max_chunk_tokens` (défaut: `max_tokens`) forme seul son
+    groupe: les chunks de taille normale gardent un appel dédié. `max_tokens <= 0` => un chunk par groupe.
+    L'ordre d'entrée est conservé (paresseux).
+    """
+    limit = max_tokens if max_chunk_tokens is None else min(max_chunk_tokens, max_tokens)
+    group: List[Dict[str, Any]] = []
+    used = 0
+    for it in items:
+        n = approx_token_count(it.get("text", ""))
+        if n > limit:
+            if group:
+                yield group
+                group, used = [], 0
+            yield [it]
+            continue
+        if group and (used + n > max_tokens or len(group) >= max_chunks):
+            yield group
+            group, used = [], 0
+        group.append(it)
+        used += n
+    if group:
+        yield group
+
+def _packed_by_id(data: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+    out: Dict[str, Dict[str, Any]] = {}
+    for c in data.get("chunks") or []:
+        if isinstance(c, dict) and c.get("id") is not None:
+            out[str(c["id"]).strip()] = c
+    return out
+
+def extract_packed(items: List[Dict[str, Any]], *, provider, series: str, domain_hint: str = "immobilier",
+                   calls: Optional[List[float]] = None) -> List[KGExtraction]:
+    """
+    Extraction de plusieurs chunks ({"text","file","page","chunk_id"}) en un seul appel LLM.
+    - Ids courts (K1..Kn) dans le prompt, remappés sur `chunk_id` => provenance inchangée;
+    - réponse illisible ou id manquant: repli sur `extract_from_text` pour les chunks concernés.
+    - `calls`: reçoit la latence (ms) de chaque appel LLM effectué, replis compris.
+    Renvoie une KGExtraction par chunk, dans l'ordre d'entrée.
+    """
+    def _ask(prompt: str) -> str:
+        t0 = time.perf_counter()
+        try:
+            return ask_cached(provider, prompt, caller="kg.extract", validate=_parses)
+        finally:
+            if calls is not None:
+                calls.append((time.perf_counter() - t0) * 1000.0)
+
+    def _single(it: Dict[str, Any]) -> KGExtraction:
+        t0 = time.perf_counter()
+        try:
+            return extract_from_text(it["text"], provider=provider, series=series, file=it["file"], page=it["page"],
+                                     chunk_id=it["chunk_id"], domain_hint=domain_hint)
+        finally:
+            if calls is not None:
+                calls.append((time.perf_counter() - t0) * 1000.0)
+
+    if len(items) == 1:
+        return [_single(items[0])]
+    keys = [f"K{i + 1}" for i in range(len(items))]
+    prompt = build_packed_extraction_prompt(list(zip(keys, (it["text"] for it in items))), domain_hint=domain_hint)
+    try:
+        by_id = _packed_by_id(_coerce_json(_ask(prompt)))
+    except Exception as e:
+        log.warning(f"packed extraction: unparsable response for {len(items)} chunks, single-chunk fallback ({e})")
+        by_id = {}
+    ts = time.time()
+    out: List[KGExtraction] = []
+    for k, it in zip(keys, items):
+        if k in by_id:
+            out.append(_normalize(by_id[k], series=series, chunk_id=it["chunk_id"], ts=ts))
+        else:
+            out.append(_single(it))
+    return out
@@ -0,0 +1,266 @@
+# corpus/kg/progress.py
+# Reprise de l'extraction KG : index SQLite des chunks traités + écriture JSONL bufferisée (flush + fsync périodiques).
+from __future__ import annotations
+import json, os, sqlite3, threading, time
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+_SCHEMA_VERSION = 3     # v2: progression clé (série, approche, build) ; v3: builds.legacy
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS builds (
+    series TEXT NOT NULL,
+    approach TEXT NOT NULL,
+    build_id TEXT NOT NULL,
+    started REAL NOT NULL,
+    finished REAL,
+    legacy INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (series, approach, build_id)
+);
+CREATE TABLE IF NOT EXISTS done (
+    series TEXT NOT NULL,
+    approach TEXT NOT NULL,
+    build_id TEXT NOT NULL,
+    file TEXT NOT NULL,
+    hash TEXT NOT NULL,
+    ts REAL NOT NULL,
+    PRIMARY KEY (series, approach, build_id, file, hash)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS imported (
+    series TEXT NOT NULL,
+    approach TEXT NOT NULL,
+    build_id TEXT NOT NULL,
+    file TEXT NOT NULL,
+    ts REAL NOT NULL,
+    PRIMARY KEY (series, approach, build_id, file)
+);
+"""
+
+
+def archive_jsonl(paths: Iterable[Path], tag: str) -> List[Path]:
+    """Renomme des caches `.kg.jsonl` en `<nom>.<tag>` (hors du glob `*.kg.jsonl` des lecteurs) ; renvoie les cibles."""
+    out: List[Path] = []
+    for p in map(Path, paths):
+        if p.exists():
+            dst = p.with_name(f"{p.name}.{tag}")
+            os.replace(p, dst)
+            out.append(dst)
+    return out
+
+
+class ProgressStore:
+    """
+    Hashes de chunks déjà extraits, par (série, approche, build, fichier).
+    - `open_build`: reprend le build inachevé de (série, approche) s'il existe, sinon en ouvre un nouveau
+      (progression vide: un nouveau build n'hérite jamais de l'ensemble « fait » du précédent);
+    - `is_done`: lookup par clé primaire (pas de relecture du cache JSONL au démarrage);
+    - `import_jsonl`: migration unique d'un `.kg.jsonl` existant (caches antérieurs à l'index);
+    - `mark_done`: appelé après le fsync des enregistrements correspondants => l'index ne devance jamais le JSONL.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        version = int(self._conn.execute("PRAGMA user_version").fetchone()[0])
+        if version < 2:
+            self._conn.executescript("DROP TABLE IF EXISTS done; DROP TABLE IF EXISTS imported;")
+        self._conn.executescript(_SCHEMA)
+        if version < 3 and "legacy" not in {r[1] for r in self._conn.execute("PRAGMA table_info(builds)")}:
+            self._conn.execute("ALTER TABLE builds ADD COLUMN legacy INTEGER NOT NULL DEFAULT 0")
+        if version < _SCHEMA_VERSION:
+            self._conn.execute(f"PRAGMA user_version={_SCHEMA_VERSION}")
+            self._conn.commit()
+
+    # ---------- builds ----------
+    def has_builds(self, series: str, approach: str) -> bool:
+        with self._lock:
+            return self._conn.execute("SELECT 1 FROM builds WHERE series=? AND approach IN (?, '*') LIMIT 1",
+                                      (series, approach)).fetchone() is not None
+
+    def open_build(self, series: str, approach: str, new_id: str, *, legacy: bool = False) -> Tuple[str, bool]:
+        """
+        (build_id, repris) : build inachevé de (série, approche) s'il existe, sinon `new_id` enregistré.
+        `legacy`: le nouveau build reprend des caches JSONL antérieurs à l'index (voir `is_legacy`).
+        """
+        with self._lock:
+            row = self._conn.execute("SELECT build_id FROM builds WHERE series=? AND approach=? AND finished IS NULL "
+                                     "ORDER BY started DESC LIMIT 1", (series, approach)).fetchone()
+            if row:
+                return row[0], True
+            self._conn.execute("INSERT INTO builds(series, approach, build_id, started, legacy) VALUES (?,?,?,?,?)",
+                               (series, approach, new_id, time.time(), int(legacy)))
+            self._conn.commit()
+        return new_id, False
+
+    def is_legacy(self, series: str, approach: str, build_id: str) -> bool:
+        """Build ouvert sur des caches antérieurs à l'index : chaque fichier est importé (une fois) tant qu'il dure."""
+        with self._lock:
+            row = self._conn.execute("SELECT legacy FROM builds WHERE series=? AND approach=? AND build_id=?",
+                                     (series, approach, build_id)).fetchone()
+        return bool(row and row[0])
+
+    def finish_build(self, series: str, approach: str, build_id: str) -> None:
+        with self._lock:
+            self._conn.execute("UPDATE builds SET finished=? WHERE series=? AND approach=? AND build_id=?",
+                               (time.time(), series, approach, build_id))
+            self._conn.commit()
+
+    # ---------- progression ----------
+    def is_done(self, series: str, approach: str, build_id: str, file: str, h: str) -> bool:
+        with self._lock:
+            row = self._conn.execute("SELECT 1 FROM done WHERE series=? AND approach=? AND build_id=? AND file=? "
+                                     "AND hash=?", (series, approach, build_id, file, h)).fetchone()
+        return row is not None
+
+    def mark_done(self, series: str, approach: str, build_id: str, file: str, hashes: Iterable[str]) -> int:
+        now = time.time()
+        rows = [(series, approach, build_id, file, h, now) for h in hashes]
+        if not rows:
+            return 0
+        with self._lock:
+            self._conn.executemany("INSERT OR IGNORE INTO done(series, approach, build_id, file, hash, ts) "
+                                   "VALUES (?,?,?,?,?,?)", rows)
+            self._conn.commit()
+        return len(rows)
+
+    def import_jsonl(self, series: str, approach: str, build_id: str, file: str, jsonl: Path) -> int:
+        """Indexe les hashes d'un cache `.kg.jsonl` existant dans `build_id` (une seule fois par fichier)."""
+        key = (series, approach, build_id, file)
+        with self._lock:
+            seen = self._conn.execute("SELECT 1 FROM imported WHERE series=? AND approach=? AND build_id=? "
+                                      "AND file=?", key).fetchone()
+        if seen:
+            return 0
+        hashes: List[str] = []
+        if Path(jsonl).exists():
+            with Path(jsonl).open(encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        h = json.loads(line).get("hash")
+                    except Exception:
+                        continue        # ligne tronquée (arrêt brutal) : le chunk sera ré-extrait
+                    if h:
+                        hashes.append(h)
+        n = self.mark_done(series, approach, build_id, file, hashes)
+        with self._lock:
+            self._conn.execute("INSERT OR REPLACE INTO imported(series, approach, build_id, file, ts) "
+                               "VALUES (?,?,?,?,?)", (*key, time.time()))
+            self._conn.commit()
+        return n
+
+    def count(self, series: str, approach: Optional[str] = None, *, build_id: Optional[str] = None) -> int:
+        q, p = "SELECT COUNT(*) FROM done WHERE series=?", [series]
+        if approach is not None:
+            q += " AND approach=?"; p.append(approach)
+        if build_id is not None:
+            q += " AND build_id=?"; p.append(build_id)
+        with self._lock:
+            return int(self._conn.execute(q, p).fetchone()[0])
+
+    def forget(self, series: str, approach: Optional[str] = None) -> int:
+        """
+        Oublie la progression (ré-extraction complète au prochain run) : les builds inachevés sont clos, ce qui
+        fait ouvrir un nouveau build au prochain run ; celui-ci archive les `.kg.jsonl` au lieu de les réimporter.
+        """
+        q, p = "DELETE FROM {} WHERE series=?", [series]
+        if approach is not None:
+            q += " AND approach=?"; p.append(approach)
+        now = time.time()
+        with self._lock:
+            n = self._conn.execute(q.format("done"), p).rowcount
+            self._conn.execute(q.format("imported"), p)
+            self._conn.execute(q.replace("DELETE FROM {}", "UPDATE builds SET finished=?") + " AND finished IS NULL",
+                               [now, *p])
+            if self._conn.execute(q.replace("DELETE FROM {}", "SELECT 1 FROM builds"), p).fetchone() is None:
+                # cache antérieur à l'index: marqueur (toutes approches: '*') pour qu'il ne soit pas réimporté
+                self._conn.execute("INSERT INTO builds(series, approach, build_id, started, finished) "
+                                   "VALUES (?,?,?,?,?)", (series, approach or "*", f"forgotten-{int(now)}", now, now))
+            self._conn.commit()
+        return int(n)
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+def _repair_tail(path: Path) -> int:
+    """
+    Tronque une dernière ligne incomplète (arrêt brutal pendant une écriture) pour que l'ajout suivant commence
+    sur une ligne neuve ; renvoie le nombre d'octets retirés. Ces chunks n'ont pas été marqués faits (mark_done
+    suit le fsync) : ils sont ré-extraits.
+    """
+    if not path.exists():
+        return 0
+    with path.open("r+b") as f:
+        size = f.seek(0, os.SEEK_END)
+        end = size
+        while end > 0:
+            start = max(0, end - 65536)
+            f.seek(start)
+            block = f.read(end - start)
+            if end == size and block.endswith(b"\n"):
+                return 0
+            nl = block.rfind(b"\n")
+            if nl >= 0:
+                end = start + nl + 1
+                break
+            end = start
+        f.truncate(end)
+        f.flush()
+        os.fsync(f.fileno())
+    return size - end
+
+
+class JsonlWriter:
+    """
+    Handle unique en ajout sur un fichier JSONL, bufferisé.
+    - dernière ligne tronquée réparée à l'ouverture (voir _repair_tail);
+    - flush + fsync toutes les `flush_every` lignes ou `fsync_s` secondes, et à la fermeture;
+    - `on_flush(keys)` reçoit les clés des lignes rendues durables (ex. ProgressStore.mark_done).
+    """
+
+    def __init__(self, path: Path, *, flush_every: int = 256, fsync_s: float = 5.0,
+                 on_flush: Optional[Callable[[Sequence[str]], Any]] = None):
+        self.path = Path(path)
+        self.flush_every = max(1, int(flush_every))
+        self.fsync_s = float(fsync_s)
+        self.on_flush = on_flush
+        self.repaired = _repair_tail(self.path)
+        self._f = self.path.open("a", encoding="utf-8", buffering=1024 * 1024)
+        self._keys: List[str] = []
+        self._last = time.monotonic()
+        self.lines = 0
+        self.syncs = 0
+
+    def write(self, obj: Dict[str, Any], key: Optional[str] = None) -> None:
+        self._f.write(json.dumps(obj, ensure_ascii=False) + "\n")
+        self.lines += 1
+        if key is not None:
+            self._keys.append(key)
+        if self.lines % self.flush_every == 0 or time.monotonic() - self._last >= self.fsync_s:
+            self.flush()
+
+    def flush(self) -> None:
+        self._f.flush()
+        os.fsync(self._f.fileno())
+        self.syncs += 1
+        self._last = time.monotonic()
+        keys, self._keys = self._keys, []
+        if keys and self.on_flush:
+            self.on_flush(keys)
+
+    def close(self) -> None:
+        if self._f.closed:
+            return
+        self.flush()
+        self._f.close()
+
+    def __enter__(self) -> "JsonlWriter":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
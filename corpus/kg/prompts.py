@@ -1,5 +1,6 @@
 # corpus/kg/prompts.py
 from __future__ import annotations
+from typing import Sequence, Tuple
 
 GENERIC_INSTRUCTIONS_FR = """Tu es un extracteur d'information pour construire un Knowledge Graph.
 RÈGLES:
@@ -30,11 +31,26 @@ IMMOBILIER_HINT_FR = """DOMAINE: immobilier
 Exemples d'entités: Project, UnitType, Unit, City, Place, Developer, Amenity, Price.
 Exemples de relations: LOCATED_IN, DEVELOPS, OFFERS, HAS_AMENITY, PRICE_FROM, NEAR."""
 
-def build_extraction_prompt(text: str, domain_hint: str = "immobilier") -> str:
-    """Construit le prompt d'extraction pour un texte donné."""
+PACKED_INSTRUCTIONS_FR = """PLUSIEURS TEXTES:
+- Chaque texte est délimité par <<<CHUNK id=...>>> et <<<FIN id=...>>>.
+- Traite chaque texte indépendamment: une entité ou relation n'appartient qu'au texte qui la mentionne.
+- Réponds par un objet {"chunks": [...]} avec UNE entrée par id reçu (listes vides si rien à extraire):
+{
+  "chunks": [
+    { "id": "<id du texte>", "entities": [ ... ], "relations": [ ... ] }
+  ]
+}
+"""
+
+def _instructions(domain_hint: str) -> str:
     base = GENERIC_INSTRUCTIONS_FR
     if (domain_hint or "").strip().lower() in {"immobilier", "immo", "real-estate"}:
         base = base + "\n" + IMMOBILIER_HINT_FR
+    return base
+
+def build_extraction_prompt(text: str, domain_hint: str = "immobilier") -> str:
+    """Construit le prompt d'extraction pour un texte donné."""
+    base = _instructions(domain_hint)
     example = (
         'EXEMPLE DE SORTIE MINIMALE:\n'
         '{\n'
@@ -43,3 +59,10 @@ def build_extraction_prompt(text: str, domain_hint: str = "immobilier") -> str:
         '}\n'
     )
     return f"{base}\n{example}\nTEXTE:\n\"\"\"\n{text}\n\"\"\"\n\nRéponds UNIQUEMENT par le JSON, sans backticks."
+
+
+def build_packed_extraction_prompt(texts: Sequence[Tuple[str, str]], domain_hint: str = "immobilier") -> str:
+    """Prompt d'extraction pour plusieurs textes courts [(id, texte)] : consignes une seule fois, un bloc délimité par texte."""
+    blocks = "\n\n".join(f"<<<CHUNK id={k}>>>\n{t}\n<<<FIN id={k}>>>" for k, t in texts)
+    return (f"{_instructions(domain_hint)}\n{PACKED_INSTRUCTIONS_FR}\nTEXTES:\n{blocks}\n\n"
+            "Réponds UNIQUEMENT par le JSON, sans backticks.")
@@ -1,24 +1,41 @@
 # corpus/kg/runner.py
 from __future__ import annotations
-import json, pathlib, time, hashlib,uuid
+import functools, json, pathlib, time, hashlib,uuid
 from dataclasses import dataclass
-from typing import Any, Dict, List, Optional, Set
+from typing import Any, Dict, List, Optional
+
+import numpy as np
 
 from app.core.config import get_settings
 from app.core.resources import get_storage
-from adapters.llm.base import Provider
+from app.observability.pipeline import Progress
+from adapters.llm.base import Provider, provider_slots
 from adapters.db.neo4j import Neo4jAdapter
-from corpus.kg.extract import extract_from_text
+from corpus.kg.extract import extract_packed, pack_chunks
+from corpus.kg.dedup import DedupStore
+from corpus.kg.progress import JsonlWriter, ProgressStore, archive_jsonl
+from graph_based.utils.parallel import imap_bounded
 
 def _hash_text(t: str) -> str:
     return hashlib.sha1((t or "").encode("utf-8")).hexdigest()
 
+def _latency_stats(ms: List[float]) -> Dict[str, Any]:
+    """Latences des appels LLM (ms): moyenne, p50/p95, max."""
+    if not ms:
+        return {"mean": None, "p50": None, "p95": None, "max": None}
+    w = np.asarray(ms, dtype=np.float64)
+    p50, p95 = np.percentile(w, [50, 95]).round(1).tolist()
+    return {"mean": round(float(w.mean()), 1), "p50": p50, "p95": p95, "max": round(float(w.max()), 1)}
+
 @dataclass
 class KGRunner:
     provider: Provider
     db: Optional[Neo4jAdapter] = None
     domain_hint: str = "immobilier"
     batch_upsert: int = 1000
+    flush_every: int = 256      # lignes JSONL entre deux flush + fsync
+    fsync_s: float = 5.0        # délai max entre deux fsync
+    dedup_capacity: int = 1_000_000   # clés prévues par ensemble de dédup (dimensionne le filtre de Bloom)
 
     def __post_init__(self):
         self.db = self.db or Neo4jAdapter()
@@ -41,9 +58,18 @@ class KGRunner:
         self.db.enable_query_logging(log_path)
 
         
-        build_id = f"build-{int(time.time())}-{uuid.uuid4().hex[:6]}"
         approach = "A1" # req.approach or "A1"  # par ex.
 
+        # Progression persistée par (série, approche, build): un build inachevé est repris, sinon un nouveau
+        # build repart de zéro (caches JSONL des builds précédents archivés, cache antérieur à l'index importé)
+        store = ProgressStore(out_dir / "_progress.sqlite")
+        # (drapeau `legacy` porté par le build: un build legacy repris importe encore les fichiers non atteints)
+        build_id, resumed = store.open_build(series, approach, f"build-{int(time.time())}-{uuid.uuid4().hex[:6]}",
+                                             legacy=not store.has_builds(series, approach))
+        legacy = store.is_legacy(series, approach, build_id)
+        if not resumed and not legacy:
+            archive_jsonl(out_dir.glob("*.kg.jsonl"), f"before-{build_id}")
+
         report = json.loads(report_path.read_text(encoding="utf-8"))
         items = report.get("items", [])
         started = time.time()
@@ -58,112 +84,163 @@ class KGRunner:
         total_chunks = 0
         total_entities = 0
         total_relations = 0
-        dedup_entities: Set[str] = set()
-        dedup_relations: Set[tuple] = set()
-
-        # Déduplique les relations
-        for it in items:
-            out_rel = it.get("output")
-            if not out_rel:
-                continue
-            fpath = sdir / out_rel
-            if not fpath.exists():
-                continue
-
-            # Chargement des chunks existants
-            kg_jsonl = out_dir / f"{pathlib.Path(it['filename']).stem}.kg.jsonl"
-            done_hashes: Set[str] = set()
-            if kg_jsonl.exists():
-                for line in kg_jsonl.read_text(encoding="utf-8").splitlines():
-                    try:
-                        obj = json.loads(line)
-                        if "hash" in obj:
-                            done_hashes.add(obj["hash"])
-                    except Exception:
-                        pass
-
-            # Chargement des chunks à partir du fichier
-            with fpath.open(encoding="utf-8") as f:
-                for line in f:
-                    # Limite le nombre de chunks si demandé
-                    if limit_chunks and total_chunks >= limit_chunks:
-                        break
-                    
-                    data = json.loads(line)
-                    text = data.get("text", "")
-                    if not text.strip():
-                        continue
-
-                    # Extraction des métadonnées
-                    filename = (data.get("doc") or {}).get("filename") or pathlib.Path(out_rel).stem
-                    idx = data.get("idx", data.get("order", 0))
-                    page = data.get("page")
-                    chunk_id = f"{series}:{filename}:{idx}"
-                    h = _hash_text(text)
-                    if h in done_hashes:
-                        total_chunks += 1
-                        continue
-
-                    # Extraction des entités et relations
-                    kg = extract_from_text(
-                        text,
-                        provider=self.provider,
-                        series=series,
-                        file=filename,
-                        page=page,
-                        chunk_id=chunk_id,
-                        domain_hint=self.domain_hint,
-                    )
-
-                    # Écriture des métadonnées dans le fichier JSONL
-                    with kg_jsonl.open("a", encoding="utf-8") as out:
-                        out.write(json.dumps({
-                            "chunk_id": chunk_id,
-                            "file": filename,
-                            "page": page,
-                            "hash": h,
-                            "ts": kg.ts,
-                            "entities": kg.entities,
-                            "relations": kg.relations
-                        }, ensure_ascii=False) + "\n")
+        # Déjà-vus du run (Bloom + ensemble exact sur disque) : mémoire bornée quelle que soit la série
+        # (tables du build: un build repris retrouve son ensemble, les autres builds n'y touchent pas).
+        # Clés persistées seulement par _write_batches, après l'écriture Neo4j des lignes qu'elles couvrent.
+        dedup_entities = DedupStore(out_dir / "_dedup.sqlite", "entities", namespace=build_id,
+                                    capacity=self.dedup_capacity, autoflush=False)
+        dedup_relations = DedupStore(out_dir / "_dedup.sqlite", "relations", namespace=build_id,
+                                     capacity=self.dedup_capacity, autoflush=False)
+        # Chunks rendus durables dans le JSONL (fsync) mais pas encore marqués faits: marqués par _write_batches
+        durable: Dict[str, List[str]] = {}
+
+        # Écritures par lots bornés ; entités toujours avant liens et relations (MATCH sur Entity côté Cypher).
+        # Appelé entre deux chunks (toutes les lignes des chunks traités sont dans les lots) : une fois Neo4j à
+        # jour, déjà-vus puis progression sont persistés => l'état de reprise ne devance jamais la base.
+        def _write_batches():
+            if ents_batch:
+                self.db.upsert_entities(ents_batch, series=series, approach=approach, build_id=build_id)
+                ents_batch.clear()
+            if rels_batch:
+                self.db.upsert_relations(rels_batch, series=series, approach=approach, build_id=build_id)
+                rels_batch.clear()
+            if links_batch:
+                self.db.link_entities_to_chunks(links_batch)
+                links_batch.clear()
+            dedup_entities.flush()
+            dedup_relations.flush()
+            for stem in list(durable):
+                store.mark_done(series, approach, build_id, stem, durable.pop(stem))
+
+        # Chunks à extraire (paresseux, ordre fichier/ligne) ; les chunks déjà en cache comptent comme traités.
+        # `total_chunks` n'est incrémenté qu'à l'achèvement (cache ici, extraction dans la boucle de consommation):
+        # les chunks préchargés par imap_bounded puis abandonnés (arrêt, erreur) ne sont pas comptés.
+        limited = False     # arrêt sur limit_chunks: build laissé ouvert (repris au run suivant)
+        completed = False   # boucle d'extraction allée au bout (sans erreur)
+        finished = False    # build clos (finish_build): ensembles de dédup supprimés à la fermeture
+
+        def _durable(stem: str, hashes: List[str]):
+            durable.setdefault(stem, []).extend(hashes)
+
+        def _jobs():
+            nonlocal total_chunks, limited
+            taken = 0
+            for it in items:
+                out_rel = it.get("output")
+                if not out_rel:
+                    continue
+                fpath = sdir / out_rel
+                if not fpath.exists():
+                    continue
+
+                # Index de reprise (migration unique d'un cache JSONL antérieur à l'index)
+                stem = pathlib.Path(it['filename']).stem
+                kg_jsonl = out_dir / f"{stem}.kg.jsonl"
+                if legacy:
+                    store.import_jsonl(series, approach, build_id, stem, kg_jsonl)
+
+                # Chargement des chunks à partir du fichier
+                with fpath.open(encoding="utf-8") as f:
+                    for line in f:
+                        # Limite le nombre de chunks si demandé
+                        if limit_chunks and taken >= limit_chunks:
+                            limited = True
+                            return
+
+                        data = json.loads(line)
+                        text = data.get("text", "")
+                        if not text.strip():
+                            continue
+
+                        # Extraction des métadonnées
+                        filename = (data.get("doc") or {}).get("filename") or pathlib.Path(out_rel).stem
+                        idx = data.get("idx", data.get("order", 0))
+                        h = _hash_text(text)
+                        taken += 1
+                        if store.is_done(series, approach, build_id, stem, h):
+                            total_chunks += 1
+                            continue
+                        yield {"out": kg_jsonl, "stem": stem, "text": text, "file": filename, "page": data.get("page"),
+                               "chunk_id": f"{series}:{filename}:{idx}", "hash": h}
+
+        runtime = get_settings().runtime
+        parallelism = max(1, runtime.parallelism)
+        slots = provider_slots(self.provider, parallelism)
+
+        def _extract(group: List[Dict[str, Any]]):
+            # Appels LLM (thread worker) : aucune écriture ici, seulement les résultats et la latence de chaque
+            # appel (appel groupé + replis mono-chunk)
+            with slots:
+                calls: List[float] = []
+                kgs = extract_packed(group, provider=self.provider, series=series, domain_hint=self.domain_hint,
+                                     calls=calls)
+                return kgs, calls
+
+        # Résultats consommés dans l'ordre d'entrée => cache JSONL et lots identiques à l'exécution séquentielle
+        progress = Progress("kg.extract", series)
+        latencies: List[float] = []
+        out: Optional[JsonlWriter] = None
+        try:
+            groups = pack_chunks(_jobs(), max_tokens=runtime.pack_tokens, max_chunks=runtime.pack_max_chunks,
+                                 max_chunk_tokens=runtime.pack_chunk_tokens)
+            for group, (kgs, calls) in imap_bounded(_extract, groups, max_workers=parallelism):
+                latencies.extend(calls)
+                for job, kg in zip(group, kgs):
+                    chunk_id, page = job["chunk_id"], job["page"]
+
+                    # Écriture des métadonnées dans le fichier JSONL (un handle bufferisé par fichier source)
+                    if out is None or out.path != job["out"]:
+                        if out:
+                            out.close()
+                        out = JsonlWriter(job["out"], flush_every=self.flush_every, fsync_s=self.fsync_s,
+                                          on_flush=functools.partial(_durable, job["stem"]))
+                    out.write({
+                        "chunk_id": chunk_id,
+                        "file": job["file"],
+                        "page": page,
+                        "hash": job["hash"],
+                        "ts": kg.ts,
+                        "entities": kg.entities,
+                        "relations": kg.relations
+                    }, key=job["hash"])
+                    total_chunks += 1
 
                     # Dé-duplication des entités
-                    for e in kg.entities:
-                        if e["id"] in dedup_entities:
+                    for e, fresh in zip(kg.entities, dedup_entities.add_many([e["id"] for e in kg.entities])):
+                        if not fresh:
                             continue
-                        dedup_entities.add(e["id"])
                         ents_batch.append(e)
                         total_entities += 1
                         links_batch.append({"eid": e["id"], "cid": chunk_id, "page": page})
-                        if len(ents_batch) >= self.batch_upsert:
-                            self.db.upsert_entities(ents_batch); ents_batch.clear()
 
                     # Dé-duplication des relations
-                    for r in kg.relations:
-                        key = (r["src"], r["type"], r["dst"])
-                        if key in dedup_relations:
+                    rel_keys = [f'{r["src"]}|{r["type"]}|{r["dst"]}' for r in kg.relations]
+                    for r, fresh in zip(kg.relations, dedup_relations.add_many(rel_keys)):
+                        if not fresh:
                             continue
-                        dedup_relations.add(key)
                         rels_batch.append(r)
                         total_relations += 1
-                        if len(rels_batch) >= self.batch_upsert:
-                            self.db.upsert_relations(rels_batch); rels_batch.clear()
 
-                    total_chunks += 1
+                    if max(len(ents_batch), len(rels_batch), len(links_batch)) >= self.batch_upsert:
+                        _write_batches()
 
-        # Insertion entités (batch)
-        if ents_batch: 
-            self.db.upsert_entities(ents_batch, series=series, approach=approach, build_id=build_id); ents_batch.clear()
-            # self.db.upsert_entities(ents_batch); ents_batch.clear()
-
-        # Insertion relations (batch)
-        if rels_batch: 
-            self.db.upsert_relations(rels_batch, series=series, approach=approach, build_id=build_id); rels_batch.clear()
-            # self.db.upsert_relations(rels_batch); rels_batch.clear()
-        
-        # Liens entités -> chunks (batch): Liens apparitions
-        if links_batch: 
-            self.db.link_entities_to_chunks(links_batch); links_batch.clear()
+                progress.advance(len(group), llm_ms=round(sum(calls), 1), llm_calls=len(calls), packed=len(group))
+            completed = True
+        finally:
+            try:
+                # Reliquats écrits aussi après une erreur d'extraction (résultats déjà obtenus) ; si l'écriture
+                # échoue, ni déjà-vus ni progression ne sont persistés : ces chunks seront ré-extraits
+                if out:
+                    out.close()
+                _write_batches()
+                if completed and not limited:
+                    store.finish_build(series, approach, build_id)
+                    finished = True
+            finally:
+                store.close()
+                dedup_stats = [dedup_entities.stats(), dedup_relations.stats()]
+                # build terminé: ensembles supprimés ; sinon conservés pour la reprise de ce build
+                dedup_entities.close(drop=finished); dedup_relations.close(drop=finished)
 
         # Stats qualité
         quality = self.db.graph_quality(series=series)
@@ -172,10 +249,16 @@ class KGRunner:
         # Rapport d'extraction
         kg_report = {
             "series": series,
+            "build_id": build_id,
+            "resumed": resumed,
             "duration_s": round(time.time() - started, 3),
             "chunks_processed": total_chunks,
             "entities_upserted": total_entities,
             "relations_upserted": total_relations,
+            "llm_calls": len(latencies),      # appels groupés + replis mono-chunk
+            "llm_latency_ms": _latency_stats(latencies),
+            "parallelism": parallelism,
+            "dedup": dedup_stats,
             "cache_dir": str(out_dir.relative_to(sdir)),
             "report": report
         }
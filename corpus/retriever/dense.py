@@ -1,14 +1,37 @@
 from __future__ import annotations
+import asyncio
 from typing import List, Dict, Any, Optional
 from dataclasses import dataclass
-from app.core.resources import get_provider
+from app.core.resources import embed_query, get_provider, get_vector_index
 from adapters.db.neo4j import Neo4jAdapter
+from adapters.db.neo4j_async import AsyncNeo4jAdapter
 from .schemas import SearchRequest, SearchResponse, Hit
 
+VECTOR_QUERY = """
+CALL db.index.vector.queryNodes($index, $k, $vec)
+YIELD node, score
+RETURN elementId(node) AS id, labels(node) AS labels, node.text AS text,
+       node.page AS page, node.series AS series, node.doc_id AS doc_id,
+       node.meta_json AS meta_json, score
+ORDER BY score DESC
+"""
+
+# nécessite: CREATE FULLTEXT INDEX chunk_text_ft IF NOT EXISTS FOR (c:Chunk) ON EACH [c.text]
+FULLTEXT_QUERY = """
+CALL db.index.fulltext.queryNodes('chunk_text_ft', $q) YIELD node, score
+WITH node AS c, score
+WHERE $series IS NULL OR c.series = $series
+RETURN elementId(c) AS id, labels(c) AS labels, c.text AS text, c.page AS page,
+       c.series AS series, c.doc_id AS doc_id, c.meta_json AS meta_json, score
+ORDER BY score DESC
+LIMIT $k
+"""
+
 @dataclass
 class DenseRetriever:
     """Récupérateur dense utilisant des embeddings et Neo4j."""
     db: Neo4jAdapter
+    adb: Optional[AsyncNeo4jAdapter] = None   # chemin async (routes / MCP)
 
     def _embed(self, text: str) -> Optional[List[float]]:
         """Crée une représentation vectorielle à partir d'un texte."""
@@ -16,38 +39,42 @@ class DenseRetriever:
         # L’embedder peut être absent → fallback None
         if prov and hasattr(prov, "embed"):
             try:
-                return list(prov.embed(text))
+                return embed_query(text, prov)
             except Exception:
                 return None
         return None
 
     def _vector_query(self, index_name: str, vec: List[float], k: int) -> List[Dict[str, Any]]:
         """Exécute une requête vectorielle sur l'index spécifié."""
-        q = """
-        CALL db.index.vector.queryNodes($index, $k, $vec)
-        YIELD node, score
-        RETURN elementId(node) AS id, labels(node) AS labels, node.text AS text,
-               node.page AS page, node.series AS series, node.doc_id AS doc_id,
-               node.meta_json AS meta_json, score
-        ORDER BY score DESC
-        """
         with self.db._session() as s:
-            return [r.data() for r in s.run(q, index=index_name, k=int(k), vec=list(vec))]
+            return [r.data() for r in s.run(VECTOR_QUERY, index=index_name, k=int(k), vec=list(vec))]
+
+    def _local_query(self, series: str, vec: List[float], k: int) -> Optional[List[Dict[str, Any]]]:
+        """Recherche dans l'index local de la série (mmap / ivf) ; None si absent ou vide."""
+        local = get_vector_index(series)
+        if local is None:
+            return None
+        local.refresh()
+        if not len(local):
+            return None
+        return [{"id": h.id, "text": h.metadata.get("text"), "page": h.metadata.get("page"),
+                 "series": h.metadata.get("series"), "doc_id": h.metadata.get("file"), "score": h.score}
+                for h in local.search(vec, k=k)]
 
     def _fulltext_fallback(self, qstr: str, k: int, series: Optional[str]) -> List[Dict[str, Any]]:
         """Exécute une requête de recherche en texte intégral."""
-        # nécessite: CREATE FULLTEXT INDEX chunk_text_ft IF NOT EXISTS FOR (c:Chunk) ON EACH [c.text]
-        q = """
-        CALL db.index.fulltext.queryNodes('chunk_text_ft', $q) YIELD node, score
-        WITH node AS c, score
-        WHERE $series IS NULL OR c.series = $series
-        RETURN elementId(c) AS id, labels(c) AS labels, c.text AS text, c.page AS page,
-               c.series AS series, c.doc_id AS doc_id, c.meta_json AS meta_json, score
-        ORDER BY score DESC
-        LIMIT $k
-        """
         with self.db._session() as s:
-            return [r.data() for r in s.run(q, q=qstr, k=int(k), series=series)]
+            return [r.data() for r in s.run(FULLTEXT_QUERY, q=qstr, k=int(k), series=series)]
+
+    @staticmethod
+    def _response(req: SearchRequest, rows: List[Dict[str, Any]], diag: Dict[str, Any]) -> SearchResponse:
+        hits: List[Hit] = []
+        for r in rows:
+            hits.append(Hit(
+                id=r["id"], score=float(r["score"]), text=r.get("text"),
+                page=r.get("page"), filename=r.get("doc_id")   # si vous stockez le filename à part, adaptez
+            ))
+        return SearchResponse(query=req.query, mode="dense", hits=hits, diagnostics=diag)
 
     def search(self, req: SearchRequest) -> SearchResponse:
         """
@@ -56,12 +83,29 @@ class DenseRetriever:
         idx = req.index_name or "chunk_embedding_idx"
         vec = self._embed(req.query)
         diag: Dict[str, Any] = {"index": idx, "used": "vector" if vec else "fulltext"}
-        rows = self._vector_query(idx, vec, req.k) if vec else self._fulltext_fallback(req.query, req.k, req.series)
+        rows = self._local_query(req.series, vec, req.k) if (vec and req.series) else None
+        if rows is not None:
+            diag.update(index=f"local:{req.series}", used="local")
+        elif vec:
+            rows = self._vector_query(idx, vec, req.k)
+        else:
+            rows = self._fulltext_fallback(req.query, req.k, req.series)
+        return self._response(req, rows, diag)
 
-        hits: List[Hit] = []
-        for r in rows:
-            hits.append(Hit(
-                id=r["id"], score=float(r["score"]), text=r.get("text"),
-                page=r.get("page"), filename=r.get("doc_id")   # si vous stockez le filename à part, adaptez
-            ))
-        return SearchResponse(query=req.query, mode="dense", hits=hits, diagnostics=diag)
+    async def asearch(self, req: SearchRequest) -> SearchResponse:
+        """
+        Version non bloquante: embedding / index local dans un thread, Cypher via AsyncNeo4jAdapter.
+        """
+        if self.adb is None:
+            return await asyncio.to_thread(self.search, req)
+        idx = req.index_name or "chunk_embedding_idx"
+        vec = await asyncio.to_thread(self._embed, req.query)
+        diag: Dict[str, Any] = {"index": idx, "used": "vector" if vec else "fulltext"}
+        rows = await asyncio.to_thread(self._local_query, req.series, vec, req.k) if (vec and req.series) else None
+        if rows is not None:
+            diag.update(index=f"local:{req.series}", used="local")
+        elif vec:
+            rows = await self.adb.run_cypher(VECTOR_QUERY, {"index": idx, "k": int(req.k), "vec": list(vec)}, name="retriever.dense.vector")
+        else:
+            rows = await self.adb.run_cypher(FULLTEXT_QUERY, {"q": req.query, "k": int(req.k), "series": req.series}, name="retriever.dense.fulltext")
+        return self._response(req, rows, diag)
@@ -0,0 +1,128 @@
+# corpus/retriever/fanout.py
+# Recherche multi-séries : une requête par série (index par série) en parallèle, échéance globale, fusion normalisée.
+from __future__ import annotations
+import asyncio, time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+from graph_based.utils.parallel import fan_out
+from .schemas import Hit, SearchRequest, SearchResponse
+
+
+def minmax(scores: Sequence[float]) -> List[float]:
+    """Normalisation min-max dans [0, 1] (scores d'un même index); valeurs toutes égales => 1.0."""
+    if not scores:
+        return []
+    lo, hi = min(scores), max(scores)
+    if hi - lo <= 1e-12:
+        return [1.0] * len(scores)
+    return [(s - lo) / (hi - lo) for s in scores]
+
+
+def merge_rows(per_series: Mapping[str, Sequence[Mapping[str, Any]]], k: int, *,
+               key: str = "score") -> List[Dict[str, Any]]:
+    """
+    Fusion de résultats (dicts) de plusieurs séries: scores normalisés par série (les échelles des index
+    diffèrent), ligne annotée {"series", "raw_score"}, top-k global (égalités: ordre des séries).
+    """
+    merged: List[Dict[str, Any]] = []
+    for s, rows in per_series.items():
+        rows = list(rows or [])
+        for r, ns in zip(rows, minmax([float(r.get(key) or 0.0) for r in rows])):
+            merged.append({**r, "series": r.get("series") or s, "raw_score": r.get(key), key: ns})
+    merged.sort(key=lambda r: r[key], reverse=True)
+    return merged[:int(k)]
+
+
+async def afan_out(fn: Callable[[Any], Awaitable[Any]], items: Iterable[Any], *, deadline_s: float,
+                   max_concurrency: int = 8) -> Tuple[Dict[Any, Any], Dict[Any, Dict[str, Any]]]:
+    """Équivalent asyncio de graph_based.utils.parallel.fan_out (tâches en retard annulées)."""
+    items = list(dict.fromkeys(items))
+    sem = asyncio.Semaphore(max(1, int(max_concurrency)))
+
+    async def one(x):
+        async with sem:
+            t0 = time.perf_counter()
+            return await fn(x), (time.perf_counter() - t0) * 1000.0
+
+    out: Dict[Any, Any] = {}
+    diag: Dict[Any, Dict[str, Any]] = {}
+    if not items:
+        return out, diag
+    tasks = {asyncio.ensure_future(one(x)): x for x in items}
+    done, pending = await asyncio.wait(tasks, timeout=max(0.0, float(deadline_s)))
+    for t in done:
+        x = tasks[t]
+        try:
+            out[x], ms = t.result()
+            diag[x] = {"status": "ok", "ms": round(ms, 1)}
+        except Exception as ex:
+            diag[x] = {"status": "error", "error": repr(ex)[:200]}
+    for t in pending:
+        t.cancel()
+        diag[tasks[t]] = {"status": "timeout"}
+    if pending:   # attendre la fin effective des annulations (pas de tâche orpheline ni d'exception non lue)
+        await asyncio.gather(*pending, return_exceptions=True)
+    return out, diag
+
+
+@dataclass
+class FanoutRetriever:
+    """
+    Aiguille une SearchRequest vers le retriever de son mode ; si `series` est une liste, une requête par
+    série (index par série via `index_for`) en parallèle sous `deadline_ms`, puis fusion normalisée par index.
+    """
+    retrievers: Dict[str, Any]                                  # mode -> KGRetriever | DenseRetriever | HybridRetriever
+    index_for: Optional[Callable[[str], str]] = None            # série -> index vectoriel (défaut: req.index_name)
+    max_concurrency: int = 8
+
+    def _single(self, req: SearchRequest) -> SearchRequest:
+        """Série unique: même résolution d'index que chaque série d'une liste."""
+        if req.index_name or not self.index_for or not req.series:
+            return req
+        return req.model_copy(update={"index_name": self.index_for(req.series)})
+
+    def _per_series(self, req: SearchRequest) -> Dict[str, SearchRequest]:
+        series = list(dict.fromkeys(req.series))                # type: ignore[arg-type]
+        return {s: req.model_copy(update={"series": s, "index_name": req.index_name or
+                                          (self.index_for(s) if self.index_for else None)})
+                for s in series}
+
+    @staticmethod
+    def _merge(req: SearchRequest, results: Dict[str, SearchResponse], diag: Dict[str, Dict[str, Any]],
+               elapsed_ms: float) -> SearchResponse:
+        hits: List[Hit] = []
+        for s in diag:
+            res = results.get(s)
+            if res is None:
+                continue
+            diag[s]["hits"] = len(res.hits)
+            for h, ns in zip(res.hits, minmax([h.score for h in res.hits])):
+                hh = h.model_copy(deep=True)
+                hh.meta = {**hh.meta, "series": s, "raw_score": h.score}
+                hh.score = ns
+                hits.append(hh)
+        hits.sort(key=lambda h: h.score, reverse=True)
+        return SearchResponse(query=req.query, mode=req.mode, hits=hits[:req.k], diagnostics={
+            "series": diag, "normalization": "minmax_per_index", "deadline_ms": req.deadline_ms,
+            "elapsed_ms": round(elapsed_ms, 1), "partial": any(d["status"] != "ok" for d in diag.values())})
+
+    def search(self, req: SearchRequest) -> SearchResponse:
+        ret = self.retrievers[req.mode]
+        if not isinstance(req.series, list):
+            return ret.search(self._single(req))
+        t0 = time.perf_counter()
+        reqs = self._per_series(req)
+        out, diag = fan_out(lambda s: ret.search(reqs[s]), list(reqs), deadline_s=req.deadline_ms / 1000.0,
+                            max_workers=self.max_concurrency)
+        return self._merge(req, out, {s: diag[s] for s in reqs}, (time.perf_counter() - t0) * 1000.0)
+
+    async def asearch(self, req: SearchRequest) -> SearchResponse:
+        ret = self.retrievers[req.mode]
+        if not isinstance(req.series, list):
+            return await ret.asearch(self._single(req))
+        t0 = time.perf_counter()
+        reqs = self._per_series(req)
+        out, diag = await afan_out(lambda s: ret.asearch(reqs[s]), list(reqs), deadline_s=req.deadline_ms / 1000.0,
+                                   max_concurrency=self.max_concurrency)
+        return self._merge(req, out, {s: diag[s] for s in reqs}, (time.perf_counter() - t0) * 1000.0)
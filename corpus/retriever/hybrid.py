@@ -1,4 +1,5 @@
 from __future__ import annotations
+import asyncio
 from typing import Dict
 from dataclasses import dataclass
 from .schemas import SearchRequest, SearchResponse, Hit
@@ -12,9 +13,15 @@ class HybridRetriever:
 
     def search(self, req: SearchRequest) -> SearchResponse:
         """Effectue une recherche hybride combinant KG et dense."""
-        kg_res = self.kg.search(req)
-        dn_res = self.dense.search(req)
+        return self._fuse(req, self.kg.search(req), self.dense.search(req))
 
+    async def asearch(self, req: SearchRequest) -> SearchResponse:
+        """Version non bloquante: KG et dense interrogés en parallèle."""
+        kg_res, dn_res = await asyncio.gather(self.kg.asearch(req), self.dense.asearch(req))
+        return self._fuse(req, kg_res, dn_res)
+
+    @staticmethod
+    def _fuse(req: SearchRequest, kg_res: SearchResponse, dn_res: SearchResponse) -> SearchResponse:
         # Fusion simple par id avec pondération
         alpha, beta = 0.6, 0.4
         bucket: Dict[str, Hit] = {}
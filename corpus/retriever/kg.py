@@ -1,7 +1,9 @@
 from __future__ import annotations
-from typing import Dict, Any, List, Optional
+import asyncio
+from typing import Dict, Any, List, Optional, Tuple
 from dataclasses import dataclass
 from adapters.db.neo4j import Neo4jAdapter, client_from_settings
+from adapters.db.neo4j_async import AsyncNeo4jAdapter
 from .schemas import SearchRequest, SearchResponse, Hit
 
 @dataclass
@@ -10,6 +12,7 @@ class KGRetriever:
     Récupérateur de connaissances utilisant Neo4j.
     """
     db: Neo4jAdapter
+    adb: Optional[AsyncNeo4jAdapter] = None   # chemin async (routes / MCP)
 
     @staticmethod
     def _base_cypher(series_filter: bool, type_filter: bool) -> str:
@@ -27,15 +30,16 @@ class KGRetriever:
         LIMIT $k
         """
 
-    def search(self, req: SearchRequest) -> SearchResponse:
-        """Exécute une recherche en utilisant l'index spécifié."""
+    def _query(self, req: SearchRequest) -> Tuple[str, Dict[str, Any]]:
         q = self._base_cypher(series_filter=True, type_filter=("type" in req.filters))
         params: Dict[str, Any] = {
             "q": req.query, "k": int(req.k),
             "series": req.series, "type": req.filters.get("type")
         }
-        with self.db._session() as s:
-            rows = [r.data() for r in s.run(q, **params)]
+        return q, params
+
+    @staticmethod
+    def _response(req: SearchRequest, rows: List[Dict[str, Any]], q: str, params: Dict[str, Any]) -> SearchResponse:
         hits: List[Hit] = []
         for r in rows:
             hits.append(Hit(
@@ -44,3 +48,18 @@ class KGRetriever:
                 name=r.get("name"), type=r.get("type")
             ))
         return SearchResponse(query=req.query, mode="kg", hits=hits, cypher=q, params=params)
+
+    def search(self, req: SearchRequest) -> SearchResponse:
+        """Exécute une recherche en utilisant l'index spécifié."""
+        q, params = self._query(req)
+        with self.db._session() as s:
+            rows = [r.data() for r in s.run(q, **params)]
+        return self._response(req, rows, q, params)
+
+    async def asearch(self, req: SearchRequest) -> SearchResponse:
+        """Version non bloquante (AsyncNeo4jAdapter) ; repli sur `search` dans un thread sinon."""
+        if self.adb is None:
+            return await asyncio.to_thread(self.search, req)
+        q, params = self._query(req)
+        rows = await self.adb.run_cypher(q, params, name="retriever.kg.asearch")
+        return self._response(req, rows, q, params)
@@ -1,5 +1,5 @@
 from __future__ import annotations
-from typing import List, Optional, Literal, Dict, Any
+from typing import List, Optional, Literal, Dict, Any, Union
 from pydantic import BaseModel, Field
 
 Mode = Literal["kg", "dense", "hybrid"]
@@ -8,7 +8,8 @@ class SearchRequest(BaseModel):
     query: str
     mode: Mode = "hybrid"
     k: int = 6
-    series: Optional[str] = None
+    series: Optional[Union[str, List[str]]] = None  # plusieurs séries => recherche fan-out (corpus/retriever/fanout.py)
+    deadline_ms: int = 3000                         # fan-out: échéance globale, séries en retard ignorées
     index_name: Optional[str] = None       # ex: "chunk_embedding_idx"
     filters: Dict[str, Any] = Field(default_factory=dict)  # ex: {"type": "Project"}
 
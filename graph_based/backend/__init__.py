@@ -0,0 +1,24 @@
+# graph_based/backend/__init__.py
+# Backends de graphe : contrat commun + implémentations Neo4j et embarquée.
+from .base import GraphBackend
+from .embedded import EmbeddedGraphBackend
+from .neo4j import Neo4jGraphBackend
+
+
+def as_backend(db) -> GraphBackend:
+    """
+    Backend pour `db`: tel quel s'il implémente GraphBackend, sinon enveloppé (Neo4jAdapter ou doublure
+    exposant `run_cypher`) ; None => backend configuré (resources.get_graph_backend).
+    Tout autre objet => TypeError (plutôt qu'un AttributeError au premier appel).
+    """
+    if db is None:
+        from app.core.resources import get_graph_backend
+        return get_graph_backend()
+    if isinstance(db, GraphBackend):
+        return db
+    if callable(getattr(db, "run_cypher", None)):
+        return Neo4jGraphBackend(db)
+    raise TypeError(f"as_backend: {type(db).__name__} n'est ni un GraphBackend ni un adapter Neo4j (run_cypher)")
+
+
+__all__ = ["GraphBackend", "EmbeddedGraphBackend", "Neo4jGraphBackend", "as_backend"]
@@ -0,0 +1,66 @@
+# graph_based/backend/base.py
+# Contrat des opérations graphe réellement utilisées par graph_based (build, PathRAG, GraphRAG).
+from __future__ import annotations
+from typing import Any, Dict, Iterator, List, Mapping, Optional, Protocol, Sequence, Tuple, runtime_checkable
+
+from graph_based.utils.types import Community, EdgeRecord, NodeRecord
+
+
+@runtime_checkable
+class GraphBackend(Protocol):
+    """
+    Backend de graphe de connaissances, indépendant du moteur (Neo4j, embarqué).
+    Les formes de lignes sont celles déjà échangées par les modules graph_based:
+    - chunks: {"id", <champs demandés>} ; entités/relations: NodeRecord / EdgeRecord de graph_store;
+    - chemins: {"nodes": [{"id","name","conf"}], "edges": [{"pred","conf"}], "length"};
+    - communautés: {"id","level","cid","node_ids","parent_id"}.
+    """
+
+    def ensure_schema(self) -> None: ...
+
+    # ---------- Chunks ----------
+    def iter_chunks(self, series: str, fields: Sequence[str] = ("id", "text"), *,
+                    fetch_size: int = 1000) -> Iterator[Dict[str, Any]]: ...
+
+    def upsert_chunks(self, rows: Sequence[Mapping[str, Any]], *, series: Optional[str] = None,
+                      approach: Optional[str] = None, build_id: Optional[str] = None) -> int: ...
+
+    def chunk_fingerprints(self, series: str) -> Dict[str, Dict[str, Any]]: ...
+
+    def delete_chunks(self, cids: Sequence[str]) -> int: ...
+
+    # ---------- Entités / relations ----------
+    def upsert_graph(self, series: str, nodes: Sequence[NodeRecord],
+                     edges: Sequence[EdgeRecord]) -> Dict[str, Any]: ...
+
+    def neighbors(self, series: str, node_id: str) -> List[Tuple[str, str, float]]: ...
+
+    def find_paths(self, series: str, src: str, dst: str, *, max_hops: int = 3, theta: float = 0.0,
+                   limit: int = 6) -> List[Dict[str, Any]]: ...
+
+    def search_entities(self, series: str, terms: Sequence[str], n: int = 30) -> List[Dict[str, Any]]: ...
+
+    # ---------- Communautés ----------
+    def detect_communities(self, series: str, *, levels: int = 3, resolution: float = 1.2) -> List[Community]: ...
+
+    def wire_hierarchy(self, series: str, lo: int, hi: int) -> int: ...
+
+    def community_members(self, series: str, level: int, cid: str, k: int = 40) -> List[Dict[str, Any]]: ...
+
+    # ---------- Résumés ----------
+    def write_summary(self, series: str, level: int, cid: str, summary: str) -> None: ...
+
+    def read_summaries(self, series: str, levels: Optional[Sequence[int]] = None) -> List[Dict[str, Any]]: ...
+
+    # ---------- Vecteurs ----------
+    def entity_texts(self, series: str) -> List[Dict[str, Any]]: ...
+
+    def write_entity_vectors(self, rows: Sequence[Mapping[str, Any]]) -> None: ...
+
+    def check_index_exists(self, name: str) -> bool: ...
+
+    def create_vector_index(self, name: str, *, label: str = "Chunk", prop: str = "embedding",
+                            dimensions: int = 768, similarity: str = "cosine") -> None: ...
+
+    def query_top_k(self, index_name: str, query_vec: Sequence[float], k: int = 5,
+                    series: Optional[str] = None) -> List[Dict[str, Any]]: ...
@@ -0,0 +1,355 @@
+# graph_based/backend/embedded.py
+# GraphBackend embarqué (sans serveur) : dictionnaires en mémoire, persistance SQLite optionnelle, parcours via GraphSnapshot.
+from __future__ import annotations
+from collections import Counter, defaultdict
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, Optional, Sequence, Tuple
+import json, re, sqlite3, threading, time
+
+import numpy as np
+
+from adapters.db import cypher as C
+from adapters.db.bulk import BulkReport
+from adapters.db.graph_snapshot import GraphSnapshot
+from adapters.db.neo4j import chunk_rows
+from graph_based.utils.lexical import LexicalIndex
+from graph_based.utils.types import Community, EdgeRecord, NodeRecord
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS graph (
+    kind TEXT NOT NULL,
+    series TEXT NOT NULL,
+    key TEXT NOT NULL,
+    value TEXT NOT NULL,
+    PRIMARY KEY (kind, series, key)
+);
+"""
+
+# Propriétés Chunk (mêmes noms que UPSERT_CHUNKS) <- colonnes de chunk_rows
+_CHUNK_PROPS = {"id": "cid", "series": "series", "file": "file", "page": "page", "text": "text", "order": "order",
+                "provider": "provider", "model": "model", "dims": "dims", "ts": "ts", "text_hash": "text_hash",
+                "build_id": "build_id", "embedding": "vec"}
+
+# label d'index vectoriel -> table ; propriété vecteur par défaut
+_LABEL_KIND = {"Chunk": "chunk", "Entity": "entity"}
+
+
+def _safe_index_name(raw: str) -> str:
+    return re.sub(r"[^A-Za-z0-9_]", "_", raw)
+
+
+def _union(a: Iterable[Any], b: Iterable[Any]) -> List[Any]:
+    return list(dict.fromkeys([*(a or []), *(b or [])]))
+
+
+def label_propagation(snap: GraphSnapshot, *, keep: Optional[np.ndarray] = None,
+                      groups: Optional[np.ndarray] = None, max_iter: int = 20) -> np.ndarray:
+    """
+    Propagation de labels pondérée par la conf des arêtes (déterministe: ordre des noeuds, égalités -> plus petit label).
+    - keep: masque des arêtes (positions CSR) conservées ; groups: les labels ne traversent pas les groupes.
+    Retourne un label (int) par noeud.
+    """
+    n = len(snap)
+    labels = np.arange(n, dtype=np.int64)
+    for _ in range(max_iter):
+        changed = 0
+        for u in range(n):
+            lo, hi = int(snap.indptr[u]), int(snap.indptr[u + 1])
+            votes: Dict[int, float] = defaultdict(float)
+            for e in range(lo, hi):
+                v = int(snap.indices[e])
+                if (keep is not None and not keep[e]) or (groups is not None and groups[v] != groups[u]):
+                    continue
+                votes[int(labels[v])] += float(snap.edge_conf[e]) or 1e-6
+            if not votes:
+                continue
+            best = max(votes.values())
+            lab = min(l for l, w in votes.items() if w == best)
+            if lab != labels[u]:
+                labels[u] = lab
+                changed += 1
+        if not changed:
+            break
+    return labels
+
+
+class EmbeddedGraphBackend:
+    """
+    Même contrat que Neo4jGraphBackend, sans serveur (tests, déploiements mono-poste):
+    - tables `chunk`, `entity`, `rel`, `member`, `parent`, `summary`, `index` : dict[series][key] -> valeur;
+    - `path` : fichier SQLite rechargé à l'ouverture et tenu à jour à chaque écriture (None => mémoire seule);
+    - voisins / chemins via GraphSnapshot, recherche lexicale via LexicalIndex (caches invalidés à l'écriture);
+    - communautés : propagation de labels par niveau (chaque niveau affine le précédent) au lieu de Leiden/GDS.
+    """
+
+    def __init__(self, path: Optional[Path] = None):
+        self.path = Path(path) if path else None
+        self._lock = threading.RLock()
+        self._data: Dict[str, Dict[str, Dict[str, Any]]] = defaultdict(lambda: defaultdict(dict))
+        self._snaps: Dict[str, GraphSnapshot] = {}
+        self._lex: Dict[str, LexicalIndex] = {}
+        self._mats: Dict[Tuple[str, str, Optional[str]], Tuple[List[Dict[str, Any]], np.ndarray]] = {}
+        self._conn: Optional[sqlite3.Connection] = None
+        if self.path is not None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(str(self.path), check_same_thread=False, timeout=30)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.executescript(_SCHEMA)
+            for kind, series, key, value in self._conn.execute("SELECT kind, series, key, value FROM graph"):
+                self._data[kind][series][key] = json.loads(value)
+
+    # ---------- stockage ----------
+    def _table(self, kind: str, series: str) -> Dict[str, Any]:
+        return self._data[kind][series]
+
+    def _put(self, kind: str, series: str, items: Mapping[str, Any]) -> None:
+        """Écrit des entrées (lock tenu) ; invalide les caches dérivés du graphe de la série."""
+        if not items:
+            return
+        self._data[kind][series].update(items)
+        if kind in ("entity", "rel"):
+            self._snaps.pop(series, None); self._lex.pop(series, None)
+        self._drop_mats(kind)
+        if self._conn is not None:
+            self._conn.executemany("INSERT OR REPLACE INTO graph(kind, series, key, value) VALUES (?,?,?,?)",
+                                   [(kind, series, k, json.dumps(v, ensure_ascii=False)) for k, v in items.items()])
+            self._conn.commit()
+
+    def _delete(self, kind: str, series: str, keys: Sequence[str]) -> None:
+        table = self._data[kind][series]
+        for k in keys:
+            table.pop(k, None)
+        self._drop_mats(kind)
+        if self._conn is not None and keys:
+            self._conn.executemany("DELETE FROM graph WHERE kind=? AND series=? AND key=?",
+                                   [(kind, series, k) for k in keys])
+            self._conn.commit()
+
+    def _drop_mats(self, kind: str) -> None:
+        """Invalide les matrices denses (query_top_k) construites sur `kind` (lock tenu)."""
+        for key in [k for k in self._mats if k[0] == kind]:
+            del self._mats[key]
+
+    def close(self) -> None:
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def ensure_schema(self) -> None:
+        """Rien à créer (schéma implicite)."""
+
+    # ---------- Chunks ----------
+    def iter_chunks(self, series: str, fields: Sequence[str] = C.DEFAULT_CHUNK_FIELDS, *,
+                    fetch_size: int = 1000) -> Iterator[Dict[str, Any]]:
+        cols = list(dict.fromkeys(["id", *fields]))
+        bad = [f for f in cols if f not in C.CHUNK_FIELDS]
+        if bad:
+            raise ValueError(f"unknown Chunk field(s): {bad}; allowed: {C.CHUNK_FIELDS}")
+        with self._lock:
+            rows = [self._table("chunk", series)[k] for k in sorted(self._table("chunk", series))]
+        for r in rows:
+            yield {f: r.get(f) for f in cols}
+
+    def upsert_chunks(self, rows: Sequence[Mapping[str, Any]], *, series: Optional[str] = None,
+                      approach: Optional[str] = None, build_id: Optional[str] = None) -> int:
+        by_series: Dict[str, Dict[str, Any]] = defaultdict(dict)
+        for r in chunk_rows(rows, series=series, approach=approach, build_id=build_id):
+            props = {p: r[c] for p, c in _CHUNK_PROPS.items() if r.get(c) is not None}
+            by_series[r["series"] or ""][r["cid"]] = props
+        with self._lock:
+            for s, items in by_series.items():
+                merged = {cid: {**self._table("chunk", s).get(cid, {}), **p} for cid, p in items.items()}
+                self._put("chunk", s, merged)
+        return sum(len(v) for v in by_series.values())
+
+    def chunk_fingerprints(self, series: str) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            return {cid: {"text_hash": c.get("text_hash"), "model": c.get("model"), "dims": c.get("dims")}
+                    for cid, c in self._table("chunk", series).items()}
+
+    def delete_chunks(self, cids: Sequence[str]) -> int:
+        n = 0
+        with self._lock:
+            for s, table in list(self._data["chunk"].items()):
+                doomed = [c for c in cids if c in table]
+                self._delete("chunk", s, doomed)
+                n += len(doomed)
+        return n
+
+    # ---------- Entités / relations ----------
+    def upsert_graph(self, series: str, nodes: Sequence[NodeRecord], edges: Sequence[EdgeRecord]) -> Dict[str, Any]:
+        """Mêmes règles de fusion que CUPSERT_* : alias et cids unis, description la plus longue, conf max."""
+        t0 = time.perf_counter()
+        with self._lock:
+            ents = self._table("entity", series)
+            new_e: Dict[str, Any] = {}
+            for r in nodes:
+                old = new_e.get(r["id"]) or ents.get(r["id"])
+                row = {"id": r["id"], "series": series, "name": r.get("name"), "type": r.get("type"),
+                       "aliases": list(r.get("aliases") or []), "desc": r.get("desc") or "",
+                       "conf": float(r.get("conf") or 0.0), "cids": list(r.get("cids") or [])}
+                if old:
+                    row.update(aliases=_union(old.get("aliases"), row["aliases"]),
+                               desc=row["desc"] if len(row["desc"]) > len(old.get("desc") or "") else old.get("desc", ""),
+                               conf=max(row["conf"], float(old.get("conf") or 0.0)),
+                               cids=_union(old.get("cids"), row["cids"]))
+                new_e[r["id"]] = row
+            self._put("entity", series, new_e)
+            t1 = time.perf_counter()
+
+            rels = self._table("rel", series)
+            new_r: Dict[str, Any] = {}
+            for r in edges:
+                if r["src_id"] not in ents or r["dst_id"] not in ents:
+                    continue  # MATCH des extrémités côté Cypher
+                old = new_r.get(r["id"]) or rels.get(r["id"])
+                row = {"id": r["id"], "src": r["src_id"], "dst": r["dst_id"], "pred": r.get("pred"),
+                       "cids": list(r.get("cids") or []), "conf": float(r.get("conf") or 0.0)}
+                if old:
+                    row.update(cids=_union(old.get("cids"), row["cids"]), conf=max(row["conf"], float(old.get("conf") or 0.0)))
+                new_r[r["id"]] = row
+            self._put("rel", series, new_r)
+            t2 = time.perf_counter()
+            chunks = self._table("chunk", series)
+            mentions = sum(1 for e in new_e.values() for c in e["cids"] if c in chunks)
+
+        return {"entities": BulkReport("graph entities", len(nodes), len(new_e), 1, 0, t1 - t0).as_dict(),
+                "relations": BulkReport("graph relations", len(edges), len(new_r), 1, 0, t2 - t1).as_dict(),
+                "mentions": BulkReport("graph mentions", len(nodes), mentions, 1, 0, 0.0).as_dict()}
+
+    def graph_snapshot(self, series: str) -> GraphSnapshot:
+        with self._lock:
+            snap = self._snaps.get(series)
+            if snap is None:
+                ents = self._table("entity", series)
+                nodes = [ents[k] for k in sorted(ents)]
+                edges = list(self._table("rel", series).values())
+                snap = self._snaps[series] = GraphSnapshot.from_rows(series, nodes, edges, version=len(edges))
+            return snap
+
+    def neighbors(self, series: str, node_id: str) -> List[Tuple[str, str, float]]:
+        return self.graph_snapshot(series).neighbors(node_id)
+
+    def find_paths(self, series: str, src: str, dst: str, *, max_hops: int = 3, theta: float = 0.0,
+                   limit: int = 6) -> List[Dict[str, Any]]:
+        return self.graph_snapshot(series).paths(src, dst, max_hops=max_hops, theta=theta, limit=limit)
+
+    def search_entities(self, series: str, terms: Sequence[str], n: int = 30) -> List[Dict[str, Any]]:
+        with self._lock:
+            idx = self._lex.get(series)
+            if idx is None:
+                idx = self._lex[series] = LexicalIndex(self._table("entity", series).values())
+        return [{**d, "score": sc} for d, sc in idx.search(terms, n=int(n))]
+
+    # ---------- Communautés ----------
+    def detect_communities(self, series: str, *, levels: int = 3, resolution: float = 1.2) -> List[Community]:
+        """
+        Niveau 0: propagation de labels sur tout le graphe. Niveau l > 0: dans chaque communauté du niveau
+        précédent, on ne garde que les arêtes de conf >= quantile q_l = 1 - 1/(1 + 0.5*l*resolution)
+        (même esprit que le gamma croissant de Leiden: communautés de plus en plus fines).
+        """
+        snap = self.graph_snapshot(series)
+        out: List[Community] = []
+        groups: Optional[np.ndarray] = None
+        for lvl in range(levels):
+            keep = None
+            if lvl and snap.edge_conf.size:
+                q = 1.0 - 1.0 / (1.0 + 0.5 * lvl * resolution)
+                keep = snap.edge_conf >= np.quantile(snap.edge_conf, q)
+            labels = label_propagation(snap, keep=keep, groups=groups)
+            cids = {lab: str(i) for i, lab in enumerate(dict.fromkeys(labels.tolist()))}
+            members: Dict[str, List[str]] = defaultdict(list)
+            for i, lab in enumerate(labels.tolist()):
+                members[cids[lab]].append(snap.ids[i])
+            with self._lock:
+                self._delete("member", series, [k for k in self._table("member", series) if k.startswith(f"{lvl}|")])
+                self._put("member", series, {f"{lvl}|{eid}": cid for cid, ids in members.items() for eid in ids})
+            out.extend({"id": f"{lvl}:{cid}", "level": lvl, "cid": cid, "node_ids": ids, "parent_id": None}
+                       for cid, ids in members.items())
+            groups = labels
+        return out
+
+    def _memberships(self, series: str, level: int) -> Dict[str, str]:
+        pre = f"{level}|"
+        return {k[len(pre):]: cid for k, cid in self._table("member", series).items() if k.startswith(pre)}
+
+    def wire_hierarchy(self, series: str, lo: int, hi: int) -> int:
+        with self._lock:
+            m_lo, m_hi = self._memberships(series, lo), self._memberships(series, hi)
+            pairs = Counter((c, m_hi[e]) for e, c in m_lo.items() if e in m_hi)
+            self._put("parent", series, {f"{lo}|{hi}|{a}|{b}": n for (a, b), n in pairs.items()})
+        return len(pairs)
+
+    def community_members(self, series: str, level: int, cid: str, k: int = 40) -> List[Dict[str, Any]]:
+        """Top membres par degré (priorise les entités “centrales”)."""
+        with self._lock:
+            ents = self._table("entity", series)
+            deg: Counter = Counter()
+            for r in self._table("rel", series).values():
+                deg[r["src"]] += 1; deg[r["dst"]] += 1
+            ids = [e for e, c in self._memberships(series, level).items() if c == cid and e in ents]
+        ids.sort(key=lambda e: (-deg[e], e))
+        return [{"name": ents[e].get("name"), "type": ents[e].get("type"), "desc": ents[e].get("desc") or ""}
+                for e in ids[:k]]
+
+    # ---------- Résumés ----------
+    def write_summary(self, series: str, level: int, cid: str, summary: str) -> None:
+        with self._lock:
+            self._put("summary", series, {f"{level}|{cid}": summary})
+
+    def read_summaries(self, series: str, levels: Optional[Sequence[int]] = None) -> List[Dict[str, Any]]:
+        out = []
+        with self._lock:
+            for key, text in self._table("summary", series).items():
+                lvl, cid = key.split("|", 1)
+                if levels is None or int(lvl) in levels:
+                    out.append({"id": f"{lvl}:{cid}", "level": int(lvl), "text": text, "vec": None})
+        return out
+
+    # ---------- Vecteurs ----------
+    def entity_texts(self, series: str) -> List[Dict[str, Any]]:
+        with self._lock:
+            ents = self._table("entity", series)
+            return [{"id": k, "text": ents[k].get("desc") or ents[k].get("name")} for k in sorted(ents)]
+
+    def write_entity_vectors(self, rows: Sequence[Mapping[str, Any]]) -> None:
+        with self._lock:
+            for s, ents in list(self._data["entity"].items()):
+                upd = {r["id"]: {**ents[r["id"]], "evec": list(map(float, r["vec"]))} for r in rows if r["id"] in ents}
+                self._put("entity", s, upd)
+
+    def check_index_exists(self, name: str) -> bool:
+        with self._lock:
+            return _safe_index_name(name) in self._table("index", "")
+
+    def create_vector_index(self, name: str, *, label: str = "Chunk", prop: str = "embedding",
+                            dimensions: int = 768, similarity: str = "cosine") -> None:
+        with self._lock:
+            self._put("index", "", {_safe_index_name(name): {"label": label, "prop": prop, "dims": int(dimensions)}})
+
+    def query_top_k(self, index_name: str, query_vec: Sequence[float], k: int = 5,
+                    series: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Top-k cosine brute-force sur les noeuds du label de l'index (forme de C.QUERY_TOP_K)."""
+        with self._lock:
+            spec = self._table("index", "").get(_safe_index_name(index_name))
+            if spec is None or spec["label"] not in _LABEL_KIND:
+                return []
+            key = (_LABEL_KIND[spec["label"]], spec["prop"], series)
+            hit = self._mats.get(key)
+            if hit is None:
+                # matrice normalisée gardée jusqu'à la prochaine écriture du même type (_put/_delete)
+                rows = [r for s, t in self._data[key[0]].items() if series is None or s == series
+                        for r in t.values() if r.get(spec["prop"]) is not None]
+                mat = np.asarray([r[spec["prop"]] for r in rows], dtype=np.float32)
+                if rows:
+                    mat /= np.maximum(np.linalg.norm(mat, axis=1, keepdims=True), 1e-12)
+                hit = self._mats[key] = (rows, mat)
+        rows, mat = hit
+        if not rows:
+            return []
+        q = np.asarray(query_vec, dtype=np.float32)
+        scores = mat @ (q / max(float(np.linalg.norm(q)), 1e-12))
+        top = np.argsort(-scores, kind="stable")[:int(k)]
+        return [{"eid": rows[i]["id"], "labels": [spec["label"]], "id": rows[i]["id"], "name": rows[i].get("name"),
+                 "text": rows[i].get("text"), "score": float(scores[i])} for i in top]
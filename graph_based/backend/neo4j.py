@@ -0,0 +1,318 @@
+# graph_based/backend/neo4j.py
+# GraphBackend sur Neo4j : regroupe le Cypher des modules graph_based autour de Neo4jAdapter.
+from __future__ import annotations
+from collections import defaultdict
+from typing import Any, Dict, Iterator, List, Mapping, Optional, Sequence, Tuple
+import logging, re, time
+
+from neo4j.exceptions import Neo4jError
+
+from adapters.db import cypher as C
+from graph_based.utils.lexical import LexicalIndex, lucene_query
+from graph_based.utils.types import Community, EdgeRecord, NodeRecord
+
+log = logging.getLogger(__name__)
+
+# ---------------- Contraintes (à exécuter une fois) ----------------
+# Syntaxe 5.x ; en 4.x utiliser le triplet 'ON (...) ASSERT ...' (erreurs ignorées)
+CONSTRAINTS_5X = [
+    """CREATE CONSTRAINT entity_id IF NOT EXISTS FOR (e:Entity) REQUIRE e.id IS UNIQUE;""",
+    """CREATE CONSTRAINT chunk_id  IF NOT EXISTS FOR (c:Chunk)  REQUIRE c.id IS UNIQUE;""",
+    """CREATE CONSTRAINT rel_id    IF NOT EXISTS FOR ()-[r:REL]-() REQUIRE r.id IS UNIQUE;""",
+]
+
+# ---------------- Upsert (graph_store) ----------------
+CUPSERT_ENTITIES = """UNWIND $rows AS r
+MERGE (e:Entity {id: r.id})
+  ON CREATE SET e.series = $series, e.name = r.name, e.type = r.type,
+                e.aliases = coalesce(r.aliases, []), e.desc = coalesce(r.desc, ""),
+                e.conf = coalesce(r.conf, 0.0)
+  ON MATCH  SET e.name   = r.name,
+                e.type   = r.type,
+                e.aliases = apoc.coll.toSet(coalesce(e.aliases, []) + coalesce(r.aliases, [])),
+                e.desc   = CASE WHEN size(coalesce(r.desc,"")) > size(coalesce(e.desc,"")) THEN r.desc ELSE e.desc END,
+                e.conf   = CASE WHEN r.conf > e.conf THEN r.conf ELSE e.conf END
+SET e.aliases_text = reduce(acc = "", a IN coalesce(e.aliases, []) | acc + " " + a);
+"""
+
+CUPSERT_RELATIONS = """UNWIND $rels AS r
+MATCH (s:Entity {id: r.src_id})
+MATCH (o:Entity {id: r.dst_id})
+MERGE (s)-[e:REL {id: r.id}]->(o)
+  ON CREATE SET e.series = $series, e.pred = r.pred, e.cids = coalesce(r.cids, []),
+                e.conf = coalesce(r.conf, 0.0)
+  ON MATCH  SET e.pred = r.pred,
+                e.cids = apoc.coll.toSet(coalesce(e.cids, []) + coalesce(r.cids, [])),
+                e.conf = CASE WHEN r.conf > e.conf THEN r.conf ELSE e.conf END;
+"""
+
+# traces de mentions (mutual-indexing)
+LINK_MENTIONS = """
+UNWIND $rows AS r
+UNWIND coalesce(r.cids, []) AS cid
+MATCH (e:Entity {id: r.id})
+MATCH (c:Chunk  {id: cid})
+MERGE (e)-[:MENTIONED_IN]->(c);
+"""
+
+# ---------------- Chemins (flow_pruning, repli sans instantané) ----------------
+def paths_query(max_hops: int) -> str:
+    return f"""
+    MATCH (s:Entity {{id:$src, series:$series}}),
+          (t:Entity {{id:$dst, series:$series}})
+    MATCH p = (s)-[r:REL*1..{int(max_hops)}]-(t)
+    WITH p, nodes(p) AS ns, relationships(p) AS rs
+    WHERE ALL(n IN ns WHERE coalesce(n.conf,0.5) >= $theta)
+      AND ALL(e IN rs WHERE coalesce(e.conf,0.5) >= $theta)
+    RETURN ns AS ns, rs AS rs, length(p) AS L
+    LIMIT $limit
+    """
+
+# ---------------- Communautés (GDS Leiden) ----------------
+GDS_DROP_IF_EXISTS = """
+CALL gds.graph.exists($graphName) YIELD exists
+WITH exists
+WHERE exists
+CALL gds.graph.drop($graphName) YIELD graphName
+RETURN graphName;
+"""
+
+# Projection cypher filtrée par série, non orientée (requis par Leiden), poids = 'weight'
+GDS_PROJECT = """
+CALL gds.graph.project.cypher(
+  $graphName,
+  'MATCH (n:Entity)
+   WHERE n.series = $series
+   RETURN id(n) AS id',
+  'MATCH (n:Entity {series: $series})-[r:RELATED_TO]->(m:Entity {series: $series})
+   RETURN id(n) AS source, id(m) AS target, "RELATED_TO" AS type,
+          coalesce(r.weight, 1.0) AS weight',
+  { relationshipProperties: "weight",
+    undirectedRelationshipTypes: ["RELATED_TO"] }
+)
+YIELD graphName, nodeCount, relationshipCount;
+"""
+
+LEIDEN_STREAM = """
+CALL gds.leiden.stream(
+  $graphName,
+  { relationshipWeightProperty: 'weight', gamma: $gamma }
+)
+YIELD nodeId, communityId
+RETURN nodeId, communityId, gds.util.asNode(nodeId).id AS eid;
+"""
+
+LEIDEN_WRITE = """
+UNWIND $rows AS r
+MATCH (e:Entity)
+WHERE id(e) = r.nodeId
+MERGE (c:Community {series: $series, level: $lvl, cid: toString(r.communityId)})
+MERGE (e)-[:IN_COMMUNITY {series: $series, level: $lvl}]->(c);
+"""
+
+GDS_DROP = "CALL gds.graph.drop($graphName, false) YIELD graphName RETURN graphName"
+
+# ---------------- Hiérarchie ----------------
+HIERARCHY_PARENT = """
+MATCH (cLo:Community {series:$series, level:$lo})<-[:IN_COMMUNITY {series:$series, level:$lo}]-(e:Entity {series:$series})
+        MATCH (e)-[:IN_COMMUNITY {series:$series, level:$hi}]->(cHi:Community {series:$series, level:$hi})
+        WITH cLo, cHi, count(e) AS overlap
+        WHERE overlap > 0
+        MERGE (cLo)-[p:PARENT {series:$series, from:$lo, to:$hi}]->(cHi)"""
+
+HIERARCHY_COUNT = """
+MATCH (:Community {series:$series, level:$lo})-[p:PARENT {series:$series, from:$lo, to:$hi}]->(:Community {series:$series, level:$hi})
+        RETURN count(p) AS n
+"""
+
+# ---------------- Résumés ----------------
+COMMUNITY_MEMBERS = """
+MATCH (c:Community {series:$series, level:$level, cid:$cid})<-[:IN_COMMUNITY {series:$series, level:$level}]-(e:Entity {series:$series})
+WITH e, size((e)-[:REL {series:$series}]-()) AS deg
+ORDER BY deg DESC LIMIT $k
+RETURN e.name AS name, e.type AS type, coalesce(e.desc, "") AS desc
+"""
+
+WRITE_COMMUNITY_SUMMARY = """
+MATCH (c:Community {series:$series, level:$level, cid:$cid})
+SET c.summary = $summary
+"""
+
+# Lus là où WRITE_COMMUNITY_SUMMARY écrit (Community.summary) ; id "<level>:<cid>" comme le backend embarqué
+READ_SUMMARIES = """
+MATCH (c:Community {series:$series})
+WHERE c.summary IS NOT NULL AND ($levels IS NULL OR c.level IN $levels)
+RETURN toString(c.level) + ":" + c.cid AS id, c.level AS level, c.summary AS text, c.summary_vec AS vec
+"""
+
+# ---------------- Index des entités ----------------
+GET_ENTITIES = """
+MATCH (e:Entity) WHERE e.series = $series
+RETURN e.id AS id, coalesce(e.desc, e.name) AS text
+ORDER BY id
+"""
+
+WRITE_ENTITY_VECS = """
+UNWIND $rows AS r
+MATCH (e:Entity {id:r.id})
+SET e.evec = r.vec
+"""
+
+# Repli Python (pas d'index full-text): index inversé par (adapter, série), reconstruit après _FALLBACK_TTL_S
+_FALLBACK: Dict[Tuple[int, str], Tuple[float, LexicalIndex]] = {}
+_FALLBACK_TTL_S = 60.0
+
+
+def _extract_path_record(p_row) -> Dict[str, Any]:
+    """
+    Résultat Cypher (nodes(p) AS ns, relationships(p) AS rs, length(p) AS L) -> dict portable.
+    """
+    nodes = [{"id": n.get("id"), "name": n.get("name", ""), "conf": float(n.get("conf", 0.5))} for n in p_row["ns"]]
+    edges = [{"pred": r.get("pred") or r.get("type", "REL"), "conf": float(r.get("conf", 0.5))} for r in p_row["rs"]]
+    return {"nodes": nodes, "edges": edges, "length": int(p_row["L"])}
+
+
+class Neo4jGraphBackend:
+    """
+    GraphBackend adossé à un Neo4jAdapter (ou tout objet exposant `run_cypher`, ex. doublures de test).
+    Chunks, vecteurs et écritures en masse sont délégués à l'adapter ; le Cypher propre à graph_based vit ici.
+    """
+
+    def __init__(self, db):
+        self.db = db
+
+    # ---------- Schéma ----------
+    def ensure_schema(self) -> None:
+        for q in CONSTRAINTS_5X:
+            try:
+                self.db.run_cypher(q)
+            except Exception:
+                pass  # à ignorer si version 4.x
+        # (rattrapage aliases_text: migration unique de Neo4jAdapter.ensure_base_schema)
+
+    # ---------- Chunks (délégués) ----------
+    def iter_chunks(self, series: str, fields: Sequence[str] = C.DEFAULT_CHUNK_FIELDS, *,
+                    fetch_size: int = 1000) -> Iterator[Dict[str, Any]]:
+        return self.db.iter_chunks(series, fields, fetch_size=fetch_size)
+
+    def upsert_chunks(self, rows: Sequence[Mapping[str, Any]], *, series: Optional[str] = None,
+                      approach: Optional[str] = None, build_id: Optional[str] = None) -> int:
+        return self.db.upsert_chunks(rows, series=series, approach=approach, build_id=build_id)
+
+    def chunk_fingerprints(self, series: str) -> Dict[str, Dict[str, Any]]:
+        return self.db.chunk_fingerprints(series)
+
+    def delete_chunks(self, cids: Sequence[str]) -> int:
+        return self.db.delete_chunks(cids)
+
+    # ---------- Entités / relations ----------
+    def upsert_graph(self, series: str, nodes: Sequence[NodeRecord], edges: Sequence[EdgeRecord]) -> Dict[str, Any]:
+        # Les entités d'abord: relations et mentions font MATCH sur les noeuds Entity.
+        ents = self.db.bulk_write(CUPSERT_ENTITIES, nodes, key="id", params={"series": series}, label="graph entities")
+        rels = self.db.bulk_write(CUPSERT_RELATIONS, edges, param="rels", key=("src_id", "dst_id"),
+                                  params={"series": series}, label="graph relations")
+        # Mentions: une ligne verrouille l'entité et tous ses chunks => partition sur l'ensemble
+        ments = self.db.bulk_write(LINK_MENTIONS, nodes, key=lambda r: (r.get("id"), *(r.get("cids") or ())),
+                                   params={"series": series}, label="graph mentions")
+        self.db.touch_graph([series])   # CUPSERT_* modifient conf/pred en place: instantanés à recharger
+        return {"entities": ents.as_dict(), "relations": rels.as_dict(), "mentions": ments.as_dict()}
+
+    def neighbors(self, series: str, node_id: str) -> List[Tuple[str, str, float]]:
+        return self.db.neighbors(series, node_id)
+
+    def _use_snapshot(self) -> bool:
+        """Instantané CSR disponible (Neo4jAdapter) et activé (neo4j.snapshot.enabled)."""
+        from app.core.config import get_settings
+        return hasattr(self.db, "graph_snapshot") and get_settings().neo4j.snapshot.enabled
+
+    def find_paths(self, series: str, src: str, dst: str, *, max_hops: int = 3, theta: float = 0.0,
+                   limit: int = 6) -> List[Dict[str, Any]]:
+        if self._use_snapshot():
+            # parcours local (CSR en mémoire): pas d'aller-retour Bolt par paire
+            return self.db.graph_snapshot(series).paths(src, dst, max_hops=max_hops, theta=theta, limit=limit)
+        rows = self.db.run_cypher(paths_query(max_hops), {"src": src, "dst": dst, "series": series,
+                                                          "theta": float(theta), "limit": int(limit)},
+                                  name="pathrag.flow_pruning.topK")
+        return [_extract_path_record(r) for r in rows]
+
+    def _fallback_index(self, series: str) -> LexicalIndex:
+        key = (id(self.db), series)
+        hit = _FALLBACK.get(key)
+        if hit is None or time.monotonic() - hit[0] > _FALLBACK_TTL_S:
+            docs = self.db.run_cypher(C.ENTITY_LEXICAL_DOCS, {"series": series}, name="pathrag.node_retrieval.docs") or []
+            hit = _FALLBACK[key] = (time.monotonic(), LexicalIndex(docs))
+        return hit[1]
+
+    def search_entities(self, series: str, terms: Sequence[str], n: int = 30) -> List[Dict[str, Any]]:
+        """Index full-text `entity_lexical_ft` (un aller-retour) ; repli index inversé Python si indisponible."""
+        try:
+            rows = self.db.run_cypher(C.ENTITY_LEXICAL_SEARCH,
+                                      {"q": lucene_query(series, terms), "series": series, "limit": int(n) * 4},
+                                      name="pathrag.node_retrieval.topN")
+        except Neo4jError as ex:
+            log.warning("node_retrieval: index full-text indisponible (%s), repli Python", ex)
+            rows = None
+        if rows is None:    # erreur, ou adapter qui renvoie None au lieu de lever
+            return [{**d, "score": sc} for d, sc in self._fallback_index(series).search(terms, n=int(n))]
+        return rows
+
+    # ---------- Communautés ----------
+    def detect_communities(self, series: str, *, levels: int = 3, resolution: float = 1.2) -> List[Community]:
+        """Leiden (GDS) par niveau, résolution croissante ; écrit (:Community) et [:IN_COMMUNITY]."""
+        graphname = f"g_{re.sub(r'[^A-Za-z0-9_]', '_', series)}"
+        self.db.run_cypher(GDS_DROP_IF_EXISTS, {"graphName": graphname})  # pas grave si n'existe pas
+        self.db.run_cypher(GDS_PROJECT, {"graphName": graphname, "series": series})
+        out: List[Community] = []
+        try:
+            for lvl in range(levels):
+                gamma = resolution * (1.0 + 0.5 * lvl)  # plus haut = communautés plus fines
+                rows = [dict(r) for r in self.db.run_cypher(LEIDEN_STREAM, {"graphName": graphname, "gamma": gamma},
+                                                             name="leiden.stream")]
+                if rows:
+                    self.db.run_cypher(LEIDEN_WRITE, {"rows": rows, "series": series, "lvl": lvl}, name="leiden.write")
+                members: Dict[str, List[str]] = defaultdict(list)
+                for r in rows:
+                    members[str(r["communityId"])].append(r.get("eid"))
+                out.extend({"id": f"{lvl}:{cid}", "level": lvl, "cid": cid, "node_ids": ids, "parent_id": None}
+                           for cid, ids in members.items())
+        finally:
+            self.db.run_cypher(GDS_DROP, {"graphName": graphname})
+        return out
+
+    def wire_hierarchy(self, series: str, lo: int, hi: int) -> int:
+        params = {"series": series, "lo": lo, "hi": hi}
+        self.db.run_cypher(HIERARCHY_PARENT, params, name="hierarchy.parent")
+        rows = self.db.run_cypher(HIERARCHY_COUNT, params, name="hierarchy.count") or [{"n": 0}]
+        return int(rows[0]["n"])
+
+    def community_members(self, series: str, level: int, cid: str, k: int = 40) -> List[Dict[str, Any]]:
+        """Top membres par degré (priorise les entités “centrales”)."""
+        return self.db.run_cypher(COMMUNITY_MEMBERS, {"series": series, "level": level, "cid": cid, "k": k},
+                                  name="comm_summaries.members_blob")
+
+    # ---------- Résumés ----------
+    def write_summary(self, series: str, level: int, cid: str, summary: str) -> None:
+        self.db.run_cypher(WRITE_COMMUNITY_SUMMARY, {"series": series, "level": level, "cid": cid, "summary": summary},
+                           name="comm_summaries.write")
+
+    def read_summaries(self, series: str, levels: Optional[Sequence[int]] = None) -> List[Dict[str, Any]]:
+        return self.db.run_cypher(READ_SUMMARIES, {"series": series, "levels": list(levels) if levels else None},
+                                  name="index_search.search")
+
+    # ---------- Vecteurs ----------
+    def entity_texts(self, series: str) -> List[Dict[str, Any]]:
+        return [dict(r) for r in self.db.run_cypher(GET_ENTITIES, {"series": series}, name="index_search.sync.entities")]
+
+    def write_entity_vectors(self, rows: Sequence[Mapping[str, Any]]) -> None:
+        self.db.run_cypher(WRITE_ENTITY_VECS, {"rows": list(rows)}, name="index_search.sync.write_vecs")
+
+    def check_index_exists(self, name: str) -> bool:
+        return self.db.check_index_exists(name)
+
+    def create_vector_index(self, name: str, *, label: str = "Chunk", prop: str = "embedding",
+                            dimensions: int = 768, similarity: str = "cosine") -> None:
+        self.db.create_vector_index(name, label=label, prop=prop, dimensions=dimensions, similarity=similarity)
+
+    def query_top_k(self, index_name: str, query_vec: Sequence[float], k: int = 5,
+                    series: Optional[str] = None) -> List[Dict[str, Any]]:
+        return self.db.query_top_k(index_name, query_vec, k=k, series=series)
@@ -0,0 +1,82 @@
+# graph_based/evaluation/bench_runtime.py
+# Benchmarks runtime : index vectoriels locaux (latence, mémoire, recall@k vs recherche exacte).
+from __future__ import annotations
+import argparse, json, tempfile, time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+import numpy as np
+
+from adapters.vector.base import InMemoryIndex, VectorIndex
+from adapters.vector.mmap import MmapIndex
+from adapters.vector.ivf import IVFIndex
+from adapters.vector.quantized import QuantizedIndex
+
+
+def recall_at_k(got: Sequence[Sequence[str]], ref: Sequence[Sequence[str]]) -> float:
+    """Moyenne sur les requêtes de |top-k approché ∩ top-k exact| / k."""
+    if not ref:
+        return 0.0
+    return float(np.mean([len(set(g) & set(r)) / max(1, len(r)) for g, r in zip(got, ref)]))
+
+
+def _timed_search(index: VectorIndex, queries: np.ndarray, k: int) -> tuple:
+    index.search(queries[0], k=k)  # échauffement (entraînement / encodage paresseux)
+    t0 = time.perf_counter()
+    hits = [[h.id for h in index.search(q, k=k)] for q in queries]
+    return hits, (time.perf_counter() - t0) * 1000.0 / len(queries)
+
+
+def bench_vector_indexes(vectors: np.ndarray, queries: np.ndarray, *, k: int = 10,
+                         workdir: Optional[Path] = None, nprobe: int = 8, rerank: int = 4) -> List[Dict[str, Any]]:
+    """
+    Compare les index locaux à la recherche exacte (InMemoryIndex).
+    - Output: [{"index","recall@k","ms_per_query","resident_bytes"}...]
+    """
+    ids = [str(i) for i in range(vectors.shape[0])]
+    tmp = tempfile.TemporaryDirectory() if workdir is None else None
+    root = Path(workdir or tmp.name)
+    try:
+        exact = InMemoryIndex(vectors.shape[1]); exact.add(ids, vectors)
+        ref, ms = _timed_search(exact, queries, k)
+        out = [{"index": "exact", f"recall@{k}": 1.0, "ms_per_query": ms, "resident_bytes": int(exact.matrix.nbytes)}]
+
+        disk = MmapIndex(root / "vectors"); disk.add(ids, vectors)
+        candidates = {
+            "ivf": IVFIndex(disk, nprobe=nprobe),
+            "int8": QuantizedIndex(disk, codes="int8", rerank=rerank),
+            "float16": QuantizedIndex(disk, codes="float16", rerank=rerank),
+        }
+        for name, index in candidates.items():
+            got, ms = _timed_search(index, queries, k)
+            out.append({"index": name, f"recall@{k}": recall_at_k(got, ref), "ms_per_query": ms,
+                        "resident_bytes": getattr(index, "nbytes", None)})
+        return out
+    finally:
+        if tmp is not None:
+            tmp.cleanup()
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    ap = argparse.ArgumentParser(description="recall@k / latence des index vectoriels locaux")
+    ap.add_argument("--n", type=int, default=20000)
+    ap.add_argument("--dim", type=int, default=1024)
+    ap.add_argument("--queries", type=int, default=100)
+    ap.add_argument("-k", type=int, default=10)
+    ap.add_argument("--vectors", type=Path, help="matrice .npy (sinon données synthétiques en clusters)")
+    args = ap.parse_args(argv)
+
+    rng = np.random.default_rng(0)
+    if args.vectors:
+        vecs = np.load(args.vectors).astype(np.float32)
+    else:
+        centers = rng.normal(size=(max(8, args.n // 200), args.dim))
+        vecs = (centers[rng.integers(0, centers.shape[0], args.n)]
+                + 0.3 * rng.normal(size=(args.n, args.dim))).astype(np.float32)
+    qs = vecs[rng.choice(vecs.shape[0], size=args.queries, replace=False)]
+    qs = qs + 0.05 * rng.normal(size=qs.shape).astype(np.float32)
+    for row in bench_vector_indexes(vecs, qs, k=args.k):
+        print(json.dumps(row))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,10 @@
 
 from cmath import log
-import json, re
+import itertools, json, re
 from typing import Any, Tuple, List
 
-from app.core.resources import get_db, get_provider
+from app.core.resources import get_graph_backend, get_provider
+from adapters.llm.llm_cache import ask_cached, json_object_reply
 from graph_based.utils.types import NodeRecord, EdgeRecord
 from graph_based.utils.tokenize import fit
 from graph_based.utils.ids import node_id, stable_id
@@ -65,19 +66,21 @@ def run(series: str, *, min_conf: float = 0.35, max_ctx_tokens: int = 1200) -> T
     - Appelé par: pipelines.build_graph.run
     """
     # database et provider LLM depuis resources
-    db, provider = get_db(), get_provider()
+    db, provider = get_graph_backend(), get_provider()
 
     min_conf = float(min_conf or 0.0)
     nodes, edges = [], []
     seen_node_key = set()   # (name_lower, type)
     seen_edge_key = set()   # (src_id, pred, dst_id)
 
-    db_chunks = db.stream_chunks(series)
-    if not db_chunks:
+    # id + texte seulement (pas d'embedding sur Bolt), lus page par page
+    db_chunks = db.iter_chunks(series, ("id", "text"))
+    first = next(db_chunks, None)
+    if first is None:
         raise ValueError(f"series '{series}' not found or has no chunks")
-    
-    for i, rec in enumerate(db_chunks):
-        cid = rec["id"] if "id" in rec else rec.get("cid")  # harmoniser si besoin
+
+    for i, rec in enumerate(itertools.chain([first], db_chunks)):
+        cid = rec["id"]
         text = rec["text"] or ""
         if i < 2: print("chunk", i, cid, text[:80])
 
@@ -87,7 +90,7 @@ def run(series: str, *, min_conf: float = 0.35, max_ctx_tokens: int = 1200) -> T
         prompt = render_canonicalize_prompt(  # charge prompts/kg_canonicalize.md puis format
             series=series, cid=cid, chunk_text=text_fit
         )
-        raw = provider.ask_llm(prompt)
+        raw = ask_cached(provider, prompt, caller="kg.canonicalize", validate=json_object_reply)
         if i < 2:
             print(f"[canonicalize] cid={cid} raw_out[:240]={raw[:240]}")
         data = _safe_parse_json(raw)
@@ -3,6 +3,7 @@ import json
 import re
 from typing import List, Tuple, Dict, Any
 from app.core.resources import get_db, get_provider
+from adapters.llm.llm_cache import ask_cached, json_object_reply
 from graph_based.prompts import render_template
 from graph_based.utils.types import NodeRecord, EdgeRecord
 from graph_based.utils.ids import node_id, stable_id
@@ -86,7 +87,7 @@ def run(series: str, nodes: List[NodeRecord], edges: List[EdgeRecord]) -> Tuple[
               "desc": (g.get("desc") or "")[:160] } for g in group
         ]
         prompt = render_el_prompt(mention=mention, candidates=candidates)
-        raw = provider.ask_llm(prompt)
+        raw = ask_cached(provider, prompt, caller="kg.el", validate=json_object_reply)
         data = _safe_parse_json(raw)
         winner = data.get("winner") or "NONE"
         if winner == "NONE":
@@ -3,6 +3,8 @@ from typing import List
 from graph_based.utils.types import Community, Summary
 from typing import List
 from graph_based.utils import tokenize
+from graph_based.backend import as_backend
+from adapters.llm.llm_cache import ask_cached
 
 
 def _render_comm_prompt(members_text: str, level: int) -> str:
@@ -12,24 +14,13 @@ def _render_comm_prompt(members_text: str, level: int) -> str:
 
 def _members_blob(db, series: str, level: int, cid: str, max_members: int = 40) -> str:
     # Top membres par degré (priorise les entités “centrales”)
-    rows = db.run_cypher("""
-    MATCH (c:Community {series:$series, level:$level, cid:$cid})<-[:IN_COMMUNITY {series:$series, level:$level}]-(e:Entity {series:$series})
-    WITH e, size((e)-[:REL {series:$series}]-()) AS deg
-    ORDER BY deg DESC LIMIT $k
-    RETURN e.name AS name, e.type AS type, coalesce(e.desc, "") AS desc
-    """, {"series": series, "level": level, "cid": cid, "k": max_members})
+    rows = as_backend(db).community_members(series, level, cid, k=max_members)
 
     lines = [f"- {r['name']} [{r['type']}]: {r['desc']}" for r in rows]
     # Tronquer pour respecter un budget de tokens
     blob = "\n".join(lines)
     return tokenize.fit(blob, max_tokens=1000)  # budget pour le contexte
 
-# CYPHER pour 
-CYPHER = """
-MATCH (c:Community {series:$series, level:$level, cid:$cid})
-SET c.summary = $summary
-"""
-
 from app.observability.pipeline import pipeline_step
 @pipeline_step("Graph Build - Community Summarization")
 def make(series: str, communities: List[Community], levels: List[str] = ["C0","C1"], *, db, provider, max_members: int = 40, max_tokens: int = 1200) -> List[Summary]:
@@ -39,6 +30,7 @@ def make(series: str, communities: List[Community], levels: List[str] = ["C0","C
     - Output: [{"community_id","level","kind","text","tokens"}...]
     - Note: pré-calcul offline; utilisé par QFS map/reduce.
     """
+    db = as_backend(db)
     done: List[Summary] = []
     target = set(levels)
 
@@ -54,9 +46,9 @@ def make(series: str, communities: List[Community], levels: List[str] = ["C0","C
         prompt = _render_comm_prompt(members_text, lvl)
         prompt = tokenize.fit(prompt, max_tokens=max_tokens)  # garde‑fou
 
-        summary = provider.ask_llm(prompt).strip()
+        summary = ask_cached(provider, prompt, caller="kg.comm_summaries").strip()
         # persist summary dans le nœud Community
-        db.run_cypher(CYPHER, {"series": series, "level": lvl, "cid": cid, "summary": summary})
+        db.write_summary(series, lvl, cid, summary)
 
         # done.append(f"{lvl}:{cid}")
         done.append({"community_id": cid, "level": lvl, "kind": "summary", "text": summary, "tokens": tokenize.count_tokens(summary)})
@@ -2,31 +2,13 @@
 import math
 from typing import Any, Dict, List, Optional, Iterable
 from graph_based.utils.tokenize import fit
+from graph_based.backend import as_backend
 
 
-# Index vectoriel (existe côté adapter) → db.create_vector_index(index, label, prop, dimensions, similarity='cosine')
-# Écriture embeddings entités (upsert propriété evec sur :Entity) :
-WRITE_ENTITY_VECS = """
-UNWIND $rows AS r
-MATCH (e:Entity {id:r.id})
-SET e.evec = r.vec
-"""
-
-# Récupère les entités à indexer (desc fallback name)
-GET_ENTITIES = """
-MATCH (e:Entity) WHERE e.series = $series
-RETURN e.id AS id, coalesce(e.desc, e.name) AS text
-ORDER BY id
-"""
-
-# Écriture embeddings entités (upsert propriété evec sur :Entity) :
-WRITE_ENTITY_VECS = """
-UNWIND $rows AS r
-MATCH (e:Entity {id:r.id})
-SET e.evec = r.vec
-"""
+# Lecture des entités / écriture des vecteurs (evec) / index: GraphBackend (graph_based/backend).
 
 from app.observability.pipeline import pipeline_step
+from app.core.resources import embed_query, get_vector_index
 @pipeline_step("Graph Build - Summarization Index Sync")
 def sync(series: str, *, db, provider, batch: int = 256, dim: int | None = None) -> Dict[str, Any]:
     """
@@ -34,12 +16,12 @@ def sync(series: str, *, db, provider, batch: int = 256, dim: int | None = None)
     -> Construit 'nodeIndex_{series}' en encodant Entity.desc (fallback: name)
     - Output: {"node_index": "...", "community_index": "...", "chunk_index": "..."}
     """
+    db = as_backend(db)
     node_index = f"nodeIndex_{series}"
     chunks_index = f"chunkIndex_{series}"  # celui créé par corpus/Embedder
 
     # 1) Récupère les entités à indexer (desc fallback name)
-    ents = db.run_cypher(GET_ENTITIES, {"series": series})
-    items = [dict(r) for r in ents if r["text"]]
+    items = [r for r in db.entity_texts(series) if r["text"]]
 
     # 2) Dimension
     if dim is None:
@@ -50,18 +32,21 @@ def sync(series: str, *, db, provider, batch: int = 256, dim: int | None = None)
     if not db.check_index_exists(node_index):
         db.create_vector_index(node_index, label="Entity", prop="evec", dimensions=dim, similarity="cosine")
 
-    # 4) Encodage batch + upsert evec
+    # 4) Encodage batch + upsert evec (+ index local "entities" si vector.type=mmap|ivf)
+    local = get_vector_index(series, "entities")
     buf = []
     for i in range(0, len(items), batch):
         chunk = items[i:i+batch]
         vecs = provider.embed_texts([x["text"] for x in chunk], dimensions=dim)
         for x, v in zip(chunk, vecs):
             buf.append({"id": x["id"], "vec": v})
+        if local is not None and vecs:
+            local.add([x["id"] for x in chunk], vecs, [{"text": x["text"]} for x in chunk])
         if len(buf) >= 1000:
-            db.run_cypher(WRITE_ENTITY_VECS, {"rows": buf})
+            db.write_entity_vectors(buf)
             buf.clear()
     if buf:
-        db.run_cypher(WRITE_ENTITY_VECS, {"rows": buf})
+        db.write_entity_vectors(buf)
 
     return {
         "nodes": len(items),
@@ -104,7 +89,7 @@ def search(series: str, query: str, *, db, provider, levels: Optional[list[int]]
     INPUTS
       - series: str
       - query: str
-      - db: adapter Neo4j existant (dispose de run_cypher)
+      - db: GraphBackend (ou adapter Neo4j, enveloppé)
       - provider: adapter LLM/embeddings existant (dispose de embed)
       - levels: liste des niveaux (ex: [0] pour C0, [0,1] pour C0→C1). None => tous
       - limit: nb max de résumés renvoyés
@@ -117,21 +102,16 @@ def search(series: str, query: str, *, db, provider, levels: Optional[list[int]]
         ]
       }
     Hypothèses de schéma:
-      - (:Summary {id, series, level, text, vec?})
+      - (:Community {series, level, cid, summary, summary_vec?}) (GraphBackend.write_summary)
     """
     # 1) Embedding de la requête (si provider supporte)
     try:
-        qvec = provider.embed(query)
+        qvec = embed_query(query, provider)
     except Exception:
         qvec = None
 
     # 2) Récupération des résumés (C0..Ck)
-    cypher = """
-    MATCH (s:Summary {series:$series})
-    WHERE $levels IS NULL OR s.level IN $levels
-    RETURN s.id AS id, s.level AS level, s.text AS text, s.vec AS vec
-    """
-    rows = [r for r in db.run_cypher(cypher, {"series": series, "levels": levels})]
+    rows = as_backend(db).read_summaries(series, levels)
 
     # 3) Scorage (cosine si vec dispo sinon simple recouvrement lex.)
     cands: List[Dict[str, Any]] = []
@@ -5,6 +5,7 @@ import json, re
 from pathlib import Path
 from graph_based.utils.tokenize import fit
 from graph_based.utils.types import QFSMapOut
+from adapters.llm.llm_cache import ask_cached, json_object_reply
 
 def _render_map_prompt(query: str, summary: str) -> str:
     # Charge le prompt Markdown et injecte {query} / {summary}
@@ -48,7 +49,7 @@ def run(series: str, query: str, *, candidates: List[Dict[str, Any]], provider,
     partials: List[Dict[str, Any]] = []
     for c in candidates:
         prompt = _render_map_prompt(query, fit(c["text"], max_tokens=max_map_tokens))
-        raw = provider.ask_llm(prompt)
+        raw = ask_cached(provider, prompt, caller="qfs.map", validate=json_object_reply)
         js = _parse_json_safe(raw)
         partials.append({
             "id": c["id"],
@@ -5,6 +5,7 @@ import json, re
 from pathlib import Path
 from graph_based.utils.tokenize import fit
 from graph_based.utils.types import QFSFinal
+from adapters.llm.llm_cache import ask_cached, json_object_reply
 
 def _render_reduce_prompt(query: str, parts: List[Dict[str, Any]], max_ctx_tokens:int) -> str:
     tmpl = Path("graph_based/prompts/qfs_reduce.md").read_text(encoding="utf-8")
@@ -51,7 +52,7 @@ def run(series: str, query: str, *, partials: List[Dict[str, Any]], provider, ma
 
     """
     prompt = _render_reduce_prompt(query, partials, max_ctx_tokens=max_reduce_tokens)
-    raw = provider.ask_llm(prompt)
+    raw = ask_cached(provider, prompt, caller="qfs.reduce", validate=json_object_reply)
     js = _parse_json_safe(raw)
     used = [u for u in js.get("used", []) if isinstance(u, str)]
     # citations simples = preuve 1ère phrase de chaque partiel utilisé
@@ -3,6 +3,8 @@ from __future__ import annotations
 from typing import List, Dict, Any
 from itertools import combinations
 
+from graph_based.backend import as_backend
+
 
 
 def _path_score(path: Dict[str, Any], *, alpha: float) -> float:
@@ -19,21 +21,6 @@ def _path_score(path: Dict[str, Any], *, alpha: float) -> float:
     return (alpha ** (L-1)) * base
 
 
-def _extract_path_record(p_row) -> Dict[str, Any]:
-    """
-    Transforme un résultat Cypher en dict portable.
-    On suppose que le cypher renvoie:
-      nodes(p) AS ns, relationships(p) AS rs, length(p) AS L
-    Avec attributs: id, name, conf, pred/ type, conf.
-    """
-    ns = p_row["ns"]
-    rs = p_row["rs"]
-    nodes = [{"id": n.get("id"), "name": n.get("name",""), "conf": float(n.get("conf",0.5))} for n in ns]
-    edges = [{"pred": r.get("pred") or r.get("type","REL"), "conf": float(r.get("conf",0.5))} for r in rs]
-    return {"nodes": nodes, "edges": edges, "length": int(p_row["L"])}
-
-
-
 def topK(series: str, nodes: List[Dict[str, Any]], *, k: int = 12, alpha: float = 0.8, theta: float = 0.05, max_hops: int = 3, db) -> Dict[str, Any]:
     """
     PathRAG 'flow pruning': explore les plus courts chemins entre seeds avec élagage.
@@ -59,21 +46,13 @@ def topK(series: str, nodes: List[Dict[str, Any]], *, k: int = 12, alpha: float
         ]
       }
     """
+    db = as_backend(db)
     paths: List[Dict[str, Any]] = []
     node_ids = [n["id"] for n in nodes][:30]  # borne
     for src_id, dst_id in combinations(node_ids, 2):
-        cypher = f"""
-        MATCH (s:Entity {{id:$src, series:$series}}),
-              (t:Entity {{id:$dst, series:$series}})
-        MATCH p = (s)-[r:REL*1..{int(max_hops)}]-(t)
-        WITH p, nodes(p) AS ns, relationships(p) AS rs
-        WHERE ALL(n IN ns WHERE coalesce(n.conf,0.5) >= $theta)
-          AND ALL(e IN rs WHERE coalesce(e.conf,0.5) >= $theta)
-        RETURN ns AS ns, rs AS rs, length(p) AS L
-        LIMIT 6
-        """
-        for row in db.run_cypher(cypher, {"src": src_id, "dst": dst_id, "series": series, "theta": float(theta)}):
-            rec = _extract_path_record(row)
+        # Neo4j: instantané CSR en mémoire si activé (sinon Cypher par paire) ; embarqué: toujours local
+        recs = db.find_paths(series, src_id, dst_id, max_hops=int(max_hops), theta=float(theta), limit=6)
+        for rec in recs:
             score = _path_score(rec, alpha=alpha)
             rec["pair"] = [src_id, dst_id]
             rec["score"] = float(score)
@@ -1,12 +1,14 @@
 # graph_based/retriever/pathrag/node_retrieval.py
 from __future__ import annotations
 from typing import List, Dict, Any
-import re
+
+from graph_based.backend import as_backend
+from graph_based.utils.lexical import tokenize
 
 
 def _keywords(q: str) -> List[str]:
-    toks = re.findall(r"[A-Za-zÀ-ÿ0-9\-]+", q.lower())
-    return [t for t in toks if len(t) >= 3]
+    return tokenize(q)
+
 
 # def topN(series: str, query: str, *, db, provider, N: int = 30) -> List[Tuple[str, float]]:
 def topN(series: str, query: str, *, n: int = 30, db) -> Dict[str, Any]:
@@ -23,42 +25,25 @@ def topN(series: str, query: str, *, n: int = 30, db) -> Dict[str, Any]:
           {"id": str, "name": str, "desc": str, "conf": float, "score": float}
         ]
       }
-    Hypothèses de schéma: (:Entity {id, series, name, aliases, desc, conf})
-    Stratégie: matching lex. sur name/aliases + score simple (overlap + conf).
+    Hypothèses de schéma: (:Entity {id, series, name, aliases, aliases_text, desc, conf})
+    Stratégie: GraphBackend.search_entities — Neo4j: index full-text `entity_lexical_ft` (BM25 Lucene,
+    name^3 aliases^2 desc^1), repli index inversé Python si indisponible ; embarqué: index inversé Python.
+    score = BM25 + conf.
     """
-    kws = _keywords(query)
+    kws = _keywords(query)[:8] or tokenize(query, min_len=1)[:8]  # borne de sécurité
     if not kws:
-        kws = [query.lower()]
-    # Cypher naïf: concatène des predicates CONTAINS
-    # (évite d'imposer un index externe ici)
-    where_parts = []
-    params = {"series": series}
-    for i, kw in enumerate(kws[:8]):  # borne de sécurité
-        p = f"kw{i}"
-        params[p] = kw
-        where_parts.append(f"toLower(e.name) CONTAINS ${p} OR any(a IN coalesce(e.aliases,[]) WHERE toLower(a) CONTAINS ${p})")
-    cypher = f"""
-    MATCH (e:Entity {{series:$series}})
-    WHERE {' OR '.join(where_parts)}
-    RETURN e.id AS id, e.name AS name, e.desc AS desc, coalesce(e.conf,0.5) AS conf
-    LIMIT 400
-    """
-    rows = [r for r in db.run_cypher(cypher, params)]
-
-    def score_row(r: Dict[str, Any]) -> float:
-        name = (r.get("name") or "").lower()
-        desc = (r.get("desc") or "").lower()
-        occ = sum(1 for k in kws if (k in name or k in desc))
-        return occ + float(r.get("conf", 0.5))
+        return {"nodes": []}
+    rows = as_backend(db).search_entities(series, kws, n=int(n))
 
     nodes = []
-    for r in rows:
+    for r in rows or []:
+        conf = float(r.get("conf", 0.5))
         nodes.append({
             "id": r["id"],
-            "name": r.get("name",""),
-            "desc": r.get("desc",""),
-            "conf": float(r.get("conf",0.5)),
-            "score": score_row(r),
+            "name": r.get("name") or "",
+            "desc": r.get("desc") or "",
+            "conf": conf,
+            "score": float(r.get("score", 0.0)) + conf,
         })
     nodes.sort(key=lambda x: x["score"], reverse=True)
-    return {"nodes": nodes[:n]}
\ No newline at end of file
+    return {"nodes": nodes[:n]}
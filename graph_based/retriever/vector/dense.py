@@ -7,7 +7,8 @@ from graph_based.utils.types import ChunkRef
 def search(series: str, query: str, *, db, provider, k: int = 6) -> List[ChunkRef]:
     """
     Fallback dense: interroge l'index vectoriel des chunks (réutilise votre corpus/embedder).
+    - index local (vector.type=mmap|ivf) si disponible, sinon index vectoriel Neo4j.
     - Output: [{"cid","series","file","page","order","score"}...]
     """
-    embedder = Embedder(provider)
+    embedder = Embedder(provider=provider, db=db)
     return embedder.search(series, query, k=k)
\ No newline at end of file
@@ -0,0 +1,78 @@
+import math, re
+from collections import Counter, defaultdict
+from typing import Any, Dict, Iterable, List, Mapping, Sequence, Tuple
+
+_TOKEN = re.compile(r"[A-Za-zÀ-ÿ0-9\-]+")
+_LUCENE_SPECIAL = re.compile(r'([+\-&|!(){}\[\]^"~*?:\\/])')
+
+# Pondération des champs (nom > alias > description), commune à Lucene et au repli Python
+FIELD_BOOSTS: Dict[str, float] = {"name": 3.0, "aliases_text": 2.0, "desc": 1.0}
+
+
+def tokenize(text: str, *, min_len: int = 3) -> List[str]:
+    """Tokens minuscules (lettres accentuées, chiffres, tirets), longueur >= min_len."""
+    return [t for t in _TOKEN.findall((text or "").lower()) if len(t) >= min_len]
+
+
+def lucene_query(series: str, terms: Sequence[str], fields: Mapping[str, float] = FIELD_BOOSTS) -> str:
+    """
+    Requête Lucene pour db.index.fulltext.queryNodes: série imposée (+series:"..."),
+    au moins un terme dans un des champs pondérés. Caractères spéciaux échappés.
+    """
+    esc = [_LUCENE_SPECIAL.sub(r"\\\1", t) for t in terms if t]
+    if not esc:
+        return ""
+    any_field = " OR ".join(f"{f}:({' '.join(esc)})^{b:g}" for f, b in fields.items())
+    quoted = _LUCENE_SPECIAL.sub(r"\\\1", series)
+    return f'+series:"{quoted}" +({any_field})'
+
+
+class LexicalIndex:
+    """
+    Index inversé en mémoire (repli sans index full-text Neo4j, tests): BM25 par champ
+    (k1, b), scores de champs combinés avec FIELD_BOOSTS — même esprit que le scoring Lucene.
+    Documents: {"id", "name", "aliases" (liste), "desc", "conf"}.
+    """
+
+    def __init__(self, docs: Iterable[Mapping[str, Any]], *, k1: float = 1.2, b: float = 0.75,
+                 fields: Mapping[str, float] = FIELD_BOOSTS):
+        self.k1, self.b, self.fields = k1, b, dict(fields)
+        self.docs: List[Dict[str, Any]] = []
+        self._post: Dict[str, Dict[str, List[Tuple[int, int]]]] = {f: defaultdict(list) for f in self.fields}
+        self._len: Dict[str, List[int]] = {f: [] for f in self.fields}
+        for d in docs:
+            i = len(self.docs)
+            self.docs.append(dict(d))
+            for f in self.fields:
+                toks = tokenize(self._text(d, f), min_len=1)
+                self._len[f].append(len(toks))
+                for t, tf in Counter(toks).items():
+                    self._post[f][t].append((i, tf))
+        n = max(1, len(self.docs))
+        self._avg = {f: (sum(ls) / n) or 1.0 for f, ls in self._len.items()}
+
+    @staticmethod
+    def _text(d: Mapping[str, Any], field: str) -> str:
+        if field == "aliases_text":
+            return " ".join(d.get("aliases") or [])
+        return d.get(field) or ""
+
+    def __len__(self) -> int:
+        return len(self.docs)
+
+    def search(self, terms: Sequence[str], n: int = 30) -> List[Tuple[Dict[str, Any], float]]:
+        """(document, score BM25 pondéré) des `n` meilleurs documents contenant au moins un terme."""
+        N = len(self.docs)
+        scores: Dict[int, float] = defaultdict(float)
+        for f, boost in self.fields.items():
+            lens, avg = self._len[f], self._avg[f]
+            for t in set(terms):
+                post = self._post[f].get(t)
+                if not post:
+                    continue
+                idf = math.log(1.0 + (N - len(post) + 0.5) / (len(post) + 0.5))
+                for i, tf in post:
+                    norm = tf + self.k1 * (1.0 - self.b + self.b * lens[i] / avg)
+                    scores[i] += boost * idf * tf * (self.k1 + 1.0) / norm
+        best = sorted(scores.items(), key=lambda kv: kv[1], reverse=True)[:n]
+        return [(self.docs[i], s) for i, s in best]
@@ -1,5 +1,7 @@
-from concurrent.futures import ThreadPoolExecutor, as_completed
-from typing import Iterable, Callable, List, Any
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed, wait
+from typing import Dict, Iterable, Iterator, Callable, Deque, List, Any, Optional, Tuple
+import queue, threading, time
 
 def _pmap(fn: Callable[[Any], Any], items: Iterable[Any], max_workers: int = 8) -> List[Any]:
     with ThreadPoolExecutor(max_workers=max_workers) as ex:
@@ -8,4 +10,109 @@ def _pmap(fn: Callable[[Any], Any], items: Iterable[Any], max_workers: int = 8)
 
 def map_unordered(fn, items: List[Any], *, max_workers: int = 8) -> List[Any]:
     """Exécute `fn` en parallèle ; renvoie les résultats dès qu’ils arrivent (QFS map)."""
-    return _pmap(fn, items, max_workers=max_workers)
\ No newline at end of file
+    return _pmap(fn, items, max_workers=max_workers)
+
+def imap_bounded(fn: Callable[[Any], Any], items: Iterable[Any], *, max_workers: int = 8,
+                 max_in_flight: Optional[int] = None) -> Iterator[Tuple[Any, Any]]:
+    """
+    map parallèle *ordonné* et borné (producteur paresseux):
+    - au plus `max_in_flight` tâches soumises (défaut 2 x max_workers) => mémoire bornée;
+    - renvoie (item, résultat) dans l'ordre d'entrée; une exception annule le reste et remonte.
+    """
+    limit = max(1, int(max_in_flight or 2 * max_workers))
+    with ThreadPoolExecutor(max_workers=max_workers) as ex:
+        pending: Deque[Tuple[Any, Future]] = deque()
+        try:
+            for x in items:
+                pending.append((x, ex.submit(fn, x)))
+                if len(pending) >= limit:
+                    x0, f0 = pending.popleft()
+                    yield x0, f0.result()
+            while pending:
+                x0, f0 = pending.popleft()
+                yield x0, f0.result()
+        finally:
+            for _, f in pending:
+                f.cancel()
+
+
+def _timed(fn: Callable[[Any], Any], x: Any) -> Tuple[Any, float]:
+    t0 = time.perf_counter()
+    res = fn(x)
+    return res, (time.perf_counter() - t0) * 1000.0
+
+def fan_out(fn: Callable[[Any], Any], items: Iterable[Any], *, deadline_s: float,
+            max_workers: int = 8) -> Tuple[Dict[Any, Any], Dict[Any, Dict[str, Any]]]:
+    """
+    Appelle `fn(x)` pour chaque item distinct en parallèle, sous une échéance *globale* `deadline_s`:
+    - renvoie ({item: résultat} des appels terminés à temps, {item: {"status": ok|error|timeout, "ms"}});
+    - une erreur ou un dépassement n'affecte que son item (les autres résultats restent utilisables);
+    - les appels en retard ne sont pas attendus (leur thread se termine en arrière-plan, résultat ignoré).
+    """
+    items = list(dict.fromkeys(items))
+    out: Dict[Any, Any] = {}
+    diag: Dict[Any, Dict[str, Any]] = {}
+    if not items:
+        return out, diag
+    ex = ThreadPoolExecutor(max_workers=max(1, min(int(max_workers), len(items))))
+    try:
+        futs = {ex.submit(_timed, fn, x): x for x in items}
+        done, pending = wait(futs, timeout=max(0.0, float(deadline_s)))
+        for f in done:
+            x = futs[f]
+            try:
+                out[x], ms = f.result()
+                diag[x] = {"status": "ok", "ms": round(ms, 1)}
+            except Exception as ex_:
+                diag[x] = {"status": "error", "error": repr(ex_)[:200]}
+        for f in pending:
+            f.cancel()
+            diag[futs[f]] = {"status": "timeout"}
+    finally:
+        ex.shutdown(wait=False, cancel_futures=True)
+    return out, diag
+
+
+class QueueWriter:
+    """
+    Consommateur dédié (thread) alimenté par une file bornée:
+    - `put(x)` bloque quand la file est pleine (back-pressure sur le producteur);
+    - `close()` vide la file, attend le thread et relance son erreur éventuelle.
+    """
+    _STOP = object()
+
+    def __init__(self, fn: Callable[[Any], None], *, maxsize: int = 4, name: str = "writer"):
+        self._fn = fn
+        self._q: "queue.Queue[Any]" = queue.Queue(maxsize=maxsize)
+        self._err: Optional[BaseException] = None
+        self._t = threading.Thread(target=self._run, name=name, daemon=True)
+        self._t.start()
+
+    def _run(self) -> None:
+        while True:
+            x = self._q.get()
+            if x is self._STOP:
+                return
+            if self._err is None:  # après une erreur: on draine sans écrire
+                try:
+                    self._fn(x)
+                except BaseException as e:
+                    self._err = e
+
+    def put(self, x: Any) -> None:
+        if self._err is not None:
+            raise self._err
+        self._q.put(x)
+
+    def close(self) -> None:
+        self._q.put(self._STOP)
+        self._t.join()
+        if self._err is not None:
+            raise self._err
+
+    def __enter__(self): return self
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:  # erreur côté producteur: arrêt sans masquer l'exception d'origine
+            self._q.put(self._STOP); self._t.join()
@@ -1,5 +1,5 @@
 from typing import List, Tuple, Dict, Any, Optional, Iterable
-from app.core.resources import get_db, get_provider
+from app.core.resources import get_graph_backend, get_provider
 from graph_based.utils.types import NodeRecord, EdgeRecord, Community, BuildReport, Summary
 
 from graph_based.kg.build import canonicalize, graph_store
@@ -22,8 +22,8 @@ async def run(series: str, options: Dict[str, Any]) -> BuildReport:
       7) indexes     = index_search.sync(series, db=db)
       8) return BuildReport
     """
-    # database et provider LLM depuis resources
-    db, provider = get_db(), get_provider()
+    # backend de graphe (graph.backend) et provider LLM depuis resources
+    db, provider = get_graph_backend(), get_provider()
     run_id = f"gb:{series}:{uuid.uuid4().hex[:8]}"
     
     # S'assurer de l'existence des contraintes
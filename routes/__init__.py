@@ -6,10 +6,12 @@ import routes.health as health_routes
 import routes.pipelines as pipelines_routes
 import routes.retriever as retriever_routes
 import routes.neo4j as neo4j_routes
+import routes.dev as dev_routes
 
 api_router = APIRouter(prefix="/api")
 api_router.include_router(corpus_routes.router)
 api_router.include_router(health_routes.router)
 api_router.include_router(pipelines_routes.router)
 api_router.include_router(retriever_routes.router)
-api_router.include_router(neo4j_routes.router)
\ No newline at end of file
+api_router.include_router(neo4j_routes.router)
+api_router.include_router(dev_routes.router)
\ No newline at end of file
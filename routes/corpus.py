@@ -1,11 +1,12 @@
 # routes/corpus.py
 from fastapi import APIRouter, HTTPException, UploadFile, BackgroundTasks, File, Form, Query, Body
+from fastapi.concurrency import run_in_threadpool
 from typing import List, Annotated, Optional, Set, Literal
 
 from pydantic import BaseModel
 from adapters.db.neo4j import Neo4jAdapter
 from app.core.logging import get_logger
-from app.core.resources import get_all_series, get_provider, get_db
+from app.core.resources import get_all_series, get_provider, get_graph_backend, get_async_db, get_all_settings
 
 from corpus.importer import Importer
 from corpus.extractor.engine import ExtractorRunner
@@ -114,22 +115,27 @@ async def run_chunk(
         return {"status": "accepted", "series": series, "strategy": strategy, "async": True}
     return runner.run_series(series)
 
-@router.post("/embed") # POST /api/corpus/embed avec body { "series": "...", "dimensions": 1536 }
+@router.post("/embed") # POST /api/corpus/embed avec body { "series": "...", "dimensions": 1536, "mode": "full|diff" }
 async def embed_series(body: dict = Body(...)):
     series = body.get("series")
     dims = body.get("dimensions")
+    mode = body.get("mode", "full")
     # return {"status": "started", "series": series, "dimensions": dims}
     emb = Embedder()
     if not series:
         raise HTTPException(status_code=422, detail="Field 'series' is required")
-    return emb.embed_corpus(series, dimensions=dims)
+    if mode not in ("full", "diff"):
+        raise HTTPException(status_code=422, detail="Field 'mode' must be 'full' or 'diff'")
+    # thread dédié: la boucle reste libre (SSE de progression, autres requêtes)
+    return await run_in_threadpool(emb.embed_corpus, series, dimensions=dims, mode=mode)
 
 @router.post("/search") # POST /api/corpus/search avec body { "series": "...", "q": "...", "k": 5 }
 async def search_series(body: dict = Body(...)):
     series = body.get("series")
     q = body.get("q"); k = int(body.get("k", 5))
-    emb = Embedder(provider=get_provider(), db=get_db())
-    return emb.search(series, q, k=k)
+    emb = Embedder(provider=get_provider(), db=get_graph_backend())
+    adb = get_async_db() if get_all_settings().graph.backend == "neo4j" else None  # embarqué: pas de Neo4j
+    return await emb.asearch(series, q, k=k, adb=adb)
 
 # POST http://127.0.0.1:8050/api/corpus/kg/build
 # asynchrone : {"series":"series-20250826-190041-1597", "limit_chunks": 50, "run_async": true}
@@ -0,0 +1,21 @@
+# routes/dev.py
+from fastapi import APIRouter, Depends, HTTPException
+from adapters.db.profiler import get_profiler
+from app.core.config import get_settings
+
+def _dev_enabled():
+    """Routes de diagnostic exposées seulement si neo4j.profile.endpoints (debug) ; 404 sinon."""
+    if not get_settings().neo4j.profile.endpoints:
+        raise HTTPException(status_code=404, detail="Not Found")
+
+router = APIRouter(prefix="/dev", tags=["dev"], dependencies=[Depends(_dev_enabled)])
+
+@router.get("/queries") # GET : /api/dev/queries?top=10
+async def queries_report(top: int = 10):
+    """Requêtes Cypher nommées: percentiles de durée, lignes, db hits (PROFILE échantillonné), pires contrevenants."""
+    return get_profiler().report(top=top)
+
+@router.post("/queries/reset") # POST : /api/dev/queries/reset
+async def queries_reset():
+    get_profiler().reset()
+    return {"status": "reset"}
@@ -1,6 +1,6 @@
 from importlib.resources import files
 from fastapi import APIRouter, Body, UploadFile, File, Form
-from app.core.resources import get_provider, get_db
+from app.core.resources import get_provider, get_graph_backend
 from app.core.logging import get_logger
 from graph_based.kg.community import hierarchy, leiden
 from graph_based.utils.types import BuildReport
@@ -29,8 +29,8 @@ async def build_graph_pipeline(series: str, options: dict) -> BuildReport:
 @router.get("/list_chunks") # get http://localhost:8000/api/pipelines/list_chunks
 async def list_chunks():
     serie = "series-20250913-175435-c30e"
-    db = get_db()
-    chunks = db.stream_chunks(serie)
+    db = get_graph_backend()
+    chunks = list(db.iter_chunks(serie, ("id", "text")))
     return {"serie": serie, "chunks": chunks}
 
 @router.post("/step1/canonicalize")
@@ -67,4 +67,4 @@ async def step5_hierarchy(params: dict = Body(...)):
     series = params.get("series")
     options = params.get("options", {})
     comms = leiden.detect(series, levels=options["community"]["levels"], resolution=options["community"]["resolution"])
-    return hierarchy.wire(series, comms, db=get_db())
\ No newline at end of file
+    return hierarchy.wire(series, comms, db=get_graph_backend())
\ No newline at end of file
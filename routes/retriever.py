@@ -2,14 +2,25 @@ from __future__ import annotations
 from fastapi import APIRouter, Body, UploadFile, File, Form
 
 
+from app.core.resources import get_provider, get_query_cache
 from corpus.retriever.schemas import SearchRequest, SearchResponse
-from tools.graph_rag_tool import kg_ret, dn_ret, hy_ret
+from tools.graph_rag_tool import retriever
 
 router = APIRouter(prefix="/retriever", tags=["retriever"])
 
 
 @router.post("/search", response_model=SearchResponse)
 async def search(req: SearchRequest):
-    if req.mode == "kg":    return kg_ret.search(req)
-    if req.mode == "dense": return dn_ret.search(req)
-    return hy_ret.search(req)
\ No newline at end of file
+    # series: str | [str, ...] (liste => une requête par série en parallèle, échéance req.deadline_ms)
+    return await retriever().asearch(req)
+
+
+@router.get("/cache/stats") # GET : /api/retriever/cache/stats
+def cache_stats():
+    """Compteurs du cache d'embeddings de requêtes (+ caches disque d'embeddings et de réponses LLM si actifs)."""
+    prov = get_provider()
+    return {
+        "queries": get_query_cache().stats(),
+        "embeddings": prov.cache_stats() if hasattr(prov, "cache_stats") else None,
+        "llm": prov.llm_cache_stats() if hasattr(prov, "llm_cache_stats") else None,
+    }
@@ -0,0 +1,68 @@
+# tests/unit/test_embedder_diff.py
+import json
+
+import pytest
+
+pytest.importorskip("fastmcp")   # corpus.embedder -> app.core.resources
+
+import corpus.embedder as embedder_mod
+from adapters.vector.base import InMemoryIndex
+from graph_based.backend import EmbeddedGraphBackend
+
+
+class _Provider:
+    embed_model = "fake-emb"
+    def __init__(self): self.seen = []
+    def embed_texts(self, texts, *, dimensions=None):
+        self.seen.extend(texts)
+        return [[float(len(t)), 1.0, float(t.count("a"))] for t in texts]
+
+
+class _Storage:
+    def __init__(self, root): self.root = root
+    def ensure_series(self, series):
+        return self.root
+
+
+def _write_chunks(root, texts):
+    (root / "chunks").mkdir(exist_ok=True)
+    (root / "chunks" / "_report.json").write_text(json.dumps({"items": [{"output": "chunks/f.chunks.jsonl"}]}))
+    (root / "chunks" / "f.chunks.jsonl").write_text("\n".join(
+        json.dumps({"doc": {"filename": "f.pdf"}, "text": t, "order": i, "meta": {"page": 1}}) for i, t in enumerate(texts)))
+
+
+def test_diff_mode_reembeds_only_changed_chunk(tmp_path, monkeypatch):
+    local = InMemoryIndex(3)
+    monkeypatch.setattr(embedder_mod, "get_vector_index", lambda series: local)
+    monkeypatch.setattr(embedder_mod, "get_storage", lambda: _Storage(tmp_path))
+    db = EmbeddedGraphBackend()
+    _write_chunks(tmp_path, ["alpha", "beta", "gamma"])
+    embedder_mod.Embedder(provider=_Provider(), db=db, batch_size=2).embed_corpus("s")
+
+    _write_chunks(tmp_path, ["alpha", "beta bis"])                 # chunk 1 modifié, chunk 2 disparu
+    prov = _Provider()
+    rep = embedder_mod.Embedder(provider=prov, db=db, batch_size=2).embed_corpus("s", mode="diff")
+    assert prov.seen == ["beta bis"]
+    assert (rep["skipped"], rep["updated"], rep["removed"]) == (1, 1, 1)
+    assert set(db.chunk_fingerprints("s")) == {"s:f.pdf:0", "s:f.pdf:1"}
+    hits = local.search([8.0, 1.0, 1.0], k=5)
+    assert {h.id for h in hits} == {"s:f.pdf:0", "s:f.pdf:1"}     # vecteur du chunk supprimé parti
+    assert hits[0].id == "s:f.pdf:1" and hits[0].score == pytest.approx(1.0)   # nouveau vecteur de "beta bis"
+
+
+def test_diff_mode_fills_a_lagging_local_index(tmp_path, monkeypatch):
+    monkeypatch.setattr(embedder_mod, "get_storage", lambda: _Storage(tmp_path))
+    monkeypatch.setattr(embedder_mod, "get_vector_index", lambda series: None)   # Neo4j seul au premier run
+    db = EmbeddedGraphBackend()
+    _write_chunks(tmp_path, ["alpha", "beta", "gamma"])
+    embedder_mod.Embedder(provider=_Provider(), db=db, batch_size=2).embed_corpus("s")
+
+    local = InMemoryIndex(3)                                          # vector.type passé à un index local
+    local.add(["s:f.pdf:0"], [[5.0, 1.0, 2.0]])
+    monkeypatch.setattr(embedder_mod, "get_vector_index", lambda series: local)
+    prov = _Provider()
+    rep = embedder_mod.Embedder(provider=prov, db=db, batch_size=2).embed_corpus("s", mode="diff")
+    assert prov.seen == ["beta", "gamma"] and (rep["skipped"], rep["reindexed"], rep["added"]) == (1, 2, 0)
+    assert all(cid in local for cid in ("s:f.pdf:0", "s:f.pdf:1", "s:f.pdf:2"))
+    rep = embedder_mod.Embedder(provider=_Provider(), db=db, batch_size=2).embed_corpus("s", mode="diff")
+    assert (rep["skipped"], rep["reindexed"], rep["vectors"]) == (3, 0, 0)
@@ -0,0 +1,62 @@
+# tests/unit/test_embedding_cache.py
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from adapters.llm.cache import CachedProvider, EmbeddingCache
+
+class _Fake:
+    embed_model = "fake-embed"
+    def __init__(self): self.calls = 0
+    def embed(self, text, *, dimensions=None):
+        self.calls += 1
+        return [float(len(text)), 1.0]
+    def embed_batch(self, texts, *, dimensions=None):
+        self.calls += 1
+        return [[float(len(t)), 1.0] for t in texts]
+    def embed_texts(self, texts, *, dimensions=None):
+        return self.embed_batch(texts, dimensions=dimensions)
+
+def test_rerun_makes_zero_provider_calls(tmp_path):
+    texts = ["a", "bb", "a", "ccc"]
+    first = CachedProvider(_Fake(), EmbeddingCache(tmp_path / "e.sqlite"))
+    v1 = first.embed_texts(texts)
+    assert first.inner.calls == 1 and v1[0] == v1[2] == [1.0, 1.0]
+
+    again = CachedProvider(_Fake(), EmbeddingCache(tmp_path / "e.sqlite"))  # nouveau process
+    assert again.embed_texts(texts) == v1 and again.embed("bb") == [2.0, 1.0]
+    assert again.inner.calls == 0 and again.hits == 5
+    # dimensions différentes => autre clé
+    again.embed("bb", dimensions=8)
+    assert again.inner.calls == 1
+
+def test_size_bounded_lru_eviction(tmp_path):
+    cache = EmbeddingCache(tmp_path / "e.sqlite", max_bytes=2000)
+    for i in range(40):
+        cache.put_many({f"k{i}": [0.0] * 16})  # ~67 octets / entrée
+    assert cache.stats()["bytes"] <= 2000
+    assert "k39" in cache.get_many(["k39"]) and not cache.get_many(["k0"])
+
+def test_byte_counter_tracks_replacements_without_rescan(tmp_path):
+    cache = EmbeddingCache(tmp_path / "e.sqlite")
+    cache.put_many({"a": [0.0] * 4, "b": [0.0] * 8})
+    cache.put_many({"a": [0.0] * 16})                      # remplace "a"
+    total = cache._conn.execute("SELECT SUM(size) FROM emb").fetchone()[0]
+    assert cache.stats()["bytes"] == total == (64 + 1) + (32 + 1)
+    assert EmbeddingCache(tmp_path / "e.sqlite").stats()["bytes"] == total   # recalculé à l'ouverture
+
+def test_short_provider_reply_raises_a_clear_error(tmp_path):
+    class _Short(_Fake):
+        def embed_texts(self, texts, *, dimensions=None):
+            return [[1.0, 1.0]] * (len(texts) - 1)
+
+    prov = CachedProvider(_Short(), EmbeddingCache(tmp_path / "e.sqlite"))
+    with pytest.raises(ValueError, match="returned 1 embeddings for 2 texts"):
+        prov.embed_texts(["a", "bb"])
+    assert len(prov.cache) == 0                            # rien de désaligné en cache
+
+def test_counters_are_thread_safe(tmp_path):
+    prov = CachedProvider(_Fake(), EmbeddingCache(tmp_path / "e.sqlite"))
+    with ThreadPoolExecutor(8) as ex:
+        list(ex.map(lambda i: prov.embed_texts([f"t{i % 50}"]), range(400)))
+    assert prov.hits + prov.misses == 400
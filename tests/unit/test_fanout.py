@@ -0,0 +1,63 @@
+# tests/unit/test_fanout.py
+import asyncio, time
+
+from corpus.retriever.fanout import FanoutRetriever, merge_rows, minmax
+from corpus.retriever.schemas import Hit, SearchRequest, SearchResponse
+from graph_based.utils.parallel import fan_out
+
+
+def test_minmax_and_merge_normalize_per_series():
+    assert minmax([2.0, 4.0, 3.0]) == [0.0, 1.0, 0.5] and minmax([7.0]) == [1.0]
+    rows = merge_rows({"a": [{"id": "x", "score": 0.91}, {"id": "y", "score": 0.90}],
+                       "b": [{"id": "z", "score": 12.0}, {"id": "w", "score": 3.0}]}, k=3)
+    assert [(r["id"], r["series"], r["score"]) for r in rows] == [("x", "a", 1.0), ("z", "b", 1.0), ("y", "a", 0.0)]
+    assert rows[1]["raw_score"] == 12.0
+
+
+def test_fan_out_deadline_and_errors_are_per_item():
+    def fn(s):
+        if s == "slow":
+            time.sleep(0.5)
+        if s == "bad":
+            raise RuntimeError("boom")
+        return s.upper()
+    t0 = time.perf_counter()
+    out, diag = fan_out(fn, ["a", "slow", "bad", "b"], deadline_s=0.1)
+    assert time.perf_counter() - t0 < 0.4
+    assert out == {"a": "A", "b": "B"}
+    assert [diag[s]["status"] for s in ("a", "slow", "bad")] == ["ok", "timeout", "error"]
+
+
+class FakeRetriever:
+    def __init__(self): self.seen, self.cancelled = [], []
+    async def asearch(self, req):
+        self.seen.append((req.series, req.index_name))
+        if req.series == "slow":
+            try:
+                await asyncio.sleep(1.0)
+            except asyncio.CancelledError:
+                self.cancelled.append(req.series)
+                raise
+        base = {"q1": 0.8, "q2": 40.0}.get(req.series, 1.0)
+        hits = [Hit(id=f"{req.series}:{i}", score=base - i) for i in range(3)]
+        return SearchResponse(query=req.query, mode=req.mode, hits=hits)
+    def search(self, req):
+        return asyncio.run(self.asearch(req))
+
+
+def test_fanout_retriever_merges_and_drops_late_series():
+    ret = FakeRetriever()
+    fo = FanoutRetriever({"dense": ret}, index_for=lambda s: f"chunkIndex__{s}")
+    req = SearchRequest(query="loyer", mode="dense", k=4, series=["q1", "q2", "slow"], deadline_ms=200)
+    async def go():
+        res = await fo.asearch(req)
+        return res, list(ret.cancelled)                                    # état au retour d'asearch
+    res, cancelled = asyncio.run(go())
+    assert sorted(ret.seen) == [("q1", "chunkIndex__q1"), ("q2", "chunkIndex__q2"), ("slow", "chunkIndex__slow")]
+    assert [h.id for h in res.hits] == ["q1:0", "q2:0", "q1:1", "q2:1"]   # échelles différentes, rangs entrelacés
+    assert res.hits[1].meta == {"series": "q2", "raw_score": 40.0}
+    assert res.diagnostics["series"]["slow"]["status"] == "timeout" and res.diagnostics["partial"]
+    assert cancelled == ["slow"]                                           # annulation attendue avant le retour
+    single = fo.search(SearchRequest(query="loyer", mode="dense", series="q2"))
+    assert single.hits[0].score == 40.0                                    # une série: réponse inchangée
+    assert ret.seen[-1] == ("q2", "chunkIndex__q2")                        # même index qu'en fan-out
@@ -0,0 +1,80 @@
+# tests/unit/test_graph_backend.py
+import pytest
+
+from graph_based.backend import EmbeddedGraphBackend, GraphBackend, Neo4jGraphBackend, as_backend
+from graph_based.retriever.pathrag import flow_pruning, node_retrieval
+
+NODES = [
+    {"id": "bail", "name": "Bail commercial", "type": "Contrat", "aliases": ["bail 3-6-9"], "desc": "contrat", "cids": ["c1"], "conf": 0.9},
+    {"id": "loyer", "name": "Loyer", "type": "Montant", "aliases": [], "desc": "montant du bail", "cids": ["c1"], "conf": 0.75},
+    {"id": "preneur", "name": "Preneur", "type": "Personne", "aliases": [], "desc": "", "cids": ["c2"], "conf": 0.75},
+    {"id": "notaire", "name": "Notaire", "type": "Personne", "aliases": [], "desc": "officier public", "cids": ["c2"], "conf": 0.5},
+]
+EDGES = [
+    {"id": "r1", "src_id": "bail", "dst_id": "loyer", "pred": "FIXE", "cids": ["c1"], "conf": 0.75},
+    {"id": "r2", "src_id": "preneur", "dst_id": "loyer", "pred": "PAIE", "cids": ["c2"], "conf": 0.5},
+    {"id": "r3", "src_id": "preneur", "dst_id": "absent", "pred": "X", "cids": [], "conf": 0.5},
+]
+
+
+def _backend(path=None):
+    db = EmbeddedGraphBackend(path)
+    db.upsert_chunks([{"cid": "c1", "text": "Le bail fixe le loyer.", "vec": [1.0, 0.0]},
+                      {"cid": "c2", "text": "Le preneur paie.", "vec": [0.0, 1.0]}], series="s")
+    db.upsert_graph("s", NODES, EDGES)
+    return db
+
+
+def test_protocol_and_wrapping():
+    db = _backend()
+    assert isinstance(db, GraphBackend) and as_backend(db) is db
+    class Adapter:
+        def run_cypher(self, q, params=None, name=None): return []
+    assert isinstance(as_backend(Adapter()), Neo4jGraphBackend)
+    with pytest.raises(TypeError):
+        as_backend(object())
+
+
+def test_chunks_and_upsert_merge():
+    db = _backend()
+    assert [c["id"] for c in db.iter_chunks("s", ("id", "text"))] == ["c1", "c2"]
+    rep = db.upsert_graph("s", [{**NODES[1], "aliases": ["redevance"], "desc": "x", "conf": 0.1, "cids": ["c2"]}], [])
+    e = db.search_entities("s", ["redevance"])[0]
+    assert (e["id"], e["desc"], e["conf"], e["cids"]) == ("loyer", "montant du bail", 0.75, ["c1", "c2"])
+    assert rep["entities"]["n"] == 1 and db.chunk_fingerprints("s")["c1"]["text_hash"]
+
+
+def test_neighbors_paths_and_pathrag_steps():
+    db = _backend()
+    assert sorted(db.neighbors("s", "loyer")) == [("bail", "FIXE", 0.75), ("preneur", "PAIE", 0.5)]
+    assert db.neighbors("s", "preneur") == [("loyer", "PAIE", 0.5)]      # r3: extrémité absente écartée
+    seeds = node_retrieval.topN("s", "bail preneur", n=5, db=db)["nodes"]
+    assert {n["id"] for n in seeds} >= {"bail", "preneur"}
+    paths = flow_pruning.topK("s", [{"id": "bail"}, {"id": "preneur"}], db=db)["paths"]
+    assert [n["id"] for n in paths[0]["nodes"]] == ["bail", "loyer", "preneur"]
+    assert flow_pruning.topK("s", [{"id": "bail"}, {"id": "preneur"}], theta=0.6, db=db)["paths"] == []
+
+
+def test_communities_summaries_and_vectors(tmp_path):
+    db = _backend(tmp_path / "g.sqlite")
+    comms = db.detect_communities("s", levels=2)
+    lvl0 = [c for c in comms if c["level"] == 0]
+    assert sorted(len(c["node_ids"]) for c in lvl0) == [1, 3]            # notaire isolé
+    assert db.wire_hierarchy("s", 0, 1) >= 2
+    big = max(lvl0, key=lambda c: len(c["node_ids"]))
+    assert db.community_members("s", 0, big["cid"], k=1)[0]["name"] == "Loyer"   # degré max
+    db.write_summary("s", 0, big["cid"], "bail et loyer")
+    db.create_vector_index("chunkIndex__s", label="Chunk", prop="embedding", dimensions=2)
+    db.close()
+
+    again = EmbeddedGraphBackend(tmp_path / "g.sqlite")                  # rechargé depuis SQLite
+    assert again.read_summaries("s", [0]) == [{"id": f"0:{big['cid']}", "level": 0, "text": "bail et loyer", "vec": None}]
+    assert again.check_index_exists("chunkIndex__s")
+    assert [h["id"] for h in again.query_top_k("chunkIndex__s", [0.1, 0.9], k=1, series="s")] == ["c2"]
+    again.write_entity_vectors([{"id": "bail", "vec": [1.0, 0.0]}])
+    again.create_vector_index("nodeIndex_s", label="Entity", prop="evec", dimensions=2)
+    assert again.query_top_k("nodeIndex_s", [1.0, 0.0], k=5)[0]["id"] == "bail"
+    mat = again._mats[("entity", "evec", None)][1]
+    assert again.query_top_k("nodeIndex_s", [0.0, 1.0], k=5) and again._mats[("entity", "evec", None)][1] is mat
+    again.write_entity_vectors([{"id": "loyer", "vec": [0.0, 1.0]}])         # matrice invalidée puis reconstruite
+    assert again.query_top_k("nodeIndex_s", [0.0, 1.0], k=1)[0]["id"] == "loyer"
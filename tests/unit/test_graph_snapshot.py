@@ -0,0 +1,54 @@
+# tests/unit/test_graph_snapshot.py
+import threading
+
+from adapters.db.graph_snapshot import GraphSnapshot, SnapshotCache, SNAPSHOT_NODES, SNAPSHOT_VERSION
+
+NODES = [{"id": x, "name": x.upper(), "conf": 0.75} for x in "abcde"] + [{"id": "w", "name": "W", "conf": 0.015625}]
+EDGES = [{"src": "a", "dst": "b", "pred": "P", "conf": 0.75}, {"src": "b", "dst": "c", "pred": "Q", "conf": 0.5},
+         {"src": "a", "dst": "w", "pred": "P", "conf": 0.75}, {"src": "w", "dst": "c", "pred": "P", "conf": 0.75},
+         {"src": "c", "dst": "d", "pred": "P", "conf": 0.015625}, {"src": "a", "dst": "zz", "pred": "P", "conf": 1.0}]
+
+def test_csr_neighbors_and_k_hop():
+    g = GraphSnapshot.from_rows("s", NODES, EDGES)
+    assert len(g) == 6 and g.n_edges == 5   # arête vers un noeud hors série écartée
+    assert sorted(g.neighbors("b")) == [("a", "P", 0.75), ("c", "Q", 0.5)]
+    assert g.neighbors("c", min_conf=0.05) == [("b", "Q", 0.5)]
+    assert g.k_hop(["a"], 2) == {"a": 0, "b": 1, "w": 1, "c": 2}
+    assert g.k_hop(["a"], 3, min_conf=0.05) == {"a": 0, "b": 1, "c": 2}
+
+def test_paths_shortest_first_with_pruning():
+    g = GraphSnapshot.from_rows("s", NODES, EDGES)
+    ps = g.paths("a", "c", max_hops=3, theta=0.0)
+    assert [[n["id"] for n in p["nodes"]] for p in ps] == [["a", "b", "c"], ["a", "w", "c"]]
+    assert ps[0]["edges"][1] == {"pred": "Q", "conf": 0.5} and ps[0]["length"] == 2
+    assert [[n["id"] for n in p["nodes"]] for p in g.paths("a", "c", theta=0.05)] == [["a", "b", "c"]]
+    assert g.paths("a", "d", theta=0.05) == [] and g.paths("a", "d", max_hops=2) == []
+
+def test_cache_reloads_only_when_version_changes():
+    calls, version = [], [(1, "t1")]
+    def run(q, params=None, name=None):
+        calls.append(name)
+        if q == SNAPSHOT_VERSION:
+            return [{"v": version[0][0], "updated_at": version[0][1]}]
+        return NODES if q == SNAPSHOT_NODES else EDGES
+    cache = SnapshotCache(run, check_every_s=0.0)
+    g1 = cache.get("s"); g2 = cache.get("s")
+    assert g1 is g2 and calls.count("graph_snapshot.nodes") == 1
+    version[0] = (2, "t2")                                  # écriture en place (conf/pred) : version incrémentée
+    assert cache.get("s") is not g1 and calls.count("graph_snapshot.nodes") == 2
+    assert "graph_snapshot.version_legacy" not in calls
+
+def test_cache_loads_series_independently():
+    started, release = threading.Event(), threading.Event()
+    def run(q, params=None, name=None):
+        if q == SNAPSHOT_VERSION:
+            return [{"v": 1, "updated_at": "t"}]
+        if params["series"] == "slow" and q == SNAPSHOT_NODES:
+            started.set(); release.wait(5)
+        return NODES if q == SNAPSHOT_NODES else EDGES
+    cache = SnapshotCache(run, check_every_s=0.0)
+    t = threading.Thread(target=cache.get, args=("slow",)); t.start()
+    assert started.wait(5)
+    assert len(cache.get("fast")) == 6                      # pas bloqué par le chargement de "slow"
+    release.set(); t.join(5)
+    assert not t.is_alive() and len(cache.get("slow")) == 6
@@ -0,0 +1,51 @@
+# tests/unit/test_kg_dedup.py
+from corpus.kg.dedup import BloomFilter, DedupStore
+
+def test_bloom_no_false_negatives_and_bounded_fp_rate():
+    b = BloomFilter(capacity=5000, error_rate=0.01)
+    for i in range(5000):
+        b.add(f"e{i}")
+    assert all(f"e{i}" in b for i in range(5000))
+    assert sum(f"x{i}" in b for i in range(20000)) < 20000 * 0.02
+    assert b.nbytes < 8 * 1024
+
+def test_dedup_store_is_exact_past_capacity_and_spills(tmp_path):
+    d = DedupStore(tmp_path / "d.sqlite", "entities", capacity=100, buffer=50)   # filtre saturé => positifs tranchés sur disque
+    assert [d.add(f"e{i % 700}") for i in range(1400)] == [True] * 700 + [False] * 700
+    st = d.stats()
+    assert len(d) == 700 and st["pending"] < 50 and st["disk_checks"] > 0
+    d.close()
+    again = DedupStore(tmp_path / "d.sqlite", "entities")                         # reprise: ensemble conservé
+    assert "e3" in again and again.add("e3") is False and again.add("new") is True
+    again.close()
+    assert len(DedupStore(tmp_path / "d.sqlite", "entities", reset=True)) == 0
+
+def test_bloom_batches_match_single_ops():
+    b = BloomFilter(capacity=1000, error_rate=0.01)
+    b.add_many([f"e{i}" for i in range(500)] + ["e1", "e1"])
+    assert b.contains_many([f"e{i}" for i in range(500)]).all()
+    assert list(b.contains_many([])) == [] and ("e7" in b) is True
+
+def test_dedup_add_many_flags_in_batch_duplicates(tmp_path):
+    d = DedupStore(tmp_path / "d.sqlite", "relations", buffer=3)
+    assert d.add_many(["a", "b", "a", "c", "d"]) == [True, True, False, True, True]
+    assert d.add_many(["d", "e", "e", "a"]) == [False, True, False, False]
+    assert len(d) == 5
+
+def test_dedup_namespaces_isolate_builds_and_drop_on_close(tmp_path):
+    path = tmp_path / "d.sqlite"
+    b1 = DedupStore(path, "entities", namespace="build-1-ab")
+    b2 = DedupStore(path, "entities", namespace="build-2-cd")
+    assert b1.add("e1") and b2.add("e1")                                         # builds concurrents indépendants
+    b2.close(drop=True)                                                            # build 2 terminé
+    b1.close()
+    assert "e1" in DedupStore(path, "entities", namespace="build-1-ab")           # build 1 repris
+    assert len(DedupStore(path, "entities", namespace="build-2-cd")) == 0
+
+def test_dedup_without_autoflush_keeps_only_confirmed_keys(tmp_path):
+    d = DedupStore(tmp_path / "d.sqlite", "entities", namespace="b1", buffer=1, autoflush=False)
+    d.add_many(["e1", "e2"]); d.flush()                                           # lignes écrites: clés confirmées
+    d.add("e3")
+    d.close()                                                                      # e3 non confirmée: abandonnée
+    again = DedupStore(tmp_path / "d.sqlite", "entities", namespace="b1")
+    assert "e1" in again and again.add("e3") is True
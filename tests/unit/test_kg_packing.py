@@ -0,0 +1,44 @@
+# tests/unit/test_kg_packing.py
+import json
+
+from corpus.kg.extract import extract_packed, pack_chunks
+
+def _item(i, text):
+    return {"text": text, "file": "f", "page": i, "chunk_id": f"s:f:{i}"}
+
+class _Packed:
+    """Répond aux prompts groupés (un bloc par id, K2 omis si `drop`) et aux prompts mono-chunk."""
+    def __init__(self, drop=None, broken=False): self.prompts, self.drop, self.broken = [], drop, broken
+    def ask_llm(self, prompt):
+        self.prompts.append(prompt)
+        if "<<<CHUNK" not in prompt:
+            return json.dumps({"entities": [{"type": "T", "name": "seul"}], "relations": []})
+        if self.broken:
+            return "désolé"
+        ids = [l.split("=")[1].rstrip(">") for l in prompt.splitlines() if l.startswith("<<<CHUNK id=")]
+        return "```json\n" + json.dumps({"chunks": [
+            {"id": k, "entities": [{"type": "Price", "name": f"prix {k}"}],
+             "relations": [{"type": "PRICE_FROM", "source": {"type": "Unit", "name": "F3"},
+                            "target": {"type": "Price", "name": f"prix {k}"}}]}
+            for k in ids if k != self.drop]}) + "\n```"
+
+def test_pack_chunks_respects_budget_and_order():
+    items = [_item(i, t) for i, t in enumerate(["a b", "c d e", "f " * 50, "g"])]
+    groups = list(pack_chunks(items, max_tokens=10, max_chunks=8))
+    assert [[it["page"] for it in g] for g in groups] == [[0, 1], [2], [3]]
+    assert [len(g) for g in pack_chunks(items, max_tokens=0)] == [1, 1, 1, 1]
+    # seuil par chunk: seuls les chunks courts sont regroupés, un chunk « normal » garde son appel
+    mixed = [_item(i, t) for i, t in enumerate(["a", "b c", "d e f g", "h"])]
+    assert [[it["page"] for it in g] for g in pack_chunks(mixed, max_tokens=100, max_chunk_tokens=3)] == [[0, 1], [2], [3]]
+
+def test_packed_extraction_keeps_provenance_and_falls_back():
+    items = [_item(i, f"T{i} 1200 DH") for i in range(3)]
+    prov = _Packed(drop="K2")
+    calls = []
+    kgs = extract_packed(items, provider=prov, series="s", calls=calls)
+    assert len(prov.prompts) == 2 and len(calls) == 2          # appel groupé + repli comptés and prov.prompts[0].count("Tu es un extracteur") == 1
+    assert [k.entities[0]["name"] for k in kgs] == ["prix K1", "seul", "prix K3"]     # K2 absent => repli
+    assert kgs[2].relations[0]["source"] == "s:f:2"
+    broken = _Packed(broken=True)
+    assert [k.entities[0]["name"] for k in extract_packed(items, provider=broken, series="s")] == ["seul"] * 3
+    assert len(broken.prompts) == 4
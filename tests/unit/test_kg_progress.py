@@ -0,0 +1,69 @@
+# tests/unit/test_kg_progress.py
+import json
+
+from corpus.kg.progress import JsonlWriter, ProgressStore
+
+
+def test_import_legacy_jsonl_once(tmp_path):
+    legacy = tmp_path / "a.kg.jsonl"
+    legacy.write_text('{"hash": "h1"}\n{"hash": "h2"}\n{"hash": "h3', encoding="utf-8")   # dernière ligne tronquée
+    store = ProgressStore(tmp_path / "p.sqlite")
+    assert store.import_jsonl("s", "A1", "b1", "a", legacy) == 2
+    assert store.import_jsonl("s", "A1", "b1", "a", legacy) == 0                           # déjà migré
+    assert store.is_done("s", "A1", "b1", "a", "h1") and not store.is_done("s", "A1", "b1", "a", "h3")
+    assert not store.is_done("s", "A2", "b1", "a", "h1") and not store.is_done("s", "A1", "b1", "b", "h1")
+    assert not store.is_done("s", "A1", "b2", "a", "h1")                                   # autre build
+
+
+def test_builds_resume_until_finished_then_start_empty(tmp_path):
+    store = ProgressStore(tmp_path / "p.sqlite")
+    assert not store.has_builds("s", "A1")
+    assert store.open_build("s", "A1", "b1") == ("b1", False)
+    store.mark_done("s", "A1", "b1", "a", ["h1"])
+    assert store.open_build("s", "A1", "b2") == ("b1", True)                              # build inachevé repris
+    store.finish_build("s", "A1", "b1")
+    assert store.open_build("s", "A1", "b3") == ("b3", False)
+    assert store.count("s", "A1", build_id="b3") == 0                                     # rien d'hérité de b1
+    assert store.forget("s") == 1 and store.open_build("s", "A1", "b4") == ("b4", False)  # b3 clos par forget
+
+
+def test_legacy_flag_follows_the_build(tmp_path):
+    store = ProgressStore(tmp_path / "p.sqlite")
+    assert store.open_build("s", "A1", "b1", legacy=True) == ("b1", False)
+    assert store.open_build("s", "A1", "b2") == ("b1", True) and store.is_legacy("s", "A1", "b1")
+    store.finish_build("s", "A1", "b1")
+    store.open_build("s", "A1", "b3")
+    assert not store.is_legacy("s", "A1", "b3")
+
+
+def test_forget_on_legacy_cache_blocks_reimport(tmp_path):
+    store = ProgressStore(tmp_path / "p.sqlite")
+    store.forget("s")
+    assert store.has_builds("s", "A1")          # le runner archivera le JSONL au lieu de le réimporter
+
+
+def test_writer_marks_done_only_after_fsync(tmp_path):
+    store = ProgressStore(tmp_path / "p.sqlite")
+    path = tmp_path / "a.kg.jsonl"
+    w = JsonlWriter(path, flush_every=2, fsync_s=60,
+                    on_flush=lambda keys: store.mark_done("s", "A1", "b1", "a", keys))
+    w.write({"hash": "h1"}, key="h1")
+    assert not store.is_done("s", "A1", "b1", "a", "h1")
+    w.write({"hash": "h2"}, key="h2")
+    w.write({"hash": "h3"}, key="h3")
+    assert store.count("s", "A1", build_id="b1") == 2
+    w.close()
+    assert store.count("s") == 3 and w.syncs == 2
+    assert [json.loads(l)["hash"] for l in path.read_text(encoding="utf-8").splitlines()] == ["h1", "h2", "h3"]
+    assert store.forget("s") == 3 and not store.is_done("s", "A1", "b1", "a", "h2")
+
+
+def test_writer_repairs_truncated_tail(tmp_path):
+    path = tmp_path / "a.kg.jsonl"
+    path.write_text('{"hash": "h1"}\n{"hash": "h2", "entit', encoding="utf-8")
+    with JsonlWriter(path) as w:
+        assert w.repaired == len('{"hash": "h2", "entit')
+        w.write({"hash": "h3"})
+    assert [json.loads(l)["hash"] for l in path.read_text(encoding="utf-8").splitlines()] == ["h1", "h3"]
+    with JsonlWriter(path) as w:
+        assert w.repaired == 0
@@ -0,0 +1,124 @@
+# tests/unit/test_kg_runner.py
+import json
+import re
+import threading
+import time
+import types
+
+import pytest
+
+pytest.importorskip("fastmcp")   # corpus.kg.runner -> app.core.resources
+
+import corpus.kg.runner as runner_mod
+from app.core.config import RuntimeCfg
+
+
+class _Provider:
+    """
+    Réponse déterministe par chunk (« lot N ») ; `fail_on`: numéro d'appel qui lève ; `sleep`: les premiers
+    chunks répondent le plus lentement (ordre d'achèvement inversé) ; prompt groupé => réponse illisible.
+    """
+    def __init__(self, fail_on=None, sleep=False):
+        self.fail_on, self.sleep, self.calls = fail_on, sleep, 0
+        self._lock = threading.Lock()
+
+    def ask_llm(self, prompt):
+        with self._lock:
+            self.calls += 1
+            if self.calls == self.fail_on:
+                raise RuntimeError("provider down")
+        ns = re.findall(r"lot (\d+)", prompt)
+        if len(ns) > 1:
+            return "désolé, pas de JSON"
+        n = ns[0]
+        if self.sleep:
+            time.sleep(0.002 * (10 - int(n) % 10))
+        return json.dumps({"entities": [{"type": "Place", "name": f"P{n}"}, {"type": "City", "name": "Casablanca"}],
+                           "relations": [{"type": "in", "source": {"type": "Place", "name": f"P{n}"},
+                                          "target": {"type": "City", "name": "Casablanca"}}]})
+
+
+class _DB:
+    def __init__(self):
+        self.entities, self.relations, self.links, self.calls = {}, set(), set(), []
+    def enable_query_logging(self, path): pass
+    def ensure_base_schema(self): pass
+    def graph_quality(self, series=None): return {}
+    def upsert_entities(self, rows, **kw):
+        self.calls.append(("entities", [r["id"] for r in rows]))
+        self.entities.update((r["id"], r["name"]) for r in rows)
+    def upsert_relations(self, rows, **kw):
+        self.calls.append(("relations", [(r["src"], r["dst"]) for r in rows]))
+        self.relations.update((r["src"], r["dst"]) for r in rows)
+    def link_entities_to_chunks(self, rows):
+        self.calls.append(("links", [(r["eid"], r["cid"]) for r in rows]))
+        self.links.update((r["eid"], r["cid"]) for r in rows)
+
+
+class _Storage:
+    def __init__(self, root): self.root = root
+    def ensure_series(self, series): return self.root
+
+
+def _setup(tmp_path, monkeypatch, n=10, parallelism=1, pack_tokens=0):
+    (tmp_path / "chunks").mkdir(parents=True)
+    (tmp_path / "chunks" / "_report.json").write_text(json.dumps(
+        {"items": [{"filename": "f.pdf", "output": "chunks/f.jsonl"}]}))
+    (tmp_path / "chunks" / "f.jsonl").write_text("\n".join(
+        json.dumps({"text": f"lot {i} à Casablanca", "idx": i, "page": 1}) for i in range(n)))
+    monkeypatch.setattr(runner_mod, "get_storage", lambda: _Storage(tmp_path))
+    monkeypatch.setattr(runner_mod, "get_settings",
+                        lambda: types.SimpleNamespace(runtime=RuntimeCfg(parallelism=parallelism,
+                                                                                   pack_tokens=pack_tokens)))
+
+
+def test_crash_then_resume_writes_every_entity(tmp_path, monkeypatch):
+    _setup(tmp_path, monkeypatch)
+    db = _DB()
+    with pytest.raises(RuntimeError):
+        runner_mod.KGRunner(_Provider(fail_on=4), db=db, batch_upsert=100).run_series("s")
+    assert set(db.entities.values()) == {"P0", "P1", "P2", "Casablanca"}    # reliquats écrits malgré l'erreur
+
+    rep = runner_mod.KGRunner(_Provider(), db=db, batch_upsert=100).run_series("s")
+    assert rep["resumed"] and rep["chunks_processed"] == 10
+    assert set(db.entities.values()) == {f"P{i}" for i in range(10)} | {"Casablanca"}
+    assert len(db.relations) == 10
+    assert {cid for _, cid in db.links} == {f"s:f:{i}" for i in range(10)}
+
+
+def _run(tmp_path, monkeypatch, parallelism):
+    _setup(tmp_path, monkeypatch, n=24, parallelism=parallelism, pack_tokens=1200)
+    db, prov = _DB(), _Provider(sleep=True)
+    rep = runner_mod.KGRunner(prov, db=db, batch_upsert=5).run_series("s")
+    lines = [json.loads(l) for l in (tmp_path / "kg" / "f.kg.jsonl").read_text(encoding="utf-8").splitlines()]
+    cache = [(r["chunk_id"], [e["id"] for e in r["entities"]], [(x["src"], x["dst"]) for x in r["relations"]])
+             for r in lines]
+    return rep, db.calls, cache, prov.calls
+
+
+def test_parallel_run_matches_sequential_run(tmp_path, monkeypatch):
+    rep1, calls1, cache1, n1 = _run(tmp_path / "p1", monkeypatch, parallelism=1)
+    rep4, calls4, cache4, n4 = _run(tmp_path / "p4", monkeypatch, parallelism=4)
+    assert rep4["parallelism"] == 4 and (cache4, calls4) == (cache1, calls1)   # JSONL et lots dans l'ordre d'entrée
+    assert [c for c, _, _ in cache1] == [f"s:f:{i}" for i in range(24)]
+    # 3 appels groupés illisibles (8 chunks max) => repli mono-chunk pour chacun des 24 chunks
+    assert n1 == n4 == rep4["llm_calls"] == 3 + 24
+    assert (rep4["chunks_processed"], rep4["entities_upserted"], rep4["relations_upserted"]) == (24, 25, 24)
+
+
+def test_limited_legacy_build_imports_remaining_caches_on_resume(tmp_path, monkeypatch):
+    _setup(tmp_path, monkeypatch, n=4)
+    (tmp_path / "chunks" / "_report.json").write_text(json.dumps({"items": [
+        {"filename": "f.pdf", "output": "chunks/f.jsonl"}, {"filename": "g.pdf", "output": "chunks/g.jsonl"}]}))
+    (tmp_path / "chunks" / "g.jsonl").write_text("\n".join(
+        json.dumps({"text": f"lot {i} à Casablanca", "idx": i, "page": 1}) for i in range(4, 8)))
+    # caches JSONL antérieurs à l'index (aucun build enregistré) pour les deux fichiers
+    runner_mod.KGRunner(_Provider(), db=_DB()).run_series("s")
+    (tmp_path / "kg" / "_progress.sqlite").unlink()
+
+    prov = _Provider()
+    rep = runner_mod.KGRunner(prov, db=_DB()).run_series("s", limit_chunks=2)   # s'arrête dans f: g non atteint
+    assert rep["chunks_processed"] == 2 and prov.calls == 0
+    rep = runner_mod.KGRunner(prov, db=_DB()).run_series("s")
+    assert rep["resumed"] and rep["chunks_processed"] == 8 and prov.calls == 0
+    assert len((tmp_path / "kg" / "g.kg.jsonl").read_text(encoding="utf-8").splitlines()) == 4   # rien de ré-ajouté
@@ -0,0 +1,85 @@
+# tests/unit/test_lexical_seeds.py
+import pytest
+from neo4j.exceptions import ClientError
+from adapters.db import cypher as C
+from adapters.db.neo4j import Neo4jAdapter
+from graph_based.backend import Neo4jGraphBackend
+from graph_based.retriever.pathrag import node_retrieval
+from graph_based.utils.lexical import LexicalIndex, lucene_query
+
+DOCS = [
+    {"id": "e1", "name": "Bail commercial", "aliases": ["bail 3-6-9"], "desc": "contrat de location", "conf": 0.9},
+    {"id": "e2", "name": "Loyer", "aliases": [], "desc": "montant du bail payé chaque mois", "conf": 0.5},
+    {"id": "e3", "name": "Notaire", "aliases": ["officier public"], "desc": "", "conf": 0.7},
+]
+
+def test_lucene_query_scopes_series_and_escapes():
+    q = lucene_query("series-1", ["bail", "3-6-9"])
+    assert q.startswith('+series:"series\\-1" +(') and "name:(bail 3\\-6\\-9)^3" in q and "desc:(bail 3\\-6\\-9)^1" in q
+
+def test_bm25_prefers_name_over_desc_matches():
+    idx = LexicalIndex(DOCS)
+    hits = idx.search(["bail"], n=5)
+    assert [d["id"] for d, _ in hits] == ["e1", "e2"] and hits[0][1] > hits[1][1]
+    assert [d["id"] for d, _ in idx.search(["officier"])] == ["e3"]
+
+class FakeDb:
+    def __init__(self): self.names = []
+    def run_cypher(self, q, params=None, name=None):
+        self.names.append(name)
+        if q == C.ENTITY_LEXICAL_SEARCH:
+            raise ClientError("There is no such fulltext schema index: entity_lexical_ft")
+        return DOCS
+
+def test_topn_falls_back_to_python_index():
+    db = FakeDb()
+    res = node_retrieval.topN("s", "Quel est le loyer du bail ?", n=2, db=db)
+    assert [n["id"] for n in res["nodes"]] == ["e1", "e2"]
+    node_retrieval.topN("s", "notaire", db=db)
+    assert db.names.count("pathrag.node_retrieval.docs") == 1   # index Python mis en cache
+
+class Rec(dict):
+    def data(self): return dict(self)
+
+class StreamFailSession:
+    """Session dont le résultat lève pendant l'itération (comme le driver quand l'index full-text manque)."""
+    def __enter__(self): return self
+    def __exit__(self, *a): return False
+    def run(self, query, **p):
+        if "entity_lexical_ft" not in query:
+            return [Rec(d) for d in DOCS]
+        def rows():
+            raise ClientError("There is no such fulltext schema index: entity_lexical_ft")
+            yield
+        return rows()
+
+def test_search_entities_falls_back_when_result_stream_fails():
+    db = Neo4jAdapter.__new__(Neo4jAdapter)
+    db._log_file, db._session = None, StreamFailSession
+    with pytest.raises(ClientError):                       # plus de résultat vide silencieux
+        db.run_cypher(C.ENTITY_LEXICAL_SEARCH, {"q": "x", "series": "s2", "limit": 4})
+    hits = Neo4jGraphBackend(db).search_entities("s2", ["bail"], n=2)
+    assert [h["id"] for h in hits] == ["e1", "e2"] and hits[0]["score"] > 0
+
+def test_aliases_text_backfill_runs_once_per_database():
+    class _Res:
+        def __init__(self, n=0): self.n = n
+        def consume(self): return None
+        def single(self): return {"n": self.n}
+    class _Driver:
+        def __init__(self): self.marked, self.queries = False, []
+        def session(self, **kw): return self
+        def __enter__(self): return self
+        def __exit__(self, *a): return False
+        def run(self, query, **p):
+            self.queries.append(query)
+            if query == C.SCHEMA_MIGRATION_MARK:
+                self.marked = True
+            return _Res(int(self.marked) if query == C.SCHEMA_MIGRATION_DONE else 0)
+
+    drv = _Driver()
+    for _ in range(2):                                  # deux process: le second voit le marqueur
+        db = Neo4jAdapter.__new__(Neo4jAdapter)
+        db._driver = drv
+        db.ensure_base_schema(); db.ensure_base_schema()
+    assert drv.queries.count(C.BACKFILL_ALIASES_TEXT) == 1 and drv.queries.count(C.SCHEMA_MIGRATION_DONE) == 2
@@ -0,0 +1,72 @@
+# tests/unit/test_llm_cache.py
+import time
+
+from adapters.llm.base import provider_slots, unwrap_provider
+from adapters.llm.cache import CachedProvider, EmbeddingCache
+from adapters.llm.llm_cache import CachedChatProvider, LLMResponseCache, ask_cached, json_object_reply
+
+class _Chat:
+    chat_model = "fake-chat"
+    def __init__(self): self.calls = 0
+    def ask_llm(self, query):
+        self.calls += 1
+        return f"r:{query}"
+
+def test_rerun_hits_cache_and_bypass(tmp_path):
+    first = CachedChatProvider(_Chat(), LLMResponseCache(tmp_path / "l.sqlite"), bypass=["kg.el"])
+    assert ask_cached(first, "p1", caller="kg.extract") == "r:p1"
+    again = CachedChatProvider(_Chat(), LLMResponseCache(tmp_path / "l.sqlite"), bypass=["kg.el"])  # nouveau process
+    assert ask_cached(again, "p1", caller="kg.extract") == "r:p1" and again.inner.calls == 0
+    ask_cached(again, "p1", caller="kg.el"); ask_cached(again, "p1", caller="kg.extract", cache=False)
+    assert again.inner.calls == 2
+    st = again.llm_cache_stats()
+    assert st["callers"]["kg.extract"] == {"hits": 1, "misses": 0, "bypass": 1, "hit_rate": 1.0}
+    assert st["callers"]["kg.el"]["bypass"] == 1 and ask_cached(_Chat(), "p", caller="x") == "r:p"
+
+def test_ttl_and_size_bound(tmp_path):
+    cache = LLMResponseCache(tmp_path / "l.sqlite", max_bytes=2000, ttl_s=0.05)
+    for i in range(40):
+        cache.put(f"k{i}", "x" * 60)
+    assert cache.stats()["bytes"] <= 2000 and cache.get("k0") is None and cache.get("k39")
+    time.sleep(0.06)
+    assert cache.get("k39") is None and cache.expired == 1
+
+def test_wrapper_stack_unwraps(tmp_path):
+    raw = _Chat()
+    stack = CachedChatProvider(CachedProvider(raw, EmbeddingCache(tmp_path / "e.sqlite")),
+                               LLMResponseCache(tmp_path / "l.sqlite"))
+    assert unwrap_provider(stack) is raw and stack.chat_model == "fake-chat"
+    assert provider_slots(stack, 2) is provider_slots(raw, 2)
+    assert stack._key("p").startswith("_Chat|fake-chat|0|")
+
+def test_byte_counter_tracks_replacements_and_evictions(tmp_path):
+    cache = LLMResponseCache(tmp_path / "l.sqlite", max_bytes=10**6)
+    cache.put("k1", "x" * 100); cache.put("k2", "y" * 50); cache.put("k1", "z" * 10)      # remplacement
+    assert cache.stats()["bytes"] == (10 + 2) + (50 + 2)
+    small = LLMResponseCache(tmp_path / "s.sqlite", max_bytes=500)
+    for i in range(20):
+        small.put(f"k{i:02d}", "x" * 60)
+    total = small._conn.execute("SELECT SUM(size) FROM llm").fetchone()[0]
+    assert small.stats()["bytes"] == total <= 500 and small.evictions > 0
+    assert LLMResponseCache(tmp_path / "l.sqlite").stats()["bytes"] == cache.stats()["bytes"]   # SUM à l'ouverture
+
+def test_invalid_replies_are_not_cached(tmp_path):
+    from corpus.kg.extract import extract_from_text
+
+    class _Flaky(_Chat):
+        def ask_llm(self, query):
+            self.calls += 1
+            return "pas du JSON" if self.calls == 1 else '{"entities": [{"type": "City", "name": "Rabat"}]}'
+
+    prov = CachedChatProvider(_Flaky(), LLMResponseCache(tmp_path / "l.sqlite"))
+    kw = dict(provider=prov, series="s", file="f", page=1, chunk_id="s:f:0")
+    try:
+        extract_from_text("Rabat", **kw)
+    except ValueError:
+        pass
+    assert len(prov.llm_cache) == 0
+    assert extract_from_text("Rabat", **kw).entities[0]["name"] == "Rabat" and prov.inner.calls == 2
+    assert extract_from_text("Rabat", **kw).entities and prov.inner.calls == 2     # réponse lisible servie du cache
+    prov.llm_cache.put(prov._key("p"), "{cassé")                                    # entrée invalide déjà en cache
+    assert ask_cached(prov, "p", caller="x", validate=json_object_reply).startswith("{")
+    assert prov.inner.calls == 3 and json_object_reply(prov.llm_cache.get(prov._key("p")))
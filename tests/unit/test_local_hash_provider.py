@@ -0,0 +1,18 @@
+# tests/unit/test_local_hash_provider.py
+import numpy as np
+import pytest
+from adapters.llm.local_hash import LocalHashProvider
+
+def test_deterministic_any_dims_and_similarity():
+    p = LocalHashProvider()
+    a = np.array(p.embed_batch(["maison avec jardin", "maison avec un jardin", "bail commercial"]))
+    assert a.shape == (3, 384) and np.allclose(np.linalg.norm(a, axis=1), 1.0, atol=1e-5)
+    assert a[0] @ a[1] > a[0] @ a[2]
+    v = LocalHashProvider().embed("maison avec jardin", dimensions=1536)
+    assert len(v) == 1536 and v == p.embed("maison avec jardin", dimensions=1536)
+    # un texte seul ou dans un lot => même vecteur
+    assert np.allclose(p.embed("bail commercial"), a[2], atol=1e-6)
+
+def test_no_chat():
+    with pytest.raises(RuntimeError):
+        LocalHashProvider().ask_llm("hello")
@@ -0,0 +1,61 @@
+# tests/unit/test_neo4j_async.py
+import asyncio
+
+import adapters.db.neo4j_async as neo4j_async
+from adapters.db.neo4j_async import AsyncNeo4jAdapter
+from corpus.retriever.kg import KGRetriever
+from corpus.retriever.schemas import SearchRequest
+
+
+class _Result:
+    def __init__(self, rows): self.rows = rows
+    async def data(self): return [dict(r) for r in self.rows]
+    async def single(self): return self.rows[0] if self.rows else None
+    async def consume(self): return type("Summary", (), {"profile": None})()
+
+
+class _Session:
+    def __init__(self, driver): self.driver = driver
+    async def __aenter__(self): return self
+    async def __aexit__(self, *a): self.driver.closed_sessions += 1
+    async def run(self, query, **p):
+        self.driver.calls.append((query, p))
+        await asyncio.sleep(0)                                   # rend la main à la boucle
+        if "MATCH (c:Chunk)" in query and "$limit" in query:
+            rest = [i for i in self.driver.ids if p.get("after") is None or i > p["after"]]
+            return _Result([{"id": i, "text": f"t{i}"} for i in rest[:p["limit"]]])
+        return _Result([{"id": "e1", "labels": ["Entity"], "name": "Loyer", "type": "Montant", "series": "s",
+                         "score": 2.5}])
+
+
+class _Driver:
+    def __init__(self): self.calls, self.closed_sessions, self.closed, self.ids = [], 0, False, [f"c{i:02d}" for i in range(7)]
+    def session(self, **kw): return _Session(self)
+    async def close(self): self.closed = True
+
+
+def _adapter(monkeypatch):
+    drv = _Driver()
+    monkeypatch.setattr(neo4j_async.AsyncGraphDatabase, "driver", staticmethod(lambda *a, **k: drv))
+    return AsyncNeo4jAdapter(uri="bolt://fake", user="u", password="p"), drv
+
+
+def test_async_adapter_run_cypher_and_keyset_pages(monkeypatch):
+    adb, drv = _adapter(monkeypatch)
+    async def go():
+        rows = await adb.run_cypher("RETURN 1", {"x": 1})
+        chunks = [c["id"] async for c in adb.iter_chunks("s", fetch_size=3)]
+        await adb.close()
+        return rows, chunks
+    rows, chunks = asyncio.run(go())
+    assert rows[0]["name"] == "Loyer" and drv.calls[0][1] == {"x": 1}
+    assert chunks == drv.ids and len(drv.calls) == 1 + 3 and drv.closed
+    assert drv.closed_sessions == len(drv.calls)                # une session par page, toujours refermée
+
+
+def test_kg_retriever_asearch_uses_async_adapter(monkeypatch):
+    adb, drv = _adapter(monkeypatch)
+    ret = KGRetriever(db=None, adb=adb)
+    res = asyncio.run(ret.asearch(SearchRequest(query="loyer", mode="kg", k=3, series="s")))
+    assert [(h.id, h.name, h.score) for h in res.hits] == [("e1", "Loyer", 2.5)]
+    assert drv.calls[0][1]["series"] == "s" and drv.calls[0][1]["k"] == 3
@@ -0,0 +1,63 @@
+# tests/unit/test_neo4j_bulk.py
+import pytest
+from neo4j.exceptions import TransientError
+from adapters.db.bulk import BulkWriter, partition, split
+
+class FakeTx:
+    def __init__(self, sess): self.sess = sess
+    def __enter__(self): return self
+    def __exit__(self, *a): return False
+    def commit(self): self.sess.commits += 1
+    def run(self, query, **params):
+        self.sess.calls.append(params)
+        if self.sess.fail:
+            self.sess.fail -= 1
+            raise TransientError("deadlock")
+        return [{"n": len(params["rows"])}] if "RETURN" in query else []
+
+class FakeSession:
+    def __init__(self): self.calls, self.fail, self.commits = [], 0, 0
+    def __enter__(self): return self
+    def __exit__(self, *a): return False
+    def begin_transaction(self): return FakeTx(self)
+
+def test_split_respects_rows_and_bytes():
+    rows = [{"id": str(i), "vec": [0.0] * 100} for i in range(10)]
+    assert [len(b) for b in split(rows, max_rows=4, max_bytes=10**9)] == [4, 4, 2]
+    assert all(len(b) <= 2 for b in split(rows, max_rows=100, max_bytes=2 * 950))
+
+def test_partition_keeps_same_node_together():
+    rows = [{"id": f"e{i % 7}", "k": i} for i in range(100)]
+    parts = partition(rows, "id", 4)
+    assert sum(len(p) for p in parts) == 100
+    owner = {}
+    for pi, p in enumerate(parts):
+        for r in p:
+            assert owner.setdefault(r["id"], pi) == pi
+
+def test_partition_on_both_endpoints_never_splits_a_node():
+    rels = [{"src": f"e{i % 11}", "dst": f"e{(i * 7) % 13 + 20}"} for i in range(60)]
+    rels += [{"src": "x1", "dst": "x2"}, {"src": "x2", "dst": "x3"}, {"src": "y1", "dst": "y2"}]
+    parts = partition(rels, ("src", "dst"), 4)
+    assert sum(len(p) for p in parts) == len(rels)
+    owner = {}
+    for pi, p in enumerate(parts):
+        for r in p:
+            assert owner.setdefault(r["src"], pi) == pi and owner.setdefault(r["dst"], pi) == pi
+    assert owner["x1"] == owner["x3"]                       # chaîne x1-x2-x3 : un seul groupe
+
+def test_bulk_writer_sums_n_and_retries_transient():
+    sess = FakeSession(); sess.fail = 2
+    w = BulkWriter(lambda: sess, max_rows=10, parallelism=3, retries=3, backoff_s=0.0)
+    rep = w.write("UNWIND $rows AS r RETURN count(*) AS n", [{"id": i} for i in range(55)], key="id", params={"series": "s"})
+    assert rep.n == 55 and rep.retries == 2 and rep.batches >= 6
+    assert len(sess.calls) == rep.batches + 2 and sess.commits == rep.batches   # une seule couche de reprise
+    assert all(c["series"] == "s" for c in sess.calls)
+    # sans RETURN: nombre de lignes envoyées
+    assert w.write("UNWIND $rels AS r MERGE (x {id: r.id});", [{"id": 1}], param="rels").n == 1
+
+def test_bulk_writer_gives_up_after_retries():
+    sess = FakeSession(); sess.fail = 10
+    w = BulkWriter(lambda: sess, retries=1, backoff_s=0.0)
+    with pytest.raises(TransientError):
+        w.write("UNWIND $rows AS r RETURN count(*) AS n", [{"id": 1}])
@@ -0,0 +1,48 @@
+# tests/unit/test_neo4j_import.py
+import csv, json
+from adapters.vector.mmap import MmapIndex
+from tools.neo4j_import import export_series
+
+def _write_jsonl(path, recs):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text("\n".join(json.dumps(r) for r in recs) + "\n", encoding="utf-8")
+
+def _rows(path):
+    with path.open(encoding="utf-8", newline="") as f:
+        return list(csv.reader(f))
+
+def test_export_series_writes_admin_csvs(tmp_path):
+    sdir = tmp_path / "s1"
+    _write_jsonl(sdir / "chunks" / "doc.chunks.jsonl", [
+        {"text": "Bail de location\nsigné", "doc": {"filename": "doc"}, "idx": 0, "meta": {"page": 1}},
+        {"text": "Loyer mensuel", "doc": {"filename": "doc"}, "idx": 1, "meta": {"page": 2}},
+    ])
+    (sdir / "chunks" / "_report.json").write_text(json.dumps({"items": [{"output": "chunks/doc.chunks.jsonl"}]}))
+    ents = [{"id": "e1", "name": "Bail", "type": "Contrat", "aliases": ["bail 3-6-9", "contrat de bail"]},
+            {"id": "e2", "name": "Loyer", "type": "Montant"}]
+    _write_jsonl(sdir / "kg" / "doc.kg.jsonl", [
+        {"chunk_id": "s1:doc:0", "page": 1, "entities": ents,
+         "relations": [{"src": "e1", "dst": "e2", "type": "FIXE"}, {"src": "e1", "dst": "zz", "type": "X"}]},
+        {"chunk_id": "s1:doc:1", "page": 2, "entities": [ents[1]],
+         "relations": [{"src": "e1", "dst": "e2", "type": "FIXE"}]},
+    ])
+    MmapIndex(sdir / "vectors").add(["s1:doc:0"], [[3.0, 4.0]])
+
+    res = export_series("s1", sdir, tmp_path / "out", model="m")
+    out = tmp_path / "out"
+    assert (res["chunks"], res["entities"], res["relations"], res["appears_in"]) == (2, 2, 1, 3)
+    assert res["dangling"] == 1 and res["embeddings"] == 1
+
+    head = _rows(out / "chunks_header.csv")[0]
+    assert head[0] == "id:ID(Chunk)" and "embedding:float[]" in head and head[-1] == ":LABEL"
+    chunks = {r[0]: dict(zip(head, r)) for r in _rows(out / "chunks.csv")}
+    assert chunks["s1:doc:0"]["text"] == "Bail de location\nsigné"
+    assert chunks["s1:doc:0"]["embedding:float[]"] == "0.6;0.8" and chunks["s1:doc:1"]["embedding:float[]"] == ""
+    ehead = _rows(out / "entities_header.csv")[0]
+    assert "aliases:string[]" in ehead and "aliases_text" in ehead
+    entities = {r[0]: dict(zip(ehead, r)) for r in _rows(out / "entities.csv")}
+    assert entities["e1"]["aliases:string[]"] == "bail 3-6-9;contrat de bail"
+    assert entities["e1"]["aliases_text"] == " bail 3-6-9 contrat de bail" and entities["e2"]["aliases_text"] == ""
+    assert _rows(out / "rels_header.csv")[0][:2] == [":START_ID(Entity)", ":END_ID(Entity)"]
+    assert [r[:2] + r[-1:] for r in _rows(out / "rels.csv")] == [["e1", "e2", "REL"]]
+    assert "--nodes=Chunk=chunks_header.csv,chunks.csv" in res["command"]
@@ -0,0 +1,44 @@
+# tests/unit/test_neo4j_iter_chunks.py
+import pytest
+from adapters.db import cypher as C
+from adapters.db.neo4j import Neo4jAdapter
+
+class Rec(dict):
+    def data(self): return dict(self)
+
+class PagedSession:
+    def __init__(self, ids): self.ids, self.calls = ids, []
+    def __enter__(self): return self
+    def __exit__(self, *a): return False
+    def run(self, q, **p):
+        self.calls.append((q, p))
+        rest = [i for i in self.ids if "after" not in p or i > p["after"]]
+        return [Rec(id=i, text=f"t{i}") for i in rest[:p["limit"]]]
+
+def test_chunks_page_query_projection_is_whitelisted():
+    q = C.chunks_page_query(["text"])
+    assert "c.`id` AS `id`" in q and "c.`text` AS `text`" in q and "embedding" not in q
+    assert "$after" not in q and "c.id > $after" in C.chunks_page_query(["text"], after=True)
+    with pytest.raises(ValueError):
+        C.chunks_page_query(["text) DETACH DELETE c //"])
+
+def test_iter_chunks_keyset_pages_lazily():
+    sess = PagedSession([f"c{i:03d}" for i in range(25)])
+    db = Neo4jAdapter.__new__(Neo4jAdapter)
+    db._log_file, db._session = None, lambda: sess
+    it = db.iter_chunks("s", fetch_size=10)
+    assert next(it)["id"] == "c000" and len(sess.calls) == 1
+    rest = list(it)
+    assert len(rest) == 24 and [p.get("after") for _, p in sess.calls] == [None, "c009", "c019"]
+    assert "$after" not in sess.calls[0][0] and all("c.id > $after" in q for q, _ in sess.calls[1:])
+
+def test_stream_chunks_keeps_whole_nodes_by_default():
+    class NodeSession(PagedSession):
+        def run(self, q, **p):
+            self.calls.append((q, p))
+            return [Rec(c={"id": "c1", "text": "t", "embedding": [0.1]})]
+    sess = NodeSession([])
+    db = Neo4jAdapter.__new__(Neo4jAdapter)
+    db._log_file, db._session = None, lambda: sess
+    assert db.stream_chunks("s") == [{"id": "c1", "text": "t", "embedding": [0.1]}]
+    assert "RETURN c" in sess.calls[0][0] and "$limit" not in sess.calls[0][0]
@@ -0,0 +1,29 @@
+# tests/unit/test_parallel.py
+import threading, time
+import pytest
+from graph_based.utils.parallel import QueueWriter, imap_bounded
+
+def test_imap_bounded_keeps_order_and_bounds_in_flight():
+    live, peak, lock = [0], [0], threading.Lock()
+    def work(x):
+        with lock:
+            live[0] += 1; peak[0] = max(peak[0], live[0])
+        time.sleep(0.01 * (5 - x % 5))
+        with lock:
+            live[0] -= 1
+        return x * x
+    out = list(imap_bounded(work, range(20), max_workers=4, max_in_flight=4))
+    assert out == [(x, x * x) for x in range(20)] and peak[0] <= 4
+
+def test_queue_writer_drains_and_reraises():
+    got = []
+    with QueueWriter(got.append, maxsize=2) as w:
+        for i in range(10):
+            w.put(i)
+    assert got == list(range(10))
+
+    def boom(x): raise ValueError("write failed")
+    w = QueueWriter(boom)
+    w.put(1)
+    with pytest.raises(ValueError):
+        w.close()
@@ -0,0 +1,24 @@
+# tests/unit/test_query_cache.py
+import time
+from adapters.llm.query_cache import QueryEmbeddingCache
+
+class _Fake:
+    embed_model = "m"
+    def __init__(self): self.calls = 0
+    def embed(self, text, *, dimensions=None):
+        self.calls += 1
+        return [float(len(text))]
+
+def test_hits_on_normalized_query_and_counters():
+    cache, prov = QueryEmbeddingCache(maxsize=2), _Fake()
+    v = cache.embed(prov, "Prix du T3 ?")
+    assert cache.embed(prov, "  prix   du t3 ? ") == v and prov.calls == 1
+    cache.embed(prov, "a"); cache.embed(prov, "b")  # éviction LRU de la 1re requête
+    cache.embed(prov, "prix du t3 ?")
+    st = cache.stats()
+    assert prov.calls == 4 and st["hits"] == 1 and st["misses"] == 4 and st["evictions"] == 2
+
+def test_ttl_expiry():
+    cache, prov = QueryEmbeddingCache(ttl_s=0.01), _Fake()
+    cache.embed(prov, "q"); time.sleep(0.02); cache.embed(prov, "q")
+    assert prov.calls == 2 and cache.stats()["expired"] == 1
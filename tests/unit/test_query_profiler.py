@@ -0,0 +1,35 @@
+# tests/unit/test_query_profiler.py
+from adapters.db.profiler import QueryProfiler, summarize_profile
+
+PLAN = {"operatorType": "ProduceResults@neo4j", "dbHits": 0, "rows": 3, "children": [
+    {"operatorType": "Expand(All)@neo4j", "dbHits": 120, "rows": 3, "children": [
+        {"operatorType": "NodeByLabelScan@neo4j", "dbHits": 900, "rows": 300, "children": []}]}]}
+
+def test_summarize_profile_sums_db_hits():
+    s = summarize_profile(PLAN)
+    assert s["db_hits"] == 1020 and s["operators"][0] == {"op": "NodeByLabelScan", "db_hits": 900, "rows": 300}
+
+def test_profiler_percentiles_and_offenders():
+    p = QueryProfiler(profile_sample=0.0)
+    assert not p.should_profile("q.fast")
+    for i in range(100):
+        p.record("q.fast", "MATCH (n) RETURN n", ms=1.0 + i % 3, rows=2)
+    for i in range(10):
+        p.record("q.slow", "MATCH p=()-[*1..3]-() RETURN p", ms=50.0 + i, rows=6)
+    p.record("q.slow", "MATCH p=()-[*1..3]-() RETURN p", ms=None, rows=6, profile=PLAN)
+    rep = p.report(top=1)
+    slow = next(q for q in rep["queries"] if q["name"] == "q.slow")
+    assert rep["top_total"] == ["q.slow"] and rep["top_db_hits"] == ["q.slow"]
+    assert slow["count"] == 11 and slow["p50_ms"] == 54.5 and slow["db_hits_mean"] == 1020.0
+    assert slow["mean_ms"] == 54.5                          # l'exécution PROFILE (non chronométrée) n'entre pas au diviseur
+    assert slow["operators"][0]["op"] == "NodeByLabelScan"
+
+def test_first_profile_comes_after_warmup_and_skips_excluded():
+    p = QueryProfiler(profile_sample=1e-9, warmup=3, exclude=["snap."])
+    for _ in range(3):
+        assert not p.should_profile("q")
+        p.record("q", "RETURN 1", ms=1.0)
+        p.record("snap.nodes", "MATCH (n) RETURN n", ms=1.0)
+    assert p.should_profile("q") and not p.should_profile(None) and not p.should_profile("snap.nodes")
+    p.record("q", "RETURN 1", ms=None, profile=PLAN)
+    assert not p.should_profile("q")
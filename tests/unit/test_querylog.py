@@ -0,0 +1,26 @@
+# tests/unit/test_querylog.py
+import json
+from adapters.db.querylog import QueryLog, elide
+
+def test_elide_vectors_lists_and_strings():
+    p = elide({"vec": [0.1] * 1536, "rows": [{"cid": i} for i in range(100)], "text": "x" * 50},
+              max_list=3, max_str=10)
+    assert p["vec"] == "<vector dims=1536>"
+    assert p["rows"][:3] == [{"cid": 0}, {"cid": 1}, {"cid": 2}] and p["rows"][3] == "...(+97)"
+    assert p["text"].startswith("x" * 10) and "+40" in p["text"]
+
+def test_querylog_writes_in_background_and_rotates(tmp_path):
+    path = tmp_path / "q.jsonl"
+    ql = QueryLog(path, max_bytes=2000, backups=2, flush_s=0.05)
+    for i in range(50):
+        ql.record("RETURN $i", {"i": i, "vec": [0.5] * 512}, ms=1.5, rows=1)
+    ql.close()
+    assert ql.written == 50 and (tmp_path / "q.jsonl.1").exists() and not (tmp_path / "q.jsonl.3").exists()
+    recs = [json.loads(l) for l in path.read_text(encoding="utf-8").splitlines()]
+    assert recs[-1]["params"] == {"i": 49, "vec": "<vector dims=512>"} and recs[-1]["ms"] == 1.5
+
+def test_querylog_sampling(tmp_path):
+    ql = QueryLog(tmp_path / "q.jsonl", sample=0.0)
+    ql.record("RETURN 1")
+    ql.close()
+    assert ql.written == 0 and ql.sampled_out == 1
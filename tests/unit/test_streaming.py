@@ -0,0 +1,64 @@
+# tests/unit/test_streaming.py
+import json
+
+import pytest
+
+pytest.importorskip("fastmcp")   # corpus.chunker / corpus.embedder -> app.core.resources
+
+import app.observability.pipeline as pipeline
+import corpus.embedder as embedder_mod
+from corpus.chunker import Chunker, ChunkOptions
+from corpus.embedder import iter_jsonl
+from corpus.models import Document, TextBlock
+from graph_based.backend import EmbeddedGraphBackend
+
+
+def test_chunker_yields_before_consuming_all_blocks():
+    doc = Document(series="s", filename="f.pdf", path="f.pdf")
+    pulled = []
+    def blocks():
+        for i in range(1000):
+            pulled.append(i)
+            yield TextBlock(doc=doc, page=1, order=i, text=f"Bloc {i}.", meta={"type": "table"})
+    it = Chunker(ChunkOptions(strategy="sentence", size=50, overlap=0)).iter_chunks(blocks())
+    first, second = next(it), next(it)
+    assert (first.idx, second.idx, first.text) == (0, 1, "Bloc 0.") and len(pulled) == 2
+
+
+def test_iter_jsonl_streams_lines(tmp_path):
+    p = tmp_path / "f.chunks.jsonl"
+    p.write_text('{"text": "a"}\n\n{"text": "b"}\n', encoding="utf-8")
+    it = iter_jsonl(p)
+    assert next(it) == (0, {"text": "a"})
+    assert list(it) == [(2, {"text": "b"})]
+
+
+class _Provider:
+    embed_model = "fake-emb"
+    def __init__(self): self.batches = []
+    def embed_texts(self, texts, *, dimensions=None):
+        self.batches.append(list(texts))
+        return [[float(len(t)), 1.0] for t in texts]
+
+
+class _Storage:
+    def __init__(self, root): self.root = root
+    def ensure_series(self, series): return self.root
+
+
+def test_embed_streams_fixed_batches_and_emits_terminal_event(tmp_path, monkeypatch):
+    (tmp_path / "chunks").mkdir()
+    (tmp_path / "chunks" / "_report.json").write_text(json.dumps({"items": [{"output": "chunks/f.chunks.jsonl"}]}))
+    (tmp_path / "chunks" / "f.chunks.jsonl").write_text("\n".join(
+        json.dumps({"doc": {"filename": "f.pdf"}, "text": f"t{i}", "order": i}) for i in range(5)))
+    events = []
+    monkeypatch.setattr(pipeline, "_emit", events.append)
+    monkeypatch.setattr(embedder_mod, "get_vector_index", lambda series: None)
+    monkeypatch.setattr(embedder_mod, "get_storage", lambda: _Storage(tmp_path))
+    prov = _Provider()
+    rep = embedder_mod.Embedder(provider=prov, db=EmbeddedGraphBackend(), batch_size=2).embed_corpus("s")
+    assert [len(b) for b in prov.batches] == [2, 2, 1]                 # lots bornés, lus au fil de l'eau
+    assert rep["vectors"] == 5 and (rep["peak_rss_mb"] is None or rep["peak_rss_mb"] > 0)
+    phases = [(e["step"], e["phase"]) for e in events]
+    assert phases[0] == ("Embedding", "start") and phases[-1] == ("Embedding", "end")
+    assert any(p == ("Embedding", "progress") for p in phases)
@@ -0,0 +1,51 @@
+# tests/unit/test_vector_index.py
+import numpy as np
+from adapters.vector.base import InMemoryIndex
+
+def _data(n=200, dim=16, seed=0):
+    rng = np.random.default_rng(seed)
+    return [f"c{i}" for i in range(n)], rng.normal(size=(n, dim)).astype("float32")
+
+def _exact(mat, q, k):
+    m = mat / np.linalg.norm(mat, axis=1, keepdims=True)
+    s = m @ (q / np.linalg.norm(q))
+    return list(np.argsort(-s)[:k])
+
+def test_inmemory_search_matches_exact_cosine():
+    ids, mat = _data()
+    idx = InMemoryIndex(dim=16)
+    idx.add(ids, mat, [{"i": i} for i in range(len(ids))])
+    q = mat[7] + 0.01
+    hits = idx.search(q, k=5)
+    assert [h.id for h in hits] == [ids[j] for j in _exact(mat, q, 5)]
+    assert hits[0].metadata == {"i": 7}
+    assert hits[0].score >= hits[-1].score
+
+def test_inmemory_search_many_equals_search():
+    ids, mat = _data()
+    idx = InMemoryIndex(dim=16)
+    idx.add(ids, mat)
+    batch = idx.search_many(mat[:4], k=3)
+    assert [[h.id for h in r] for r in batch] == [[h.id for h in idx.search(q, k=3)] for q in mat[:4]]
+
+def test_inmemory_upsert_and_dim_check():
+    idx = InMemoryIndex(dim=2)
+    idx.add(["a", "b"], [[1.0, 0.0], [0.0, 1.0]])
+    idx.add(["a"], [[0.0, 1.0]], [{"v": 2}])
+    assert len(idx) == 2
+    hits = idx.search([0.0, 1.0], k=5)
+    assert len(hits) == 2 and hits[0].score > 0.99 and hits[1].score > 0.99
+    try:
+        idx.add(["c"], [[1.0, 2.0, 3.0]])
+        assert False, "dim mismatch attendu"
+    except ValueError:
+        pass
+
+def test_inmemory_remove_tombstones_rows():
+    ids, mat = _data()
+    idx = InMemoryIndex(dim=16)
+    idx.add(ids, mat)
+    assert idx.remove(["c7", "c7", "absent"]) == 1 and idx.dead == 1
+    assert "c7" not in [h.id for h in idx.search(mat[7], k=5)] and len(idx.search(mat[7], k=5)) == 5
+    idx.add(["c7"], mat[7:8])                     # ré-ajout: nouvelle ligne
+    assert idx.search(mat[7], k=1)[0].id == "c7"
@@ -0,0 +1,40 @@
+# tests/unit/test_vector_ivf.py
+import numpy as np
+from adapters.vector.base import InMemoryIndex
+from adapters.vector.ivf import IVFIndex
+
+def _data(n=3000, dim=16, seed=0):
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(30, dim))
+    return (centers[rng.integers(0, 30, n)] + 0.1 * rng.normal(size=(n, dim))).astype("float32")
+
+def test_ivf_recall_vs_exact():
+    mat = _data()
+    ids = [str(i) for i in range(len(mat))]
+    exact = InMemoryIndex(16); exact.add(ids, mat)
+    ivf = IVFIndex(InMemoryIndex(16), nprobe=8, train_min=500); ivf.add(ids, mat)
+    qs = mat[:50] + 0.05
+    got = ivf.search_many(qs, k=10)
+    ref = exact.search_many(qs, k=10)
+    recall = np.mean([len({h.id for h in a} & {h.id for h in b}) / 10 for a, b in zip(got, ref)])
+    assert ivf.trained and recall >= 0.9
+    # nprobe = nlist => exhaustif
+    full = ivf.search(qs[0], k=10, nprobe=ivf.nlist)
+    assert [h.id for h in full] == [h.id for h in ref[0]]
+
+def test_ivf_incremental_add_and_persist(tmp_path):
+    mat = _data(1200)
+    ivf = IVFIndex(InMemoryIndex(16), train_min=1000, path=tmp_path / "ivf.npz")
+    ivf.add([str(i) for i in range(1000)], mat[:1000])
+    assert ivf.trained and (tmp_path / "ivf.npz").exists()     # entraîné + persisté à l'ajout, pas à la recherche
+    ivf.add([str(i) for i in range(1000, 1200)], mat[1000:])
+    assert ivf.search(mat[1100], k=1)[0].id == "1100"
+    ivf.add(["5"], mat[1100:1101])                               # upsert: ré-affectation persistée
+    again = IVFIndex(ivf.base, train_min=1000, path=tmp_path / "ivf.npz")
+    assert np.array_equal(again._assign, ivf._assign) and again.search(mat[1100], k=2)[1].id in {"5", "1100"}
+    assert [p.name for p in tmp_path.iterdir()] == ["ivf.npz"]
+
+def test_ivf_trains_at_build_over_existing_base():
+    mat = _data(1200)
+    base = InMemoryIndex(16); base.add([str(i) for i in range(1200)], mat)
+    assert IVFIndex(base, train_min=1000).trained
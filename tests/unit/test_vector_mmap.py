@@ -0,0 +1,34 @@
+# tests/unit/test_vector_mmap.py
+import numpy as np
+from adapters.vector.mmap import MmapIndex
+
+def test_mmap_roundtrip_and_reopen(tmp_path):
+    rng = np.random.default_rng(1)
+    mat = rng.normal(size=(50, 8)).astype("float32")
+    ids = [f"s:f:{i}" for i in range(50)]
+    idx = MmapIndex(tmp_path / "vectors")
+    idx.add(ids, mat, [{"text": f"t{i}"} for i in range(50)])
+
+    reader = MmapIndex(tmp_path / "vectors")  # autre "worker"
+    assert len(reader) == 50 and reader.dim == 8
+    hit = reader.search(mat[3], k=1)[0]
+    assert hit.id == "s:f:3" and hit.metadata == {"text": "t3"}
+
+def test_mmap_upsert_and_refresh(tmp_path):
+    writer = MmapIndex(tmp_path / "v", dim=2)
+    reader = MmapIndex(tmp_path / "v")
+    writer.add(["a", "b"], [[1.0, 0.0], [0.0, 1.0]])
+    writer.add(["a", "c"], [[0.0, 1.0], [-1.0, 0.0]], [{"v": 2}, {}])
+    reader.refresh()
+    assert len(reader) == 3
+    top = reader.search([0.0, 1.0], k=2)
+    assert {h.id for h in top} == {"a", "b"}
+    assert reader.search([1.0, 0.0], k=3)[-1].id == "c"
+
+def test_mmap_remove_tombstones(tmp_path):
+    idx = MmapIndex(tmp_path / "v", dim=2)
+    idx.add(["a", "b", "c"], [[1.0, 0.0], [0.9, 0.1], [0.0, 1.0]])
+    assert idx.remove(["a", "zz"]) == 1
+    reader = MmapIndex(tmp_path / "v")
+    assert reader.dead == 1 and "a" not in reader._pos
+    assert [h.id for h in reader.search([1.0, 0.0], k=3)] == ["b", "c"]
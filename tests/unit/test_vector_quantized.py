@@ -0,0 +1,22 @@
+# tests/unit/test_vector_quantized.py
+import numpy as np
+from adapters.vector.mmap import MmapIndex
+from adapters.vector.quantized import QuantizedIndex
+from graph_based.evaluation.bench_runtime import bench_vector_indexes
+
+def test_quantized_int8_rerank_matches_exact(tmp_path):
+    rng = np.random.default_rng(0)
+    mat = rng.normal(size=(500, 32)).astype("float32")
+    idx = QuantizedIndex(MmapIndex(tmp_path / "v"), codes="int8")
+    idx.add([str(i) for i in range(400)], mat[:400])
+    idx.add([str(i) for i in range(400, 500)], mat[400:])  # ajout incrémental
+    assert idx.nbytes == 500 * 32  # 1 octet / dimension
+    for i in (3, 450):
+        hit = idx.search(mat[i], k=1)[0]
+        assert hit.id == str(i) and abs(hit.score - 1.0) < 1e-5  # score exact (re-scoring)
+
+def test_bench_reports_recall():
+    rng = np.random.default_rng(1)
+    vecs = rng.normal(size=(3000, 16)).astype("float32")
+    rows = {r["index"]: r for r in bench_vector_indexes(vecs, vecs[:20], k=5)}
+    assert rows["int8"]["recall@5"] >= 0.9 and rows["float16"]["recall@5"] >= 0.95
@@ -1,10 +1,10 @@
 # tools/graph_rag_tool.py
 from __future__ import annotations
-from typing import Literal, Dict, Any, Optional
+from typing import Literal, Dict, Any, List, Optional
 # from fastmcp import FastMCP
 
 # -- Core --------
-from app.core.resources import get_db, get_provider
+from app.core.resources import get_async_db, get_db, get_provider
 from app.core.logging import setup_logging, get_logger
 
 # -- Corpus ------
@@ -12,16 +12,26 @@ from corpus.retriever.schemas import SearchRequest, SearchResponse
 from corpus.retriever.kg import KGRetriever
 from corpus.retriever.dense import DenseRetriever
 from corpus.retriever.hybrid import HybridRetriever
+from corpus.retriever.fanout import FanoutRetriever
+from corpus.embedder import chunk_index_name
 # from corpus.kg.runner import retriever_query   # ta logique existante
 
 
 
 
-# Pré-instanciation (singleton)
+# Pré-instanciation (singleton) ; driver async lié au premier appel (boucle en cours), pas à l'import
 _db = get_db()
 kg_ret = KGRetriever(_db)
 dn_ret = DenseRetriever(_db)
 hy_ret = HybridRetriever(kg_ret, dn_ret)
+fo_ret = FanoutRetriever({"kg": kg_ret, "dense": dn_ret, "hybrid": hy_ret}, index_for=chunk_index_name)
+
+
+def retriever() -> FanoutRetriever:
+    """Retriever fan-out partagé, avec l'adapter Neo4j async résolu à la première requête."""
+    if kg_ret.adb is None or dn_ret.adb is None:
+        kg_ret.adb = dn_ret.adb = get_async_db()
+    return fo_ret
 
 
 # ===== Tool de recherche dans KG / index vectoriel / hybride ============================
@@ -30,7 +40,7 @@ async def search_data(
     query: str,
     mode: str = "hybrid",
     k: int = 6,
-    series: str | None = None,
+    series: str | List[str] | None = None,
     filters: dict | None = None,
     index_name: str | None = None,
     pipeline: Literal["anchors","anchors+expand","full"]= "anchors"
@@ -41,14 +51,10 @@ async def search_data(
     anchors         -> renvoie seulement les 'hits' (retour actuel)
     anchors+expand  -> ajoute 'neighbors' (les projets reliés)
     full            -> ajoute 'evidence' (chunks) prêts pour la synthèse
+    series: une série, ou une liste (recherche parallèle par série, scores normalisés par index)
     """
     req = SearchRequest(query=query, mode=mode, k=k, series=series, filters=filters or {}, index_name=index_name, pipeline=pipeline)
-    if req.mode == "kg":
-        res: SearchResponse = kg_ret.search(req)
-    elif req.mode == "dense":
-        res = dn_ret.search(req)
-    else:
-        res = hy_ret.search(req)
+    res: SearchResponse = await retriever().asearch(req)
     return res.model_dump()
 
 # ========================================================================================
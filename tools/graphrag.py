@@ -1,13 +1,17 @@
 # tools/graph_rag_tool.py
 from __future__ import annotations
-from typing import Dict, Any, Optional, Literal
+from typing import Callable, Dict, Any, List, Optional, Literal, Tuple, Union
 import time
 
-from app.core.resources import get_db, get_provider
+from app.core.resources import get_graph_backend, get_provider
 from graph_based.kg.summarize import index_search, qfs_map, qfs_reduce
 from graph_based.retriever.pathrag import node_retrieval, flow_pruning, prompt_builder
 from graph_based.retriever.vector import dense as vector_dense
+from graph_based.utils.parallel import fan_out
 from graph_based.utils.tokenize import count_tokens
+from corpus.retriever.fanout import merge_rows
+
+Series = Union[str, List[str]]
 
 # ---------------- Defaults prudents ----------------
 
@@ -15,7 +19,8 @@ DEFAULT_BUDGETS: Dict[str, Any] = {
     "qfs_map":    {"max_items": 24, "max_prompt_tokens": 900,  "max_response_tokens": 384},
     "qfs_reduce": {"max_items": 12, "max_prompt_tokens": 1200, "max_response_tokens": 384},
     "paths":      {"max_prompt_tokens": 1400, "max_response_tokens": 384},
-    "vector":     {"max_prompt_tokens": 1200, "max_response_tokens": 384}
+    "vector":     {"max_prompt_tokens": 1200, "max_response_tokens": 384},
+    "fanout":     {"deadline_s": 20.0, "max_workers": 8}   # plusieurs séries: échéance globale de la récupération
 }
 
 # ---------------- MCP: spec ----------------
@@ -30,7 +35,8 @@ def mcp_spec() -> Dict[str, Any]:
         "input_schema": {
             "type": "object",
             "properties": {
-                "series":  {"type": "string", "description": "Nom de la série (corpus/index)."},
+                "series":  {"oneOf": [{"type": "string"}, {"type": "array", "items": {"type": "string"}}],
+                            "description": "Nom de la série (corpus/index), ou liste de séries (recherche parallèle)."},
                 "query":   {"type": "string", "description": "Question utilisateur."},
                 "mode":    {"type": "string", "enum": ["auto", "graph", "path", "vector"], "default": "auto"},
                 "budgets": {"type": "object", "description": "Budgets facultatifs par étape (qfs_map/qfs_reduce/paths/vector)."},
@@ -44,7 +50,7 @@ def mcp_spec() -> Dict[str, Any]:
         "output_schema": {
             "type": "object",
             "properties": {
-                "series": {"type": "string"},
+                "series": {"oneOf": [{"type": "string"}, {"type": "array", "items": {"type": "string"}}]},
                 "mode_used": {"type": "string"},
                 "question": {"type": "string"},
                 "answer": {"type": "string"},
@@ -87,16 +93,32 @@ def _route_auto(question: str) -> Dict[str, Any]:
         return {"mode": "path", "rule": "local/fact+relations"}
     return {"mode": "vector", "rule": "fallback/simple"}
 
+# ---------------- Multi-séries (fan-out) ----------------
+
+def _gather(series: Series, fn: Callable[[str], List[Dict[str, Any]]], *, k: int,
+            budgets: Dict[str, Any]) -> Tuple[List[Dict[str, Any]], Optional[Dict[str, Any]]]:
+    """
+    Une série: fn(series). Plusieurs: fn par série en parallèle (index par série) sous l'échéance
+    budgets["fanout"], puis fusion des scores normalisés par série (top-k global). Renvoie (lignes, diag).
+    """
+    if isinstance(series, str):
+        return fn(series), None
+    cfg = {**DEFAULT_BUDGETS["fanout"], **budgets.get("fanout", {})}
+    out, diag = fan_out(fn, series, deadline_s=cfg["deadline_s"], max_workers=cfg["max_workers"])
+    return merge_rows({s: out[s] for s in dict.fromkeys(series) if s in out}, k), diag
+
 # ---------------- Exécutions spécialisées ----------------
 
-def _run_graphrag(*, series: str, question: str, budgets: Dict[str, Any], db, provider) -> Dict[str, Any]:
+def _run_graphrag(*, series: Series, question: str, budgets: Dict[str, Any], db, provider) -> Dict[str, Any]:
     t0 = time.perf_counter()
 
     # 1) Seed search dans l’index (comm-summaries/chunk summaries) — pure lecture
-    seeds = index_search.search(series=series, query=question, db=db, provider=provider)  # List[{"text","level","comm_id","score", ...}]
-    
-    # Quelle la différence entre candidates et seeds ? candidates = seeds ?
-    seeds = seeds.get("candidates", []) if isinstance(seeds, dict) else seeds
+    # (plusieurs séries: candidats de chaque série, scores normalisés par série)
+    def _seeds(s: str) -> List[Dict[str, Any]]:
+        found = index_search.search(series=s, query=question, db=db, provider=provider)
+        return found.get("candidates", []) if isinstance(found, dict) else list(found or [])
+
+    seeds, fanout = _gather(series, _seeds, k=budgets.get("qfs_map", {}).get("max_items", 24), budgets=budgets)
     
     # 2) QFS map-reduce sur seeds (prompts markdown existants)
     map_out = qfs_map.run(series=series, query=question, candidates=seeds, provider=provider, max_map_tokens=budgets.get("qfs_map", {}).get("max_prompt_tokens", 512))   # List[{"partial","citations":[...]}]
@@ -118,19 +140,22 @@ def _run_graphrag(*, series: str, question: str, budgets: Dict[str, Any], db, pr
         "citations": citations,
         "latency_ms": elapsed,
         "token_usage": {"prompt": p_tok, "completion": c_tok, "total": p_tok + c_tok},
-        "debug": {"router": {"rule": "graph (global/sensemaking)"}, "seeds": seeds[:24]}
+        "debug": {"router": {"rule": "graph (global/sensemaking)"}, "seeds": seeds[:24], "fanout": fanout}
     }
 
-def _run_pathrag(*, series: str, question: str, k: int, n: int, alpha: float, theta: float,
+def _run_pathrag(*, series: Series, question: str, k: int, n: int, alpha: float, theta: float,
                  budgets: Dict[str, Any], db, provider) -> Dict[str, Any]:
     t0 = time.perf_counter()
 
-    # 1) Node retrieval (top-N entités pertinentes)
-    node_res = node_retrieval.topN(series=series, query=question, n=n, db=db)
-    # node_res = {"nodes":[{"id","name","type","score"}], "pairs":[(src_id,dst_id), ...]}
+    def retrieve(s: str) -> List[Dict[str, Any]]:
+        # 1) Node retrieval (top-N entités pertinentes)
+        node_res = node_retrieval.topN(series=s, query=question, n=n, db=db)
+        # node_res = {"nodes":[{"id","name","type","score"}], "pairs":[(src_id,dst_id), ...]}
+
+        # 2) Path retrieval via flow-pruning (top-K chemins fiables)
+        return flow_pruning.topK(series=s, nodes=node_res.get("nodes", []), k=k, alpha=alpha, theta=theta, db=db).get("paths", [])
 
-    # 2) Path retrieval via flow-pruning (top-K chemins fiables)
-    paths = flow_pruning.topK(series=series, nodes=node_res.get("nodes", []), k=k, alpha=alpha, theta=theta, db=db).get("paths", [])
+    paths, fanout = _gather(series, retrieve, k=k, budgets=budgets)
     # paths = flow_pruning.topK(series=series, pairs=node_res["pairs"], k=k, alpha=alpha, theta=theta, db=db)
     # paths = [{"nodes":[...], "edges":[...], "score":float, "ids":{"node_ids":[...],"edge_ids":[...]}}]
 
@@ -156,13 +181,14 @@ def _run_pathrag(*, series: str, question: str, k: int, n: int, alpha: float, th
         "citations": cites,
         "latency_ms": elapsed,
         "token_usage": {"prompt": p_tok, "completion": c_tok, "total": p_tok + c_tok},
-        "debug": {"router": {"rule": "path (fact/relations)"}, "paths": paths}
+        "debug": {"router": {"rule": "path (fact/relations)"}, "paths": paths, "fanout": fanout}
     }
 
-def _run_vector(*, series: str, question: str, k: int, budgets: Dict[str, Any], db, provider) -> Dict[str, Any]:
+def _run_vector(*, series: Series, question: str, k: int, budgets: Dict[str, Any], db, provider) -> Dict[str, Any]:
     t0 = time.perf_counter()
 
-    chunks = vector_dense.search(series=series, query=question, k=k, db=db, provider=provider)
+    chunks, fanout = _gather(series, lambda s: vector_dense.search(series=s, query=question, k=k, db=db, provider=provider),
+                             k=k, budgets=budgets)
     # chunks = [{"cid","text","score", "doc","page", ...}]
 
     # Prompt simple « citations + question »
@@ -186,12 +212,12 @@ def _run_vector(*, series: str, question: str, k: int, budgets: Dict[str, Any],
         "citations": cites,
         "latency_ms": elapsed,
         "token_usage": {"prompt": p_tok, "completion": c_tok, "total": p_tok + c_tok},
-        "debug": {"router": {"rule": "vector (fallback)"}, "chunks": chunks}
+        "debug": {"router": {"rule": "vector (fallback)"}, "chunks": chunks, "fanout": fanout}
     }
 
 # ---------------- Point d’entrée MCP ----------------
 
-def query(series: str, query: str, *, mode: str = "auto",
+def query(series: Series, query: str, *, mode: str = "auto",
           budgets: Optional[Dict[str, Any]] = None, k: int = 12, n: int = 30,
           alpha: float = 0.8, theta: float = 0.05,
           db=None, provider=None) -> Dict[str, Any]:
@@ -201,9 +227,10 @@ def query(series: str, query: str, *, mode: str = "auto",
           if global/sensemaking -> GraphRAG: index_search.search -> qfs_map.run -> qfs_reduce.run
           if local/fact lookup   -> PathRAG : node_retrieval.topN -> flow_pruning.topK -> prompt_builder.build -> provider.ask_llm
           else (fallback)        -> Vector  : vector_dense.search -> prompt (simple) -> provider.ask_llm
+      - `series` peut être une liste: récupération par série en parallèle, une seule génération.
       - Retourne AnswerBundle (voir schéma).
     """
-    db = db or get_db()
+    db = db or get_graph_backend()
     provider = provider or get_provider()
     budgets = budgets or DEFAULT_BUDGETS
 
@@ -224,7 +251,7 @@ def search_data(series: str, query: str, k: int = 8, *, db=None, provider=None)
     """
     Expose un simple 'search' (vector) pour debug/inspection.
     """
-    db = db or get_db()
+    db = db or get_graph_backend()
     provider = provider or get_provider()
     chunks = vector_dense.search(series=series, query=query, k=k, db=db, provider=provider)
     return {"series": series, "query": query, "topk": chunks}
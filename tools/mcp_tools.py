@@ -1,9 +1,9 @@
 from __future__ import annotations
-import time
-from typing import Literal, Dict, Any, Optional
+import asyncio, time
+from typing import Literal, Dict, Any, List, Optional
 
 # -- Core Server --------
-from app.core.resources import get_db, get_mcp, get_provider
+from app.core.resources import get_async_db, get_graph_backend, get_mcp, get_provider
 mcp = get_mcp()
 
 # -- Tools Logic --------
@@ -22,8 +22,7 @@ async def default_tool(word: str) -> str:
 @mcp.tool()
 async def db_ping() -> bool:
     """ Tester la connexion avec Neo4J """
-    
-    return test_cnx()
+    return await get_async_db().ping()
 
 
 # -- GraphRAG (based) Tool ------
@@ -33,7 +32,7 @@ async def graph_rag_query() -> Dict[str, Any]:
     return mcp_spec()
 
 @mcp.tool()
-async def search(series: str, query: str, *, mode: str = "auto",
+async def search(series: str | List[str], query: str, *, mode: str = "auto",
                      budgets: Dict[str, Any] | None = None,
                      k: int = 12, n: int = 30, alpha: float = 0.8, theta: float = 0.05) -> Dict[str, Any]:
     """
@@ -46,7 +45,9 @@ async def search(series: str, query: str, *, mode: str = "auto",
     """
     # Object of type str is not callable ? : 'str' object is not callable, what to do ? : vérifier les types, ajouter des assertions, etc.
     # Attribute "__call__" is unknown ? : Object of type 'str' has no '__call__' member, what to do ? : vérifier les types, ajouter des assertions, etc.
-    return graph_query(series=series, query=query, mode=mode, budgets=budgets, k=k, n=n, alpha=alpha, theta=theta, db=get_db(), provider=get_provider())
+    # pipeline synchrone (Cypher + LLM) exécuté hors de la boucle d'événements
+    return await asyncio.to_thread(graph_query, series=series, query=query, mode=mode, budgets=budgets, k=k, n=n,
+                                   alpha=alpha, theta=theta, db=get_graph_backend(), provider=get_provider())
 
 
 # -- Old KG Retriever Tool ------
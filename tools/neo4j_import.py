@@ -0,0 +1,200 @@
+# tools/neo4j_import.py
+# Chargement initial hors-ligne : artefacts d'une série -> CSV `neo4j-admin database import full`.
+"""
+Usage:
+    python -m tools.neo4j_import <series> [--out DIR] [--model NAME] [--provider NAME]
+
+Sources (data/series/<series>/):
+- chunks/_report.json + chunks/*.chunks.jsonl  -> Chunk (mêmes cid que corpus/embedder.py)
+- kg/*.kg.jsonl (cache de corpus/kg/runner.py)  -> Entity, REL, APPEARS_IN
+- vectors/ (MmapIndex, vector.type=mmap|ivf)     -> Chunk.embedding (si présent)
+
+Les colonnes reprennent les propriétés écrites par adapters/db/cypher.py (UPSERT_CHUNKS,
+UPSERT_ENTITIES, UPSERT_RELATIONS, LINK_ENTS_TO_CHUNKS) via les mêmes normaliseurs de lignes.
+Ids dédupliqués (premier vu gagnant); relations dont une extrémité est absente écartées.
+Aucune connexion à Neo4j n'est ouverte.
+"""
+from __future__ import annotations
+import argparse, csv, json
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Mapping, Optional, Sequence, Tuple
+
+from adapters.db.neo4j import chunk_rows, entity_rows, relation_rows
+from adapters.vector.mmap import MmapIndex, HEADER_FILE
+
+ARRAY_DELIMITER = ";"
+
+# (colonne d'en-tête neo4j-admin, clé de la ligne normalisée)
+CHUNK_COLUMNS: List[Tuple[str, str]] = [
+    ("id:ID(Chunk)", "cid"), ("series", "series"), ("file", "file"), ("page:int", "page"),
+    ("text", "text"), ("order:int", "order"), ("provider", "provider"), ("model", "model"),
+    ("dims:int", "dims"), ("ts:double", "ts"), ("text_hash", "text_hash"), ("build_id", "build_id"),
+    ("embedding:float[]", "vec"),
+]
+ENTITY_COLUMNS: List[Tuple[str, str]] = [
+    ("id:ID(Entity)", "id"), ("name", "name"), ("type", "type"), ("series", "series"),
+    ("source", "source"), ("aliases:string[]", "aliases"), ("aliases_text", "aliases_text"),
+    ("attrs_json", "attrs_json"), ("meta_json", "meta_json"), ("embedding:float[]", "embedding"), ("approach", "approach"), ("build_id", "build_id"),
+]
+REL_COLUMNS: List[Tuple[str, str]] = [
+    (":START_ID(Entity)", "src"), (":END_ID(Entity)", "dst"), ("id", "id"), ("kind", "kind"),
+    ("series", "series"), ("weight:double", "weight"), ("meta_json", "meta_json"),
+    ("approach", "approach"), ("build_id", "build_id"),
+]
+APPEARS_IN_COLUMNS: List[Tuple[str, str]] = [
+    (":START_ID(Entity)", "eid"), (":END_ID(Chunk)", "cid"), ("page:int", "page"),
+]
+
+
+def _cell(v: Any) -> Any:
+    if v is None:
+        return ""
+    if isinstance(v, (list, tuple)):
+        return ARRAY_DELIMITER.join(str(x) for x in v)  # np.float32 -> plus courte écriture exacte
+    return v
+
+
+class _CsvOut:
+    """Paire <name>_header.csv / <name>.csv écrite en flux ; colonnes fixes (+ :LABEL / :TYPE constant)."""
+
+    def __init__(self, out_dir: Path, name: str, columns: Sequence[Tuple[str, str]], *,
+                 const: Optional[Tuple[str, str]] = None):
+        self.columns, self.const = list(columns), const
+        self.header = out_dir / f"{name}_header.csv"
+        self.data = out_dir / f"{name}.csv"
+        head = [c for c, _ in self.columns] + ([const[0]] if const else [])
+        with self.header.open("w", encoding="utf-8", newline="") as f:
+            csv.writer(f).writerow(head)
+        self._fh = self.data.open("w", encoding="utf-8", newline="")
+        self._w = csv.writer(self._fh)
+        self.count = 0
+
+    def write(self, row: Mapping[str, Any]) -> None:
+        vals = [_cell(row.get(k)) for _, k in self.columns] + ([self.const[1]] if self.const else [])
+        self._w.writerow(vals)
+        self.count += 1
+
+    def close(self) -> None:
+        self._fh.close()
+
+    @property
+    def arg(self) -> str:
+        return f"{self.header.name},{self.data.name}"
+
+
+def _jsonl(path: Path) -> Iterator[Tuple[int, Dict[str, Any]]]:
+    with path.open(encoding="utf-8") as f:
+        for i, line in enumerate(f):
+            line = line.strip()
+            if line:
+                yield i, json.loads(line)
+
+
+def _chunk_files(series_dir: Path) -> Iterator[Path]:
+    """Sorties *.chunks.jsonl listées par chunks/_report.json (à défaut, glob)."""
+    report = series_dir / "chunks" / "_report.json"
+    if report.exists():
+        for it in json.loads(report.read_text(encoding="utf-8")).get("items", []):
+            if it.get("output") and (series_dir / it["output"]).exists():
+                yield series_dir / it["output"]
+    else:
+        yield from sorted((series_dir / "chunks").glob("*.chunks.jsonl"))
+
+
+def export_series(series: str, series_dir: Path, out_dir: Path, *, vectors_dir: Optional[Path] = None,
+                  model: Optional[str] = None, provider: Optional[str] = None,
+                  build_id: Optional[str] = None) -> Dict[str, Any]:
+    """Écrit les CSV dans `out_dir` ; renvoie les compteurs et la commande neo4j-admin correspondante."""
+    out_dir.mkdir(parents=True, exist_ok=True)
+    vectors_dir = vectors_dir or series_dir / "vectors"
+    vindex = MmapIndex(vectors_dir) if (vectors_dir / HEADER_FILE).exists() else None
+    build_id = build_id or f"import-{series}"
+
+    chunks = _CsvOut(out_dir, "chunks", CHUNK_COLUMNS, const=(":LABEL", "Chunk"))
+    entities = _CsvOut(out_dir, "entities", ENTITY_COLUMNS, const=(":LABEL", "Entity"))
+    rels = _CsvOut(out_dir, "rels", REL_COLUMNS, const=(":TYPE", "REL"))
+    appears = _CsvOut(out_dir, "appears_in", APPEARS_IN_COLUMNS, const=(":TYPE", "APPEARS_IN"))
+    stats = {"duplicates": 0, "dangling": 0, "embeddings": 0}
+
+    # ---- Chunks ----
+    cids: set[str] = set()
+    for fpath in _chunk_files(series_dir):
+        for line_idx, data in _jsonl(fpath):
+            doc, meta = data.get("doc", {}) or {}, data.get("meta", {}) or {}
+            filename = doc.get("filename") or fpath.stem
+            idx = data.get("idx", data.get("order", line_idx))
+            cid = f"{series}:{filename}:{idx}"
+            if cid in cids:
+                stats["duplicates"] += 1
+                continue
+            cids.add(cid)
+            row = {"cid": cid, "text": data.get("text", ""), "file": filename,
+                   "page": meta.get("page", data.get("page")), "order": idx}
+            vec = vindex.get(cid) if vindex is not None else None
+            if vec is not None:
+                row.update(vec=list(vec), dims=len(vec), model=model, provider=provider)
+                stats["embeddings"] += 1
+            chunks.write(chunk_rows([row], series=series, approach=provider, build_id=build_id)[0])
+
+    # ---- Entités / relations / apparitions (cache d'extraction) ----
+    eids: set[str] = set()
+    pending_rels: List[Dict[str, Any]] = []
+    links: set[Tuple[str, str, Any]] = set()
+    for kg_path in sorted((series_dir / "kg").glob("*.kg.jsonl")):
+        for _, rec in _jsonl(kg_path):
+            cid, page = rec.get("chunk_id"), rec.get("page")
+            for e in rec.get("entities") or []:
+                if e["id"] in eids:
+                    stats["duplicates"] += 1
+                else:
+                    eids.add(e["id"])
+                    row = entity_rows([e], series=series, approach="A1", build_id=build_id)[0]
+                    # même valeur que UPSERT_ENTITIES (champ de entity_lexical_ft)
+                    row["aliases_text"] = "".join(" " + a for a in row["aliases"] or [])
+                    entities.write(row)
+                key = (e["id"], cid, page)
+                if cid in cids and key not in links:
+                    links.add(key)
+                    appears.write({"eid": e["id"], "cid": cid, "page": page})
+            pending_rels.extend(relation_rows(rec.get("relations") or [], series=series,
+                                              approach="A1", build_id=build_id))
+
+    # Relations après les entités: extrémités connues seulement
+    rids: set[str] = set()
+    for r in pending_rels:
+        if r["id"] in rids:
+            stats["duplicates"] += 1
+        elif r["src"] not in eids or r["dst"] not in eids:
+            stats["dangling"] += 1
+        else:
+            rids.add(r["id"])
+            rels.write(r)
+
+    for out in (chunks, entities, rels, appears):
+        out.close()
+    command = (f"neo4j-admin database import full --multiline-fields=true --array-delimiter='{ARRAY_DELIMITER}' "
+               f"--nodes=Chunk={chunks.arg} --nodes=Entity={entities.arg} "
+               f"--relationships=REL={rels.arg} --relationships=APPEARS_IN={appears.arg} <database>")
+    return {"series": series, "out_dir": str(out_dir), "chunks": chunks.count, "entities": entities.count,
+            "relations": rels.count, "appears_in": appears.count, **stats, "command": command}
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    from app.core.config import get_settings
+    ap = argparse.ArgumentParser(description="Export d'une série en CSV pour neo4j-admin import")
+    ap.add_argument("series")
+    ap.add_argument("--out", type=Path, default=None, help="défaut: data/series/<series>/import")
+    ap.add_argument("--model", default=None, help="modèle d'embedding (propriété Chunk.model)")
+    ap.add_argument("--provider", default=None, help="provider d'embedding (propriété Chunk.provider)")
+    args = ap.parse_args(argv)
+
+    st = get_settings().storage
+    series_dir = Path(st.root) / st.series_dirname / args.series
+    res = export_series(args.series, series_dir, args.out or series_dir / "import",
+                        vectors_dir=series_dir / get_settings().vector.dirname,
+                        model=args.model, provider=args.provider)
+    print(json.dumps(res, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()